@@ -7,13 +7,15 @@ Manages system state transitions and maintains operational resonance.
 
 import json
 import logging
+from collections import deque
 from datetime import datetime, timedelta
 from enum import Enum
 from pathlib import Path
-from typing import Any, Dict, List, Optional, Set, Tuple
+from typing import Any, Deque, Dict, Iterable, List, Optional, Set, Tuple
 
 from guardian.codex_awareness import CodexAwareness
 from guardian.metacognition import MetacognitionEngine
+from guardian.utils.online_stats import EWMA, PeakDetector, WindowedStats
 
 # Configure logging
 logging.basicConfig(
@@ -74,6 +76,78 @@ class StateTransition:
         }
 
 
+class MetricHistory:
+    """Rolling statistics for one resonance metric, updated in O(1) per sample."""
+
+    TREND_WINDOW = 10
+    ANOMALY_WINDOW = 20
+    SMOOTHING = 0.2
+
+    def __init__(self) -> None:
+        self.trend = WindowedStats(self.TREND_WINDOW)
+        self.baseline = WindowedStats(self.ANOMALY_WINDOW)
+        self.smoothed = EWMA(self.SMOOTHING)
+
+    def push(self, value: float) -> None:
+        self.trend.push(value)
+        self.baseline.push(value)
+        self.smoothed.push(value)
+
+
+class CycleHistory:
+    """
+    A cycle history (the "history" of a load or resource entry) that keeps
+    its peak statistics and periodicity up to date as samples are pushed.
+    Callers that report the same stream on every assessment can keep one
+    and pass it as "history" instead of a list: samples can only be
+    appended, so nothing is rescanned. A plain list is analysed from
+    scratch each time, since the agent can't tell whether it was appended
+    to or replaced.
+    """
+
+    TOLERANCE = 0.1
+
+    def __init__(self, values: Iterable[float] = ()) -> None:
+        self.values: List[float] = []
+        self.peaks = PeakDetector()
+        self._periodic_at = 0  # History length the periodic flag was computed for
+        self._periodic = False
+        self.extend(values)
+
+    def push(self, value: float) -> None:
+        self.values.append(value)
+        self.peaks.push(value)
+
+    def extend(self, values: Iterable[float]) -> None:
+        for value in values:
+            self.push(value)
+
+    def __len__(self) -> int:
+        return len(self.values)
+
+    @property
+    def frequency(self) -> Optional[float]:
+        """Inverse of the mean distance between peaks."""
+        interval = self.peaks.mean_interval
+        return None if interval is None else 1.0 / interval
+
+    @property
+    def periodic(self) -> bool:
+        """Whether the first half of the history repeats in the second half."""
+        if len(self.values) < 3:
+            return False
+        # The halves only change when a pair of samples has been added
+        pattern_length = len(self.values) // 2
+        if pattern_length * 2 != self._periodic_at:
+            self._periodic_at = pattern_length * 2
+            self._periodic = all(
+                abs(self.values[i] - self.values[i + pattern_length])
+                <= self.TOLERANCE
+                for i in range(pattern_length)
+            )
+        return self._periodic
+
+
 class EchoformAgent:
     """
     Reflective process and transition management agent.
@@ -85,7 +159,10 @@ class EchoformAgent:
         self.metacognition = metacognition
         self.current_resonance = ResonanceState.HARMONIC
         self.active_transitions: Dict[str, StateTransition] = {}
-        self.resonance_history: List[Tuple[datetime, ResonanceState]] = []
+        self.resonance_history: Deque[Tuple[datetime, ResonanceState]] = deque(
+            maxlen=1000
+        )
+        self.metric_history: Dict[str, MetricHistory] = {}
         self.transition_patterns: Dict[str, List[Dict[str, Any]]] = {}
 
     async def assess_resonance(self, system_state: Dict[str, Any]) -> Dict[str, Any]:
@@ -112,6 +189,7 @@ class EchoformAgent:
 
             # Update history
             self._update_resonance_history(new_resonance)
+            self._update_metric_history(metrics_analysis)
 
             # Store assessment
             assessment_id = self._store_assessment(
@@ -300,21 +378,15 @@ class EchoformAgent:
         trends = {}
 
         for metric, value in metrics.items():
-            # Compare with historical values
-            history = [
-                state
-                for timestamp, state in self.resonance_history[-10:]
-                if hasattr(state, metric)
-            ]
-
-            if history:
-                avg_value = sum(getattr(state, metric, 0.0) for state in history) / len(
-                    history
-                )
-                trend = value - avg_value
+            # Compare with the last MetricHistory.TREND_WINDOW values
+            history = self.metric_history.get(metric)
+
+            if history and len(history.trend):
+                trend = value - history.trend.mean
                 trends[metric] = {
                     "direction": "up" if trend > 0 else "down",
                     "magnitude": abs(trend),
+                    "smoothed": history.smoothed.mean,
                 }
 
         return trends
@@ -355,57 +427,30 @@ class EchoformAgent:
 
         return cycles
 
-    def _is_periodic(self, data: Dict[str, Any]) -> bool:
-        """Determine if data shows periodic behavior."""
-        # Simplified implementation - enhance based on needs
+    def _cycle_history(self, data: Dict[str, Any]) -> Optional[CycleHistory]:
+        """data["history"] as a CycleHistory."""
         if "history" not in data:
-            return False
-
+            return None
         history = data["history"]
-        if len(history) < 3:
-            return False
-
-        # Check for repeating patterns
-        pattern_length = len(history) // 2
-        return self._has_repeating_pattern(history, pattern_length)
-
-    def _has_repeating_pattern(self, data: List[Any], pattern_length: int) -> bool:
-        """Check for repeating patterns in data."""
-        if len(data) < pattern_length * 2:
-            return False
-
-        pattern = data[:pattern_length]
-        next_section = data[pattern_length : pattern_length * 2]
+        if isinstance(history, CycleHistory):
+            return history
+        return CycleHistory(history)
 
-        # Compare sections with tolerance
-        tolerance = 0.1
-        return all(abs(a - b) <= tolerance for a, b in zip(pattern, next_section))
+    def _is_periodic(self, data: Dict[str, Any]) -> bool:
+        """Determine if data shows periodic behavior."""
+        cycle = self._cycle_history(data)
+        return cycle is not None and cycle.periodic
 
     def _calculate_frequency(self, data: Dict[str, Any]) -> Optional[float]:
-        """Calculate frequency of cyclic behavior."""
-        if "history" not in data or len(data["history"]) < 2:
+        """Calculate frequency of cyclic behavior from the average peak spacing."""
+        cycle = self._cycle_history(data)
+        if cycle is None:
             return None
-
-        history = data["history"]
-        peaks = self._find_peaks(history)
-
-        if len(peaks) < 2:
-            return None
-
-        # Calculate average time between peaks
-        peak_intervals = [peaks[i + 1] - peaks[i] for i in range(len(peaks) - 1)]
-
-        return 1.0 / (sum(peak_intervals) / len(peak_intervals))
+        return cycle.frequency
 
     def _find_peaks(self, data: List[float]) -> List[int]:
         """Find indices of peaks in data."""
-        peaks = []
-
-        for i in range(1, len(data) - 1):
-            if data[i] > data[i - 1] and data[i] > data[i + 1]:
-                peaks.append(i)
-
-        return peaks
+        return PeakDetector().extend(data)
 
     def _detect_anomalies(
         self, metrics: Dict[str, float], system_state: Dict[str, Any]
@@ -430,41 +475,28 @@ class EchoformAgent:
 
     def _is_anomalous(self, metric: str, value: float) -> bool:
         """Determine if a metric value is anomalous."""
-        # Get historical values
-        history = [
-            state
-            for timestamp, state in self.resonance_history[-20:]
-            if hasattr(state, metric)
-        ]
-
-        if not history:
-            return False
+        # Statistics over the last MetricHistory.ANOMALY_WINDOW values
+        history = self.metric_history.get(metric)
 
-        # Calculate statistics
-        values = [getattr(state, metric, 0.0) for state in history]
-        mean = sum(values) / len(values)
-        std_dev = (sum((x - mean) ** 2 for x in values) / len(values)) ** 0.5
+        if not history or not len(history.baseline):
+            return False
 
         # Check if value is outside 2 standard deviations
-        return abs(value - mean) > 2 * std_dev
+        baseline = history.baseline
+        return abs(value - baseline.mean) > 2 * baseline.std
 
     def _calculate_anomaly_severity(self, metric: str, value: float) -> float:
         """Calculate severity of an anomaly."""
-        history = [
-            state
-            for timestamp, state in self.resonance_history[-20:]
-            if hasattr(state, metric)
-        ]
+        history = self.metric_history.get(metric)
 
-        if not history:
+        if not history or not len(history.baseline):
             return 0.0
 
-        values = [getattr(state, metric, 0.0) for state in history]
-        mean = sum(values) / len(values)
-        std_dev = (sum((x - mean) ** 2 for x in values) / len(values)) ** 0.5
+        baseline = history.baseline
+        std_dev = baseline.std
 
         # Calculate how many standard deviations from mean
-        deviations = abs(value - mean) / std_dev if std_dev > 0 else 0
+        deviations = abs(value - baseline.mean) / std_dev if std_dev > 0 else 0
 
         # Normalize to 0-1 range
         return min(deviations / 4.0, 1.0)
@@ -515,14 +547,19 @@ class EchoformAgent:
 
     def _update_resonance_history(self, new_state: ResonanceState) -> None:
         """Update resonance state history."""
+        # The deque keeps the latest 1000 entries
         self.resonance_history.append((datetime.utcnow(), new_state))
 
-        # Maintain history size
-        while len(self.resonance_history) > 1000:
-            self.resonance_history.pop(0)
-
         self.current_resonance = new_state
 
+    def _update_metric_history(self, metrics: Dict[str, float]) -> None:
+        """Feed this assessment's metrics into their rolling statistics."""
+        for metric, value in metrics.items():
+            history = self.metric_history.get(metric)
+            if history is None:
+                history = self.metric_history[metric] = MetricHistory()
+            history.push(value)
+
     def _store_assessment(
         self,
         resonance: ResonanceState,
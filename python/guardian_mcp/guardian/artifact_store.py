@@ -0,0 +1,475 @@
+"""
+guardian.artifact_store
+=======================
+
+SQLite storage engine behind CodexAwareness.
+
+- artifacts: one row per artifact, indexed on type (content["type"]), source
+  agent and timestamp; rows keep insertion order through their integer key
+- tags / artifact_tags: tag vocabulary and join table for tag filters
+- artifacts_fts: FTS5 trigram index over the artifact's JSON content, used to
+  narrow substring queries to candidate rows before the exact match
+- artifact_relations: adjacency list of related_artifacts; a recursive CTE
+  fetches the part reachable within the depth limit, ordered depth-first here
+
+Artifacts go in and come out as MemoryArtifact.to_dict() dictionaries.
+Connections are pooled per thread, as in GuardianDB.
+
+Usage:
+    store = ArtifactStore("guardian/memory/artifacts.db")
+    store.put(artifact.to_dict())
+    for row in store.search("conversation", tags=["test"]):
+        ...
+"""
+
+import heapq
+import json
+import logging
+import sqlite3
+import threading
+from collections import defaultdict
+from typing import Any, Dict, Iterable, Iterator, List, Optional
+
+logger = logging.getLogger(__name__)
+
+STATEMENT_CACHE_SIZE = 256
+FTS_MIN_QUERY = 3  # Trigram lookups need at least three characters
+FETCH_SIZE = 64
+
+SCHEMA = [
+    """
+    CREATE TABLE IF NOT EXISTS artifacts (
+        pk INTEGER PRIMARY KEY,
+        id TEXT NOT NULL UNIQUE,
+        type TEXT,
+        source TEXT NOT NULL,
+        timestamp TEXT NOT NULL,
+        confidence REAL NOT NULL,
+        content TEXT NOT NULL,
+        tags TEXT NOT NULL,
+        related TEXT NOT NULL
+    )
+    """,
+    "CREATE INDEX IF NOT EXISTS idx_artifacts_type ON artifacts (type)",
+    "CREATE INDEX IF NOT EXISTS idx_artifacts_source ON artifacts (source)",
+    "CREATE INDEX IF NOT EXISTS idx_artifacts_timestamp ON artifacts (timestamp)",
+    "CREATE TABLE IF NOT EXISTS tags (id INTEGER PRIMARY KEY, name TEXT NOT NULL UNIQUE)",
+    """
+    CREATE TABLE IF NOT EXISTS artifact_tags (
+        tag INTEGER NOT NULL,
+        artifact INTEGER NOT NULL,
+        PRIMARY KEY (tag, artifact)
+    ) WITHOUT ROWID
+    """,
+    "CREATE INDEX IF NOT EXISTS idx_artifact_tags_artifact ON artifact_tags (artifact)",
+    """
+    CREATE TABLE IF NOT EXISTS artifact_relations (
+        artifact_id TEXT NOT NULL,
+        position INTEGER NOT NULL,
+        related_id TEXT NOT NULL,
+        PRIMARY KEY (artifact_id, position)
+    ) WITHOUT ROWID
+    """,
+]
+
+FTS_SCHEMA = [
+    "CREATE VIRTUAL TABLE IF NOT EXISTS artifacts_fts USING fts5("
+    "content, content='artifacts', content_rowid='pk', tokenize='trigram')",
+    "CREATE TRIGGER IF NOT EXISTS artifacts_fts_ai AFTER INSERT ON artifacts BEGIN "
+    "INSERT INTO artifacts_fts (rowid, content) VALUES (new.pk, new.content); END",
+    "CREATE TRIGGER IF NOT EXISTS artifacts_fts_ad AFTER DELETE ON artifacts BEGIN "
+    "INSERT INTO artifacts_fts (artifacts_fts, rowid, content) "
+    "VALUES ('delete', old.pk, old.content); END",
+    "CREATE TRIGGER IF NOT EXISTS artifacts_fts_au AFTER UPDATE OF content ON artifacts BEGIN "
+    "INSERT INTO artifacts_fts (artifacts_fts, rowid, content) "
+    "VALUES ('delete', old.pk, old.content); "
+    "INSERT INTO artifacts_fts (rowid, content) VALUES (new.pk, new.content); END",
+]
+
+ARTIFACT_COLUMNS = (
+    "a.id, a.source, a.timestamp, a.confidence, a.content, a.tags, a.related"
+)
+
+UPSERT = """
+    INSERT INTO artifacts (id, type, source, timestamp, confidence, content, tags, related)
+    VALUES (?, ?, ?, ?, ?, ?, ?, ?)
+    ON CONFLICT (id) DO UPDATE SET
+        type = excluded.type,
+        source = excluded.source,
+        timestamp = excluded.timestamp,
+        confidence = excluded.confidence,
+        content = excluded.content,
+        tags = excluded.tags,
+        related = excluded.related
+"""
+
+# Relations of every artifact within max_depth - 1 hops of the start, in
+# related_artifacts order. UNION over (id, depth) keeps at most one row per
+# artifact and depth, so dense or cyclic graphs cost O(depth * (V + E)) rather
+# than one row per path. Only relations to stored artifacts are followed.
+REACHABLE_RELATIONS = """
+    WITH RECURSIVE reach (id, depth) AS (
+        SELECT ?, 0
+        UNION
+        SELECT r.related_id, reach.depth + 1
+        FROM reach
+        JOIN artifact_relations r ON r.artifact_id = reach.id
+        JOIN artifacts target ON target.id = r.related_id
+        WHERE reach.depth < ?
+    )
+    SELECT r.artifact_id, r.related_id
+    FROM artifact_relations r
+    JOIN artifacts target ON target.id = r.related_id
+    WHERE r.artifact_id IN (SELECT id FROM reach WHERE depth < ?)
+    ORDER BY r.artifact_id, r.position
+"""
+
+
+def fts_phrase(text: str) -> str:
+    """Quotes text as a single FTS5 phrase (a substring under the trigram tokenizer)."""
+    return '"' + text.replace('"', '""') + '"'
+
+
+def content_text(content: Dict[str, Any]) -> str:
+    """The text substring queries run against (same as CodexAwareness._matches_query)."""
+    return json.dumps(content, default=str)
+
+
+class ArtifactStore:
+    def __init__(self, db_path: str) -> None:
+        self.db_path = db_path
+        self._local = threading.local()
+        self._connections: List[sqlite3.Connection] = []
+        self._connections_lock = threading.Lock()
+        self.fts_enabled = True
+        self._init_schema()
+
+    def _connect(self) -> sqlite3.Connection:
+        """This thread's pooled connection; `with conn:` commits or rolls back."""
+        conn = getattr(self._local, "conn", None)
+        if conn is None:
+            conn = sqlite3.connect(
+                self.db_path,
+                timeout=30.0,
+                cached_statements=STATEMENT_CACHE_SIZE,
+                check_same_thread=False,  # close() may run on another thread
+            )
+            conn.execute("PRAGMA journal_mode=WAL")
+            conn.execute("PRAGMA synchronous=NORMAL")
+            conn.execute("PRAGMA temp_store=MEMORY")
+            self._local.conn = conn
+            with self._connections_lock:
+                self._connections.append(conn)
+        return conn
+
+    def close(self) -> None:
+        with self._connections_lock:
+            connections, self._connections = self._connections, []
+        for conn in connections:
+            conn.close()
+        self._local = threading.local()
+
+    def _init_schema(self) -> None:
+        with self._connect() as conn:
+            for statement in SCHEMA:
+                conn.execute(statement)
+            try:
+                for statement in FTS_SCHEMA:
+                    conn.execute(statement)
+            except sqlite3.OperationalError as e:
+                # SQLite < 3.34 has no trigram tokenizer; queries fall back to a scan
+                self.fts_enabled = False
+                logger.warning(f"Artifact FTS index unavailable ({e}); using scans")
+
+    # ---- Writes ----
+    @staticmethod
+    def _write(conn: sqlite3.Connection, artifact: Dict[str, Any]) -> None:
+        content = artifact["content"]
+        artifact_type = content.get("type") if isinstance(content, dict) else None
+        conn.execute(
+            UPSERT,
+            (
+                artifact["id"],
+                artifact_type if isinstance(artifact_type, str) else None,
+                artifact["source"],
+                artifact["timestamp"],
+                artifact["confidence"],
+                content_text(content),
+                json.dumps(artifact["tags"]),
+                json.dumps(artifact["related_artifacts"]),
+            ),
+        )
+        pk = conn.execute(
+            "SELECT pk FROM artifacts WHERE id = ?", (artifact["id"],)
+        ).fetchone()[0]
+        conn.execute("DELETE FROM artifact_tags WHERE artifact = ?", (pk,))
+        for tag in set(artifact["tags"]):
+            conn.execute("INSERT OR IGNORE INTO tags (name) VALUES (?)", (tag,))
+            conn.execute(
+                "INSERT OR IGNORE INTO artifact_tags (tag, artifact) "
+                "SELECT id, ? FROM tags WHERE name = ?",
+                (pk, tag),
+            )
+        conn.execute(
+            "DELETE FROM artifact_relations WHERE artifact_id = ?", (artifact["id"],)
+        )
+        conn.executemany(
+            "INSERT INTO artifact_relations (artifact_id, position, related_id) "
+            "VALUES (?, ?, ?)",
+            [
+                (artifact["id"], position, related_id)
+                for position, related_id in enumerate(artifact["related_artifacts"])
+            ],
+        )
+
+    def put(self, artifact: Dict[str, Any]) -> None:
+        """Inserts or replaces one artifact (keeping its original position)."""
+        with self._connect() as conn:
+            self._write(conn, artifact)
+
+    def put_many(self, artifacts: Iterable[Dict[str, Any]]) -> int:
+        """Writes many artifacts in one transaction. Returns the count."""
+        count = 0
+        with self._connect() as conn:
+            for artifact in artifacts:
+                self._write(conn, artifact)
+                count += 1
+        return count
+
+    def delete(self, artifact_id: str) -> bool:
+        with self._connect() as conn:
+            row = conn.execute(
+                "SELECT pk FROM artifacts WHERE id = ?", (artifact_id,)
+            ).fetchone()
+            if row is None:
+                return False
+            conn.execute("DELETE FROM artifact_tags WHERE artifact = ?", (row[0],))
+            conn.execute(
+                "DELETE FROM artifact_relations WHERE artifact_id = ?", (artifact_id,)
+            )
+            conn.execute("DELETE FROM artifacts WHERE pk = ?", (row[0],))
+        return True
+
+    def clear(self) -> None:
+        with self._connect() as conn:
+            for table in ("artifact_tags", "artifact_relations", "tags", "artifacts"):
+                conn.execute(f"DELETE FROM {table}")
+
+    # ---- Reads ----
+    @staticmethod
+    def _to_dict(row) -> Dict[str, Any]:
+        artifact_id, source, timestamp, confidence, content, tags, related = row
+        return {
+            "id": artifact_id,
+            "content": json.loads(content),
+            "source": source,
+            "timestamp": timestamp,
+            "tags": json.loads(tags),
+            "confidence": confidence,
+            "related_artifacts": json.loads(related),
+        }
+
+    def _fetch(self, sql: str, params: Iterable[Any]) -> Iterator[Any]:
+        cursor = self._connect().execute(sql, list(params))
+        while True:
+            rows = cursor.fetchmany(FETCH_SIZE)
+            if not rows:
+                return
+            yield from rows
+
+    def _rows(self, sql: str, params: Iterable[Any]) -> Iterator[Dict[str, Any]]:
+        for row in self._fetch(sql, params):
+            yield self._to_dict(row)
+
+    def _keyed_rows(self, sql: str, params: Iterable[Any]) -> Iterator[Any]:
+        """(pk, artifact) pairs for queries selecting the pk ahead of the columns."""
+        for row in self._fetch(sql, params):
+            yield row[0], self._to_dict(row[1:])
+
+    def get(self, artifact_id: str) -> Optional[Dict[str, Any]]:
+        row = (
+            self._connect()
+            .execute(
+                f"SELECT {ARTIFACT_COLUMNS} FROM artifacts a WHERE a.id = ?",
+                (artifact_id,),
+            )
+            .fetchone()
+        )
+        return self._to_dict(row) if row else None
+
+    def contains(self, artifact_id: str) -> bool:
+        return (
+            self._connect()
+            .execute("SELECT 1 FROM artifacts WHERE id = ?", (artifact_id,))
+            .fetchone()
+            is not None
+        )
+
+    def ids(self) -> List[str]:
+        """Artifact ids in insertion order."""
+        return [
+            row[0]
+            for row in self._connect().execute("SELECT id FROM artifacts ORDER BY pk")
+        ]
+
+    def count(self) -> int:
+        return self._connect().execute("SELECT COUNT(*) FROM artifacts").fetchone()[0]
+
+    def iter_all(self) -> Iterator[Dict[str, Any]]:
+        return self._rows(
+            f"SELECT {ARTIFACT_COLUMNS} FROM artifacts a ORDER BY a.pk", ()
+        )
+
+    def search(
+        self,
+        query: str = "",
+        source: Optional[str] = None,
+        tags: Optional[List[str]] = None,
+        min_confidence: float = 0.0,
+        artifact_type: Optional[str] = None,
+    ) -> Iterator[Dict[str, Any]]:
+        """
+        Candidate artifacts in insertion order. Filters on source, type, tags
+        (all required) and confidence are exact. A text query keeps rows whose
+        content contains it (case-insensitively, via the trigram index) or that
+        have a tag containing it, a superset of CodexAwareness._matches_query,
+        which the caller applies to finish the match.
+
+        Every plan walks an index in key order, so rows stream and a caller
+        that stops after `limit` matches never pays for the rest.
+        """
+        conn = self._connect()
+        tag_ids = {
+            name: tag_id for tag_id, name in conn.execute("SELECT id, name FROM tags")
+        }
+        required = []
+        for tag in dict.fromkeys(tags or []):
+            if tag not in tag_ids:
+                return iter(())
+            required.append(tag_ids[tag])
+
+        clauses, params = ["a.confidence >= ?"], [min_confidence]
+        if source:
+            clauses.append("a.source = ?")
+            params.append(source)
+        if artifact_type is not None:
+            clauses.append("a.type = ?")
+            params.append(artifact_type)
+
+        if not (query and self.fts_enabled and len(query) >= FTS_MIN_QUERY):
+            return self._tag_driven(required, clauses, params)
+
+        # Content hits from the trigram index, merged with artifacts carrying a
+        # tag that contains the query; both streams come out in pk order
+        query_l = query.lower()
+        matching_tags = [
+            tag_id for name, tag_id in tag_ids.items() if query_l in name.lower()
+        ]
+        streams = [
+            self._keyed_rows(
+                f"SELECT a.pk, {ARTIFACT_COLUMNS} FROM artifacts_fts f "
+                "JOIN artifacts a ON a.pk = f.rowid "
+                f"WHERE f.artifacts_fts MATCH ? AND {self._where(required, clauses)} "
+                "ORDER BY f.rowid",
+                [fts_phrase(query), *required, *params],
+            )
+        ]
+        if matching_tags:
+            streams.append(
+                self._tag_driven(
+                    required,
+                    clauses
+                    + [
+                        "EXISTS (SELECT 1 FROM artifact_tags m WHERE m.artifact = a.pk "
+                        "AND m.tag IN (%s))" % ", ".join("?" * len(matching_tags))
+                    ],
+                    params + matching_tags,
+                    keyed=True,
+                )
+            )
+        return self._merge(streams)
+
+    @staticmethod
+    def _where(required: List[int], clauses: List[str]) -> str:
+        """Filter clauses plus one membership probe per required tag id."""
+        probes = [
+            "EXISTS (SELECT 1 FROM artifact_tags t WHERE t.tag = ? AND t.artifact = a.pk)"
+        ] * len(required)
+        return " AND ".join(probes + clauses)
+
+    def _tag_driven(
+        self,
+        required: List[int],
+        clauses: List[str],
+        params: List[Any],
+        keyed: bool = False,
+    ) -> Iterator[Any]:
+        """Walks the first required tag's postings (or the table) in pk order."""
+        if required:
+            first, rest = required[0], required[1:]
+            sql = (
+                f"SELECT a.pk, {ARTIFACT_COLUMNS} FROM artifact_tags d "
+                "JOIN artifacts a ON a.pk = d.artifact "
+                f"WHERE d.tag = ? AND {self._where(rest, clauses)} ORDER BY d.artifact"
+            )
+            params = [first, *rest, *params]
+        else:
+            sql = (
+                f"SELECT a.pk, {ARTIFACT_COLUMNS} FROM artifacts a "
+                f"WHERE {' AND '.join(clauses)} ORDER BY a.pk"
+            )
+        rows = self._keyed_rows(sql, params)
+        return rows if keyed else (row for _, row in rows)
+
+    @staticmethod
+    def _merge(streams: List[Iterator[Any]]) -> Iterator[Dict[str, Any]]:
+        last = None
+        for pk, row in heapq.merge(*streams, key=lambda item: item[0]):
+            if pk != last:
+                last = pk
+                yield row
+
+    def related(self, artifact_id: str, max_depth: int) -> List[Dict[str, Any]]:
+        """Artifacts reachable within max_depth relation hops, in depth-first order."""
+        children = defaultdict(list)
+        for parent, child in self._fetch(
+            REACHABLE_RELATIONS, (artifact_id, max_depth, max_depth)
+        ):
+            children[parent].append(child)
+
+        # The in-memory walk this replaces: depth-first in related_artifacts
+        # order, listing each artifact the first time it is reached and
+        # expanding each one at most once (the first time, with whatever
+        # depth is left then). Iterative, so deep max_depth can't overflow.
+        order: Dict[str, None] = {}
+        expanded = set()
+        stack = []
+
+        def expand(node: str, depth: int) -> None:
+            if depth > 0 and node not in expanded:
+                expanded.add(node)
+                stack.append((iter(children.get(node, ())), depth - 1))
+
+        expand(artifact_id, max_depth)
+        while stack:
+            pending, depth = stack[-1]
+            child = next(pending, None)
+            if child is None:
+                stack.pop()
+                continue
+            order.setdefault(child)
+            expand(child, depth)
+        return self.get_many(list(order))
+
+    def get_many(self, artifact_ids: List[str]) -> List[Dict[str, Any]]:
+        """Stored artifacts among artifact_ids, in the given order."""
+        found: Dict[str, Dict[str, Any]] = {}
+        for i in range(0, len(artifact_ids), 500):  # Under the bound-parameter limit
+            chunk = artifact_ids[i : i + 500]
+            for row in self._rows(
+                f"SELECT {ARTIFACT_COLUMNS} FROM artifacts a "
+                f"WHERE a.id IN ({', '.join('?' * len(chunk))})",
+                chunk,
+            ):
+                found[row["id"]] = row
+        return [found[i] for i in artifact_ids if i in found]
@@ -4,16 +4,20 @@ Guardian Cache Module
 Provides caching decorators and utilities for efficient resource usage.
 """
 
+import atexit
 import functools
 import hashlib
 import json
 import logging
 import os
-import time
-import math
+import threading
 from pathlib import Path
 from typing import Any, Callable, Dict, Optional, TypeVar, Union
 
+from guardian.cache_core import MISSING, make_cache, make_key
+from guardian.disk_cache import DiskCache
+from guardian.semantic_cache import SemanticCache
+
 # Configure logging
 logging.basicConfig(level=logging.INFO)
 logger = logging.getLogger(__name__)
@@ -29,6 +33,17 @@ class CacheConfig:
     CACHE_DIR = Path("guardian/.cache")
     CACHE_ENABLED = True
     DEFAULT_EXPIRE = 3600  # 1 hour
+    CACHE_POLICY = "lru"  # In-process cache eviction: "lru" or "lfu"
+    MEMORY_CACHE_MAX_BYTES: Optional[int] = None  # Per lru_cache_safe cache
+    DISK_CACHE_FILE = "memoize.db"
+    DISK_CACHE_MAX_ENTRIES: Optional[int] = 100_000
+    DISK_CACHE_MAX_BYTES: Optional[int] = 256 * 1024 * 1024
+    DISK_CACHE_COMPACT_INTERVAL: Optional[float] = 300.0  # 5 minutes
+    SEMANTIC_CACHE_THRESHOLD = 0.8  # Minimum cosine similarity for a hit
+    SEMANTIC_CACHE_MAX_ENTRIES: Optional[int] = 10_000
+    SEMANTIC_CACHE_TTL: Optional[float] = 24 * 3600
+    SEMANTIC_CACHE_PERSIST = False  # Save to CACHE_DIR on exit, reload on start
+    SEMANTIC_CACHE_FILE = "semantic_cache.jsonl"
 
     @classmethod
     def ensure_cache_dir(cls) -> None:
@@ -55,20 +70,51 @@ def hash_args(*args: Any, **kwargs: Any) -> str:
     return hashlib.sha256(serialized.encode()).hexdigest()
 
 
-def memoize_to_disk(expire: int = CacheConfig.DEFAULT_EXPIRE) -> Callable[[F], F]:
+_disk_caches: Dict[Path, DiskCache] = {}
+_disk_caches_lock = threading.Lock()
+
+
+def disk_cache() -> DiskCache:
+    """The shared DiskCache in CacheConfig.CACHE_DIR (one per directory)."""
+    path = CacheConfig.CACHE_DIR / CacheConfig.DISK_CACHE_FILE
+    cache = _disk_caches.get(path)
+    if cache is None:
+        with _disk_caches_lock:
+            cache = _disk_caches.get(path)
+            if cache is None:
+                CacheConfig.ensure_cache_dir()
+                cache = _disk_caches[path] = DiskCache(
+                    str(path),
+                    max_entries=CacheConfig.DISK_CACHE_MAX_ENTRIES,
+                    max_bytes=CacheConfig.DISK_CACHE_MAX_BYTES,
+                    compact_interval=CacheConfig.DISK_CACHE_COMPACT_INTERVAL,
+                )
+    return cache
+
+
+_MISSING = object()
+
+
+def memoize_to_disk(
+    expire: int = CacheConfig.DEFAULT_EXPIRE,
+    key: Optional[Callable[..., Any]] = None,
+) -> Callable[[F], F]:
     """
-    Decorator for disk-persistent JSONL caching with input hashing.
+    Decorator for disk-persistent caching with input hashing, backed by the
+    shared DiskCache (see guardian.disk_cache).
 
     Args:
         expire: Cache expiration time in seconds
+        key: Maps the call's arguments to the JSON-serializable value that is
+            hashed as the cache key (e.g. to leave out `self`); defaults to
+            all arguments
 
     Returns:
         Callable: Decorated function
     """
 
     def decorator(func: F) -> F:
-        CacheConfig.ensure_cache_dir()
-        cache_file = CacheConfig.CACHE_DIR / f"{func.__name__}.jsonl"
+        namespace = f"{func.__module__}.{func.__qualname__}"
 
         @functools.wraps(func)
         def wrapper(*args: Any, **kwargs: Any) -> Any:
@@ -76,31 +122,27 @@ def memoize_to_disk(expire: int = CacheConfig.DEFAULT_EXPIRE) -> Callable[[F], F
                 return func(*args, **kwargs)
 
             # Generate cache key
-            key = hash_args(*args, **kwargs)
-
-            # Check cache file
-            if cache_file.exists():
-                with open(cache_file) as f:
-                    for line in f:
-                        try:
-                            entry = json.loads(line)
-                            if (
-                                entry["key"] == key
-                                and time.time() - entry["timestamp"] < expire
-                            ):
-                                logger.debug(f"Cache hit for {func.__name__}")
-                                return entry["result"]
-                        except json.JSONDecodeError:
-                            continue
+            try:
+                if key is None:
+                    cache_key = hash_args(*args, **kwargs)
+                else:
+                    cache_key = hash_args(key(*args, **kwargs))
+            except TypeError as e:
+                logger.debug(f"Not caching {func.__name__}: {e}")
+                return func(*args, **kwargs)
+
+            cache = disk_cache()
+            result = cache.get(namespace, cache_key, _MISSING)
+            if result is not _MISSING:
+                logger.debug(f"Cache hit for {func.__name__}")
+                return result
 
             # Cache miss - call function
             result = func(*args, **kwargs)
-
-            # Store in cache
-            entry = {"key": key, "timestamp": time.time(), "result": result}
-
-            with open(cache_file, "a") as f:
-                f.write(json.dumps(entry) + "\n")
+            try:
+                cache.set(namespace, cache_key, result, expire)
+            except TypeError as e:
+                logger.debug(f"Not caching {func.__name__} result: {e}")
 
             return result
 
@@ -113,22 +155,35 @@ def lru_cache_safe(
     maxsize: Optional[int] = 128,
     typed: bool = False,
     expire: int = CacheConfig.DEFAULT_EXPIRE,
+    policy: Optional[str] = None,
+    max_bytes: Optional[int] = None,
 ) -> Callable[[F], F]:
     """
-    Safe LRU cache decorator with expiration.
+    Safe in-memory cache decorator with expiration, backed by
+    guardian.cache_core.
 
     Args:
-        maxsize: Maximum cache size
+        maxsize: Maximum cache size (None or 0 for unbounded)
         typed: Whether to cache different types separately
         expire: Cache expiration time in seconds
+        policy: "lru" or "lfu"; defaults to CacheConfig.CACHE_POLICY
+        max_bytes: Estimated size limit for cached results; defaults to
+            CacheConfig.MEMORY_CACHE_MAX_BYTES
 
     Returns:
-        Callable: Decorated function
+        Callable: Decorated function, with cache_info() and cache_clear()
     """
 
     def decorator(func: F) -> F:
-        # Create cache storage
-        cache: Dict[str, tuple[Any, float]] = {}
+        cache = make_cache(
+            policy or CacheConfig.CACHE_POLICY,
+            maxsize=maxsize or None,
+            max_bytes=(
+                max_bytes
+                if max_bytes is not None
+                else CacheConfig.MEMORY_CACHE_MAX_BYTES
+            ),
+        )
 
         @functools.wraps(func)
         def wrapper(*args: Any, **kwargs: Any) -> Any:
@@ -136,68 +191,58 @@ def lru_cache_safe(
                 return func(*args, **kwargs)
 
             # Generate cache key
-            key = hash_args(*args, **kwargs)
+            try:
+                key = make_key(args, kwargs, typed)
+            except TypeError:
+                return func(*args, **kwargs)
 
             # Check cache
-            if key in cache:
-                result, timestamp = cache[key]
-                if time.time() - timestamp < expire:
-                    logger.debug(f"Cache hit for {func.__name__}")
-                    return result
-                else:
-                    del cache[key]
+            result = cache.get(key, MISSING)
+            if result is not MISSING:
+                return result
 
             # Cache miss
             result = func(*args, **kwargs)
-
-            # Store in cache
-            cache[key] = (result, time.time())
-
-            # Enforce maxsize
-            if maxsize and len(cache) > maxsize:
-                # Remove oldest entry
-                oldest_key = min(cache.keys(), key=lambda k: cache[k][1])
-                del cache[oldest_key]
-
+            cache.set(key, result, expire)
             return result
 
+        wrapper.cache = cache  # type: ignore[attr-defined]
+        wrapper.cache_info = cache.stats  # type: ignore[attr-defined]
+        wrapper.cache_clear = cache.clear  # type: ignore[attr-defined]
         return wrapper  # type: ignore
 
     return decorator
 
 
-_semantic_store: list[tuple[dict[str, float], Any]] = []
+_semantic_cache: Optional[SemanticCache] = None
 
 
-def _embed(text: str) -> dict[str, float]:
-    """Very small embedding function using term frequencies."""
-    words = [w.lower() for w in text.split() if w.isalpha()]
-    counts: Dict[str, int] = {}
-    for w in words:
-        counts[w] = counts.get(w, 0) + 1
-    norm = math.sqrt(sum(v * v for v in counts.values())) or 1.0
-    return {w: c / norm for w, c in counts.items()}
+def get_semantic_cache() -> SemanticCache:
+    """The shared SemanticCache, built from CacheConfig on first use."""
+    global _semantic_cache
+    if _semantic_cache is None:
+        with _disk_caches_lock:
+            if _semantic_cache is None:
+                path = None
+                if CacheConfig.SEMANTIC_CACHE_PERSIST:
+                    CacheConfig.ensure_cache_dir()
+                    path = str(CacheConfig.CACHE_DIR / CacheConfig.SEMANTIC_CACHE_FILE)
+                _semantic_cache = SemanticCache(
+                    threshold=CacheConfig.SEMANTIC_CACHE_THRESHOLD,
+                    max_entries=CacheConfig.SEMANTIC_CACHE_MAX_ENTRIES,
+                    ttl=CacheConfig.SEMANTIC_CACHE_TTL,
+                    path=path,
+                )
+                if path:
+                    atexit.register(_semantic_cache.save)
+    return _semantic_cache
 
 
-def semantic_cache(query: str, threshold: float = 0.8) -> Optional[Any]:
+def semantic_cache(query: str, threshold: Optional[float] = None) -> Optional[Any]:
     """Retrieve a cached result based on cosine similarity."""
-
-    q_vec = _embed(query)
-    best_score = 0.0
-    best_result: Optional[Any] = None
-    for vec, result in _semantic_store:
-        score = sum(q_vec.get(k, 0.0) * v for k, v in vec.items())
-        if score > best_score:
-            best_score = score
-            best_result = result
-    if best_score >= threshold:
-        logger.debug("Semantic cache hit with score %.2f", best_score)
-        return best_result
-    return None
+    return get_semantic_cache().lookup(query, threshold)
 
 
 def semantic_cache_store(query: str, result: Any) -> None:
     """Store a query and result in the semantic cache."""
-
-    vec = _embed(query)
-    _semantic_store.append((vec, result))
+    get_semantic_cache().store(query, result)
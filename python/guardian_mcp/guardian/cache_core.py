@@ -0,0 +1,307 @@
+"""
+guardian.cache_core
+===================
+
+In-process cache core behind lru_cache_safe.
+
+- LRUCache: OrderedDict in recency order; hits move to the end without
+  taking the lock, eviction pops the front
+- LFUCache: frequency buckets (count -> OrderedDict of keys, oldest first)
+  plus the lowest populated count, so hits and evictions are O(1); ties are
+  broken by least recent use
+- make_key: the call's arguments as a tuple when they are hashable (the
+  common case, no serialization), canonical JSON only when they are not
+
+Both caches take an optional per-entry TTL, a maxsize in entries and a
+max_bytes limit measured with a sizeof estimator (estimate_size by default,
+sys.getsizeof summed over containers). stats() reports hits, misses,
+evictions and expirations per cache.
+
+Usage:
+    cache = make_cache("lfu", maxsize=1000, max_bytes=16 * 2**20)
+    key = make_key(args, kwargs)
+    value = cache.get(key, MISSING)
+    if value is MISSING:
+        cache.set(key, compute(), expire=300)
+"""
+
+import hashlib
+import json
+import sys
+import threading
+import time
+from collections import OrderedDict
+from typing import Any, Callable, Dict, Hashable, Optional
+
+MISSING = object()
+_KWARGS_MARK = object()
+_JSON_MARK = object()
+_FAST_TYPES = frozenset({int, str})
+
+
+def estimate_size(obj: Any) -> int:
+    """sys.getsizeof of obj plus everything reachable through its containers."""
+    seen = set()
+    stack = [obj]
+    total = 0
+    while stack:
+        item = stack.pop()
+        if id(item) in seen:
+            continue
+        seen.add(id(item))
+        total += sys.getsizeof(item)
+        if isinstance(item, dict):
+            stack.extend(item.keys())
+            stack.extend(item.values())
+        elif isinstance(item, (list, tuple, set, frozenset)):
+            stack.extend(item)
+    return total
+
+
+def make_key(args: tuple, kwargs: Dict[str, Any], typed: bool = False) -> Hashable:
+    """
+    Cache key for a call. Hashable arguments are used as they are (a lone int
+    or str argument is its own key, as in functools.lru_cache); anything
+    else is keyed by the sha256 of its canonical JSON. Raises TypeError when
+    the arguments are neither hashable nor JSON-serializable.
+    """
+    if not kwargs and not typed and len(args) == 1 and type(args[0]) in _FAST_TYPES:
+        return args[0]
+    key = args
+    if kwargs:
+        key += (_KWARGS_MARK,) + tuple(sorted(kwargs.items()))
+    if typed:
+        key += tuple(type(v) for v in args) + tuple(type(v) for v in kwargs.values())
+    try:
+        hash(key)
+        return key
+    except TypeError:
+        serialized = json.dumps({"args": args, "kwargs": kwargs}, sort_keys=True)
+        return (_JSON_MARK, hashlib.sha256(serialized.encode()).hexdigest())
+
+
+class _BaseCache:
+    """Bookkeeping shared by the policies: limits, sizes, TTLs and counters."""
+
+    policy = ""
+
+    def __init__(
+        self,
+        maxsize: Optional[int] = 128,
+        max_bytes: Optional[int] = None,
+        sizeof: Callable[[Any], int] = estimate_size,
+    ) -> None:
+        self.maxsize = maxsize
+        self.max_bytes = max_bytes
+        self.sizeof = sizeof
+        self.bytes = 0
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+        self.expired = 0
+        # key -> [value, expires_at or None, size]
+        self._entries: Dict[Hashable, list] = {}
+        self._lock = threading.Lock()
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+    def __contains__(self, key: Hashable) -> bool:
+        entry = self._entries.get(key)
+        return entry is not None and (entry[1] is None or entry[1] > time.time())
+
+    def get(self, key: Hashable, default: Any = None) -> Any:
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None:
+                self.misses += 1
+                return default
+            if entry[1] is not None and entry[1] <= time.time():
+                self._remove(key)
+                self.expired += 1
+                self.misses += 1
+                return default
+            self.hits += 1
+            self._touch(key, entry)
+            return entry[0]
+
+    def set(self, key: Hashable, value: Any, expire: Optional[float] = None) -> None:
+        size = self.sizeof(value) if self.max_bytes is not None else 0
+        if self.maxsize == 0 or (self.max_bytes is not None and size > self.max_bytes):
+            return  # Would evict everything and still not fit
+        expires_at = time.time() + expire if expire is not None else None
+        with self._lock:
+            if key in self._entries:
+                self._remove(key)
+            # Make room first, so a new LFU entry is never its own victim
+            while self._entries and (
+                (self.maxsize is not None and len(self._entries) >= self.maxsize)
+                or (self.max_bytes is not None and self.bytes + size > self.max_bytes)
+            ):
+                self._remove(self._victim())
+                self.evictions += 1
+            self._insert(key, [value, expires_at, size])
+            self.bytes += size
+
+    def delete(self, key: Hashable) -> bool:
+        with self._lock:
+            if key not in self._entries:
+                return False
+            self._remove(key)
+            return True
+
+    def clear(self) -> None:
+        with self._lock:
+            self._entries.clear()
+            self._clear_order()
+            self.bytes = 0
+
+    def stats(self) -> Dict[str, Any]:
+        with self._lock:
+            return {
+                "policy": self.policy,
+                "hits": self.hits,
+                "misses": self.misses,
+                "evictions": self.evictions,
+                "expired": self.expired,
+                "entries": len(self._entries),
+                "bytes": self.bytes,
+                "maxsize": self.maxsize,
+                "max_bytes": self.max_bytes,
+            }
+
+    def _remove(self, key: Hashable) -> None:
+        entry = self._entries.pop(key)
+        self.bytes -= entry[2]
+        self._unlink(key, entry)
+
+    # Policy hooks, called with the lock held
+    def _insert(self, key: Hashable, entry: list) -> None:
+        raise NotImplementedError
+
+    def _touch(self, key: Hashable, entry: list) -> None:
+        raise NotImplementedError
+
+    def _unlink(self, key: Hashable, entry: list) -> None:
+        raise NotImplementedError
+
+    def _victim(self) -> Hashable:
+        raise NotImplementedError
+
+    def _clear_order(self) -> None:
+        raise NotImplementedError
+
+
+class LRUCache(_BaseCache):
+    """Evicts the least recently used entry."""
+
+    policy = "lru"
+
+    def __init__(self, *args: Any, **kwargs: Any) -> None:
+        super().__init__(*args, **kwargs)
+        self._entries = OrderedDict()
+
+    def get(self, key: Hashable, default: Any = None) -> Any:
+        # Lock-free: a hit is a dict lookup plus move_to_end, each atomic
+        # under the GIL. An entry evicted in between just isn't moved, and a
+        # racing counter increment may be lost, which stats() can live with.
+        entry = self._entries.get(key)
+        if entry is None:
+            self.misses += 1
+            return default
+        if entry[1] is not None and entry[1] <= time.time():
+            with self._lock:
+                if self._entries.get(key) is entry:
+                    self._remove(key)
+                    self.expired += 1
+            self.misses += 1
+            return default
+        try:
+            self._entries.move_to_end(key)
+        except KeyError:
+            pass
+        self.hits += 1
+        return entry[0]
+
+    def _insert(self, key: Hashable, entry: list) -> None:
+        self._entries[key] = entry
+
+    def _touch(self, key: Hashable, entry: list) -> None:
+        self._entries.move_to_end(key)
+
+    def _unlink(self, key: Hashable, entry: list) -> None:
+        pass  # Removing it from _entries was enough
+
+    def _victim(self) -> Hashable:
+        return next(iter(self._entries))
+
+    def _clear_order(self) -> None:
+        pass
+
+
+class LFUCache(_BaseCache):
+    """Evicts the least frequently used entry, least recently used among ties."""
+
+    policy = "lfu"
+
+    def __init__(self, *args: Any, **kwargs: Any) -> None:
+        super().__init__(*args, **kwargs)
+        self._buckets: Dict[int, OrderedDict] = {}
+        self._min_count = 0
+
+    def _insert(self, key: Hashable, entry: list) -> None:
+        entry.append(1)  # Use count
+        self._buckets.setdefault(1, OrderedDict())[key] = None
+        self._min_count = 1
+        self._entries[key] = entry
+
+    def _touch(self, key: Hashable, entry: list) -> None:
+        count = entry[3]
+        bucket = self._buckets[count]
+        del bucket[key]
+        if not bucket:
+            del self._buckets[count]
+            if self._min_count == count:
+                self._min_count = count + 1
+        entry[3] = count + 1
+        self._buckets.setdefault(count + 1, OrderedDict())[key] = None
+
+    def _unlink(self, key: Hashable, entry: list) -> None:
+        count = entry[3]
+        bucket = self._buckets[count]
+        del bucket[key]
+        if not bucket:
+            # _min_count may now name an empty bucket. It stays a lower bound:
+            # an eviction is followed by an insert that resets it to 1, and
+            # _victim catches up after a delete or expiry
+            del self._buckets[count]
+
+    def _victim(self) -> Hashable:
+        bucket = self._buckets.get(self._min_count)
+        if bucket is None:
+            self._min_count = min(self._buckets)
+            bucket = self._buckets[self._min_count]
+        return next(iter(bucket))
+
+    def _clear_order(self) -> None:
+        self._buckets.clear()
+        self._min_count = 0
+
+
+POLICIES = {"lru": LRUCache, "lfu": LFUCache}
+
+
+def make_cache(
+    policy: str = "lru",
+    maxsize: Optional[int] = 128,
+    max_bytes: Optional[int] = None,
+    sizeof: Callable[[Any], int] = estimate_size,
+) -> _BaseCache:
+    """A cache for the named policy ("lru" or "lfu")."""
+    try:
+        cls = POLICIES[policy]
+    except KeyError:
+        raise ValueError(
+            f"Unknown cache policy {policy!r}; expected one of {sorted(POLICIES)}"
+        ) from None
+    return cls(maxsize=maxsize, max_bytes=max_bytes, sizeof=sizeof)
@@ -5,38 +5,48 @@ import os
 BASE_DIR = os.path.abspath(os.path.join(os.path.dirname(__file__), "../../"))
 
 
-def extract_python_metadata(file_path):
-    with open(file_path, "r", encoding="utf-8", errors="replace") as f:
-        try:
-            tree = ast.parse(f.read(), filename=file_path)
-        except SyntaxError:
-            return None
+def extract_python_metadata_from_source(source, file_path="<unknown>"):
+    try:
+        tree = ast.parse(source, filename=file_path)
+    except SyntaxError:
+        return None
 
     functions = []
     classes = []
 
     for node in ast.walk(tree):
         if isinstance(node, ast.FunctionDef):
-            functions.append({"name": node.name, "docstring": ast.get_docstring(node)})
+            functions.append(
+                {
+                    "name": node.name,
+                    "docstring": ast.get_docstring(node),
+                    "line": node.lineno,
+                }
+            )
         elif isinstance(node, ast.ClassDef):
-            classes.append({"name": node.name, "docstring": ast.get_docstring(node)})
+            classes.append(
+                {
+                    "name": node.name,
+                    "docstring": ast.get_docstring(node),
+                    "line": node.lineno,
+                }
+            )
 
     return {"functions": functions, "classes": classes}
 
 
+def extract_python_metadata(file_path):
+    with open(file_path, "r", encoding="utf-8", errors="replace") as f:
+        return extract_python_metadata_from_source(f.read(), file_path)
+
+
 def generate_codemap():
-    codemap = []
-
-    for root, _, files in os.walk(BASE_DIR):
-        for file in files:
-            if file.endswith(".py"):
-                full_path = os.path.join(root, file)
-                rel_path = os.path.relpath(full_path, BASE_DIR)
-                metadata = extract_python_metadata(full_path)
-                if metadata:
-                    codemap.append(
-                        {"path": rel_path, "type": "python", "metadata": metadata}
-                    )
+    # Incremental: only files changed since the last run are reparsed
+    from guardian.codemap.index import CodemapIndex
+
+    index = CodemapIndex(base_dir=BASE_DIR)
+    index.refresh()
+    codemap = index.entries()
 
     os.makedirs(os.path.join(BASE_DIR, "guardian/codemap"), exist_ok=True)
     output_path = os.path.join(BASE_DIR, "guardian/codemap/codemap.json")
@@ -0,0 +1,338 @@
+"""
+Incremental codemap engine.
+
+CodemapIndex keeps one cache record per Python file, keyed by
+(path, mtime, size, content hash):
+- an unchanged (mtime, size) pair reuses the record without reading the file
+- a touched file whose content hash is unchanged is not reparsed
+- only new or edited files go through ast.parse
+The cache is persisted next to codemap.json, so a warm start costs one
+directory walk plus stat calls.
+
+Symbols (functions, classes, file paths) feed an inverted index from token to
+symbol, so queries return the top-k relevant entries instead of the whole map.
+
+    index = get_codemap_index()        # refreshes in a background thread
+    index.query("embedding cache", top_k=5)
+"""
+
+import bisect
+import hashlib
+import json
+import logging
+import math
+import os
+import re
+import threading
+from collections import defaultdict
+from typing import Any, Dict, Iterable, List, Optional, Tuple
+
+from guardian.codemap.generate_codemap import (
+    BASE_DIR,
+    extract_python_metadata_from_source,
+)
+
+logger = logging.getLogger(__name__)
+
+CACHE_VERSION = 1
+SKIP_DIRS = {
+    ".git",
+    "__pycache__",
+    "node_modules",
+    ".venv",
+    "venv",
+    ".mypy_cache",
+    ".pytest_cache",
+    ".tox",
+}
+
+# Relative weight of each field a symbol is indexed under
+NAME_WEIGHT = 3.0
+PATH_WEIGHT = 1.0
+DOC_WEIGHT = 1.0
+PREFIX_FACTOR = 0.5  # Partial credit for a query token that only prefixes a term
+MAX_PREFIX_EXPANSIONS = 50
+
+STOPWORDS = {
+    "the",
+    "and",
+    "for",
+    "with",
+    "from",
+    "this",
+    "that",
+    "are",
+    "is",
+    "of",
+    "to",
+    "in",
+    "a",
+    "an",
+    "py",
+    "self",
+}
+
+
+def tokenize(text: str) -> List[str]:
+    """
+    Lowercased search tokens. Identifiers are also split on snake_case and
+    CamelCase boundaries and kept whole: "get_codemap_index" yields
+    get_codemap_index, get, codemap, index.
+    """
+    tokens = []
+    for word in re.findall(r"[A-Za-z0-9_]+", text or ""):
+        parts = re.findall(r"[A-Z]+(?=[A-Z][a-z]|\d|\b)|[A-Z]?[a-z]+|[A-Z]+|\d+", word)
+        whole = word.lower().strip("_")
+        if len(parts) > 1 and whole:
+            tokens.append(whole)
+        tokens.extend(p.lower() for p in parts)
+    return [t for t in tokens if len(t) > 1 and t not in STOPWORDS]
+
+
+class InvertedIndex:
+    """Token -> {doc_id: weight} postings with idf-weighted, prefix-aware search."""
+
+    def __init__(self):
+        self.postings: Dict[str, Dict[Any, float]] = defaultdict(dict)
+        self.doc_count = 0
+        self._vocab: Optional[List[str]] = None
+
+    def add(self, doc_id, fields: Iterable[Tuple[str, float]]):
+        self.doc_count += 1
+        for text, weight in fields:
+            for token in tokenize(text):
+                postings = self.postings[token]
+                postings[doc_id] = max(postings.get(doc_id, 0.0), weight)
+        self._vocab = None
+
+    def _expand(self, token: str) -> List[Tuple[str, float]]:
+        if token in self.postings:
+            return [(token, 1.0)]
+        if self._vocab is None:
+            self._vocab = sorted(self.postings)
+        start = bisect.bisect_left(self._vocab, token)
+        matches = []
+        for term in self._vocab[start : start + MAX_PREFIX_EXPANSIONS]:
+            if not term.startswith(token):
+                break
+            matches.append((term, PREFIX_FACTOR))
+        return matches
+
+    def search(self, query: str, top_k: int = 10) -> List[Tuple[Any, float]]:
+        scores: Dict[Any, float] = defaultdict(float)
+        for token in set(tokenize(query)):
+            for term, factor in self._expand(token):
+                postings = self.postings[term]
+                idf = math.log(1 + self.doc_count / len(postings))
+                for doc_id, weight in postings.items():
+                    scores[doc_id] += factor * weight * idf
+        ranked = sorted(scores.items(), key=lambda item: (-item[1], str(item[0])))
+        return ranked[:top_k]
+
+
+class CodemapIndex:
+    def __init__(self, base_dir: str = BASE_DIR, cache_path: Optional[str] = None):
+        self.base_dir = base_dir
+        self.cache_path = cache_path or os.path.join(
+            base_dir, "guardian", "codemap", "codemap_cache.json"
+        )
+        self.files: Dict[str, Dict[str, Any]] = (
+            {}
+        )  # rel_path -> {mtime, size, hash, metadata}
+        self.symbols: List[Dict[str, Any]] = []
+        self.index = InvertedIndex()
+        self.stats = {"reused": 0, "rehashed": 0, "parsed": 0, "removed": 0}
+        self._lock = threading.Lock()
+        self._ready = threading.Event()
+        self._thread: Optional[threading.Thread] = None
+
+    # ---- Cache persistence ----
+    def _load_cache(self) -> Dict[str, Dict[str, Any]]:
+        try:
+            with open(self.cache_path, "r", encoding="utf-8") as f:
+                data = json.load(f)
+            if (
+                data.get("version") == CACHE_VERSION
+                and data.get("base_dir") == self.base_dir
+            ):
+                return data["files"]
+        except FileNotFoundError:
+            pass
+        except (OSError, ValueError, KeyError) as e:
+            logger.warning(f"Ignoring unreadable codemap cache {self.cache_path}: {e}")
+        return {}
+
+    def _save_cache(self):
+        os.makedirs(os.path.dirname(self.cache_path), exist_ok=True)
+        tmp_path = f"{self.cache_path}.tmp"
+        with open(tmp_path, "w", encoding="utf-8") as f:
+            json.dump(
+                {
+                    "version": CACHE_VERSION,
+                    "base_dir": self.base_dir,
+                    "files": self.files,
+                },
+                f,
+            )
+        os.replace(tmp_path, self.cache_path)
+
+    # ---- Refresh ----
+    def _python_files(self):
+        for root, dirs, files in os.walk(self.base_dir):
+            dirs[:] = [d for d in dirs if d not in SKIP_DIRS]
+            for name in files:
+                if name.endswith(".py"):
+                    full_path = os.path.join(root, name)
+                    yield os.path.relpath(full_path, self.base_dir), full_path
+
+    def refresh(self) -> bool:
+        """Reparses only new or changed files, then rebuilds the symbol index. Returns True if anything changed."""
+        previous = self.files or self._load_cache()
+        files: Dict[str, Dict[str, Any]] = {}
+        changed = False
+        for rel_path, full_path in self._python_files():
+            try:
+                st = os.stat(full_path)
+            except OSError:
+                continue
+            record = previous.get(rel_path)
+            if (
+                record
+                and record["mtime"] == st.st_mtime
+                and record["size"] == st.st_size
+            ):
+                files[rel_path] = record
+                self.stats["reused"] += 1
+                continue
+            with open(full_path, "rb") as f:
+                content = f.read()
+            digest = hashlib.sha1(content).hexdigest()
+            changed = True
+            if record and record["hash"] == digest:
+                metadata = record["metadata"]  # Touched but identical
+                self.stats["rehashed"] += 1
+            else:
+                source = content.decode("utf-8", errors="replace")
+                metadata = extract_python_metadata_from_source(source, full_path)
+                self.stats["parsed"] += 1
+            files[rel_path] = {
+                "mtime": st.st_mtime,
+                "size": st.st_size,
+                "hash": digest,
+                "metadata": metadata,
+            }
+        removed = len(set(previous) - set(files))
+        self.stats["removed"] += removed
+        changed = changed or bool(removed)
+
+        symbols, index = self._build_index(files)
+        with self._lock:
+            self.files, self.symbols, self.index = files, symbols, index
+        if changed or not os.path.exists(self.cache_path):
+            self._save_cache()
+        self._ready.set()
+        return changed
+
+    @staticmethod
+    def _build_index(files):
+        symbols: List[Dict[str, Any]] = []
+        index = InvertedIndex()
+        for rel_path in sorted(files):
+            metadata = files[rel_path]["metadata"]
+            if not metadata:
+                continue
+            path_text = rel_path.replace(os.sep, " ").replace(".py", "")
+            index.add(len(symbols), [(path_text, NAME_WEIGHT)])
+            symbols.append(
+                {
+                    "path": rel_path,
+                    "kind": "file",
+                    "name": rel_path,
+                    "line": 1,
+                    "docstring": None,
+                }
+            )
+            for kind, key in (("function", "functions"), ("class", "classes")):
+                for item in metadata.get(key, []):
+                    index.add(
+                        len(symbols),
+                        [
+                            (item["name"], NAME_WEIGHT),
+                            (path_text, PATH_WEIGHT),
+                            (item.get("docstring") or "", DOC_WEIGHT),
+                        ],
+                    )
+                    symbols.append(
+                        {
+                            "path": rel_path,
+                            "kind": kind,
+                            "name": item["name"],
+                            "line": item.get("line"),
+                            "docstring": item.get("docstring"),
+                        }
+                    )
+        return symbols, index
+
+    def start(self) -> "CodemapIndex":
+        """Refreshes in a background thread; readers block in wait() only if they need the map first."""
+        if self._thread is None:
+            self._thread = threading.Thread(
+                target=self._background_refresh, name="codemap-refresh", daemon=True
+            )
+            self._thread.start()
+        return self
+
+    def _background_refresh(self):
+        try:
+            self.refresh()
+        except Exception as e:
+            logger.error(f"Codemap refresh failed: {e}")
+            self._ready.set()  # Unblock readers with whatever is loaded
+
+    def wait(self, timeout: Optional[float] = None) -> bool:
+        if not self._ready.is_set() and self._thread is None:
+            self.refresh()
+        return self._ready.wait(timeout)
+
+    # ---- Reads ----
+    def entries(self) -> List[Dict[str, Any]]:
+        """The full codemap in generate_codemap's format: [{path, type, metadata}]."""
+        self.wait()
+        with self._lock:
+            files = self.files
+        return [
+            {
+                "path": rel_path,
+                "type": "python",
+                "metadata": files[rel_path]["metadata"],
+            }
+            for rel_path in sorted(files)
+            if files[rel_path]["metadata"]
+        ]
+
+    def query(self, text: str, top_k: int = 10) -> List[Dict[str, Any]]:
+        """Top-k symbols for free text, best first, each with its score."""
+        self.wait()
+        with self._lock:
+            symbols, index = self.symbols, self.index
+        return [
+            dict(symbols[i], score=round(score, 4))
+            for i, score in index.search(text, top_k)
+        ]
+
+    def __len__(self) -> int:
+        self.wait()
+        return len(self.files)
+
+
+_shared_index: Optional[CodemapIndex] = None
+_shared_lock = threading.Lock()
+
+
+def get_codemap_index() -> CodemapIndex:
+    """Process-wide CodemapIndex, refreshing in the background from first use."""
+    global _shared_index
+    with _shared_lock:
+        if _shared_index is None:
+            _shared_index = CodemapIndex().start()
+        return _shared_index
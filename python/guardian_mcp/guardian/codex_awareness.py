@@ -6,15 +6,23 @@ Provides a unified interface for accessing and reasoning about system memory art
 
 This module serves as the bridge between passive storage and active memory utilization,
 allowing the system to reflect on and learn from its accumulated knowledge.
+
+Artifacts are stored in SQLite (see guardian.artifact_store): each store_memory
+is a single-row write, queries use the type/source/timestamp and tag indexes
+plus an FTS5 index over content, and related artifacts are found with one
+recursive query.
 """
 
 import json
 import logging
+from collections.abc import MutableMapping
 from datetime import datetime
 from pathlib import Path
-from typing import Any, Dict, List, Optional, Union
+from typing import Any, Dict, Iterator, List, Optional
 from dataclasses import dataclass
 
+from guardian.artifact_store import ArtifactStore
+
 # Configure logging
 logging.basicConfig(
     level=logging.INFO, format="%(asctime)s - %(name)s - %(levelname)s - %(message)s"
@@ -46,6 +54,57 @@ class MemoryArtifact:
             "related_artifacts": self.related_artifacts,
         }
 
+    @classmethod
+    def from_dict(cls, data: Dict[str, Any]) -> "MemoryArtifact":
+        """Inverse of to_dict."""
+        return cls(
+            id=data["id"],
+            content=data["content"],
+            source=data["source"],
+            timestamp=datetime.fromisoformat(data["timestamp"]),
+            tags=data["tags"],
+            confidence=data["confidence"],
+            related_artifacts=data["related_artifacts"],
+        )
+
+
+class ArtifactMap(MutableMapping):
+    """Dict-style view of the artifact store, so `codex.artifacts` keeps working."""
+
+    def __init__(self, store: ArtifactStore):
+        self.store = store
+
+    def __getitem__(self, artifact_id: str) -> MemoryArtifact:
+        data = self.store.get(artifact_id)
+        if data is None:
+            raise KeyError(artifact_id)
+        return MemoryArtifact.from_dict(data)
+
+    def __setitem__(self, artifact_id: str, artifact: MemoryArtifact) -> None:
+        self.store.put({**artifact.to_dict(), "id": artifact_id})
+
+    def __delitem__(self, artifact_id: str) -> None:
+        if not self.store.delete(artifact_id):
+            raise KeyError(artifact_id)
+
+    def __contains__(self, artifact_id: object) -> bool:
+        return isinstance(artifact_id, str) and self.store.contains(artifact_id)
+
+    def __iter__(self) -> Iterator[str]:
+        return iter(self.store.ids())
+
+    def __len__(self) -> int:
+        return self.store.count()
+
+    def values(self) -> List[MemoryArtifact]:
+        return [MemoryArtifact.from_dict(d) for d in self.store.iter_all()]
+
+    def items(self) -> List[tuple]:
+        return [(a.id, a) for a in self.values()]
+
+    def clear(self) -> None:
+        self.store.clear()
+
 
 class CodexAwareness:
     """
@@ -56,40 +115,32 @@ class CodexAwareness:
     def __init__(self, memory_path: Optional[Path] = None):
         self.memory_path = memory_path or Path(__file__).parent / "memory"
         self.memory_path.mkdir(exist_ok=True)
-        self.artifacts: Dict[str, MemoryArtifact] = {}
-        self._load_artifacts()
+        db_path = self.memory_path / "artifacts.db"
+        is_new = not db_path.exists()
+        self.store = ArtifactStore(str(db_path))
+        self.artifacts: ArtifactMap = ArtifactMap(self.store)
+        if is_new:
+            self._load_artifacts()
 
     def _load_artifacts(self) -> None:
-        """Load existing memory artifacts from storage."""
+        """Imports a legacy artifacts.json into a freshly created store."""
         try:
             artifact_path = self.memory_path / "artifacts.json"
             if artifact_path.exists():
                 with open(artifact_path, "r") as f:
                     data = json.load(f)
-                    for artifact_dict in data:
-                        artifact = MemoryArtifact(
-                            id=artifact_dict["id"],
-                            content=artifact_dict["content"],
-                            source=artifact_dict["source"],
-                            timestamp=datetime.fromisoformat(
-                                artifact_dict["timestamp"]
-                            ),
-                            tags=artifact_dict["tags"],
-                            confidence=artifact_dict["confidence"],
-                            related_artifacts=artifact_dict["related_artifacts"],
-                        )
-                        self.artifacts[artifact.id] = artifact
+                count = self.store.put_many(
+                    MemoryArtifact.from_dict(d).to_dict() for d in data
+                )
+                logger.info(f"Imported {count} artifacts from {artifact_path}")
         except Exception as e:
             logger.error(f"Failed to load artifacts: {e}")
 
     def save_artifacts(self) -> None:
-        """Persist memory artifacts to storage."""
-        try:
-            artifact_path = self.memory_path / "artifacts.json"
-            with open(artifact_path, "w") as f:
-                json.dump([a.to_dict() for a in self.artifacts.values()], f, indent=2)
-        except Exception as e:
-            logger.error(f"Failed to save artifacts: {e}")
+        """Artifacts are committed as they are stored; kept for API compatibility."""
+
+    def close(self) -> None:
+        self.store.close()
 
     def store_memory(
         self,
@@ -123,14 +174,10 @@ class CodexAwareness:
             related_artifacts=related_artifacts or [],
         )
 
-        logger.info(
-            logger.debug(f"Storing memory_id: {artifact_id}, content: {content}, tags: {tags}")
-        )  # DEBUG
-        self.artifacts[artifact_id] = artifact
-        self.save_artifacts()
-        logger.info(
-            logger.debug(f"CodexAwareness.artifacts after store for {artifact_id}: {list(self.artifacts.keys())}")
-        )  # DEBUG
+        logger.debug(
+            f"Storing memory_id: {artifact_id}, content: {content}, tags: {tags}"
+        )
+        self.store.put(artifact.to_dict())
         return artifact_id
 
     def query_memory(
@@ -154,72 +201,55 @@ class CodexAwareness:
         Returns:
             List[MemoryArtifact]: Matching memory artifacts
         """
-        logger.info(
-            logger.debug(f"query_memory: query='{query}', tags={tags}, current artifact keys: {list(self.artifacts.keys())}")
-        )  # DEBUG
+        logger.debug(
+            f"query_memory: query='{query}', source={source_filter}, tags={tags}"
+        )
         results = []
-
-        for (
-            artifact_id,
-            artifact_obj,
-        ) in self.artifacts.items():  # Iterate items to log ID
-            logger.info(
-                logger.debug(f"Checking artifact: {artifact_id} with content type {artifact_obj.content.get('type', 'N/A')}")
-            )  # DEBUG
-            if source_filter and artifact_obj.source != source_filter:
-                continue
-
-            if tags and not all(tag in artifact_obj.tags for tag in tags):
-                logger.info(
-                    logger.debug(f"Artifact {artifact_id} failed tag check: artifact_tags={artifact_obj.tags}, query_tags={tags}")
-                )  # DEBUG
-                continue
-
-            if artifact_obj.confidence < min_confidence:
-                logger.info(
-                    logger.debug(f"Artifact {artifact_id} failed confidence check: {artifact_obj.confidence} < {min_confidence}")
-                )  # DEBUG
-                continue
-
-            matches = self._matches_query(artifact_obj, query)
-            # Logging for match status is now inside _matches_query
-            if matches:
+        # The store applies the source/tag/confidence filters and narrows the
+        # text match to candidates; _matches_query has the final say
+        for data in self.store.search(
+            query,
+            source=source_filter,
+            tags=tags,
+            min_confidence=min_confidence,
+        ):
+            artifact_obj = MemoryArtifact.from_dict(data)
+            if self._matches_query(artifact_obj, query):
                 results.append(artifact_obj)
-
             if len(results) >= limit:
                 break
 
-        logger.info(
-            logger.debug(f"query_memory for '{query}' found {len(results)} results: {[r.id for r in results]}")
-        )  # DEBUG
+        logger.debug(
+            f"query_memory for '{query}' found {len(results)} results: {[r.id for r in results]}"
+        )
         return results
 
     def _matches_query(self, artifact: MemoryArtifact, query: str) -> bool:
         """Check if an artifact matches the search query."""
         query_l = query.lower()
-        logger.info(
-            logger.debug(f"_matches_query: artifact ID {artifact.id}, query_l '{query_l}', artifact.content {artifact.content}, artifact.tags {artifact.tags}")
-        )  # DEBUG
+        logger.debug(
+            f"_matches_query: artifact ID {artifact.id}, query_l '{query_l}', artifact.content {artifact.content}, artifact.tags {artifact.tags}"
+        )
 
         # Check content
         content_str = json.dumps(artifact.content).lower()
         if query in content_str:
-            logger.info(
-                logger.debug(f"_matches_query: Matched query '{query_l}' in content_str for artifact ID {artifact.id}")
-            )  # DEBUG
+            logger.debug(
+                f"_matches_query: Matched query '{query_l}' in content_str for artifact ID {artifact.id}"
+            )
             return True
 
         # Check tags
         # Ensure artifact.tags is not None before iterating
         if artifact.tags and any(query_l in tag.lower() for tag in artifact.tags):
-            logger.info(
-                logger.debug(f"_matches_query: Matched query '{query_l}' in tags for artifact ID {artifact.id}")
-            )  # DEBUG
+            logger.debug(
+                f"_matches_query: Matched query '{query_l}' in tags for artifact ID {artifact.id}"
+            )
             return True
 
-        logger.info(
-            logger.debug(f"_matches_query: No match for query '{query_l}' in artifact ID {artifact.id}")
-        )  # DEBUG
+        logger.debug(
+            f"_matches_query: No match for query '{query_l}' in artifact ID {artifact.id}"
+        )
         return False
 
     def get_related_memories(
@@ -235,11 +265,12 @@ class CodexAwareness:
         Args:
             artifact_id: ID of the source artifact
             max_depth: Maximum depth to traverse related artifacts
-            max_retries: Maximum number of retries
-            retry_delay: Delay between retries in seconds
+            max_retries: Ignored; the store is read once, retrying finds nothing new
+            retry_delay: Ignored, as max_retries
 
         Returns:
-            List[MemoryArtifact]: Related artifacts
+            List[MemoryArtifact]: Related artifacts, depth-first in
+            related_artifacts order
         """
         if max_depth <= 0:
             return []
@@ -248,51 +279,14 @@ class CodexAwareness:
             logger.warning(f"Artifact {artifact_id} not found in memory store")
             return []
 
-        related = []
-        visited = set()
-
-        def traverse_related(current_id: str, depth: int):
-            if depth <= 0 or current_id in visited:
-                return
-
-            visited.add(current_id)
-            current_artifact = self.artifacts.get(current_id)
-
-            if not current_artifact:
-                logger.warning(f"Related artifact {current_id} not found")
-                return
-
-            # Always include the current artifact's direct relations
-            for related_id in current_artifact.related_artifacts:
-                if related_id in self.artifacts:
-                    related_artifact = self.artifacts[related_id]
-                    if related_artifact not in related:
-                        related.append(related_artifact)
-                        logger.info(f"Found related artifact: {related_id}")
-                    traverse_related(related_id, depth - 1)
-
-        # Try multiple times with delay
-        for attempt in range(max_retries):
-            traverse_related(artifact_id, max_depth)
-            if related:
-                logger.info(
-                    f"Found {len(related)} related memories on attempt {attempt + 1}"
-                )
-                break
-
-            if attempt < max_retries - 1:
-                logger.warning(
-                    f"No related memories found, retrying (attempt {attempt + 1})"
-                )
-                import time
-
-                time.sleep(retry_delay)
-
+        related = [
+            MemoryArtifact.from_dict(d)
+            for d in self.store.related(artifact_id, max_depth)
+        ]
         if not related:
-            logger.warning(f"No related memories found after {max_retries} attempts")
-            # Return an empty list instead of raising an error
-            return []
-
+            logger.warning(f"No related memories found for {artifact_id}")
+        else:
+            logger.info(f"Found {len(related)} related memories for {artifact_id}")
         return related
 
     def summarize_context(self, artifact_ids: List[str]) -> Dict[str, Any]:
@@ -45,6 +45,9 @@ class SystemConfig:
             "max_artifacts": 10000,
             "cleanup_threshold": 0.9,  # 90% full
             "min_confidence": 0.1,
+            "jsonl_segment_size": 64 * 1024 * 1024,  # bytes
+            "jsonl_compression": None,  # "gzip" or "zstd"
+            "jsonl_retention_days": None,
         },
         "agents": {
             "required": ["Axis", "Vestige"],
@@ -28,6 +28,20 @@ class Settings(BaseSettings):
     AGENT_TIMEOUT_SECONDS: int = Field(
         default=30, description="Timeout in seconds for agent execution."
     )
+    ORCHESTRATOR_POOL_SIZE: int | None = Field(
+        default=None,
+        description="Agent worker processes kept warm by the orchestrator (default: CPU count).",
+    )
+    ORCHESTRATOR_MAX_TASKS_PER_CHILD: int = Field(
+        default=100, description="Tasks a worker runs before it is recycled (0 = never)."
+    )
+    ORCHESTRATOR_MAX_QUEUE: int = Field(
+        default=64, description="Agent tasks allowed to wait for a free worker."
+    )
+    ORCHESTRATOR_SUBMIT_TIMEOUT_SECONDS: float = Field(
+        default=5.0,
+        description="How long a request waits for queue space before it is rejected.",
+    )
     PROMPT_DIR_PATH: str | None = Field(
         default=None, description="Optional absolute path to the prompts directory."
     )
@@ -4,16 +4,132 @@ guardian.core.db
 
 GuardianDB: Handles all low-level memory persistence in SQLite for Guardian.
 
+Connections are pooled per thread: each thread reuses one connection opened
+in WAL mode with synchronous=NORMAL, so readers never block the writer and
+sqlite3's per-connection statement cache keeps hot queries prepared.
+
+chat_log and memory are mirrored into FTS5 tables by triggers. Searches are
+BM25-ranked with highlighted snippets and paginate with opaque keyset
+cursors rather than OFFSET. Rows that existed before the FTS migration are
+indexed by backfill_fts() in short chunked transactions.
+
 Usage:
     db = GuardianDB("guardian.db")
     db.init_db()
     db.insert_log(...)
     history = db.get_history(...)
+    db.close()
 """
 
+import base64
+import json
+import re
 import sqlite3
+import threading
+import time
 from datetime import datetime, timezone
-from typing import Any, Dict, List, Optional, Tuple
+from typing import Any, Dict, Iterable, List, Optional, Tuple
+
+# Prepared statements kept per connection (sqlite3's default is 128)
+STATEMENT_CACHE_SIZE = 256
+
+# Source table -> (FTS5 table, indexed text columns)
+FTS_TABLES: Dict[str, Tuple[str, Tuple[str, ...]]] = {
+    "chat_log": ("chat_log_fts", ("message", "response")),
+    "memory": ("memory_fts", ("command", "tag")),
+}
+
+
+def _fts_statements() -> List[str]:
+    """
+    FTS5 tables plus sync triggers for every FTS_TABLES entry.
+    The FTS tables keep their own copy of the text (not external content), so
+    deleting a row that the backfill hasn't reached yet is still safe.
+    Each table's current max id is recorded as its backfill range.
+    """
+    statements = [
+        "CREATE TABLE IF NOT EXISTS fts_backfill ("
+        "source TEXT PRIMARY KEY, last_id INTEGER NOT NULL, end_id INTEGER NOT NULL)"
+    ]
+    for source, (fts, columns) in FTS_TABLES.items():
+        cols = ", ".join(columns)
+        new_vals = ", ".join(f"new.{c}" for c in columns)
+        statements += [
+            f"CREATE VIRTUAL TABLE IF NOT EXISTS {fts} USING fts5({cols})",
+            f"CREATE TRIGGER IF NOT EXISTS {fts}_ai AFTER INSERT ON {source} BEGIN "
+            f"INSERT INTO {fts} (rowid, {cols}) VALUES (new.id, {new_vals}); END",
+            f"CREATE TRIGGER IF NOT EXISTS {fts}_ad AFTER DELETE ON {source} BEGIN "
+            f"DELETE FROM {fts} WHERE rowid = old.id; END",
+            f"CREATE TRIGGER IF NOT EXISTS {fts}_au AFTER UPDATE OF {cols} ON {source} BEGIN "
+            f"DELETE FROM {fts} WHERE rowid = old.id; "
+            f"INSERT INTO {fts} (rowid, {cols}) VALUES (new.id, {new_vals}); END",
+            f"INSERT OR IGNORE INTO fts_backfill (source, last_id, end_id) "
+            f"SELECT '{source}', 0, COALESCE(MAX(id), 0) FROM {source}",
+        ]
+    return statements
+
+
+# Ordered schema migrations, tracked with PRAGMA user_version.
+# Append new steps; never edit or reorder applied ones.
+MIGRATIONS: List[Tuple[str, List[str]]] = [
+    (
+        "lookup indexes",
+        [
+            # get_chat_history filters on (session_id, user_id) and orders by id
+            "CREATE INDEX IF NOT EXISTS idx_chat_log_session_user "
+            "ON chat_log (session_id, user_id, id)",
+            "CREATE INDEX IF NOT EXISTS idx_chat_log_user_id ON chat_log (user_id)",
+            "CREATE INDEX IF NOT EXISTS idx_threads_parent_thread_id "
+            "ON threads (parent_thread_id)",
+            "CREATE INDEX IF NOT EXISTS idx_memory_timestamp ON memory (timestamp)",
+            "CREATE INDEX IF NOT EXISTS idx_memory_user_id ON memory (user_id, id)",
+        ],
+    ),
+    ("fts5 search", _fts_statements()),
+]
+
+CHAT_LOG_COLUMNS = (
+    "id, timestamp, session_id, user_id, role, message, response, backend, model, agent, tag, extra"
+)
+
+CHAT_LOG_INSERT = """
+    INSERT INTO chat_log (
+        timestamp, session_id, user_id, role, message, response, backend, model, agent, tag, extra
+    ) VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?)
+"""
+
+MEMORY_INSERT = """
+    INSERT INTO memory (timestamp, command, tag, agent, user_id)
+    VALUES (?, ?, ?, ?, ?)
+"""
+
+
+def fts_query(text: str) -> str:
+    """
+    Turns free text into a safe FTS5 MATCH expression: every word becomes a
+    quoted term (implicit AND), a trailing '*' on a word keeps prefix search.
+    """
+    terms = [
+        f'"{word}"' + ("*" if star else "")
+        for word, star in re.findall(r"(\w+)(\*?)", text)
+    ]
+    return " ".join(terms)
+
+
+def encode_cursor(*values: Any) -> str:
+    """Opaque keyset cursor for the last row of a page."""
+    return base64.urlsafe_b64encode(json.dumps(values).encode("utf-8")).decode("ascii")
+
+
+def decode_cursor(cursor: str) -> List[Any]:
+    """Inverse of encode_cursor; raises ValueError on a malformed cursor."""
+    try:
+        values = json.loads(base64.urlsafe_b64decode(cursor.encode("ascii")))
+    except Exception as e:
+        raise ValueError(f"Invalid cursor: {cursor!r}") from e
+    if not isinstance(values, list):
+        raise ValueError(f"Invalid cursor: {cursor!r}")
+    return values
 
 
 class GuardianDB:
@@ -21,11 +137,49 @@ class GuardianDB:
 
     def __init__(self, db_path: str = "guardian.db") -> None:
         self.db_path = db_path
+        self._local = threading.local()
+        self._connections: List[sqlite3.Connection] = []
+        self._connections_lock = threading.Lock()
         self.upgrade_db_schema()  # <-- Add this line so table always exists
 
+    def _connect(self) -> sqlite3.Connection:
+        """
+        Returns this thread's pooled connection, opening it on first use.
+        Usable as `with self._connect() as conn:` (commits or rolls back, stays open).
+        """
+        conn = getattr(self._local, "conn", None)
+        if conn is None:
+            conn = sqlite3.connect(
+                self.db_path,
+                timeout=30.0,
+                cached_statements=STATEMENT_CACHE_SIZE,
+                check_same_thread=False,  # close() may run on another thread
+            )
+            conn.execute("PRAGMA journal_mode=WAL")
+            conn.execute("PRAGMA synchronous=NORMAL")
+            conn.execute("PRAGMA temp_store=MEMORY")
+            self._local.conn = conn
+            with self._connections_lock:
+                self._connections.append(conn)
+        return conn
+
+    def close(self) -> None:
+        """Closes every pooled connection; later calls transparently reopen."""
+        with self._connections_lock:
+            connections, self._connections = self._connections, []
+        for conn in connections:
+            conn.close()
+        self._local = threading.local()
+
+    def __enter__(self) -> "GuardianDB":
+        return self
+
+    def __exit__(self, *exc) -> None:
+        self.close()
+
     def init_db(self) -> None:
         """Initializes the database schema for memory storage (legacy) and calls upgrade_db_schema for chat_log."""
-        with sqlite3.connect(self.db_path) as conn:
+        with self._connect() as conn:
             c = conn.cursor()
             c.execute(
                 """
@@ -61,7 +215,7 @@ class GuardianDB:
             ("tag", "TEXT"),
             ("extra", "TEXT"),
         ]
-        with sqlite3.connect(self.db_path) as conn:
+        with self._connect() as conn:
             c = conn.cursor()
             # Check if table exists
             c.execute(
@@ -76,20 +230,16 @@ class GuardianDB:
                 c.execute(
                     f"CREATE TABLE IF NOT EXISTS chat_log (\n    {columns_def}\n)"
                 )
-                conn.commit()
-                return
-            # Table exists, check for missing columns
-            c.execute("PRAGMA table_info(chat_log)")
-            existing_cols = {row[1] for row in c.fetchall()}
-            for col, ctype in schema_columns:
-                if col not in existing_cols:
-                    # Add missing column
-                    c.execute(f"ALTER TABLE chat_log ADD COLUMN {col} {ctype}")
-            conn.commit()
+            else:
+                # Table exists, check for missing columns
+                c.execute("PRAGMA table_info(chat_log)")
+                existing_cols = {row[1] for row in c.fetchall()}
+                for col, ctype in schema_columns:
+                    if col not in existing_cols:
+                        # Add missing column
+                        c.execute(f"ALTER TABLE chat_log ADD COLUMN {col} {ctype}")
 
-        # Add threads table for lineage and summary support
-        with sqlite3.connect(self.db_path) as conn:
-            c = conn.cursor()
+            # Add threads table for lineage and summary support
             c.execute(
                 """
                 CREATE TABLE IF NOT EXISTS threads (
@@ -103,7 +253,37 @@ class GuardianDB:
                 )
                 """
             )
-            conn.commit()
+            # Legacy memory table, so migrations can index it
+            c.execute(
+                """
+                CREATE TABLE IF NOT EXISTS memory (
+                    id INTEGER PRIMARY KEY AUTOINCREMENT,
+                    timestamp TEXT,
+                    command TEXT,
+                    tag TEXT,
+                    agent TEXT,
+                    user_id TEXT
+                )
+                """
+            )
+        self.apply_migrations()
+
+    def apply_migrations(self) -> int:
+        """
+        Runs any MIGRATIONS newer than the database's user_version.
+        Returns the resulting schema version.
+        """
+        with self._connect() as conn:
+            version = conn.execute("PRAGMA user_version").fetchone()[0]
+            for number, (_name, statements) in enumerate(MIGRATIONS, start=1):
+                if number <= version:
+                    continue
+                for statement in statements:
+                    conn.execute(statement)
+                # PRAGMA doesn't take parameters; number is an int we control
+                conn.execute(f"PRAGMA user_version = {number}")
+                version = number
+        return version
 
     def insert_log(
         self,
@@ -117,17 +297,30 @@ class GuardianDB:
         Insert a log entry into the legacy memory table.
         NOTE: The new canonical table for chat history is 'chat_log'.
         """
-        with sqlite3.connect(self.db_path) as conn:
+        with self._connect() as conn:
             c = conn.cursor()
-            c.execute(
-                """
-                INSERT INTO memory (timestamp, command, tag, agent, user_id)
-                VALUES (?, ?, ?, ?, ?)
-                """,
-                (timestamp, command, tag, agent, user_id),
-            )
+            c.execute(MEMORY_INSERT, (timestamp, command, tag, agent, user_id))
             conn.commit()
 
+    def insert_logs_bulk(self, entries: Iterable[Dict[str, Any]]) -> int:
+        """
+        Insert many legacy memory rows in one transaction (executemany).
+        Each entry takes the insert_log keyword arguments; returns the row count.
+        """
+        rows = [
+            (
+                e.get("timestamp"),
+                e["command"],
+                e.get("tag"),
+                e.get("agent"),
+                e.get("user_id", "default"),
+            )
+            for e in entries
+        ]
+        with self._connect() as conn:
+            conn.executemany(MEMORY_INSERT, rows)
+        return len(rows)
+
     def get_history(
         self, limit: int = 10, user_id: Optional[str] = None
     ) -> List[Tuple[Any, ...]]:
@@ -136,7 +329,7 @@ class GuardianDB:
         NOTE: The new canonical table for chat history is 'chat_log'.
         If user_id is set, filter to that user.
         """
-        with sqlite3.connect(self.db_path) as conn:
+        with self._connect() as conn:
             c = conn.cursor()
             if user_id:
                 c.execute(
@@ -178,14 +371,10 @@ class GuardianDB:
         """
         Insert a chat log entry into the canonical 'chat_log' table.
         """
-        with sqlite3.connect(self.db_path) as conn:
+        with self._connect() as conn:
             c = conn.cursor()
             c.execute(
-                """
-                INSERT INTO chat_log (
-                    timestamp, session_id, user_id, role, message, response, backend, model, agent, tag, extra
-                ) VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?)
-                """,
+                CHAT_LOG_INSERT,
                 (
                     timestamp,
                     session_id,
@@ -202,6 +391,33 @@ class GuardianDB:
             )
             conn.commit()
 
+    def insert_chat_logs_bulk(self, entries: Iterable[Dict[str, Any]]) -> int:
+        """
+        Insert many chat log entries in one transaction (executemany).
+        Each entry takes the add_chat_log keyword arguments, with the same
+        defaults for timestamp and model. Returns the number of rows written.
+        """
+        now = datetime.now(timezone.utc).isoformat()
+        rows = [
+            (
+                e.get("timestamp") or now,
+                e["session_id"],
+                e["user_id"],
+                e["role"],
+                e["message"],
+                e.get("response"),
+                e.get("backend"),
+                e.get("model") or "test-model",
+                e.get("agent"),
+                e.get("tag"),
+                e.get("extra"),
+            )
+            for e in entries
+        ]
+        with self._connect() as conn:
+            conn.executemany(CHAT_LOG_INSERT, rows)
+        return len(rows)
+
     def get_chat_history(
         self,
         session_id: str,
@@ -244,13 +460,206 @@ class GuardianDB:
         query += f" ORDER BY id {order_by} LIMIT ? OFFSET ?"
         params.extend([limit, offset])
 
-        with sqlite3.connect(self.db_path) as conn:
+        with self._connect() as conn:
             c = conn.cursor()
             c.execute(query, params)
             rows = c.fetchall()
             columns = [desc[0] for desc in c.description]
             return [dict(zip(columns, row)) for row in rows]
 
+    def get_chat_history_page(
+        self,
+        session_id: str,
+        user_id: str = "default",
+        limit: int = 20,
+        cursor: Optional[str] = None,
+        order: str = "desc",
+        role: Optional[str] = None,
+        after: Optional[str] = None,
+        before: Optional[str] = None,
+        keyword: Optional[str] = None,
+    ) -> Dict[str, Any]:
+        """
+        Keyset-paginated chat history: pass the previous page's next_cursor to
+        continue. keyword is matched through chat_log_fts instead of LIKE.
+        Returns {"history": [...], "next_cursor": str or None}.
+        """
+        descending = order == "desc"
+        query = f"SELECT {CHAT_LOG_COLUMNS} FROM chat_log WHERE session_id = ? AND user_id = ?"
+        params: List[Any] = [session_id, user_id]
+        if cursor:
+            (last_id,) = decode_cursor(cursor)
+            query += " AND id < ?" if descending else " AND id > ?"
+            params.append(int(last_id))
+        if role:
+            query += " AND role = ?"
+            params.append(role)
+        if after:
+            query += " AND timestamp > ?"
+            params.append(after)
+        if before:
+            query += " AND timestamp < ?"
+            params.append(before)
+        if keyword:
+            match = fts_query(keyword)
+            if not match:
+                return {"history": [], "next_cursor": None}
+            query += " AND id IN (SELECT rowid FROM chat_log_fts WHERE chat_log_fts MATCH ?)"
+            params.append(match)
+        query += f" ORDER BY id {'DESC' if descending else 'ASC'} LIMIT ?"
+        params.append(limit + 1)  # One extra row tells us whether a next page exists
+
+        with self._connect() as conn:
+            c = conn.execute(query, params)
+            columns = [desc[0] for desc in c.description]
+            rows = [dict(zip(columns, row)) for row in c.fetchall()]
+        next_cursor = encode_cursor(rows[limit - 1]["id"]) if len(rows) > limit else None
+        return {"history": rows[:limit], "next_cursor": next_cursor}
+
+    def _fts_search(
+        self,
+        source: str,
+        select_columns: str,
+        query: str,
+        filters: List[Tuple[str, Any]],
+        limit: int,
+        cursor: Optional[str],
+        highlight: Tuple[str, str],
+        snippet_tokens: int,
+    ) -> Dict[str, Any]:
+        """
+        BM25-ranked search over FTS_TABLES[source], joined back to the source
+        table. Pages are keyed on (bm25, id), both ascending (bm25 is lower
+        for better matches).
+        """
+        fts, _columns = FTS_TABLES[source]
+        match = fts_query(query)
+        if not match:
+            return {"results": [], "next_cursor": None}
+        sql = f"""
+            SELECT * FROM (
+                SELECT {select_columns},
+                       bm25({fts}) AS rank,
+                       snippet({fts}, -1, ?, ?, '…', ?) AS snippet
+                FROM {fts} JOIN {source} AS src ON src.id = {fts}.rowid
+                WHERE {fts} MATCH ?
+            )
+            WHERE 1 = 1
+        """
+        params: List[Any] = [highlight[0], highlight[1], snippet_tokens, match]
+        for column, value in filters:
+            sql += f" AND {column} = ?"
+            params.append(value)
+        if cursor:
+            last_rank, last_id = decode_cursor(cursor)
+            sql += " AND (rank > ? OR (rank = ? AND id > ?))"
+            params.extend([float(last_rank), float(last_rank), int(last_id)])
+        sql += " ORDER BY rank, id LIMIT ?"
+        params.append(limit + 1)
+
+        with self._connect() as conn:
+            c = conn.execute(sql, params)
+            columns = [desc[0] for desc in c.description]
+            rows = [dict(zip(columns, row)) for row in c.fetchall()]
+        next_cursor = None
+        if len(rows) > limit:
+            last = rows[limit - 1]
+            next_cursor = encode_cursor(last["rank"], last["id"])
+        results = rows[:limit]
+        for row in results:
+            row["score"] = -row.pop("rank")  # Higher is better for callers
+        return {"results": results, "next_cursor": next_cursor}
+
+    def search_chat_log(
+        self,
+        query: str,
+        session_id: Optional[str] = None,
+        user_id: Optional[str] = None,
+        limit: int = 20,
+        cursor: Optional[str] = None,
+        highlight: Tuple[str, str] = ("<mark>", "</mark>"),
+        snippet_tokens: int = 12,
+    ) -> Dict[str, Any]:
+        """
+        Full-text search over chat_log message/response, best matches first.
+        Each result carries the chat_log columns plus "score" and "snippet".
+        Returns {"results": [...], "next_cursor": str or None}.
+        """
+        filters = [
+            (column, value)
+            for column, value in (("session_id", session_id), ("user_id", user_id))
+            if value is not None
+        ]
+        select_columns = ", ".join(f"src.{c}" for c in CHAT_LOG_COLUMNS.split(", "))
+        return self._fts_search(
+            "chat_log", select_columns, query, filters, limit, cursor, highlight, snippet_tokens
+        )
+
+    def search_memory(
+        self,
+        query: str,
+        limit: int = 10,
+        user_id: Optional[str] = None,
+        cursor: Optional[str] = None,
+        highlight: Tuple[str, str] = ("<mark>", "</mark>"),
+        snippet_tokens: int = 12,
+    ) -> Dict[str, Any]:
+        """
+        Full-text search over the legacy memory table (command and tag).
+        Returns {"results": [...], "next_cursor": str or None}.
+        """
+        filters = [("user_id", user_id)] if user_id is not None else []
+        select_columns = "src.id, src.timestamp, src.command, src.tag, src.agent, src.user_id"
+        return self._fts_search(
+            "memory", select_columns, query, filters, limit, cursor, highlight, snippet_tokens
+        )
+
+    def fts_backfill_pending(self) -> bool:
+        """True while rows from before the FTS migration are still unindexed."""
+        with self._connect() as conn:
+            row = conn.execute(
+                "SELECT COUNT(*) FROM fts_backfill WHERE last_id < end_id"
+            ).fetchone()
+        return bool(row[0])
+
+    def backfill_fts(self, chunk_size: int = 5000, pause: float = 0.0) -> int:
+        """
+        Indexes pre-migration rows into the FTS tables, chunk_size ids per
+        transaction so writers are only ever blocked briefly; `pause` sleeps
+        between chunks to leave the write lock free. Progress is persisted, so
+        an interrupted backfill resumes where it stopped. Returns rows indexed.
+        """
+        indexed = 0
+        for source, (fts, columns) in FTS_TABLES.items():
+            cols = ", ".join(columns)
+            while True:
+                with self._connect() as conn:
+                    state = conn.execute(
+                        "SELECT last_id, end_id FROM fts_backfill WHERE source = ?",
+                        (source,),
+                    ).fetchone()
+                    if state is None or state[0] >= state[1]:
+                        break
+                    low, high = state[0], min(state[0] + chunk_size, state[1])
+                    # Rows already re-indexed by the update trigger are skipped
+                    c = conn.execute(
+                        f"""
+                        INSERT INTO {fts} (rowid, {cols})
+                        SELECT id, {cols} FROM {source}
+                        WHERE id > ? AND id <= ?
+                          AND id NOT IN (SELECT rowid FROM {fts} WHERE rowid > ? AND rowid <= ?)
+                        """,
+                        (low, high, low, high),
+                    )
+                    indexed += c.rowcount
+                    conn.execute(
+                        "UPDATE fts_backfill SET last_id = ? WHERE source = ?",
+                        (high, source),
+                    )
+                if pause:
+                    time.sleep(pause)
+        return indexed
+
     def create_thread(
         self,
         parent_thread_id: Optional[int],
@@ -264,7 +673,7 @@ class GuardianDB:
         Returns the new thread_id.
         """
         created_at = datetime.now(timezone.utc).isoformat()
-        with sqlite3.connect(self.db_path) as conn:
+        with self._connect() as conn:
             c = conn.cursor()
             c.execute(
                 """
@@ -287,7 +696,7 @@ class GuardianDB:
         """
         Get a thread by thread_id.
         """
-        with sqlite3.connect(self.db_path) as conn:
+        with self._connect() as conn:
             c = conn.cursor()
             c.execute(
                 "SELECT thread_id, parent_thread_id, session_id, summary, created_at, user_id, project_id FROM threads WHERE thread_id = ?",
@@ -299,7 +708,7 @@ class GuardianDB:
         """
         Get all threads with a given parent_thread_id.
         """
-        with sqlite3.connect(self.db_path) as conn:
+        with self._connect() as conn:
             c = conn.cursor()
             c.execute(
                 "SELECT thread_id, session_id, summary, created_at, user_id, project_id FROM threads WHERE parent_thread_id = ?",
@@ -311,7 +720,7 @@ class GuardianDB:
         """
         Update a thread's summary (latest rollup).
         """
-        with sqlite3.connect(self.db_path) as conn:
+        with self._connect() as conn:
             c = conn.cursor()
             c.execute(
                 "UPDATE threads SET summary = ? WHERE thread_id = ?",
@@ -323,7 +732,7 @@ class GuardianDB:
         """
         Get the summary for a thread.
         """
-        with sqlite3.connect(self.db_path) as conn:
+        with self._connect() as conn:
             c = conn.cursor()
             c.execute("SELECT summary FROM threads WHERE thread_id = ?", (thread_id,))
             row = c.fetchone()
@@ -11,9 +11,9 @@ import logging
 logger = logging.getLogger(__name__)
 import asyncio
 from concurrent.futures import TimeoutError
+from contextlib import asynccontextmanager
 from functools import lru_cache
-
-from pebble import ProcessPool
+from typing import Optional
 
 from guardian.core.config import settings
 from guardian.core.client_factory import get_memoryos_instance
@@ -21,8 +21,10 @@ from guardian.core.orchestrator.agents.foresight_agent import run_foresight
 from guardian.core.orchestrator.agents.health_agent import get_health_summary
 from guardian.core.orchestrator.agents.memory_agent import fetch_memory
 from guardian.core.orchestrator.agents.ritual_agent import trigger_ritual
+from guardian.core.orchestrator.worker_pool import AgentWorkerPool, PoolSaturated
 
 from fastapi import FastAPI, HTTPException, Request
+from fastapi.concurrency import run_in_threadpool
 from pydantic import BaseModel
 from fastapi.responses import JSONResponse, StreamingResponse
 import uuid
@@ -40,8 +42,67 @@ logger.info("🔑 GEMINI_API_KEY: %s", os.getenv("GEMINI_API_KEY"))
 logger.info("🔑 OPENAI_API_KEY: %s", os.getenv("OPENAI_API_KEY"))
 
 
+# Long-lived agent worker pool, owned by the app lifespan
+_worker_pool: Optional[AgentWorkerPool] = None
+
+
+def _warm_worker():
+    """Worker initializer: build this process's Memoryos singleton before the first task."""
+    try:
+        get_memoryos_instance()
+    except Exception as e:
+        logger.warning(f"Agent worker warm-up failed, continuing cold: {e}")
+
+
+def start_worker_pool(
+    size: Optional[int] = None,
+    max_tasks_per_child: Optional[int] = None,
+    max_queue: Optional[int] = None,
+    submit_timeout: Optional[float] = None,
+) -> AgentWorkerPool:
+    """Starts (or returns) the shared pool; unset options come from settings."""
+    global _worker_pool
+    if _worker_pool is None or not _worker_pool.running:
+        _worker_pool = AgentWorkerPool(
+            size=size or settings.ORCHESTRATOR_POOL_SIZE,
+            max_tasks_per_child=(
+                max_tasks_per_child
+                if max_tasks_per_child is not None
+                else settings.ORCHESTRATOR_MAX_TASKS_PER_CHILD
+            ),
+            max_queue=max_queue if max_queue is not None else settings.ORCHESTRATOR_MAX_QUEUE,
+            submit_timeout=(
+                submit_timeout
+                if submit_timeout is not None
+                else settings.ORCHESTRATOR_SUBMIT_TIMEOUT_SECONDS
+            ),
+            initializer=_warm_worker,
+        ).start()
+    return _worker_pool
+
+
+def get_worker_pool() -> AgentWorkerPool:
+    """The shared pool; started on first use when running outside the app (CLI, scripts)."""
+    return start_worker_pool()
+
+
+def stop_worker_pool(wait: bool = True):
+    global _worker_pool
+    if _worker_pool is not None:
+        _worker_pool.shutdown(wait=wait)
+        _worker_pool = None
+
+
+@asynccontextmanager
+async def lifespan(app: FastAPI):
+    await run_in_threadpool(start_worker_pool)
+    try:
+        yield
+    finally:
+        await run_in_threadpool(stop_worker_pool)
+
 
-app = FastAPI()
+app = FastAPI(lifespan=lifespan)
 
 # Map action strings to their corresponding agent functions for cleaner, scalable routing.
 AGENT_ACTIONS = {
@@ -119,13 +180,12 @@ def orchestrate(command: dict):
             # TODO: For multiple orchestrator instances, integrate a distributed cache like Redis.
             result = cached_agent_task(action, json.dumps(params))
         else:
-            with ProcessPool() as pool:
-                future = pool.schedule(
-                    function=_execute_agent_task,
-                    args=[agent_function, params],
-                    timeout=settings.AGENT_TIMEOUT_SECONDS,
-                )
-                result = future.result()  # Blocks until completion or timeout
+            # Blocks until completion or timeout; a timed-out worker is replaced
+            result = get_worker_pool().run(
+                _execute_agent_task,
+                args=[agent_function, params],
+                timeout=settings.AGENT_TIMEOUT_SECONDS,
+            )
 
         logger.info(f"Action '{action}' executed successfully")
         return result
@@ -134,6 +194,9 @@ def orchestrate(command: dict):
             f"Action '{action}' timed out after {settings.AGENT_TIMEOUT_SECONDS} seconds."
         )
         return {"status": "error", "message": f"Action '{action}' timed out."}
+    except PoolSaturated as e:
+        logger.warning(f"Rejected action '{action}': {e}")
+        return {"status": "error", "message": str(e), "retryable": True}
     except Exception as e:
         # Log the full exception traceback for effective debugging.
         logger.exception(
@@ -165,7 +228,7 @@ async def orchestrate_streaming(command: dict):
         logger.info(f"Processing chunk {idx+1}/{len(chunks)}: {chunk_params}")
         chunk_command = {"action": action, "params": chunk_params}
 
-        result = orchestrate(chunk_command)
+        result = await run_in_threadpool(orchestrate, chunk_command)
         yield json.dumps({"chunk": idx+1, "result": result}) + "\n"
 
         # Optional delay to simulate processing time and keep spinner alive
@@ -184,15 +247,21 @@ async def orchestrate_endpoint(command: OrchestrateCommand, request: Request):
             media_type="application/json"
         )
     else:
-        response = orchestrate(command_dict)
+        response = await run_in_threadpool(orchestrate, command_dict)
         if response.get("status") == "error":
-            raise HTTPException(status_code=400, detail=response)
+            status_code = 503 if response.get("retryable") else 400
+            raise HTTPException(status_code=status_code, detail=response)
         return JSONResponse(content=response)
 
 
 @app.get("/health")
 async def health_check():
-    return {"status": "ok", "orchestrator": "alive"}
+    pool = _worker_pool
+    return {
+        "status": "ok",
+        "orchestrator": "alive",
+        "worker_pool": pool.metrics() if pool is not None else {"running": False},
+    }
 
 
 # To run: uvicorn guardian.core.orchestrator.pulse_orchestrator:app --reload
@@ -201,3 +270,4 @@ if __name__ == "__main__":
     test_command = {"action": "trigger_ritual", "params": {"name": "evening_grounding"}}
     result = orchestrate(test_command)
     print(json.dumps(result, indent=2))
+    stop_worker_pool()
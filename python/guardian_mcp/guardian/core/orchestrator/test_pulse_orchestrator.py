@@ -2,7 +2,11 @@ import time
 from unittest.mock import patch, MagicMock
 import pytest
 
-from guardian.core.orchestrator.pulse_orchestrator import orchestrate
+from guardian.core.orchestrator.pulse_orchestrator import (
+    orchestrate,
+    start_worker_pool,
+    stop_worker_pool,
+)
 
 
 def mock_slow_agent(*args, **kwargs):
@@ -17,6 +21,20 @@ def mock_fast_agent(*args, **kwargs):
     return {"status": "success", "message": "I finished on time"}
 
 
+@pytest.fixture(autouse=True)
+def worker_pool():
+    """
+    A small shared pool per test. Workers fork with get_memoryos_instance
+    already patched, since later patches in the parent don't reach them.
+    """
+    with patch(
+        "guardian.core.orchestrator.pulse_orchestrator.get_memoryos_instance",
+        return_value=None,
+    ):
+        pool = start_worker_pool(size=2, max_tasks_per_child=10, max_queue=4)
+        yield pool
+    stop_worker_pool(wait=False)
+
 
 # --- Helper decorator for patching common dependencies ---
 def patch_orchestrator_common(test_func):
@@ -58,3 +76,24 @@ def test_orchestrate_agent_timeout_and_success(
 
     assert result["status"] == expected_status
     assert expected_in_message in result["message"] or expected_in_message == result.get("message")
+
+
+@patch_orchestrator_common
+def test_orchestrate_reuses_warm_workers(
+    mock_agent_actions: MagicMock,
+    mock_settings: MagicMock,
+    mock_get_memoryos: MagicMock,
+    worker_pool,
+):
+    """
+    Repeated calls run on the same pre-started workers instead of a fresh pool per call.
+    """
+    mock_settings.AGENT_TIMEOUT_SECONDS = 5
+    mock_agent_actions.get.return_value = mock_fast_agent
+
+    for _ in range(6):
+        assert orchestrate({"action": "run_foresight", "params": {}})["status"] == "success"
+
+    metrics = worker_pool.metrics()
+    assert metrics["completed"] == 6  # Warm-up tasks bypass the counters
+    assert metrics["busy_workers"] == 0
@@ -0,0 +1,80 @@
+import os
+import time
+from concurrent.futures import TimeoutError
+
+import pytest
+
+from guardian.core.orchestrator.worker_pool import AgentWorkerPool, PoolSaturated
+
+
+def worker_pid(delay=0.0):
+    time.sleep(delay)
+    return os.getpid()
+
+
+def wait_idle(pool, timeout=2.0):
+    # Done-callbacks may run just after result() returns
+    deadline = time.monotonic() + timeout
+    while pool.metrics()["busy_workers"] and time.monotonic() < deadline:
+        time.sleep(0.01)
+
+
+@pytest.fixture
+def make_pool():
+    pools = []
+
+    def factory(**kwargs):
+        pool = AgentWorkerPool(**kwargs).start()
+        pools.append(pool)
+        return pool
+
+    yield factory
+    for pool in pools:
+        pool.shutdown(wait=False)
+
+
+def test_timeout_replaces_only_the_offending_worker(make_pool):
+    pool = make_pool(size=2, max_tasks_per_child=0)
+    slow = pool.submit(worker_pid, args=[1.0], timeout=0.1)
+    healthy = pool.run(worker_pid, args=[0.3])  # Runs on the other worker meanwhile
+
+    with pytest.raises(TimeoutError):
+        slow.result()
+    pids = {f.result() for f in [pool.submit(worker_pid, args=[0.1]) for _ in range(8)]}
+    wait_idle(pool)
+
+    assert healthy in pids  # The untouched worker survived
+    assert len(pids) == 2  # A replacement took the killed worker's place
+    assert pool.metrics()["timeouts"] == 1
+
+
+def test_workers_recycle_after_max_tasks(make_pool):
+    pool = make_pool(size=1, max_tasks_per_child=2)
+    pids = [pool.run(worker_pid) for _ in range(6)]
+
+    assert len(set(pids)) >= 3
+
+
+def test_full_queue_rejects_after_submit_timeout(make_pool):
+    pool = make_pool(size=1, max_queue=1, submit_timeout=0.05)
+    pool.submit(worker_pid, args=[0.5])
+    pool.submit(worker_pid, args=[0.5])  # Waits in the queue
+
+    with pytest.raises(PoolSaturated):
+        pool.submit(worker_pid)
+    metrics = pool.metrics()
+    assert metrics["busy_workers"] == 1
+    assert metrics["queue_depth"] == 1
+    assert metrics["rejected"] == 1
+
+
+def test_latency_histogram_counts_every_task(make_pool):
+    pool = make_pool(size=2)
+    for _ in range(5):
+        pool.run(worker_pid)
+    wait_idle(pool)
+
+    latency = pool.metrics()["task_latency_ms"]
+    assert latency["count"] == 5
+    assert latency["buckets"]["+Inf"] == 5
+    assert latency["sum"] > 0
@@ -0,0 +1,164 @@
+"""
+Long-lived, pre-warmed process pool for orchestrator agent tasks.
+
+A single pool is created at app startup and reused by every request, so agent
+modules and the per-process Memoryos singleton are loaded once per worker
+instead of once per call.
+
+- `size` worker processes, started and warmed up front
+- a task that exceeds its timeout kills and replaces only its own worker (pebble)
+- workers are recycled after `max_tasks_per_child` tasks
+- at most `size + max_queue` tasks are admitted; beyond that `submit` waits up
+  to `submit_timeout` seconds and then raises PoolSaturated
+- `metrics()` reports queue depth, busy workers and a task latency histogram
+"""
+
+import logging
+import os
+import threading
+import time
+from concurrent.futures import TimeoutError
+from typing import Any, Callable, Dict, Optional, Sequence
+
+from pebble import ProcessPool
+
+logger = logging.getLogger(__name__)
+
+# Upper bounds (ms) of the latency histogram buckets; the last bucket is +Inf
+LATENCY_BUCKETS_MS = (5, 10, 25, 50, 100, 250, 500, 1000, 2500, 5000, 10000, 30000)
+
+
+class PoolSaturated(RuntimeError):
+    """Raised when the submission queue stays full for longer than submit_timeout."""
+
+
+def _noop() -> int:
+    return os.getpid()
+
+
+class AgentWorkerPool:
+    def __init__(
+        self,
+        size: Optional[int] = None,
+        max_tasks_per_child: int = 100,
+        max_queue: int = 64,
+        submit_timeout: float = 5.0,
+        initializer: Optional[Callable[[], None]] = None,
+    ):
+        self.size = size or os.cpu_count() or 1
+        self.max_tasks_per_child = max_tasks_per_child
+        self.max_queue = max_queue
+        self.submit_timeout = submit_timeout
+        self.initializer = initializer
+        self._pool: Optional[ProcessPool] = None
+        self._slots = threading.BoundedSemaphore(self.size + max_queue)
+        self._lock = threading.Lock()
+        self._in_flight = 0
+        self._counters = {"submitted": 0, "completed": 0, "timeouts": 0, "failures": 0, "rejected": 0}
+        self._histogram = [0] * (len(LATENCY_BUCKETS_MS) + 1)
+        self._latency_sum_ms = 0.0
+
+    @property
+    def running(self) -> bool:
+        return self._pool is not None
+
+    def start(self, warm: bool = True) -> "AgentWorkerPool":
+        if self._pool is not None:
+            return self
+        self._pool = ProcessPool(
+            max_workers=self.size,
+            max_tasks=self.max_tasks_per_child,
+            initializer=self.initializer,
+        )
+        if warm:
+            # One trivial task per worker forces every process (and its initializer) up now
+            pids = {f.result() for f in [self._pool.schedule(_noop) for _ in range(self.size)]}
+            logger.info(f"Agent worker pool warm: {len(pids)} worker(s) of {self.size}")
+        return self
+
+    def shutdown(self, wait: bool = True) -> None:
+        pool, self._pool = self._pool, None
+        if pool is None:
+            return
+        if wait:
+            pool.close()
+        else:
+            pool.stop()
+        pool.join()
+
+    def submit(self, function: Callable, args: Sequence[Any] = (), timeout: Optional[float] = None):
+        """
+        Schedules function(*args) on a worker and returns its future.
+        Blocks while the queue is full; raises PoolSaturated after submit_timeout.
+        """
+        if self._pool is None:
+            raise RuntimeError("Agent worker pool is not running")
+        if not self._slots.acquire(timeout=self.submit_timeout):
+            with self._lock:
+                self._counters["rejected"] += 1
+            raise PoolSaturated(
+                f"Agent worker pool saturated ({self.size} busy, {self.max_queue} queued)"
+            )
+        started = time.perf_counter()
+        with self._lock:
+            self._in_flight += 1
+            self._counters["submitted"] += 1
+        try:
+            future = self._pool.schedule(function, args=list(args), timeout=timeout)
+        except Exception:
+            self._finish(started, "failures")
+            raise
+        future.add_done_callback(lambda f: self._finish(started, self._outcome(f)))
+        return future
+
+    def run(self, function: Callable, args: Sequence[Any] = (), timeout: Optional[float] = None):
+        """Synchronous submit; raises concurrent.futures.TimeoutError on task timeout."""
+        return self.submit(function, args, timeout).result()
+
+    @staticmethod
+    def _outcome(future) -> str:
+        if future.cancelled():
+            return "failures"
+        error = future.exception()
+        if error is None:
+            return "completed"
+        return "timeouts" if isinstance(error, TimeoutError) else "failures"
+
+    def _finish(self, started: float, outcome: str) -> None:
+        elapsed_ms = (time.perf_counter() - started) * 1000
+        bucket = next(
+            (i for i, bound in enumerate(LATENCY_BUCKETS_MS) if elapsed_ms <= bound),
+            len(LATENCY_BUCKETS_MS),
+        )
+        with self._lock:
+            self._in_flight -= 1
+            self._counters[outcome] += 1
+            self._histogram[bucket] += 1
+            self._latency_sum_ms += elapsed_ms
+        self._slots.release()
+
+    def metrics(self) -> Dict[str, Any]:
+        with self._lock:
+            in_flight = self._in_flight
+            counters = dict(self._counters)
+            histogram = list(self._histogram)
+            latency_sum = self._latency_sum_ms
+        # Cumulative, Prometheus-style: each bucket counts tasks at or under its bound
+        buckets, total = {}, 0
+        for bound, count in zip([*LATENCY_BUCKETS_MS, "+Inf"], histogram):
+            total += count
+            buckets[str(bound)] = total
+        return {
+            "running": self.running,
+            "size": self.size,
+            "max_tasks_per_child": self.max_tasks_per_child,
+            "max_queue": self.max_queue,
+            "busy_workers": min(in_flight, self.size),
+            "queue_depth": max(0, in_flight - self.size),
+            **counters,
+            "task_latency_ms": {
+                "buckets": buckets,
+                "count": total,
+                "sum": round(latency_sum, 3),
+            },
+        }
@@ -0,0 +1,192 @@
+"""
+Research Executor
+-----------------
+Runs a search plan as a dependency DAG instead of one step at a time.
+
+- build_plan() turns planner output into Subtasks. A step may list the
+  steps it needs ("depends_on": their positions in the plan); otherwise a
+  page_content step depends on the url_search before it, and a url_search
+  with no page_content of its own gets an implicit one, so its pages are
+  still summarized.
+- ResearchExecutor runs every subtask whose prerequisites are done, at most
+  `fan_out` at once. Before each one it waits for `rate_key` on a
+  limiter_core RateLimiter (default "models/research", which is charged
+  against the shared "models" budget), so calls are delayed only when the
+  budget is actually spent rather than by a fixed sleep.
+- stream() yields subtasks as they finish. A failed subtask skips its
+  dependants and leaves the rest of the plan running.
+
+Usage:
+    executor = ResearchExecutor({"url_search": search, "page_content": summarize})
+    async for subtask in executor.stream(build_plan(steps)):
+        if subtask.status == "done":
+            ...
+"""
+
+import asyncio
+from collections import defaultdict
+from dataclasses import dataclass, field
+from typing import Any, AsyncIterator, Awaitable, Callable, Dict, List, Optional
+
+from guardian.utils import limiter_core
+
+RATE_KEY = "models/research"
+SEARCH, SUMMARY = "url_search", "page_content"
+
+# handler(subtask, results of its dependencies in order) -> result
+Handler = Callable[["Subtask", List[Any]], Awaitable[Any]]
+
+
+@dataclass
+class Subtask:
+    index: int
+    tool: str
+    keyword: str = ""
+    search_engine: str = ""
+    deps: List[int] = field(default_factory=list)
+    step: Dict[str, Any] = field(default_factory=dict)
+    status: str = "pending"  # pending, done, failed or skipped
+    result: Any = None
+    error: Optional[BaseException] = None
+
+
+def build_plan(steps: List[Dict[str, Any]]) -> List[Subtask]:
+    """Subtasks for the planner's steps; ValueError on a bad or cyclic dependency."""
+    subtasks = [
+        Subtask(i, s.get("tool", ""), s.get("keyword", ""), s.get("search_engine", ""))
+        for i, s in enumerate(steps)
+    ]
+    last_search: Optional[int] = None
+    for subtask, step in zip(subtasks, steps):
+        subtask.step = step
+        if "depends_on" in step:
+            deps = step["depends_on"]
+            subtask.deps = [deps] if isinstance(deps, int) else list(deps)
+        elif subtask.tool == SUMMARY and last_search is not None:
+            subtask.deps = [last_search]
+        if subtask.tool == SEARCH:
+            last_search = subtask.index
+    _check_acyclic(subtasks)
+
+    # A search nobody summarizes gets a page_content step of its own
+    summarized = {d for s in subtasks if s.tool == SUMMARY for d in s.deps}
+    for search in [s for s in subtasks if s.tool == SEARCH]:
+        if search.index not in summarized:
+            subtasks.append(
+                Subtask(len(subtasks), SUMMARY, search.keyword, deps=[search.index])
+            )
+    return subtasks
+
+
+def _check_acyclic(subtasks: List[Subtask]) -> None:
+    for subtask in subtasks:
+        for dep in subtask.deps:
+            if not isinstance(dep, int) or not 0 <= dep < len(subtasks):
+                raise ValueError(
+                    f"step {subtask.index} depends on unknown step {dep!r}"
+                )
+    state: Dict[int, int] = {}  # 1 visiting, 2 done
+
+    for root in subtasks:
+        stack = [(root.index, iter(root.deps))]
+        while stack:
+            index, deps = stack[-1]
+            state[index] = 1
+            for dep in deps:
+                if state.get(dep) == 1:
+                    raise ValueError(f"dependency cycle through step {dep}")
+                if dep not in state:
+                    stack.append((dep, iter(subtasks[dep].deps)))
+                    break
+            else:
+                state[index] = 2
+                stack.pop()
+
+
+class ResearchExecutor:
+    """Runs subtasks as their dependencies finish, `fan_out` at a time."""
+
+    def __init__(
+        self,
+        handlers: Dict[str, Handler],
+        fan_out: int = 4,
+        limiter: Optional[limiter_core.RateLimiter] = None,
+        rate_key: Optional[str] = RATE_KEY,
+    ) -> None:
+        if fan_out < 1:
+            raise ValueError(f"fan_out must be at least 1, got {fan_out}")
+        self.handlers = handlers
+        self.fan_out = fan_out
+        self.limiter = limiter or limiter_core.default_limiter
+        self.rate_key = rate_key
+
+    async def _execute(self, subtask: Subtask, inputs: List[Any], slots) -> Subtask:
+        async with slots:
+            try:
+                if self.rate_key:
+                    await self.limiter.acquire_async(self.rate_key)
+                subtask.result = await self.handlers[subtask.tool](subtask, inputs)
+                subtask.status = "done"
+            except Exception as e:
+                subtask.status, subtask.error = "failed", e
+        return subtask
+
+    async def stream(self, subtasks: List[Subtask]) -> AsyncIterator[Subtask]:
+        """Yields each subtask once it is done, failed or skipped."""
+        slots = asyncio.Semaphore(self.fan_out)
+        waiting = {s.index: set(s.deps) for s in subtasks}
+        dependants = defaultdict(list)
+        for subtask in subtasks:
+            for dep in subtask.deps:
+                dependants[dep].append(subtask.index)
+        running = set()
+        finished: List[Subtask] = []
+
+        def release(subtask: Subtask) -> None:
+            """Starts (or skips) whatever was only waiting on `subtask`."""
+            for index in dependants[subtask.index]:
+                child = subtasks[index]
+                if child.status != "pending":
+                    continue
+                if subtask.status != "done":
+                    child.status = "skipped"
+                    finished.append(child)
+                    continue
+                waiting[index].discard(subtask.index)
+                if not waiting[index]:
+                    launch(child)
+
+        def launch(subtask: Subtask) -> None:
+            if subtask.tool not in self.handlers:
+                subtask.status = "skipped"
+                finished.append(subtask)
+                return
+            inputs = [subtasks[d].result for d in subtask.deps]
+            running.add(asyncio.ensure_future(self._execute(subtask, inputs, slots)))
+
+        for subtask in subtasks:
+            if not subtask.deps:
+                launch(subtask)
+        try:
+            while running or finished:
+                while finished:
+                    subtask = finished.pop(0)
+                    release(subtask)
+                    yield subtask
+                if running:
+                    done, _ = await asyncio.wait(
+                        running, return_when=asyncio.FIRST_COMPLETED
+                    )
+                    for task in done:
+                        running.discard(task)
+                        finished.append(task.result())
+                    finished.sort(key=lambda s: s.index)
+        finally:
+            for task in running:
+                task.cancel()
+
+    async def run(self, subtasks: List[Subtask]) -> List[Subtask]:
+        """Runs the whole plan; the subtasks come back in plan order."""
+        async for _ in self.stream(subtasks):
+            pass
+        return subtasks
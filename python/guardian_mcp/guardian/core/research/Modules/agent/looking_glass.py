@@ -7,6 +7,7 @@ from typing import Optional
 import yaml
 
 from guardian.core.research.Modules.agent.search import SearchAgent
+from guardian.core.research.Modules.browser.crawl_ai import close_shared_sessions
 from guardian.core.utils.hybrid_router import HybridRouter
 from guardian.core.utils.markdown_extract import extract_json_from_markdown
 
@@ -198,4 +199,10 @@ if __name__ == "__main__":
         with open(log_path, "r", encoding="utf-8") as f:
             print(f.read())
 
-    asyncio.run(run_agent())
+    async def main():
+        try:
+            await run_agent()
+        finally:
+            await close_shared_sessions()
+
+    asyncio.run(main())
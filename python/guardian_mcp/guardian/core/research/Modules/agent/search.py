@@ -1,21 +1,26 @@
 import ast
 import json
-import time
 from collections import deque
 
-from ..browser.crawl_ai import Crawl
+from guardian.utils import limiter_core
+
+from ..browser.crawl_ai import Crawl, close_shared_sessions
 from ..model import Model
 from ..prompt.searcher import search_plan
 from .agent import Agent
+from .executor import RATE_KEY, SEARCH, SUMMARY, ResearchExecutor, build_plan
 
 
 class SearchAgent(Agent):
-    def __init__(self, model: Model, k: int = 10):
+    def __init__(self, model: Model, k: int = 10, fan_out: int = 4, limiter=None):
         """
         take some default URL for search
         k: number of steps
+        fan_out: searches and summaries allowed to run at once
         """
         self.model = model
+        self.fan_out = fan_out
+        self.limiter = limiter or limiter_core.default_limiter
         self.crawl = Crawl(model=model)
         self.description = "search latest information"
 
@@ -125,6 +130,12 @@ class SearchAgent(Agent):
         return None
 
     async def run(self, task, data) -> str:
+        """Runs stream() to the end and returns its final message."""
+        async for message in self.stream(task, data):
+            result = message
+        return result
+
+    async def stream(self, task, data):
         """
         Search function need to user the brower methods to search relevant contents
         - note that search agent should have it's own planner to plan search with what links
@@ -142,41 +153,67 @@ class SearchAgent(Agent):
                 data: we want to reutrn the long summary
                 for response we just need to response "FINISHED"
                 AGENT: PLANNER
+
+        The planned steps run as a DAG (see executor.py): independent searches
+        and summaries run concurrently, and each summary is yielded as a
+        partial message as soon as it is ready, before the final one.
         """
         print("SEARCHER: RUNNING ")
         print(f"{self.todo} testing..")
         # Plan tasks; swallow planning errors
         try:
+            await self.limiter.acquire_async(RATE_KEY)
             steps = self._plan(task)
         except Exception:
             steps = []
         self.todo = deque(steps)
         # Prepare result container and reset internal DB
-        summary_list = []
         self.db = []
 
-        for next_task in list(self.todo):
-            tool = next_task.get("tool", "")
-            if tool == "url_search":
-                # Execute URL search with exception handling
-                keyword = next_task.get("keyword", "")
-                search_engine = next_task.get("search_engine", "")
-                try:
-                    urls = await self._search_url(keyword, data, search_engine)
-                except Exception:
-                    urls = []
-                # Summarize URLs with exception handling
-                try:
-                    summaries = await self.crawl.get_summary(urls)
-                except Exception:
-                    summaries = []
-                # Populate internal DB and result list
-                for s in summaries:
-                    self.db.append(s)
-                summary_list.extend(summaries)
-            # Ignore other task types
-
-        return {"agent": "planner", "data": summary_list, "task": task}
+        async def search(subtask, inputs):
+            return await self._search_url(subtask.keyword, data, subtask.search_engine)
+
+        async def summarize(subtask, inputs):
+            urls = []
+            for found in inputs:
+                for element in found or []:
+                    if isinstance(element, dict):
+                        element = element.get("url")
+                    if element:
+                        urls.append(element)
+            if not urls:
+                return []
+            return await self.crawl.get_summary(urls, subtask.keyword)
+
+        executor = ResearchExecutor(
+            {SEARCH: search, SUMMARY: summarize}, self.fan_out, self.limiter
+        )
+        try:
+            plan = build_plan(list(self.todo))
+        except ValueError as e:
+            print(f"[DEBUG] Ignoring malformed plan: {e}")
+            plan = []
+        async for subtask in executor.stream(plan):
+            if subtask.tool == SUMMARY and subtask.status == "done":
+                # Populate internal DB as results arrive
+                self.db.extend(subtask.result)
+                yield {
+                    "agent": self.name,
+                    "partial": True,
+                    "data": subtask.result,
+                    "task": subtask.keyword,
+                }
+            elif subtask.status == "failed":
+                print(f"[DEBUG] {subtask.tool} {subtask.keyword!r}: {subtask.error}")
+
+        # Plan order, whatever order they finished in
+        summary_list = [
+            summary
+            for subtask in plan
+            if subtask.tool == SUMMARY and subtask.status == "done"
+            for summary in subtask.result
+        ]
+        yield {"agent": "planner", "data": summary_list, "task": task}
 
     def get_send_format(self):
         """
@@ -200,7 +237,6 @@ class SearchAgent(Agent):
 
         response = self.model.completion(prompt)
         print(f"searcher response: {response}")
-        time.sleep(3)  ## foo foo solution
 
         # Handle both string and dict responses (Ollama's are dicts with 'choices')
         if isinstance(response, dict) and "choices" in response:
@@ -323,7 +359,10 @@ if __name__ == "__main__":
     # The agent's planner and crawl are async, so use asyncio to run them
     async def run_agent():
         # agent.run expects (task, data) -> str (see class above). We'll pass the query and an empty list for data.
-        result = await agent.run(args.query, [])
+        try:
+            result = await agent.run(args.query, [])
+        finally:
+            await close_shared_sessions()
         print(result)
 
     asyncio.run(run_agent())
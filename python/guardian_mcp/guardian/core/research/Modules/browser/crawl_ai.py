@@ -9,7 +9,6 @@ lightweight stub implementations when they are unavailable.  The tests patch the
 
 try:  # Most recent crawl4ai versions
     from crawl4ai import (
-        AsyncWebCrawler,
         BrowserConfig,
         CacheMode,
         CrawlerRunConfig,
@@ -18,8 +17,6 @@ try:  # Most recent crawl4ai versions
 except Exception:  # pragma: no cover - missing attributes or old package
     from dataclasses import dataclass
 
-    from crawl4ai import AsyncWebCrawler  # at least this exists
-
     class BrowserConfig:
         def __init__(self, *_, **__):
             pass
@@ -37,16 +34,33 @@ except Exception:  # pragma: no cover - missing attributes or old package
         api_token: str | None = None
 
 
+import asyncio
 import json
 import os
 
-import requests
 from crawl4ai.extraction_strategy import LLMExtractionStrategy
 from markitdown import MarkItDown
 from pydantic import BaseModel, Field
 
 from ..model import Model
 from ..RAG.summary import Summary
+from .session import CrawlerSessions
+
+_sessions = None
+
+
+def shared_sessions() -> CrawlerSessions:
+    """Process-wide browser pool and page cache for every Crawl."""
+    global _sessions
+    if _sessions is None:
+        _sessions = CrawlerSessions(cache_dir="./tmp/page_cache")
+    return _sessions
+
+
+async def close_shared_sessions() -> None:
+    """Closes the shared pool's browsers; call at shutdown, once crawling is done."""
+    if _sessions is not None:
+        await _sessions.close()
 
 
 class Crawl:
@@ -64,9 +78,10 @@ class Crawl:
         get_content: get relevant content to a markdown
     """
 
-    def __init__(self, model: Model, db=None, url_search=None):
+    def __init__(self, model: Model, db=None, url_search=None, sessions=None):
         self.model = model
-        self.crawler = AsyncWebCrawler()
+        # Browsers and cached pages are shared; nothing is started per call
+        self.sessions = sessions or shared_sessions()
         self.db = [] if db == None else db
 
         """
@@ -80,10 +95,13 @@ class Crawl:
         self.run_conf = CrawlerRunConfig()
 
     async def start_crawler(self):
-        await self.crawler.start()
+        await self.sessions.start()
 
     async def close_crawler(self):
-        await self.crawler.close()
+        # The pool is shared with every other Crawl, so only this crawl's
+        # state goes; close_shared_sessions() shuts the pool down
+        self.url_list = []
+        self.run_conf = CrawlerRunConfig()
 
     # problem: still so slow --> for example searching takes 124.12s for arxiv website
     # TODO: concurrent process other state first ?
@@ -91,7 +109,6 @@ class Crawl:
         """
         Get url from a website with the help of llm
         """
-        self.broswer_conf = BrowserConfig(headless=True)
         self.run_conf = CrawlerRunConfig(
             cache_mode=CacheMode.BYPASS,
             word_count_threshold=1,
@@ -121,11 +138,8 @@ class Crawl:
                     """,
             ),
         )
-        self.crawler = AsyncWebCrawler(config=self.broswer_conf)
-        await self.start_crawler()
-
-        result = await self.crawler.arun(url=url, config=self.run_conf)
-        await self.close_crawler()
+        # Search results are rendered live, never served from the page cache
+        result = await self.sessions.crawl(url, self.run_conf, cached=False)
         self.url_list = json.loads(result.extracted_content)
 
         return self.url_list
@@ -136,9 +150,9 @@ class Crawl:
         user markitdown to convert to markdown
         generate summary with LLM --> we need a specific method to handle this
         """
-        p = self._download_pdf(url)
+        p = await self._download_pdf(url)
         md = MarkItDown()
-        result = md.convert(p)
+        result = await asyncio.to_thread(md.convert, p)
         s = Summary(self.model)
         r = s.summary(result.markdown)
         del s
@@ -146,19 +160,14 @@ class Crawl:
 
     async def get_summary(self, url: list, query):
         summary = []
-        for u in url:
-            is_pdf = await self._is_pdf(u)
-            if is_pdf:
-                try:
-                    content = await self.get_pdf_summary(u)
-                    response = await summary.append(content)
-                    summary.append(response)
-                except Exception as e:
-                    print("Handling pdf error: ", e)
-                # current not support pdf first
-                url.remove(u)
+        flags = await asyncio.gather(*[self._is_pdf(u) for u in url])
+        pages = [u for u, is_pdf in zip(url, flags) if not is_pdf]
+        for u in [u for u, is_pdf in zip(url, flags) if is_pdf]:
+            try:
+                summary.append(await self.get_pdf_summary(u))
+            except Exception as e:
+                print("Handling pdf error: ", e)
 
-        self.broswer_conf = BrowserConfig()
         self.run_conf = CrawlerRunConfig(
             word_count_threshold=1,
             extraction_strategy=LLMExtractionStrategy(
@@ -201,18 +210,15 @@ class Crawl:
             ),
             cache_mode=CacheMode.BYPASS,
         )
-        self.crawler = AsyncWebCrawler(config=self.broswer_conf)
-        await self.start_crawler()
+        result = await self.sessions.crawl_many(pages, self.run_conf)
 
-        result = await self.crawler.arun_many(
-            urls=url,
-            config=self.run_conf,
-        )
-        await self.close_crawler()
-
-        for ele in result:
+        for u, ele in zip(pages, result):
+            if ele is None or not ele.extracted_content:
+                continue
             page_summary = json.loads(ele.extracted_content)
             try:
+                # Cached pages are rendered from memory, so the URL comes from here
+                page_summary[0]["url"] = page_summary[0].get("url") or u
                 summary.append(page_summary[0])
             except:
                 pass
@@ -223,7 +229,6 @@ class Crawl:
         """
         The performance of the get table is not good.  we may need to use VLLM to handle the table extraction job
         """
-        self.browser_conf = BrowserConfig(headless=True)
         self.run_conf = CrawlerRunConfig(
             cache_mode=CacheMode.BYPASS,
             word_count_threshold=1,
@@ -255,18 +260,13 @@ class Crawl:
                 """,
             ),
         )
-        self.crawler = AsyncWebCrawler(config=self.browser_conf)
-        await self.start_crawler()
-
-        result = await self.crawler.arun(url=url, config=self.run_conf)
-        await self.close_crawler()
+        result = await self.sessions.crawl(url, self.run_conf)
 
         # Parse the JSON extracted content into TableData model
 
         return result
 
     async def screen_shot(self, url):
-        self.broswer_conf = BrowserConfig(headless=False, verbose=True)
         self.run_conf = CrawlerRunConfig(
             cache_mode=CacheMode.BYPASS,
             screenshot=True,
@@ -274,10 +274,7 @@ class Crawl:
             wait_for_images=True,
         )
 
-        self.crawler = AsyncWebCrawler(config=self.broswer_conf)
-        await self.start_crawler()
-
-        result = await self.crawler.arun(url=url, config=self.run_conf)
+        result = await self.sessions.crawl(url, self.run_conf, cached=False)
 
         if result.screenshot:
             from base64 import b64decode
@@ -285,27 +282,9 @@ class Crawl:
             with open("./tmp/screenshot/screenshot.png", "wb") as f:
                 f.write(b64decode(result.screenshot))
 
-        await self.close_crawler()
-
     async def _is_pdf(self, url):
-        try:
-            # Use GET request with stream=True to avoid downloading the entire file
-            response = requests.get(url, stream=True, allow_redirects=True, timeout=10)
-            response.raise_for_status()
-
-            content_type = response.headers.get("Content-Type", "").lower()
-            # Check if content-type indicates PDF
-            if "application/pdf" in content_type:
-                return True
-
-            # Sometimes content-type is not set correctly,
-            # so check the first 5 bytes for '%PDF-'
-            start = response.raw.read(5)
-            return start == b"%PDF-"
-
-        except requests.RequestException as e:
-            print(f"Request failed: {e}")
-            return False
+        # HEAD request first, then the first 5 bytes for '%PDF-'
+        return await self.sessions.is_pdf(url)
 
     def search_content(self):
         pass
@@ -313,20 +292,14 @@ class Crawl:
     def run(self):
         pass
 
-    def _download_pdf(self, url, save_path="./tmp"):
+    async def _download_pdf(self, url, save_path="./tmp"):
         filename = url.rstrip("/").split("/")[-1]
         filename = filename.split("?")[0]
         # Ensure the filename ends with .pdf
         if not filename.lower().endswith(".pdf"):
             filename += ".pdf"
         save_path = os.path.join(save_path, filename)
-
-        response = requests.get(url)
-        response.raise_for_status()
-
-        with open(save_path, "wb") as f:
-            f.write(response.content)
-        return save_path
+        return await self.sessions.download(url, save_path)
 
 
 class Url_result(BaseModel):
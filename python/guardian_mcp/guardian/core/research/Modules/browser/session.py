@@ -0,0 +1,486 @@
+"""
+Crawler Sessions
+----------------
+Shared fetching machinery for the research crawler, so a batch of URLs pays
+for browser startup once instead of once per page.
+
+- Browser pool: up to `pool_size` long-lived AsyncWebCrawler instances,
+  started on first use and handed to whichever crawl is waiting, so at most
+  `pool_size` pages render at once.
+- PageCache: bodies stored on disk under their SHA-256 (identical pages are
+  kept once), plus a small JSON record per URL with the digest, expiry time,
+  ETag and Last-Modified. A fresh entry is served without touching the
+  network; a stale one is revalidated with If-None-Match/If-Modified-Since
+  and a 304 renews it. Cache-Control max-age, no-cache and no-store are
+  honoured.
+- HTTP goes through one httpx.AsyncClient: HEAD checks (is_pdf), fetches and
+  downloads never block the event loop, and concurrent fetches of the same
+  URL share one request.
+- Politeness: each host gets its own budget ("hosts/<host>") in a
+  guardian.utils.limiter_core RateLimiter plus a cap on requests in flight.
+
+crawl() renders cached HTML through the pool ("raw:" input), so only pages
+that must run in a browser (search results) are loaded by the browser itself.
+The pool, client and semaphores belong to the event loop that first used
+them; a session used from a new loop starts over.
+
+Usage:
+    async with CrawlerSessions(cache_dir="./tmp/page_cache") as sessions:
+        page = await sessions.fetch("https://example.com/")
+        if await sessions.is_pdf(url):
+            await sessions.download(url, "./tmp/paper.pdf")
+        results = await sessions.crawl_many(urls, run_config)
+"""
+
+import asyncio
+import contextlib
+import hashlib
+import json
+import logging
+import os
+import re
+import time
+from dataclasses import dataclass, field
+from email.utils import formatdate
+from typing import Any, Callable, Dict, List, Optional, Tuple
+from urllib.parse import urlsplit
+
+import httpx
+
+from guardian.utils.limiter_core import RateLimiter
+
+logger = logging.getLogger(__name__)
+
+USER_AGENT = "ThreadSpace-Research/1.0"
+MAX_AGE_RE = re.compile(r"max-age\s*=\s*(\d+)")
+HTML_TYPES = ("text/html", "application/xhtml+xml")
+
+
+@dataclass
+class Page:
+    """A fetched (or cached) response body with the headers that matter."""
+
+    url: str
+    status: int
+    body: bytes
+    headers: Dict[str, str] = field(default_factory=dict)
+    from_cache: bool = False
+
+    @property
+    def content_type(self) -> str:
+        return self.headers.get("content-type", "").lower()
+
+    @property
+    def text(self) -> str:
+        return self.body.decode("utf-8", errors="replace")
+
+
+def _digest(data: bytes) -> str:
+    return hashlib.sha256(data).hexdigest()
+
+
+def cache_ttl(headers: Dict[str, str], default: float) -> Optional[float]:
+    """Seconds a response stays fresh, or None if it must not be stored."""
+    control = headers.get("cache-control", "").lower()
+    if "no-store" in control:
+        return None
+    if "no-cache" in control:
+        return 0.0
+    match = MAX_AGE_RE.search(control)
+    return float(match.group(1)) if match else default
+
+
+class PageCache:
+    """
+    Content-addressed page store.
+
+    objects/ab/<sha256>    response bodies
+    records/cd/<sha256>    {"url", "digest", "status", "headers",
+                            "fetched_at", "expires_at"} per URL (named by
+                            the hash of the URL)
+
+    Files are written to a temporary name and renamed into place, so a
+    reader never sees half a body or record.
+    """
+
+    def __init__(self, directory: str, ttl: float = 3600.0) -> None:
+        self.directory = str(directory)
+        self.ttl = ttl
+        self.hits = 0
+        self.misses = 0
+        self.revalidated = 0
+        os.makedirs(os.path.join(self.directory, "objects"), exist_ok=True)
+        os.makedirs(os.path.join(self.directory, "records"), exist_ok=True)
+
+    def _path(self, kind: str, name: str) -> str:
+        return os.path.join(self.directory, kind, name[:2], name)
+
+    @staticmethod
+    def _write(path: str, data: bytes) -> None:
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+        tmp = f"{path}.{os.getpid()}.tmp"
+        with open(tmp, "wb") as f:
+            f.write(data)
+        os.replace(tmp, path)
+
+    def lookup(self, url: str) -> Optional[Tuple[Dict[str, Any], bytes]]:
+        """The record and body stored for `url`, fresh or not."""
+        try:
+            with open(self._path("records", _digest(url.encode())), "rb") as f:
+                record = json.load(f)
+            with open(self._path("objects", record["digest"]), "rb") as f:
+                body = f.read()
+        except (OSError, ValueError, KeyError):
+            return None
+        if _digest(body) != record["digest"]:  # Torn or tampered with
+            return None
+        return record, body
+
+    def store(
+        self, url: str, status: int, headers: Dict[str, str], body: bytes
+    ) -> Optional[Dict[str, Any]]:
+        ttl = cache_ttl(headers, self.ttl)
+        if ttl is None:
+            return None
+        digest = _digest(body)
+        obj = self._path("objects", digest)
+        if not os.path.exists(obj):
+            self._write(obj, body)
+        now = time.time()
+        record = {
+            "url": url,
+            "digest": digest,
+            "status": status,
+            "headers": headers,
+            "fetched_at": now,
+            "expires_at": now + ttl,
+        }
+        self._write(
+            self._path("records", _digest(url.encode())), json.dumps(record).encode()
+        )
+        return record
+
+    def renew(self, url: str, record: Dict[str, Any], headers: Dict[str, str]) -> None:
+        """Extends a revalidated (304) entry, taking any updated validators."""
+        merged = dict(record["headers"])
+        merged.update(
+            {k: v for k, v in headers.items() if k in ("etag", "last-modified")}
+        )
+        if "cache-control" in headers:
+            merged["cache-control"] = headers["cache-control"]
+        ttl = cache_ttl(merged, self.ttl) or 0.0
+        now = time.time()
+        record = dict(record, headers=merged, fetched_at=now, expires_at=now + ttl)
+        self._write(
+            self._path("records", _digest(url.encode())), json.dumps(record).encode()
+        )
+
+    def prune(self, older_than: float = 7 * 86400) -> int:
+        """Drops records not refreshed for `older_than` seconds and orphaned bodies."""
+        cutoff = time.time() - older_than
+        referenced = set()
+        removed = 0
+        for root, _, files in os.walk(os.path.join(self.directory, "records")):
+            for name in files:
+                path = os.path.join(root, name)
+                try:
+                    with open(path, "rb") as f:
+                        record = json.load(f)
+                except (OSError, ValueError):
+                    record = None
+                if record is None or record.get("fetched_at", 0) < cutoff:
+                    with contextlib.suppress(OSError):
+                        os.remove(path)
+                        removed += 1
+                else:
+                    referenced.add(record["digest"])
+        for root, _, files in os.walk(os.path.join(self.directory, "objects")):
+            for name in files:
+                if name not in referenced:
+                    with contextlib.suppress(OSError):
+                        os.remove(os.path.join(root, name))
+        return removed
+
+
+def _default_crawler(browser_config: Any = None) -> Any:
+    try:
+        from crawl4ai import AsyncWebCrawler, BrowserConfig
+    except ImportError:
+        raise ImportError("crawl4ai package required. Run 'pip install crawl4ai'.")
+    return AsyncWebCrawler(config=browser_config or BrowserConfig(headless=True))
+
+
+class CrawlerSessions:
+    """
+    Pooled browsers, cached pages and polite HTTP for the research crawler.
+
+    `crawler_factory` builds an unstarted crawler (start(), close(), arun());
+    it defaults to a headless crawl4ai AsyncWebCrawler.
+    """
+
+    def __init__(
+        self,
+        pool_size: int = 4,
+        cache_dir: Optional[str] = None,
+        ttl: float = 3600.0,
+        host_rate: float = 2.0,
+        host_burst: float = 4.0,
+        host_concurrency: int = 2,
+        timeout: float = 10.0,
+        crawler_factory: Optional[Callable[[], Any]] = None,
+        browser_config: Any = None,
+        limiter: Optional[RateLimiter] = None,
+    ) -> None:
+        self.pool_size = pool_size
+        self.cache = PageCache(cache_dir, ttl) if cache_dir else None
+        self.host_concurrency = host_concurrency
+        self.timeout = timeout
+        self.crawler_factory = crawler_factory or (
+            lambda: _default_crawler(browser_config)
+        )
+        self.limiter = limiter or RateLimiter()
+        self.limiter.set_limit("hosts/*", rate=host_rate, burst=host_burst)
+        self.fetches = 0
+        self.browsers_started = 0
+        self._loop: Optional[asyncio.AbstractEventLoop] = None
+
+    # ---- Per-loop state ----
+    def _bind(self) -> None:
+        loop = asyncio.get_running_loop()
+        if loop is self._loop:
+            return
+        if self._loop is not None:
+            logger.warning("CrawlerSessions moved to a new event loop; starting over")
+        self._loop = loop
+        self._client: Optional[httpx.AsyncClient] = None
+        self._slots = asyncio.Semaphore(self.pool_size)
+        self._idle: List[Any] = []
+        self._browsers: List[Any] = []
+        self._hosts: Dict[str, asyncio.Semaphore] = {}
+        self._inflight: Dict[str, asyncio.Future] = {}
+
+    @property
+    def client(self) -> httpx.AsyncClient:
+        self._bind()
+        if self._client is None:
+            self._client = httpx.AsyncClient(
+                timeout=self.timeout,
+                follow_redirects=True,
+                headers={"User-Agent": USER_AGENT},
+            )
+        return self._client
+
+    @contextlib.asynccontextmanager
+    async def polite(self, url: str):
+        """Holds one of the host's request slots, after waiting for its rate."""
+        self._bind()
+        host = urlsplit(url).netloc.lower()
+        slots = self._hosts.get(host)
+        if slots is None:
+            slots = self._hosts[host] = asyncio.Semaphore(self.host_concurrency)
+        async with slots:
+            await self.limiter.acquire_async(f"hosts/{host}")
+            yield
+
+    # ---- HTTP ----
+    async def fetch(self, url: str) -> Page:
+        """GET through the page cache; concurrent calls for one URL share a request."""
+        self._bind()
+        pending = self._inflight.get(url)
+        if pending is not None:
+            return await asyncio.shield(pending)
+        future = self._loop.create_future()
+        self._inflight[url] = future
+        try:
+            page = await self._fetch(url)
+        except asyncio.CancelledError:
+            future.cancel()
+            raise
+        except Exception as e:
+            future.set_exception(e)
+            future.exception()  # Retrieved, even if nobody else was waiting
+            raise
+        else:
+            future.set_result(page)
+            return page
+        finally:
+            del self._inflight[url]
+
+    async def _fetch(self, url: str) -> Page:
+        cached = self.cache.lookup(url) if self.cache else None
+        if cached is not None:
+            record, body = cached
+            if record["expires_at"] > time.time():
+                self.cache.hits += 1
+                return Page(url, record["status"], body, record["headers"], True)
+        headers = {}
+        if cached is not None:
+            validators = record["headers"]
+            if "etag" in validators:
+                headers["If-None-Match"] = validators["etag"]
+            if "last-modified" in validators:
+                headers["If-Modified-Since"] = validators["last-modified"]
+            elif not headers:
+                headers["If-Modified-Since"] = formatdate(
+                    record["fetched_at"], usegmt=True
+                )
+        async with self.polite(url):
+            response = await self.client.get(url, headers=headers)
+        self.fetches += 1
+        response_headers = {k.lower(): v for k, v in response.headers.items()}
+        if cached is not None and response.status_code == 304:
+            self.cache.revalidated += 1
+            self.cache.renew(url, record, response_headers)
+            return Page(url, record["status"], body, record["headers"], True)
+        response.raise_for_status()
+        if self.cache is not None:
+            self.cache.misses += 1
+            self.cache.store(
+                url, response.status_code, response_headers, response.content
+            )
+        return Page(url, response.status_code, response.content, response_headers)
+
+    async def head(self, url: str) -> Dict[str, str]:
+        """Response headers for `url`, from a HEAD request (or the cache)."""
+        if self.cache is not None:
+            cached = self.cache.lookup(url)
+            if cached is not None and cached[0]["expires_at"] > time.time():
+                return cached[0]["headers"]
+        async with self.polite(url):
+            response = await self.client.head(url)
+        response.raise_for_status()
+        return {k.lower(): v for k, v in response.headers.items()}
+
+    async def is_pdf(self, url: str) -> bool:
+        """
+        True if `url` serves a PDF: by Content-Type from a HEAD request, or
+        by the first five bytes when the server doesn't say (or rejects HEAD).
+        """
+        try:
+            try:
+                headers = await self.head(url)
+            except httpx.HTTPStatusError as e:
+                if e.response.status_code not in (403, 405, 501):
+                    raise
+                headers = {}
+            content_type = headers.get("content-type", "").lower()
+            if "application/pdf" in content_type:
+                return True
+            if any(t in content_type for t in HTML_TYPES):
+                return False
+            async with self.polite(url):
+                request = self.client.build_request(
+                    "GET", url, headers={"Range": "bytes=0-4"}
+                )
+                response = await self.client.send(request, stream=True)
+                try:
+                    response.raise_for_status()
+                    start = b""
+                    async for chunk in response.aiter_bytes():
+                        start += chunk
+                        if len(start) >= 5:
+                            break
+                finally:
+                    await response.aclose()
+            return start[:5] == b"%PDF-"
+        except httpx.HTTPError as e:
+            logger.warning("PDF check failed for %s: %s", url, e)
+            return False
+
+    async def download(self, url: str, path: str) -> str:
+        """Saves the body of `url` (cached if possible) to `path`."""
+        page = await self.fetch(url)
+        await asyncio.to_thread(PageCache._write, path, page.body)
+        return path
+
+    # ---- Browser pool ----
+    @contextlib.asynccontextmanager
+    async def browser(self):
+        """A started crawler from the pool, returned to it afterwards."""
+        self._bind()
+        async with self._slots:
+            if self._idle:
+                crawler = self._idle.pop()
+            else:
+                crawler = self.crawler_factory()
+                await crawler.start()
+                self.browsers_started += 1
+                self._browsers.append(crawler)
+            try:
+                yield crawler
+            except BaseException:
+                # The browser may be wedged; the next crawl starts a fresh one
+                self._browsers.remove(crawler)
+                with contextlib.suppress(Exception):
+                    await crawler.close()
+                raise
+            self._idle.append(crawler)
+
+    async def start(self) -> None:
+        """Starts one browser ahead of the first crawl."""
+        async with self.browser():
+            pass
+
+    async def crawl(self, url: str, config: Any = None, cached: bool = True) -> Any:
+        """
+        Runs `config` (a CrawlerRunConfig) over `url` on a pooled browser.
+        With `cached`, HTML comes from fetch() and is rendered from memory;
+        other pages, or cached=False, are loaded by the browser itself.
+        """
+        target = url
+        if cached and url.startswith(("http://", "https://")):
+            try:
+                page = await self.fetch(url)
+            except httpx.HTTPError as e:
+                logger.warning("Fetch failed for %s, crawling it directly: %s", url, e)
+            else:
+                if any(t in page.content_type for t in HTML_TYPES):
+                    target = "raw:" + page.text
+        if target is url:
+            async with self.polite(url), self.browser() as crawler:
+                return await crawler.arun(url=url, config=config)
+        async with self.browser() as crawler:
+            return await crawler.arun(url=target, config=config)
+
+    async def crawl_many(
+        self, urls: List[str], config: Any = None, cached: bool = True
+    ) -> List[Any]:
+        """crawl() for each URL, at most pool_size at once; None where one failed."""
+
+        async def one(url: str) -> Any:
+            try:
+                return await self.crawl(url, config, cached)
+            except Exception as e:
+                logger.warning("Crawl failed for %s: %s", url, e)
+                return None
+
+        return await asyncio.gather(*[one(url) for url in urls])
+
+    # ---- Lifecycle ----
+    async def close(self) -> None:
+        """Closes the browsers and the HTTP client; the session can be reused."""
+        if self._loop is None:
+            return
+        browsers, self._browsers, self._idle = self._browsers, [], []
+        for crawler in browsers:
+            with contextlib.suppress(Exception):
+                await crawler.close()
+        if self._client is not None:
+            await self._client.aclose()
+            self._client = None
+
+    async def __aenter__(self) -> "CrawlerSessions":
+        return self
+
+    async def __aexit__(self, *exc: Any) -> None:
+        await self.close()
+
+    def stats(self) -> Dict[str, Any]:
+        stats = {"fetches": self.fetches, "browsers_started": self.browsers_started}
+        if self.cache is not None:
+            stats.update(
+                cache_hits=self.cache.hits,
+                cache_misses=self.cache.misses,
+                revalidated=self.cache.revalidated,
+            )
+        return stats
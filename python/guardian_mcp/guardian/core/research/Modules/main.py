@@ -8,7 +8,13 @@ from .agent import Agent, Planner
 from .router import Router, Server
 
 
-async def generate_report(query, planner: Planner, agents: list[Agent]):
+async def generate_report(
+    query, planner: Planner, agents: list[Agent], on_partial=None
+):
+    """
+    on_partial: called with each partial result (an agent message with
+    "partial": True, e.g. one search summary) while the report is in progress
+    """
     planner.query = query
     server = Server()
 
@@ -21,7 +27,7 @@ async def generate_report(query, planner: Planner, agents: list[Agent]):
         planner.add_model(agent.name, agent.description)
     server.set_initial_router(planner.name, query)
 
-    report = await server.start(query=query)
+    report = await server.start(query=query, on_partial=on_partial)
     report = report["data"]
 
     with open("report.md", "w", encoding="utf-8") as file:
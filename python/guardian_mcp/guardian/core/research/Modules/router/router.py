@@ -38,7 +38,14 @@ class Router(object):
         An agent receive the message from other agent
         use the run function and send it back to server
         """
-        res = await self.agent.run(message, data)
+        stream = getattr(self.agent, "stream", None)
+        if stream is None:
+            res = await self.agent.run(message, data)
+            return self.send_response(res)
+        # Streaming agents: hand partial results to the server as they arrive
+        async for res in stream(message, data):
+            if res.get("partial"):
+                await self.server.publish(res)
         return self.send_response(res)
 
     def set_send_format(self, s: BaseModel):
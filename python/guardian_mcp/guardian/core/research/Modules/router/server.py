@@ -1,5 +1,7 @@
 from __future__ import annotations
 
+import inspect
+
 
 class Server:
     """
@@ -28,14 +30,27 @@ class Server:
         self.initial_router: str = ""
         self.next_router = None
         self.data = []
+        self.on_partial = None
 
     def recv_message(self):
         pass
 
-    async def start(self, query: str):
+    async def publish(self, message: dict):
+        """
+        Pass a partial result (e.g. one search summary) on before its agent is
+        done; on_partial may be a plain function or a coroutine function
+        """
+        if self.on_partial is not None:
+            res = self.on_partial(message)
+            if inspect.isawaitable(res):
+                await res
+
+    async def start(self, query: str, on_partial=None):
         """
         start the workflow
+        on_partial: called with every partial result as it arrives
         """
+        self.on_partial = on_partial
         self.next_router = self.routers[self.initial_router]
 
         while True:
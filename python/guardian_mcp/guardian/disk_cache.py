@@ -0,0 +1,291 @@
+"""
+guardian.disk_cache
+===================
+
+SQLite storage engine behind memoize_to_disk.
+
+- entries: one row per (namespace, key) with its JSON value, size in bytes
+  and expiry time; lookups are a single seek on the unique key index
+- idx_entries_expires: expiry order, used both to purge expired rows and to
+  pick eviction victims (soonest to expire first)
+- totals: entry count and byte total kept current by triggers, so the size
+  limits are checked in O(1) on every write
+
+Writes go through WAL with a busy timeout, so several processes can share
+one cache file. Reads never write (there is no access-time bookkeeping), so
+hits don't contend for the write lock. Once over max_entries or max_bytes, a
+write evicts down to EVICT_TO of the limit so eviction is amortized.
+
+A daemon thread compacts the file every compact_interval seconds: expired
+rows are deleted in batches, freed pages go back to the filesystem through
+incremental vacuum and the WAL is checkpointed.
+
+Usage:
+    cache = DiskCache("guardian/.cache/memoize.db", max_entries=100_000)
+    cache.set("module.func", key, result, expire=3600)
+    result = cache.get("module.func", key)
+    cache.stats()  # {"hits": ..., "misses": ..., "evictions": ..., ...}
+"""
+
+import json
+import logging
+import os
+import sqlite3
+import threading
+import time
+from typing import Any, Dict, List, Optional
+
+logger = logging.getLogger(__name__)
+
+STATEMENT_CACHE_SIZE = 64
+EVICT_TO = 0.9  # Evict down to this fraction of a limit once it is exceeded
+PURGE_BATCH = 1000  # Expired rows deleted per compaction transaction
+
+SCHEMA = [
+    """
+    CREATE TABLE IF NOT EXISTS entries (
+        id INTEGER PRIMARY KEY,
+        namespace TEXT NOT NULL,
+        key TEXT NOT NULL,
+        value TEXT NOT NULL,
+        size INTEGER NOT NULL,
+        expires_at REAL NOT NULL,
+        UNIQUE (namespace, key)
+    )
+    """,
+    "CREATE INDEX IF NOT EXISTS idx_entries_expires ON entries (expires_at)",
+    """
+    CREATE TABLE IF NOT EXISTS totals (
+        id INTEGER PRIMARY KEY CHECK (id = 0),
+        entries INTEGER NOT NULL,
+        bytes INTEGER NOT NULL
+    )
+    """,
+    "INSERT OR IGNORE INTO totals (id, entries, bytes) VALUES (0, 0, 0)",
+    "CREATE TRIGGER IF NOT EXISTS entries_ai AFTER INSERT ON entries BEGIN "
+    "UPDATE totals SET entries = entries + 1, bytes = bytes + new.size; END",
+    "CREATE TRIGGER IF NOT EXISTS entries_ad AFTER DELETE ON entries BEGIN "
+    "UPDATE totals SET entries = entries - 1, bytes = bytes - old.size; END",
+    "CREATE TRIGGER IF NOT EXISTS entries_au AFTER UPDATE OF size ON entries BEGIN "
+    "UPDATE totals SET bytes = bytes - old.size + new.size; END",
+]
+
+UPSERT = """
+    INSERT INTO entries (namespace, key, value, size, expires_at)
+    VALUES (?, ?, ?, ?, ?)
+    ON CONFLICT (namespace, key) DO UPDATE SET
+        value = excluded.value,
+        size = excluded.size,
+        expires_at = excluded.expires_at
+"""
+
+LOOKUP = "SELECT value, expires_at FROM entries WHERE namespace = ? AND key = ?"
+
+PURGE_EXPIRED = """
+    DELETE FROM entries WHERE id IN (
+        SELECT id FROM entries WHERE expires_at <= ? ORDER BY expires_at LIMIT ?
+    )
+"""
+
+
+class DiskCache:
+    def __init__(
+        self,
+        db_path: str,
+        max_entries: Optional[int] = None,
+        max_bytes: Optional[int] = None,
+        compact_interval: Optional[float] = 300.0,
+    ) -> None:
+        self.db_path = str(db_path)
+        self.max_entries = max_entries
+        self.max_bytes = max_bytes
+        self.compact_interval = compact_interval
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+        self.expired = 0
+        self._counters_lock = threading.Lock()
+        self._local = threading.local()
+        self._pid = os.getpid()
+        self._connections: List[sqlite3.Connection] = []
+        self._connections_lock = threading.Lock()
+        self._compactor: Optional[threading.Thread] = None
+        self._stop = threading.Event()
+        self._init_schema()
+
+    def _connect(self) -> sqlite3.Connection:
+        """This thread's pooled connection; `with conn:` commits or rolls back."""
+        if self._pid != os.getpid():
+            # Forked: never share the parent's connections
+            self._pid = os.getpid()
+            self._local = threading.local()
+            self._connections = []
+            self._connections_lock = threading.Lock()
+        conn = getattr(self._local, "conn", None)
+        if conn is None:
+            conn = sqlite3.connect(
+                self.db_path,
+                timeout=30.0,
+                cached_statements=STATEMENT_CACHE_SIZE,
+                check_same_thread=False,  # close() may run on another thread
+            )
+            # Only takes effect on a new file, before the switch to WAL;
+            # lets compact() hand freed pages back to the filesystem
+            conn.execute("PRAGMA auto_vacuum=INCREMENTAL")
+            conn.execute("PRAGMA journal_mode=WAL")
+            conn.execute("PRAGMA synchronous=NORMAL")
+            self._local.conn = conn
+            with self._connections_lock:
+                self._connections.append(conn)
+        return conn
+
+    def close(self) -> None:
+        self._stop.set()
+        if self._compactor is not None and self._compactor.is_alive():
+            self._compactor.join()
+        with self._connections_lock:
+            connections, self._connections = self._connections, []
+        for conn in connections:
+            conn.close()
+        self._local = threading.local()
+
+    def _init_schema(self) -> None:
+        conn = self._connect()
+        with conn:
+            for statement in SCHEMA:
+                conn.execute(statement)
+
+    def _count(self, counter: str, n: int = 1) -> None:
+        with self._counters_lock:
+            setattr(self, counter, getattr(self, counter) + n)
+
+    # ---- Lookups ----
+    def get(self, namespace: str, key: str, default: Any = None) -> Any:
+        """The cached value, or default when missing or expired."""
+        row = self._connect().execute(LOOKUP, (namespace, key)).fetchone()
+        if row is None or row[1] <= time.time():
+            self._count("misses")
+            return default
+        self._count("hits")
+        return json.loads(row[0])
+
+    # ---- Writes ----
+    def set(self, namespace: str, key: str, value: Any, expire: float) -> None:
+        """Stores a JSON-serializable value for `expire` seconds."""
+        text = json.dumps(value)
+        size = len(text.encode())
+        conn = self._connect()
+        with conn:
+            conn.execute(UPSERT, (namespace, key, text, size, time.time() + expire))
+            self._enforce_limits(conn)
+        self._ensure_compactor()
+
+    def delete(self, namespace: str, key: str) -> bool:
+        conn = self._connect()
+        with conn:
+            cursor = conn.execute(
+                "DELETE FROM entries WHERE namespace = ? AND key = ?", (namespace, key)
+            )
+        return cursor.rowcount > 0
+
+    def clear(self, namespace: Optional[str] = None) -> int:
+        """Drops every entry, or every entry in one namespace."""
+        conn = self._connect()
+        with conn:
+            if namespace is None:
+                cursor = conn.execute("DELETE FROM entries")
+            else:
+                cursor = conn.execute(
+                    "DELETE FROM entries WHERE namespace = ?", (namespace,)
+                )
+        return cursor.rowcount
+
+    def _over(self, entries: int, size: int, fraction: float = 1.0) -> bool:
+        return (
+            self.max_entries is not None and entries > self.max_entries * fraction
+        ) or (self.max_bytes is not None and size > self.max_bytes * fraction)
+
+    def _enforce_limits(self, conn: sqlite3.Connection) -> None:
+        """Evicts down to EVICT_TO of the limits, inside the caller's transaction."""
+        entries, size = conn.execute("SELECT entries, bytes FROM totals").fetchone()
+        if not self._over(entries, size):
+            return
+        # Expired rows go first, then whatever expires soonest
+        expired = conn.execute(
+            "DELETE FROM entries WHERE expires_at <= ?", (time.time(),)
+        ).rowcount
+        self._count("expired", expired)
+        entries, size = conn.execute("SELECT entries, bytes FROM totals").fetchone()
+        victims = []
+        cursor = conn.execute("SELECT id, size FROM entries ORDER BY expires_at")
+        while self._over(entries, size, EVICT_TO):
+            row = cursor.fetchone()
+            if row is None:
+                break
+            victims.append((row[0],))
+            entries -= 1
+            size -= row[1]
+        cursor.close()
+        conn.executemany("DELETE FROM entries WHERE id = ?", victims)
+        self._count("evictions", len(victims))
+
+    # ---- Compaction ----
+    def compact(self) -> int:
+        """
+        Deletes expired entries in short transactions, enforces the size
+        limits, returns freed pages to the filesystem and checkpoints the WAL.
+        Returns the number of expired entries removed.
+        """
+        conn = self._connect()
+        now = time.time()
+        removed = 0
+        while True:
+            with conn:
+                deleted = conn.execute(PURGE_EXPIRED, (now, PURGE_BATCH)).rowcount
+            removed += deleted
+            if deleted < PURGE_BATCH:
+                break
+        self._count("expired", removed)
+        with conn:
+            self._enforce_limits(conn)
+        # Each step of incremental_vacuum frees one page, and execute() only
+        # steps once; executescript() runs it to completion
+        conn.executescript("PRAGMA incremental_vacuum")
+        conn.execute("PRAGMA wal_checkpoint(PASSIVE)").fetchall()
+        return removed
+
+    def _ensure_compactor(self) -> None:
+        if self.compact_interval is None or self._stop.is_set():
+            return
+        if self._compactor is None or not self._compactor.is_alive():
+            # Also restarts it in a forked child, where threads don't survive
+            self._compactor = threading.Thread(
+                target=self._compact_loop, name="disk-cache-compactor", daemon=True
+            )
+            self._compactor.start()
+
+    def _compact_loop(self) -> None:
+        while not self._stop.wait(self.compact_interval):
+            try:
+                self.compact()
+            except sqlite3.Error as e:
+                logger.warning(f"Disk cache compaction failed: {e}")
+
+    # ---- Introspection ----
+    def __len__(self) -> int:
+        return self._connect().execute("SELECT entries FROM totals").fetchone()[0]
+
+    def stats(self) -> Dict[str, int]:
+        """Hit/miss/eviction counters for this process, plus the stored totals."""
+        entries, size = (
+            self._connect().execute("SELECT entries, bytes FROM totals").fetchone()
+        )
+        with self._counters_lock:
+            return {
+                "hits": self.hits,
+                "misses": self.misses,
+                "evictions": self.evictions,
+                "expired": self.expired,
+                "entries": entries,
+                "bytes": size,
+            }
@@ -3,6 +3,9 @@
 # =========================
 
 # Import settings, db, and LLM router for chat_log-aware endpoints
+import threading
+from typing import Optional
+
 from guardian.config import get_settings
 from guardian.core.ai_router import chat_with_ai  # Adjust import if needed
 from guardian.core.db import GuardianDB as NewGuardianDB
@@ -12,79 +15,18 @@ settings = get_settings()
 chatlog_db = NewGuardianDB(settings.GUARDIAN_DB_PATH)
 
 
-# /history/v2: Retrieve chat logs from new chat_log table
-@app.get("/history/v2", summary="Retrieve chat log history (v2)", tags=["Memory"])
-def chat_log_history(
-    session_id: str = Query(..., description="Session ID to fetch"),
-    user_id: str = Query("default", description="User ID"),
-    limit: int = Query(20, ge=1, le=200, description="Number of messages"),
-    api_key: str = Depends(require_api_key),
-):
-    """
-    Returns latest chat logs for a session/user, from the new chat_log table.
-    """
-    history = chatlog_db.get_chat_history(
-        session_id=session_id, user_id=user_id, limit=limit
+def start_fts_backfill() -> threading.Thread:
+    """Indexes pre-existing rows into the FTS tables without holding up startup."""
+    worker = threading.Thread(
+        target=chatlog_db.backfill_fts, kwargs={"pause": 0.01}, daemon=True
     )
-    results = [
-        {
-            "id": row[0],
-            "timestamp": row[1],
-            "session_id": row[2],
-            "user_id": row[3],
-            "role": row[4],
-            "message": row[5],
-            "response": row[6],
-            "backend": row[7],
-            "model": row[8],
-            "agent": row[9],
-            "tag": row[10],
-            "extra": row[11],
-        }
-        for row in history
-    ]
-    return {"history": results}
-
-
-# /summarize/v2: Summarize recent chat logs using active LLM
-@app.post("/summarize/v2", summary="Summarize chat log history (v2)", tags=["Memory"])
-def summarize_chat_log(
-    session_id: str = Query(..., description="Session ID to summarize"),
-    user_id: str = Query("default", description="User ID"),
-    limit: int = Query(20, ge=1, le=200, description="How many messages to summarize"),
-    api_key: str = Depends(require_api_key),
-):
-    """
-    Summarizes chat history for a session/user using the currently active LLM backend.
-    """
-    history = chatlog_db.get_chat_history(
-        session_id=session_id, user_id=user_id, limit=limit
-    )
-    if not history:
-        return {"summary": "No chat history found for this session."}
-
-    # Compose LLM-ready message format (chronological)
-    messages = []
-    for row in reversed(history):
-        # row: id, timestamp, session_id, user_id, role, message, response, backend, model, agent, tag, extra
-        if row[4] == "user" and row[5]:
-            messages.append({"role": "user", "content": row[5]})
-        elif row[4] == "assistant" and row[6]:
-            messages.append({"role": "assistant", "content": row[6]})
-
-    summary_prompt = [
-        {
-            "role": "system",
-            "content": "Summarize this conversation for future recall. Capture all key facts, emotional beats, and decisions. Be specific.",
-        }
-    ] + messages
-
-    summary = chat_with_ai(summary_prompt)
-    return {"summary": summary}
+    worker.start()
+    return worker
 
 
 import logging
 import os
+from contextlib import asynccontextmanager
 from datetime import datetime
 from pathlib import Path
 from typing import List, Optional
@@ -124,7 +66,13 @@ GEMINI_API_KEY = os.getenv("GEMINI_API_KEY", "your_gemini_api_key_here")
 # Initialize database
 db = GuardianDB(DB_PATH)
 
-app = FastAPI(title="Guardian Codex API")
+@asynccontextmanager
+async def lifespan(app: FastAPI):
+    start_fts_backfill()
+    yield
+
+
+app = FastAPI(title="Guardian Codex API", lifespan=lifespan)
 
 # Import and include routers for modular endpoints
 from guardian.routes import threads, research, memory, agent
@@ -247,6 +195,43 @@ def summarize_entry(entry: SummaryEntry, api_key: str = Depends(require_api_key)
     return {"result": "Summary stored!", "timestamp": timestamp}
 
 
+# /summarize/v2: Summarize recent chat logs using active LLM
+@app.post("/summarize/v2", summary="Summarize chat log history (v2)", tags=["Memory"])
+def summarize_chat_log(
+    session_id: str = Query(..., description="Session ID to summarize"),
+    user_id: str = Query("default", description="User ID"),
+    limit: int = Query(20, ge=1, le=200, description="How many messages to summarize"),
+    api_key: str = Depends(require_api_key),
+):
+    """
+    Summarizes chat history for a session/user using the currently active LLM backend.
+    """
+    history = chatlog_db.get_chat_history(
+        session_id=session_id, user_id=user_id, limit=limit
+    )
+    if not history:
+        return {"summary": "No chat history found for this session."}
+
+    # Compose LLM-ready message format (chronological)
+    messages = []
+    for row in reversed(history):
+        # row: id, timestamp, session_id, user_id, role, message, response, backend, model, agent, tag, extra
+        if row[4] == "user" and row[5]:
+            messages.append({"role": "user", "content": row[5]})
+        elif row[4] == "assistant" and row[6]:
+            messages.append({"role": "assistant", "content": row[6]})
+
+    summary_prompt = [
+        {
+            "role": "system",
+            "content": "Summarize this conversation for future recall. Capture all key facts, emotional beats, and decisions. Be specific.",
+        }
+    ] + messages
+
+    summary = chat_with_ai(summary_prompt)
+    return {"summary": summary}
+
+
 @app.get("/search", summary="Search memory entries", tags=["Memory"])
 def search(
     query: str = Query(..., description="Search query string"),
@@ -283,6 +268,33 @@ def search(
     return results
 
 
+# /search/v2: BM25-ranked full-text search over chat_log or memory
+@app.get("/search/v2", summary="Full-text search (v2)", tags=["Memory"])
+def search_v2(
+    query: str = Query(..., description="Search terms; a trailing * matches prefixes"),
+    scope: str = Query("chat", pattern="^(chat|memory)$", description="chat_log or memory"),
+    session_id: Optional[str] = Query(None, description="Restrict chat results to a session"),
+    user_id: Optional[str] = Query(None, description="Restrict results to a user"),
+    limit: int = Query(10, ge=1, le=100),
+    cursor: Optional[str] = Query(None, description="next_cursor from the previous page"),
+    api_key: str = Depends(require_api_key),
+):
+    """
+    Ranked search with highlighted snippets. Page through results with next_cursor.
+    """
+    try:
+        if scope == "memory":
+            page = chatlog_db.search_memory(query, limit=limit, user_id=user_id, cursor=cursor)
+        else:
+            page = chatlog_db.search_chat_log(
+                query, session_id=session_id, user_id=user_id, limit=limit, cursor=cursor
+            )
+    except ValueError as ve:
+        raise HTTPException(status_code=400, detail=str(ve))
+    logger.info(f"Search v2 ({scope}) for {query!r}: {len(page['results'])} results")
+    return page
+
+
 @app.get(
     "/history",
     summary="Retrieve history entries with optional filters",
@@ -360,6 +372,34 @@ def history(
     return results
 
 
+# /history/v2: Retrieve chat logs from new chat_log table
+@app.get("/history/v2", summary="Retrieve chat log history (v2)", tags=["Memory"])
+def chat_log_history(
+    session_id: str = Query(..., description="Session ID to fetch"),
+    user_id: str = Query("default", description="User ID"),
+    limit: int = Query(20, ge=1, le=200, description="Number of messages"),
+    cursor: Optional[str] = Query(None, description="next_cursor from the previous page"),
+    order: str = Query("desc", pattern="^(asc|desc)$", description="Newest or oldest first"),
+    q: Optional[str] = Query(None, description="Full-text filter on message/response"),
+    api_key: str = Depends(require_api_key),
+):
+    """
+    Returns chat logs for a session/user from the chat_log table, one keyset page at a time.
+    """
+    try:
+        page = chatlog_db.get_chat_history_page(
+            session_id=session_id,
+            user_id=user_id,
+            limit=limit,
+            cursor=cursor,
+            order=order,
+            keyword=q,
+        )
+    except ValueError as ve:
+        raise HTTPException(status_code=400, detail=str(ve))
+    return page
+
+
 # =========================
 # Thread Lineage Endpoints
 # =========================
@@ -643,11 +683,19 @@ def research_agent(
     import asyncio
 
     from guardian.core.research.Modules.agent import Agent, Planner
+    from guardian.core.research.Modules.browser.crawl_ai import close_shared_sessions
     from guardian.core.research.Modules.main import generate_report, read_config
 
     config = read_config()
     planner = Planner(**config.get("planner", {}))
     agents = [Agent(**a) for a in config.get("agents", [])]
 
-    report = asyncio.run(generate_report(query, planner, agents))
+    async def run_report():
+        # The browser pool is bound to this request's event loop
+        try:
+            return await generate_report(query, planner, agents)
+        finally:
+            await close_shared_sessions()
+
+    report = asyncio.run(run_report())
     return {"mode": mode, "report": report}
@@ -7,7 +7,9 @@ Provides functionality to load and query the project's codemap.
 import json
 import os
 import logging
-from typing import Dict, List, Optional, Union
+from typing import Dict, List, Optional, Tuple, Union
+
+from guardian.codemap.index import InvertedIndex
 
 # Configure logging
 logger = logging.getLogger(__name__)
@@ -16,6 +18,24 @@ logger = logging.getLogger(__name__)
 CodemapEntry = Dict[str, Union[str, int]]
 CodemapResult = List[CodemapEntry]
 
+# Inverted index for the most recently queried codemap dict
+_index_cache: Optional[Tuple[Dict, int, InvertedIndex]] = None
+
+
+def _index_for(codemap: Dict) -> InvertedIndex:
+    """Builds (or reuses) the token index for a codemap; rebuilt if the dict changes size."""
+    global _index_cache
+    if _index_cache is not None:
+        cached_map, cached_len, index = _index_cache
+        if cached_map is codemap and cached_len == len(codemap):
+            return index
+    index = InvertedIndex()
+    for key, info in codemap.items():
+        if isinstance(info, dict):
+            index.add(key, [(key, 3.0), (str(info.get("description", "")), 1.0)])
+    _index_cache = (codemap, len(codemap), index)
+    return index
+
 
 def load_codemap() -> Dict:
     """
@@ -45,13 +65,16 @@ def load_codemap() -> Dict:
     return {}
 
 
-def query_codemap(term: str, codemap: Optional[Dict] = None) -> CodemapResult:
+def query_codemap(
+    term: str, codemap: Optional[Dict] = None, top_k: int = 10
+) -> CodemapResult:
     """
-    Query the codemap using fuzzy matching based on the term.
+    Query the codemap for the entries most relevant to the term.
 
     Args:
         term (str): The search string to match against keys and descriptions.
         codemap (dict, optional): Use provided codemap. Otherwise, load using load_codemap.
+        top_k (int): Maximum number of results, best match first.
 
     Returns:
         list: A list of results, where each result is a dict with keys:
@@ -70,25 +93,16 @@ def query_codemap(term: str, codemap: Optional[Dict] = None) -> CodemapResult:
     results: CodemapResult = []
     term = term.lower()
 
-    # Search through the codemap entries
-    for key, info in codemap.items():
-        # Skip invalid entries
-        if not isinstance(info, dict):
-            continue
-
-        # Perform case-insensitive substring matching on key and description
-        if term in key.lower() or term in info.get("description", "").lower():
-
-            results.append(
-                {
-                    "file": info.get("file", "Unknown"),
-                    "line": info.get("line", "N/A"),
-                    "description": info.get("description", "No description available"),
-                }
-            )
-
-    # Sort results by filename and line number for consistent output
-    results.sort(key=lambda x: (x["file"], x.get("line", 0)))
+    # Token and prefix matches on key and description, ranked by relevance
+    for key, _score in _index_for(codemap).search(term, top_k=top_k):
+        info = codemap[key]
+        results.append(
+            {
+                "file": info.get("file", "Unknown"),
+                "line": info.get("line", "N/A"),
+                "description": info.get("description", "No description available"),
+            }
+        )
 
     return results if results else [{"message": f"No matches found for term: {term}"}]
 
@@ -13,6 +13,7 @@ from pathlib import Path
 from typing import Any, Dict, List, Optional, Union
 
 from guardian.config.system_config import system_config
+from guardian.memory.segment_log import SEGMENT_SIZE, SegmentLog
 
 # Configure logging
 logging.basicConfig(
@@ -70,31 +71,45 @@ class MemoryLogger:
 
 
 class JSONLMemoryLogger(MemoryLogger):
-    """JSONL-based memory logger."""
+    """JSONL-based memory logger, stored as a segmented log (see segment_log)."""
 
-    def __init__(self, log_dir: Path):
+    def __init__(
+        self,
+        log_dir: Path,
+        segment_size: int = SEGMENT_SIZE,
+        compression: Optional[str] = None,
+        retention: Optional[float] = None,
+        compact_interval: Optional[float] = 600.0,
+    ):
         self.log_dir = log_dir
-        self.current_log = self._get_current_log()
-        self.max_file_size = 10 * 1024 * 1024  # 10MB
-
-    def _get_current_log(self) -> Path:
-        """Get or create current log file."""
-        current = self.log_dir / f"memory_{datetime.utcnow().strftime('%Y%m')}.jsonl"
-        current.parent.mkdir(parents=True, exist_ok=True)
-        return current
-
-    def _rotate_log_if_needed(self) -> None:
-        """Rotate log file if it exceeds max size."""
-        if self.current_log.stat().st_size > self.max_file_size:
-            self.current_log = self._get_current_log()
+        self.log = SegmentLog(
+            log_dir,
+            segment_size=segment_size,
+            compression=compression,
+            retention=retention,
+            compact_interval=compact_interval,
+        )
+        self._import_monthly_logs()
+
+    def _import_monthly_logs(self) -> None:
+        """Moves events from the old memory_YYYYMM.jsonl files into the log, once."""
+        for log_file in sorted(self.log_dir.glob("memory_*.jsonl")):
+            imported = 0
+            try:
+                with open(log_file, "r") as f:
+                    for line in f:
+                        if line.strip():
+                            self.log.append(json.loads(line))
+                            imported += 1
+                log_file.rename(log_file.with_name(log_file.name + ".imported"))
+                logger.info(f"Imported {imported} events from {log_file}")
+            except Exception as e:
+                logger.error(f"Error importing log file {log_file}: {e}")
 
     def log_event(self, event: MemoryEvent) -> bool:
-        """Log event to JSONL file."""
+        """Log event to the active segment; buffered until a query or close()."""
         try:
-            self._rotate_log_if_needed()
-            with open(self.current_log, "a") as f:
-                json.dump(event.to_dict(), f)
-                f.write("\n")
+            self.log.append(event.to_dict())
             return True
         except Exception as e:
             logger.error(f"Failed to log event: {e}")
@@ -109,63 +124,30 @@ class JSONLMemoryLogger(MemoryLogger):
         end_time: Optional[datetime] = None,
         limit: int = 100,
     ) -> List[Dict[str, Any]]:
-        """Query events from JSONL files."""
-        results = []
-        count = 0
+        """Query events, newest first; only segments and blocks in range are read."""
 
-        # Get all log files in reverse chronological order
-        log_files = sorted(self.log_dir.glob("memory_*.jsonl"), reverse=True)
-
-        for log_file in log_files:
-            if count >= limit:
-                break
-
-            try:
-                with open(log_file, "r") as f:
-                    for line in f:
-                        if count >= limit:
-                            break
-
-                        event = json.loads(line)
-                        if self._matches_criteria(
-                            event, source, event_type, tags, start_time, end_time
-                        ):
-                            results.append(event)
-                            count += 1
-
-            except Exception as e:
-                logger.error(f"Error reading log file {log_file}: {e}")
+        def matches(event: Dict[str, Any]) -> bool:
+            if source and event["source"] != source:
+                return False
+            return not tags or all(tag in event["tags"] for tag in tags)
 
-        return results
-
-    def _matches_criteria(
-        self,
-        event: Dict[str, Any],
-        source: Optional[str],
-        event_type: Optional[str],
-        tags: Optional[List[str]],
-        start_time: Optional[datetime],
-        end_time: Optional[datetime],
-    ) -> bool:
-        """Check if event matches query criteria."""
-        if source and event["source"] != source:
-            return False
-
-        if event_type and event["event_type"] != event_type:
-            return False
-
-        if tags and not all(tag in event["tags"] for tag in tags):
-            return False
-
-        event_time = datetime.fromisoformat(event["timestamp"])
-
-        if start_time and event_time < start_time:
-            return False
+        try:
+            return self.log.query(
+                start=start_time,
+                end=end_time,
+                event_types=[event_type] if event_type else None,
+                predicate=matches if source or tags else None,
+                limit=limit,
+            )
+        except Exception as e:
+            logger.error(f"Failed to query events: {e}")
+            return []
 
-        if end_time and event_time > end_time:
-            return False
+    def compact(self) -> Dict[str, int]:
+        return self.log.compact()
 
-        return True
+    def close(self) -> None:
+        self.log.close()
 
 
 class SQLiteMemoryLogger(MemoryLogger):
@@ -301,7 +283,13 @@ class MemoryLogManager:
         """Initialize configured logging backends."""
         # Initialize JSONL backend
         jsonl_dir = self.log_dir / "jsonl"
-        self.backends["jsonl"] = JSONLMemoryLogger(jsonl_dir)
+        retention_days = system_config.get("memory", "jsonl_retention_days")
+        self.backends["jsonl"] = JSONLMemoryLogger(
+            jsonl_dir,
+            segment_size=system_config.get("memory", "jsonl_segment_size"),
+            compression=system_config.get("memory", "jsonl_compression"),
+            retention=retention_days * 86400 if retention_days else None,
+        )
 
         # Initialize SQLite backend
         sqlite_path = self.log_dir / "memory.db"
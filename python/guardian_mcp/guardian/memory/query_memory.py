@@ -100,7 +100,10 @@ class MemoryStore:
                 for row in cursor.fetchall()
             ]
 
-    @memoize_to_disk(expire=3600)  # Cache for 1 hour
+    # Cache for 1 hour, keyed by database rather than by instance
+    @memoize_to_disk(
+        expire=3600, key=lambda self, tags, limit=100: [str(self.db_path), tags, limit]
+    )
     def query_by_tags(self, tags: List[str], limit: int = 100) -> List[Dict[str, Any]]:
         """
         Query memories by tags.
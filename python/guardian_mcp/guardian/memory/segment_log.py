@@ -0,0 +1,618 @@
+"""
+Segment Log
+-----------
+Append-only JSONL event log split into fixed-size segments, the storage
+engine behind JSONLMemoryLogger.
+
+- Appends go through one buffered writer on the active segment, which is
+  sealed once it reaches segment_size bytes.
+- Sealing writes a sparse index next to the segment: one entry per block of
+  about block_size bytes (offset, length, event count, earliest and latest
+  timestamp, and a bitmap of the event types in the block), summarized again
+  for the whole segment. Event types get their bit from a registry file
+  shared by the directory.
+- query() skips segments and blocks whose time range or event types cannot
+  match and seeks straight to the ones that can (binary search when a
+  segment's timestamps are in order), so only those blocks are read.
+- compact() drops segments past the retention period, merges runs of small
+  sealed segments and compresses sealed segments with gzip or zstd (when
+  zstandard is installed). Blocks are compressed one by one, so a
+  compressed segment is still read a block at a time.
+
+A directory has one writer at a time. Results come newest first, in append
+order.
+
+Usage:
+    log = SegmentLog("memory/jsonl", compression="gzip", retention=30 * 86400)
+    log.append({"event_type": "recall", "timestamp": "2024-05-01T12:00:00"})
+    log.query(start=time.time() - 3600, event_types=["recall"], limit=100)
+"""
+
+import atexit
+import bisect
+import gzip
+import json
+import logging
+import os
+import re
+import threading
+import time
+import weakref
+from datetime import datetime
+from pathlib import Path
+from typing import Any, BinaryIO, Callable, Dict, Iterable, List, Optional, Tuple, Union
+
+logger = logging.getLogger(__name__)
+
+SEGMENT_SIZE = 64 * 1024 * 1024
+BLOCK_SIZE = 64 * 1024
+BUFFER_SIZE = 256 * 1024
+REGISTRY = "event_types.json"
+DATA_RE = re.compile(r"^(\d{8})-(\d+)\.jsonl(\.gz|\.zst)?$")
+INDEX_RE = re.compile(r"^(\d{8})\.idx\.json$")
+
+# (offset, length, events, earliest, latest, event type bitmap)
+Block = Tuple[int, int, int, float, float, int]
+Record = Dict[str, Any]
+
+EPOCH = datetime(1970, 1, 1)
+
+_open_logs: "weakref.WeakSet[SegmentLog]" = weakref.WeakSet()
+
+
+@atexit.register
+def _close_open_logs() -> None:
+    for log in list(_open_logs):
+        log.close()
+
+
+def to_epoch(value: Union[datetime, float, int, str]) -> float:
+    """Seconds since the epoch; naive datetimes (and ISO strings) are UTC."""
+    if isinstance(value, (int, float)):
+        return float(value)
+    if isinstance(value, str):
+        value = datetime.fromisoformat(value)
+    if value.tzinfo is None:
+        return (value - EPOCH).total_seconds()
+    return value.timestamp()
+
+
+def record_time(record: Record) -> float:
+    return to_epoch(record["timestamp"])
+
+
+def record_type(record: Record) -> str:
+    return record.get("event_type", "")
+
+
+def _codec(name: Optional[str]) -> Tuple[str, Callable, Callable]:
+    """(file suffix, compress, decompress) for a compression name."""
+    if name is None:
+        return "", bytes, bytes
+    if name == "gzip":
+        return (
+            ".gz",
+            lambda data: gzip.compress(data, compresslevel=6, mtime=0),
+            gzip.decompress,
+        )
+    if name == "zstd":
+        try:
+            import zstandard
+        except ImportError:
+            raise ImportError(
+                "zstandard package required for zstd compression. "
+                "Run 'pip install zstandard'."
+            )
+        return (
+            ".zst",
+            lambda data: zstandard.ZstdCompressor(level=3).compress(data),
+            lambda data: zstandard.ZstdDecompressor().decompress(data),
+        )
+    raise ValueError(f"Unknown compression {name!r}; expected 'gzip' or 'zstd'")
+
+
+class Segment:
+    """One segment file and its index, in memory."""
+
+    def __init__(self, seq: int, name: str, codec: Optional[str] = None) -> None:
+        self.seq = seq
+        self.name = name
+        self.codec = codec
+        self.blocks: List[Block] = []
+        self.events = 0
+        self.raw_bytes = 0  # Uncompressed
+        self.size = 0  # On disk
+        self.earliest = float("inf")
+        self.latest = float("-inf")
+        self.ordered = True  # Timestamps never decrease, nor do block ranges
+        self.types = 0
+        self.replaces: List[int] = []
+        self._open: Optional[list] = None  # Block being appended to
+
+    def add(self, timestamp: float, bit: int, length: int, block_size: int) -> None:
+        """Accounts for one line appended to the (uncompressed) segment."""
+        block = self._open
+        if block is None:
+            block = self._open = [self.raw_bytes, 0, 0, timestamp, timestamp, 0]
+        block[1] += length
+        block[2] += 1
+        if timestamp < block[3]:
+            block[3] = timestamp
+        if timestamp > block[4]:
+            block[4] = timestamp
+        block[5] |= bit
+        self.events += 1
+        self.raw_bytes += length
+        self.size = self.raw_bytes
+        if timestamp < self.earliest:
+            self.earliest = timestamp
+        if timestamp >= self.latest:
+            self.latest = timestamp
+        else:
+            self.ordered = False
+        self.types |= bit
+        if block[1] >= block_size:
+            self.close_block()
+
+    def close_block(self) -> None:
+        if self._open is not None:
+            self.blocks.append(tuple(self._open))
+            self._open = None
+
+    def snapshot(self) -> List[Block]:
+        """The blocks so far, including the one being appended to."""
+        if self._open is None:
+            return list(self.blocks)
+        return self.blocks + [tuple(self._open)]
+
+    def to_index(self) -> Dict[str, Any]:
+        return {
+            "file": self.name,
+            "codec": self.codec,
+            "events": self.events,
+            "raw_bytes": self.raw_bytes,
+            "size": self.size,
+            "earliest": self.earliest,
+            "latest": self.latest,
+            "ordered": self.ordered,
+            "types": self.types,
+            "replaces": self.replaces,
+            "blocks": self.blocks,
+        }
+
+    @classmethod
+    def from_index(cls, seq: int, index: Dict[str, Any]) -> "Segment":
+        segment = cls(seq, index["file"], index["codec"])
+        segment.blocks = [tuple(block) for block in index["blocks"]]
+        for field in ("events", "raw_bytes", "size", "earliest", "latest"):
+            setattr(segment, field, index[field])
+        segment.ordered = index["ordered"]
+        segment.types = index["types"]
+        segment.replaces = index.get("replaces", [])
+        return segment
+
+
+def candidate_blocks(
+    segment: Segment, blocks: List[Block], start: float, end: float
+) -> List[Block]:
+    """The blocks of `segment` whose time range overlaps [start, end]."""
+    if segment.ordered:
+        # Earliest and latest both increase block to block: seek to the range
+        first = bisect.bisect_left(blocks, start, key=lambda block: block[4])
+        stop = bisect.bisect_right(blocks, end, key=lambda block: block[3])
+        return blocks[first:stop]
+    return [block for block in blocks if block[4] >= start and block[3] <= end]
+
+
+class SegmentLog:
+    """
+    Segmented JSONL log in `directory`.
+
+    `time_of` and `type_of` read a record's timestamp (seconds since the
+    epoch) and event type; by default its "timestamp" (ISO format or a
+    number) and "event_type" fields. With compact_interval, a daemon thread
+    runs compact() that often once a segment has been sealed.
+    """
+
+    def __init__(
+        self,
+        directory: Union[str, Path],
+        segment_size: int = SEGMENT_SIZE,
+        block_size: int = BLOCK_SIZE,
+        compression: Optional[str] = None,
+        retention: Optional[float] = None,
+        compact_interval: Optional[float] = None,
+        time_of: Callable[[Record], float] = record_time,
+        type_of: Callable[[Record], str] = record_type,
+    ) -> None:
+        self.directory = Path(directory)
+        self.segment_size = segment_size
+        self.block_size = block_size
+        self.compression = compression
+        _codec(compression)  # Fail now on an unknown or unavailable codec
+        self.retention = retention
+        self.compact_interval = compact_interval
+        self.time_of = time_of
+        self.type_of = type_of
+        self._segments: List[Segment] = []  # Sealed, oldest first
+        self._active: Optional[Segment] = None
+        self._writer: Optional[BinaryIO] = None
+        self._next_seq = 1
+        self._bits: Dict[str, int] = {}
+        self._lock = threading.RLock()
+        self._compact_lock = threading.Lock()
+        self._readers = 0
+        self._graveyard: List[Path] = []  # Deleted once no query reads them
+        self._compactor: Optional[threading.Thread] = None
+        self._stop = threading.Event()
+        self.directory.mkdir(parents=True, exist_ok=True)
+        self._load_registry()
+        self._recover()
+        _open_logs.add(self)
+        if self._segments:
+            self._ensure_compactor()
+
+    # ---- Opening ----
+    def _load_registry(self) -> None:
+        try:
+            with open(self.directory / REGISTRY, encoding="utf-8") as f:
+                names = json.load(f)
+        except FileNotFoundError:
+            names = []
+        self._bits = {name: 1 << i for i, name in enumerate(names)}
+
+    def _bit(self, event_type: str) -> int:
+        bit = self._bits.get(event_type)
+        if bit is None:
+            bit = self._bits[event_type] = 1 << len(self._bits)
+            self._write_json(self.directory / REGISTRY, list(self._bits))
+        return bit
+
+    def _recover(self) -> None:
+        """Loads the indexes and cleans up after an interrupted seal or compaction."""
+        indexes: Dict[int, Dict[str, Any]] = {}
+        data: Dict[int, List[str]] = {}
+        for path in self.directory.iterdir():
+            if path.name.endswith(".tmp"):
+                path.unlink()
+            elif INDEX_RE.match(path.name):
+                with open(path, encoding="utf-8") as f:
+                    indexes[int(path.name[:8])] = json.load(f)
+            elif DATA_RE.match(path.name):
+                data.setdefault(int(path.name[:8]), []).append(path.name)
+
+        replaced = {
+            seq for index in indexes.values() for seq in index.get("replaces", [])
+        }
+        newest = max([*indexes, *data], default=0)
+        for seq in sorted(set(indexes) | set(data)):
+            index = indexes.get(seq)
+            if seq in replaced:
+                index = None  # Merged into a later segment
+                if seq in indexes:
+                    self._index_path(seq).unlink()
+            if index is not None:
+                keep = index["file"]
+                self._segments.append(Segment.from_index(seq, index))
+            elif seq == newest and seq not in replaced:
+                # Never sealed: the active segment, still uncompressed
+                keep = f"{seq:08d}-0.jsonl"
+                if keep in data.get(seq, []):
+                    self._active = self._rebuild(seq, keep)
+            else:
+                keep = None  # Left behind by an interrupted compaction
+            for name in data.get(seq, []):
+                if name != keep:
+                    (self.directory / name).unlink()
+        self._next_seq = newest + 1
+
+    def _rebuild(self, seq: int, name: str) -> Segment:
+        """Re-reads the unsealed segment, dropping a torn last line."""
+        path = self.directory / name
+        segment = Segment(seq, name)
+        with open(path, "rb") as f:
+            content = f.read()
+        end = content.rfind(b"\n") + 1
+        if end < len(content):
+            logger.warning(f"Dropping a partial line at the end of {path}")
+            with open(path, "r+b") as f:
+                f.truncate(end)
+        for line in content[:end].splitlines(keepends=True):
+            record = json.loads(line)
+            bit = self._bit(self.type_of(record))
+            segment.add(self.time_of(record), bit, len(line), self.block_size)
+        return segment
+
+    # ---- Writes ----
+    def append(self, record: Record) -> None:
+        line = (json.dumps(record) + "\n").encode("utf-8")
+        timestamp = self.time_of(record)
+        event_type = self.type_of(record)
+        with self._lock:
+            bit = self._bit(event_type)
+            if self._writer is None:
+                self._open_writer()
+            self._writer.write(line)
+            self._active.add(timestamp, bit, len(line), self.block_size)
+            if self._active.raw_bytes >= self.segment_size:
+                self.seal()
+
+    def _open_writer(self) -> None:
+        if self._active is None:
+            seq = self._next_seq
+            self._next_seq += 1
+            self._active = Segment(seq, f"{seq:08d}-0.jsonl")
+        self._writer = open(
+            self.directory / self._active.name, "ab", buffering=BUFFER_SIZE
+        )
+
+    def flush(self) -> None:
+        with self._lock:
+            if self._writer is not None:
+                self._writer.flush()
+
+    def seal(self) -> None:
+        """Closes the active segment and writes its index."""
+        with self._lock:
+            segment = self._active
+            if segment is None or not segment.events:
+                return
+            if self._writer is not None:
+                self._writer.close()
+                self._writer = None
+            segment.close_block()
+            self._write_json(self._index_path(segment.seq), segment.to_index())
+            self._segments.append(segment)
+            self._active = None
+        self._ensure_compactor()
+
+    def _index_path(self, seq: int) -> Path:
+        return self.directory / f"{seq:08d}.idx.json"
+
+    @staticmethod
+    def _write_json(path: Path, value: Any) -> None:
+        tmp_path = path.with_name(path.name + ".tmp")
+        with open(tmp_path, "w", encoding="utf-8") as f:
+            json.dump(value, f, separators=(",", ":"))
+        os.replace(tmp_path, path)
+
+    # ---- Queries ----
+    def query(
+        self,
+        start: Optional[Union[datetime, float]] = None,
+        end: Optional[Union[datetime, float]] = None,
+        event_types: Optional[Iterable[str]] = None,
+        predicate: Optional[Callable[[Record], bool]] = None,
+        limit: Optional[int] = None,
+    ) -> List[Record]:
+        """
+        Records with start <= timestamp <= end, of one of `event_types` and
+        accepted by `predicate` (each filter optional), newest first.
+        """
+        lo = float("-inf") if start is None else to_epoch(start)
+        hi = float("inf") if end is None else to_epoch(end)
+        wanted = None if event_types is None else set(event_types)
+        with self._lock:
+            mask = 0
+            if wanted is not None:
+                for event_type in wanted:
+                    mask |= self._bits.get(event_type, 0)
+                if not mask:
+                    return []  # None of them was ever logged
+            if self._writer is not None:
+                self._writer.flush()
+            snapshot = [(segment, segment.blocks) for segment in self._segments]
+            if self._active is not None:
+                snapshot.append((self._active, self._active.snapshot()))
+            self._readers += 1
+        try:
+            return self._scan(snapshot, lo, hi, wanted, mask, predicate, limit)
+        finally:
+            with self._lock:
+                self._readers -= 1
+                self._reap()
+
+    def _scan(
+        self,
+        snapshot: List[Tuple[Segment, List[Block]]],
+        lo: float,
+        hi: float,
+        wanted: Optional[set],
+        mask: int,
+        predicate: Optional[Callable[[Record], bool]],
+        limit: Optional[int],
+    ) -> List[Record]:
+        results: List[Record] = []
+        if limit is not None and limit <= 0:
+            return results
+        for segment, blocks in reversed(snapshot):
+            if segment.latest < lo or segment.earliest > hi:
+                continue
+            if mask and not segment.types & mask:
+                continue
+            _, _, decompress = _codec(segment.codec)
+            with open(self.directory / segment.name, "rb") as f:
+                for block in reversed(candidate_blocks(segment, blocks, lo, hi)):
+                    offset, length, _, earliest, latest, types = block
+                    if mask and not types & mask:
+                        continue
+                    f.seek(offset)
+                    lines = decompress(f.read(length)).splitlines()
+                    check_time = earliest < lo or latest > hi
+                    check_type = mask and types & ~mask
+                    for line in reversed(lines):
+                        record = json.loads(line)
+                        if check_time and not lo <= self.time_of(record) <= hi:
+                            continue
+                        if check_type and self.type_of(record) not in wanted:
+                            continue
+                        if predicate is not None and not predicate(record):
+                            continue
+                        results.append(record)
+                        if limit is not None and len(results) >= limit:
+                            return results
+        return results
+
+    # ---- Compaction ----
+    def compact(self) -> Dict[str, int]:
+        """
+        Drops sealed segments entirely older than the retention period,
+        merges runs of adjacent sealed segments that fit in one segment and
+        compresses the ones still uncompressed. Returns what it did.
+        """
+        with self._compact_lock:
+            done = {"expired": 0, "merged": 0, "compressed": 0}
+            if self.retention is not None:
+                cutoff = time.time() - self.retention
+                with self._lock:
+                    expired = [s for s in self._segments if s.latest < cutoff]
+                    for segment in expired:
+                        self._retire(segment)
+                done["expired"] = len(expired)
+
+            for run in self._runs():
+                if len(run) > 1:
+                    done["merged"] += len(run)
+                elif run[0].codec == self.compression:
+                    continue
+                elif self.compression is not None:
+                    done["compressed"] += 1
+                self._rewrite(run)
+            with self._lock:
+                self._reap()
+            return done
+
+    def _runs(self) -> List[List[Segment]]:
+        """Sealed segments grouped into runs that fit in one segment together."""
+        with self._lock:
+            segments = list(self._segments)
+        runs: List[List[Segment]] = []
+        for segment in segments:
+            run = runs[-1] if runs else None
+            if (
+                run is not None
+                and sum(s.raw_bytes for s in run) + segment.raw_bytes
+                <= self.segment_size
+            ):
+                run.append(segment)
+            else:
+                runs.append([segment])
+        return runs
+
+    def _rewrite(self, run: List[Segment]) -> None:
+        """Writes `run` as one segment, with the current compression."""
+        suffix, compress, _ = _codec(self.compression)
+        last = run[-1]
+        generation = int(DATA_RE.match(last.name).group(2)) + 1
+        merged = Segment(last.seq, f"{last.seq:08d}-{generation}.jsonl{suffix}")
+        merged.codec = self.compression
+        merged.replaces = sorted(
+            {s.seq for s in run[:-1]} | {seq for s in run for seq in s.replaces}
+        )
+        tmp_path = self.directory / (merged.name + ".tmp")
+        with open(tmp_path, "wb") as out:
+            for segment in run:
+                _, _, decompress = _codec(segment.codec)
+                with open(self.directory / segment.name, "rb") as f:
+                    for (
+                        offset,
+                        length,
+                        events,
+                        earliest,
+                        latest,
+                        types,
+                    ) in segment.blocks:
+                        f.seek(offset)
+                        raw = decompress(f.read(length))
+                        data = compress(raw)
+                        out.write(data)
+                        merged.blocks.append(
+                            (merged.size, len(data), events, earliest, latest, types)
+                        )
+                        merged.size += len(data)
+                        merged.raw_bytes += len(raw)
+                merged.ordered = (
+                    merged.ordered
+                    and segment.ordered
+                    and segment.earliest >= merged.latest
+                )
+                merged.events += segment.events
+                merged.earliest = min(merged.earliest, segment.earliest)
+                merged.latest = max(merged.latest, segment.latest)
+                merged.types |= segment.types
+        os.replace(tmp_path, self.directory / merged.name)
+
+        with self._lock:
+            # The new index is the commit point; on a crash before the old
+            # indexes are gone, `replaces` tells _recover() to drop them
+            self._write_json(self._index_path(merged.seq), merged.to_index())
+            position = self._segments.index(run[0])
+            self._segments[position : position + len(run)] = [merged]
+            for segment in run:
+                self._graveyard.append(self.directory / segment.name)
+                if segment.seq != merged.seq:
+                    self._graveyard.append(self._index_path(segment.seq))
+
+    def _retire(self, segment: Segment) -> None:
+        """Forgets a sealed segment; its files go once no query is reading them."""
+        self._segments.remove(segment)
+        self._graveyard.append(self._index_path(segment.seq))
+        self._graveyard.append(self.directory / segment.name)
+
+    def _reap(self) -> None:
+        if self._readers:
+            return
+        for path in self._graveyard:
+            try:
+                path.unlink()
+            except FileNotFoundError:
+                pass
+        self._graveyard.clear()
+
+    def _ensure_compactor(self) -> None:
+        if self.compact_interval is None or self._stop.is_set():
+            return
+        if self._compactor is None or not self._compactor.is_alive():
+            self._compactor = threading.Thread(
+                target=self._compact_loop, name="segment-log-compactor", daemon=True
+            )
+            self._compactor.start()
+
+    def _compact_loop(self) -> None:
+        while not self._stop.wait(self.compact_interval):
+            try:
+                self.compact()
+            except (OSError, ValueError) as e:
+                logger.warning(f"Segment log compaction failed: {e}")
+
+    # ---- Introspection ----
+    def __len__(self) -> int:
+        with self._lock:
+            active = self._active.events if self._active is not None else 0
+            return active + sum(s.events for s in self._segments)
+
+    def stats(self) -> Dict[str, int]:
+        with self._lock:
+            segments = list(self._segments)
+            if self._active is not None:
+                segments.append(self._active)
+            return {
+                "segments": len(segments),
+                "events": sum(s.events for s in segments),
+                "bytes": sum(s.size for s in segments),
+                "raw_bytes": sum(s.raw_bytes for s in segments),
+                "event_types": len(self._bits),
+            }
+
+    def close(self) -> None:
+        """Flushes the active segment (it stays open for appends after a restart)."""
+        self._stop.set()
+        if self._compactor is not None and self._compactor.is_alive():
+            if self._compactor is not threading.current_thread():
+                self._compactor.join()
+        with self._lock:
+            if self._writer is not None:
+                self._writer.close()
+                self._writer = None
+            self._reap()
+        _open_logs.discard(self)
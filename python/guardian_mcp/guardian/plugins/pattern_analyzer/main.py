@@ -9,13 +9,19 @@ import json
 import logging
 import threading
 import time
+from collections import deque
 from datetime import datetime, timedelta
 from pathlib import Path
-from typing import Any, Dict, List, Optional, Set, Tuple
+from typing import Any, Deque, Dict, List, Optional, Set, Tuple
 from guardian.logging_config import configure_logging
 
 from guardian.codex_awareness import CodexAwareness
 from guardian.metacognition import MetacognitionEngine
+from guardian.plugins.pattern_analyzer.sequences import (
+    StreamingSequenceMiner,
+    mine_sequences,
+    non_overlapping_count,
+)
 
 # Configure logging
 configure_logging()
@@ -67,6 +73,10 @@ class PatternAnalyzer:
         self.running = False
         self.analysis_thread: Optional[threading.Thread] = None
         self.last_analysis: Optional[datetime] = None
+        # operation_type -> (miner, memories in its window) for streaming mode
+        self._sequence_streams: Dict[str, Tuple[StreamingSequenceMiner, Deque[Any]]] = (
+            {}
+        )
 
     def health_check(self) -> dict:
         """
@@ -200,13 +210,14 @@ class PatternAnalyzer:
                 if op_type:
                     operations.setdefault(op_type, []).append(memory)
 
+        if self.config.get("streaming_sequences"):
+            return self._analyze_sequence_streams(operations)
+
         # Analyze operation sequences
         for op_type, op_memories in operations.items():
             if len(op_memories) >= 3:  # Minimum sequence length
                 # Look for repeated sequences
-                sequences = self._find_sequences(op_memories)
-
-                for seq in sequences:
+                for seq, frequency in self._mine_sequences(op_memories):
                     pattern = Pattern(
                         pattern_type="behavioral",
                         signature=f"behavior_{op_type}_{hash(str(seq))}",
@@ -215,15 +226,77 @@ class PatternAnalyzer:
                         metadata={
                             "operation_type": op_type,
                             "sequence_length": len(seq),
-                            "frequency": self._calculate_sequence_frequency(
-                                seq, op_memories
-                            ),
+                            "frequency": frequency,
                         },
                     )
                     patterns.append(pattern)
 
         return patterns
 
+    def _analyze_sequence_streams(
+        self, operations: Dict[str, List[Any]]
+    ) -> List[Pattern]:
+        """
+        Streaming variant of the sequence analysis: only memories newer than
+        the last cycle are pushed into each operation type's miner, and
+        memories older than `sequence_window` seconds are expired from it.
+        Runs are bounded by `sequence_max_length` as in batch mode, or by
+        `streaming_sequence_max_length` when that is unset, so each push
+        stays O(max length) and the miner's trie O(window * max length).
+        One pattern is reported per distinct frequent sequence, with its
+        most recent occurrence as evidence.
+        """
+        patterns: List[Pattern] = []
+        window = timedelta(seconds=self.config.get("sequence_window", 3600))
+
+        for op_type, op_memories in operations.items():
+            stream = self._sequence_streams.get(op_type)
+            if stream is None:
+                miner = StreamingSequenceMiner(
+                    min_length=self.config.get("sequence_min_length", 3),
+                    max_length=self.config.get("sequence_max_length")
+                    or self.config.get("streaming_sequence_max_length", 10),
+                    min_support=self.config.get("sequence_min_support", 2),
+                )
+                stream = self._sequence_streams[op_type] = (miner, deque())
+            miner, window_memories = stream
+
+            # (timestamp, id) so memories sharing the last timestamp still count
+            watermark = (
+                self._stream_key(window_memories[-1]) if window_memories else None
+            )
+            for memory in sorted(op_memories, key=self._stream_key):
+                if watermark is None or self._stream_key(memory) > watermark:
+                    miner.push(self._event_type(memory))
+                    window_memories.append(memory)
+            if not window_memories:
+                continue
+            horizon = window_memories[-1].timestamp - window
+            expired = 0
+            while window_memories and window_memories[0].timestamp < horizon:
+                window_memories.popleft()
+                expired += 1
+            miner.evict(expired)
+
+            for found in miner.frequent():
+                start = found.starts[-1] - miner.offset
+                seq = [window_memories[i] for i in range(start, start + found.length)]
+                max_possible = len(window_memories) - found.length + 1
+                pattern = Pattern(
+                    pattern_type="behavioral",
+                    signature=f"behavior_{op_type}_{hash(found.events)}",
+                    confidence=self._calculate_sequence_confidence(seq),
+                    evidence=[m.id for m in seq],
+                    metadata={
+                        "operation_type": op_type,
+                        "sequence_length": found.length,
+                        "frequency": found.support / max_possible,
+                    },
+                )
+                patterns.append(pattern)
+
+        return patterns
+
     def _analyze_temporal_patterns(self, memories: List[Any]) -> List[Pattern]:
         """Analyze temporal patterns in system events."""
         patterns: List[Pattern] = []
@@ -314,31 +387,59 @@ class PatternAnalyzer:
 
     def _find_sequences(self, memories: List[Any]) -> List[List[Any]]:
         """Find repeated sequences in memories."""
-        sequences: List[List[Any]] = []
-        min_length = 3
-
-        for i in range(len(memories) - min_length + 1):
-            for j in range(i + min_length, len(memories) + 1):
-                sequence = memories[i:j]
-                # Check if sequence repeats
-                if self._is_repeated_sequence(sequence, memories):
-                    sequences.append(sequence)
+        return [seq for seq, _ in self._mine_sequences(memories)]
 
-        return sequences
+    def _mine_sequences(self, memories: List[Any]) -> List[Tuple[List[Any], float]]:
+        """
+        Every window of memories whose run of event types repeats, with the
+        run's frequency, ordered by start and then end. Bounded by the
+        `sequence_min_length`, `sequence_max_length` and
+        `sequence_min_support` settings (3, unbounded and 2 by default).
+        """
+        found = mine_sequences(
+            [self._event_type(m) for m in memories],
+            min_length=self.config.get("sequence_min_length", 3),
+            max_length=self.config.get("sequence_max_length"),
+            min_support=self.config.get("sequence_min_support", 2),
+        )
+        windows = []
+        for seq in found:
+            max_possible = len(memories) - seq.length + 1
+            frequency = seq.support / max_possible if max_possible > 0 else 0.0
+            for start in seq.starts:
+                windows.append((start, start + seq.length, frequency))
+        windows.sort()
+        return [(memories[start:end], frequency) for start, end, frequency in windows]
 
     def _is_repeated_sequence(self, sequence: List[Any], memories: List[Any]) -> bool:
         """Check if a sequence repeats in memories."""
-        seq_str = self._sequence_to_string(sequence)
-        mem_str = self._sequence_to_string(memories)
+        return self._count_sequence(sequence, memories) > 1
+
+    def _event_type(self, memory: Any) -> str:
+        """The event type sequences are mined over."""
+        return str(getattr(memory, "content", {}).get("operation_type", ""))
 
-        # Count occurrences
-        return mem_str.count(seq_str) > 1
+    def _stream_key(self, memory: Any) -> Tuple[Any, str]:
+        """Order in which memories are pushed into a sequence stream."""
+        return memory.timestamp, str(memory.id)
 
     def _sequence_to_string(self, sequence: List[Any]) -> str:
         """Convert sequence to string representation."""
-        return ",".join(
-            str(getattr(m, "content", {}).get("operation_type", "")) for m in sequence
-        )
+        return ",".join(self._event_type(m) for m in sequence)
+
+    def _count_sequence(self, sequence: List[Any], memories: List[Any]) -> int:
+        """Non-overlapping occurrences of the sequence's event types in memories."""
+        target = [self._event_type(m) for m in sequence]
+        events = [self._event_type(m) for m in memories]
+        length = len(target)
+        if not length:
+            return 0
+        starts = [
+            i
+            for i in range(len(events) - length + 1)
+            if events[i : i + length] == target
+        ]
+        return non_overlapping_count(starts, length)
 
     def _calculate_sequence_confidence(self, sequence: List[Any]) -> float:
         """Calculate confidence in a behavioral sequence."""
@@ -359,10 +460,7 @@ class PatternAnalyzer:
         self, sequence: List[Any], memories: List[Any]
     ) -> float:
         """Calculate frequency of a sequence in memories."""
-        seq_str = self._sequence_to_string(sequence)
-        mem_str = self._sequence_to_string(memories)
-
-        count = mem_str.count(seq_str)
+        count = self._count_sequence(sequence, memories)
         max_possible = len(memories) - len(sequence) + 1
 
         return count / max_possible if max_possible > 0 else 0.0
@@ -0,0 +1,221 @@
+"""
+Frequent Sequence Mining
+------------------------
+Finds contiguous runs of event types that repeat within an event stream.
+
+N-grams are numbered the way a trie would number them: an (n+1)-gram is the
+pair (id of its n-gram prefix, next event), interned to a small integer. That
+makes every extension O(1) and exact (no hash collisions), and the batch
+miner only extends n-grams that still occur `min_support` times (a longer
+run can never repeat more often than its prefix), so the work is bounded by
+the number of repeated n-grams rather than by every window of the input.
+
+Support is counted the way PatternAnalyzer always has (``str.count`` on the
+joined event types): leftmost, non-overlapping occurrences.
+
+- mine_sequences: batch mining of a list of events
+- repeated_windows: (start, end) windows whose run repeats, in the order the
+  old window-by-window scan produced them
+- StreamingSequenceMiner: the same counts kept up to date as events are
+  appended and expired, for callers that watch a sliding window
+"""
+
+from collections import deque
+from dataclasses import dataclass
+from itertools import count
+from typing import Deque, Dict, Hashable, List, Optional, Sequence, Tuple
+
+ROOT = 0
+
+
+@dataclass
+class FrequentSequence:
+    """A repeated run of events and where it starts (all occurrences, ascending)."""
+
+    events: Tuple[Hashable, ...]
+    starts: List[int]
+
+    @property
+    def length(self) -> int:
+        return len(self.events)
+
+    @property
+    def support(self) -> int:
+        """Leftmost non-overlapping occurrences, as ``str.count`` would count them."""
+        return non_overlapping_count(self.starts, len(self.events))
+
+
+def non_overlapping_count(starts: Sequence[int], length: int) -> int:
+    """Greedy count of occurrences that do not overlap, given ascending starts."""
+    total, free_from = 0, None
+    for start in starts:
+        if free_from is None or start >= free_from:
+            total += 1
+            free_from = start + length
+    return total
+
+
+def mine_sequences(
+    events: Sequence[Hashable],
+    min_length: int = 3,
+    max_length: Optional[int] = None,
+    min_support: int = 2,
+) -> List[FrequentSequence]:
+    """
+    All runs of min_length..max_length events (unbounded when None) with at
+    least min_support non-overlapping occurrences, sorted by length and then
+    by first occurrence.
+    """
+    symbols: Dict[Hashable, int] = {}
+    ids = [symbols.setdefault(event, len(symbols)) for event in events]
+    n = len(ids)
+    node = list(ids)  # Id of the current-length n-gram starting at each position
+    live = list(range(n))
+    results: List[FrequentSequence] = []
+    length = 1
+    while live:
+        occurrences: Dict[int, List[int]] = {}
+        for start in live:
+            occurrences.setdefault(node[start], []).append(start)
+        if length >= min_length:
+            for starts in occurrences.values():
+                if (
+                    len(starts) >= min_support
+                    and non_overlapping_count(starts, length) >= min_support
+                ):
+                    first = starts[0]
+                    results.append(
+                        FrequentSequence(tuple(events[first : first + length]), starts)
+                    )
+        if max_length is not None and length >= max_length:
+            break
+
+        # Extend only the n-grams that can still repeat
+        extended: Dict[Tuple[int, int], int] = {}
+        next_live = []
+        for start in live:
+            if start + length < n and len(occurrences[node[start]]) >= min_support:
+                key = (node[start], ids[start + length])
+                node[start] = extended.setdefault(key, len(extended))
+                next_live.append(start)
+        live = next_live
+        length += 1
+    results.sort(key=lambda seq: (seq.length, seq.starts[0]))
+    return results
+
+
+def repeated_windows(
+    events: Sequence[Hashable],
+    min_length: int = 3,
+    max_length: Optional[int] = None,
+    min_support: int = 2,
+) -> List[Tuple[int, int]]:
+    """Every (start, end) window whose run of events is frequent, in order."""
+    windows = [
+        (start, start + seq.length)
+        for seq in mine_sequences(events, min_length, max_length, min_support)
+        for start in seq.starts
+    ]
+    windows.sort()
+    return windows
+
+
+class StreamingSequenceMiner:
+    """
+    Incremental n-gram counts over a sliding window of events.
+
+    push() and evict() cost O(max_length) and the trie holds at most
+    window * max_length nodes, so a caller can feed new events as they
+    arrive and drop expired ones instead of re-mining the whole window.
+    max_length is required to be finite here; unbounded runs are left to
+    mine_sequences(). Positions are absolute (the i-th event ever pushed is
+    position i); `offset` is the position of the oldest event still held.
+    """
+
+    def __init__(
+        self,
+        min_length: int = 3,
+        max_length: int = 10,
+        min_support: int = 2,
+    ) -> None:
+        if max_length < min_length:
+            raise ValueError("max_length must be >= min_length")
+        self.min_length = min_length
+        self.max_length = max_length
+        self.min_support = min_support
+        self.offset = 0
+        self.events: Deque[Hashable] = deque()
+        self._ids = count(ROOT + 1)
+        self._children: Dict[Tuple[int, Hashable], int] = {}
+        self._length: Dict[int, int] = {}
+        self._starts: Dict[int, Deque[int]] = {}
+        self._repeated: Dict[int, None] = {}  # Nodes with >= min_support occurrences
+        self._tail: List[int] = []  # Nodes of the n-grams ending at the newest event
+
+    def __len__(self) -> int:
+        return len(self.events)
+
+    def push(self, event: Hashable) -> None:
+        """Appends one event and counts the n-grams that end on it."""
+        position = self.offset + len(self.events)
+        self.events.append(event)
+        tail = []
+        parent = ROOT
+        for length in range(1, self._longest() + 1):
+            if length > 1:
+                parent = self._tail[length - 2]
+            key = (parent, event)
+            node = self._children.get(key)
+            if node is None:
+                node = self._children[key] = next(self._ids)
+                self._length[node] = length
+                self._starts[node] = deque()
+            starts = self._starts[node]
+            starts.append(position - length + 1)
+            if len(starts) == self.min_support and length >= self.min_length:
+                self._repeated[node] = None
+            tail.append(node)
+        self._tail = tail
+
+    def _longest(self) -> int:
+        """Length of the longest n-gram counted over the current window."""
+        return min(self.max_length, len(self.events))
+
+    def extend(self, events: Sequence[Hashable]) -> None:
+        for event in events:
+            self.push(event)
+
+    def evict(self, n: int = 1) -> None:
+        """Drops the n oldest events and every n-gram occurrence starting on them."""
+        for _ in range(min(n, len(self.events))):
+            node = ROOT
+            for length in range(1, self._longest() + 1):
+                key = (node, self.events[length - 1])
+                node = self._children[key]
+                starts = self._starts[node]
+                starts.popleft()
+                if len(starts) < self.min_support:
+                    self._repeated.pop(node, None)
+                if not starts:
+                    # Longer n-grams through this node have no occurrences left
+                    # either and are removed further down this walk
+                    del self._children[key], self._starts[node], self._length[node]
+            self.events.popleft()
+            self.offset += 1
+        if not self.events:
+            self._tail = []
+        elif len(self._tail) > len(self.events):
+            self._tail = self._tail[: len(self.events)]
+
+    def frequent(self) -> List[FrequentSequence]:
+        """Currently frequent runs, sorted by length and then by first occurrence."""
+        results = []
+        for node in self._repeated:
+            length = self._length[node]
+            starts = list(self._starts[node])
+            if non_overlapping_count(starts, length) >= self.min_support:
+                first = starts[0] - self.offset
+                events = tuple(self.events[i] for i in range(first, first + length))
+                results.append(FrequentSequence(events, starts))
+        results.sort(key=lambda seq: (seq.length, seq.starts[0]))
+        return results
@@ -0,0 +1,177 @@
+"""
+Sequence Mining Tests
+---------------------
+The sequence miner against the original window-by-window detector.
+"""
+
+import random
+import unittest
+from datetime import datetime, timedelta
+from types import SimpleNamespace
+from unittest.mock import patch
+
+from guardian.plugins.pattern_analyzer.main import PatternAnalyzer
+from guardian.plugins.pattern_analyzer.sequences import (
+    StreamingSequenceMiner,
+    mine_sequences,
+    repeated_windows,
+)
+
+
+def legacy_find_sequences(memories):
+    """The original cubic detector, kept as the reference."""
+
+    def to_string(sequence):
+        return ",".join(str(m.content.get("operation_type", "")) for m in sequence)
+
+    sequences = []
+    for i in range(len(memories) - 3 + 1):
+        for j in range(i + 3, len(memories) + 1):
+            sequence = memories[i:j]
+            if to_string(memories).count(to_string(sequence)) > 1:
+                sequences.append(sequence)
+    return sequences
+
+
+def make_memories(ops, start=None, prefix="m"):
+    start = start or datetime(2024, 1, 1)
+    return [
+        SimpleNamespace(
+            id=f"{prefix}{i}",
+            content={"operation_type": op},
+            confidence=0.5,
+            timestamp=start + timedelta(seconds=i),
+        )
+        for i, op in enumerate(ops)
+    ]
+
+
+class TestSequenceMining(unittest.TestCase):
+    def setUp(self):
+        with (
+            patch("guardian.plugins.pattern_analyzer.main.CodexAwareness"),
+            patch("guardian.plugins.pattern_analyzer.main.MetacognitionEngine"),
+        ):
+            self.analyzer = PatternAnalyzer({"pattern_types": ["behavioral"]})
+
+    def test_matches_legacy_detector(self):
+        rng = random.Random(3)
+        cases = [list("abcabcab"), list("aaaaaaa"), list("abab"), [], list("ab")]
+        cases += [
+            [rng.choice("abc"[: rng.randint(1, 3)]) for _ in range(rng.randint(3, 30))]
+            for _ in range(150)
+        ]
+        for ops in cases:
+            memories = make_memories(ops)
+            expected = [[m.id for m in seq] for seq in legacy_find_sequences(memories)]
+            found = self.analyzer._find_sequences(memories)
+            self.assertEqual([[m.id for m in seq] for seq in found], expected, ops)
+
+    def test_frequency_counts_non_overlapping_occurrences(self):
+        memories = make_memories("aaaaaaa")
+        frequencies = {
+            len(seq): frequency
+            for seq, frequency in self.analyzer._mine_sequences(memories)
+        }
+        # "a,a,a".count in seven a's is 2, over 5 possible starts
+        self.assertEqual(frequencies[3], 2 / 5)
+        self.assertNotIn(4, frequencies)  # Overlapping occurrences do not count
+        for length, frequency in frequencies.items():
+            seq = memories[:length]
+            self.assertEqual(
+                self.analyzer._calculate_sequence_frequency(seq, memories), frequency
+            )
+
+    def test_limits(self):
+        events = list("xyzwxyzwxyzw")
+        self.assertTrue(
+            all(
+                end - start <= 4
+                for start, end in repeated_windows(events, max_length=4)
+            )
+        )
+        self.assertEqual(
+            repeated_windows(events, min_support=3, max_length=4),
+            [(0, 3), (0, 4), (1, 4), (4, 7), (4, 8), (5, 8), (8, 11), (8, 12), (9, 12)],
+        )
+        found = mine_sequences(events, min_length=4, max_length=4, min_support=3)
+        self.assertEqual([seq.events for seq in found], [tuple("xyzw")])
+        self.assertEqual(found[0].starts, [0, 4, 8])
+
+    def test_streaming_matches_batch_over_sliding_window(self):
+        rng = random.Random(11)
+        events = [rng.choice("abcd") for _ in range(400)]
+        miner = StreamingSequenceMiner(min_length=2, max_length=6, min_support=2)
+        for i, event in enumerate(events):
+            miner.push(event)
+            if len(miner) > 50:
+                miner.evict(rng.randint(1, 3))
+            if i % 37 == 0:
+                window = list(miner.events)
+                expected = [
+                    (seq.events, [s + miner.offset for s in seq.starts])
+                    for seq in mine_sequences(window, 2, 6, 2)
+                ]
+                got = [(seq.events, seq.starts) for seq in miner.frequent()]
+                self.assertEqual(got, expected)
+        miner.evict(len(miner))
+        self.assertEqual(miner.frequent(), [])
+        self.assertEqual(miner._children, {})
+
+    def test_streaming_analysis_only_pushes_new_memories(self):
+        self.analyzer.config.update(streaming_sequences=True, sequence_window=60)
+        memories = make_memories(["sync"] * 8)
+        self.analyzer._analyze_behavioral_patterns(memories[:5])
+        patterns = self.analyzer._analyze_behavioral_patterns(memories)
+        miner, window = self.analyzer._sequence_streams["sync"]
+        self.assertEqual(len(miner), 8)  # The first five were not pushed twice
+        self.assertEqual([p.metadata["sequence_length"] for p in patterns], [3, 4])
+        self.assertEqual(patterns[0].evidence, ["m5", "m6", "m7"])
+
+        later = make_memories(
+            ["sync"] * 3, start=datetime(2024, 1, 1, 0, 5), prefix="n"
+        )
+        self.analyzer._analyze_behavioral_patterns(later)
+        self.assertEqual([m.id for m in window], ["n0", "n1", "n2"])  # Rest expired
+        self.assertEqual(miner.offset, 8)
+
+    def test_streaming_keeps_memories_that_share_the_last_timestamp(self):
+        self.analyzer.config.update(streaming_sequences=True, sequence_window=60)
+        memories = make_memories(["sync"] * 6)
+        for memory in memories[3:]:
+            memory.timestamp = memories[2].timestamp
+        self.analyzer._analyze_behavioral_patterns(memories[:4])
+        self.analyzer._analyze_behavioral_patterns(memories)
+        miner, window = self.analyzer._sequence_streams["sync"]
+        self.assertEqual([m.id for m in window], [m.id for m in memories])
+        self.assertEqual(len(miner), 6)
+
+    def test_streaming_length_bound(self):
+        self.analyzer.config.update(streaming_sequences=True, sequence_window=600)
+        memories = make_memories(["sync"] * 30)
+        streamed = self.analyzer._analyze_behavioral_patterns(memories)
+        lengths = {p.metadata["sequence_length"] for p in streamed}
+        self.assertEqual(max(lengths), 10)  # streaming_sequence_max_length
+
+        self.analyzer.config["sequence_max_length"] = 12
+        self.analyzer._sequence_streams.clear()
+        streamed = self.analyzer._analyze_behavioral_patterns(memories)
+        self.analyzer.config["streaming_sequences"] = False
+        batch = self.analyzer._analyze_behavioral_patterns(memories)
+        lengths = {p.metadata["sequence_length"] for p in streamed}
+        self.assertEqual(lengths, {p.metadata["sequence_length"] for p in batch})
+        self.assertEqual(max(lengths), 12)
+
+    def test_streaming_trie_stays_within_window_times_max_length(self):
+        rng = random.Random(5)
+        miner = StreamingSequenceMiner(min_length=3, max_length=8, min_support=2)
+        for _ in range(2000):
+            # Mostly-distinct events are the worst case: few shared prefixes
+            miner.push(rng.randrange(1000))
+            if len(miner) > 100:
+                miner.evict()
+            self.assertLessEqual(len(miner._children), len(miner) * 8)
+
+
+if __name__ == "__main__":
+    unittest.main()
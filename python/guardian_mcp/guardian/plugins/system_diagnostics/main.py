@@ -10,14 +10,20 @@ import json
 import logging
 import threading
 import time
+from collections import deque
 from datetime import datetime, timedelta
 from pathlib import Path
-from typing import Any, Dict, List, Optional
+from typing import Any, Deque, Dict, List, Optional
 
 from guardian.codex_awareness import CodexAwareness
 from guardian.metacognition import MetacognitionEngine
 from guardian.threads.thread_manager import ThreadManager
 from guardian.logging_config import configure_logging
+from guardian.plugins.system_diagnostics.scheduler import (
+    DeltaFilter,
+    DiagnosticsScheduler,
+    MonitorSchedule,
+)
 
 # Configure logging
 configure_logging()
@@ -78,12 +84,21 @@ class SystemDiagnostics:
 
         self.running = False
         self.diagnostic_thread: Optional[threading.Thread] = None
+        self.diagnostic_loop: Optional[asyncio.AbstractEventLoop] = None
         self.last_check: Optional[datetime] = None
-        self.check_results: List[DiagnosticResult] = []
+        # Ring of recent results (dashboards, error rate)
+        self.check_results: Deque[DiagnosticResult] = deque(
+            maxlen=self.config.get("max_history", 100)
+        )
         self.error_count: Dict[str, int] = {}
         self.recovery_in_progress = False
 
         self.monitors = self._initialize_monitors()
+        self.delta_filter = DeltaFilter(
+            threshold=self.config.get("delta_threshold", 0.05),
+            heartbeat=self.config.get("heartbeat_interval", 3600),
+        )
+        self.scheduler = self._create_scheduler()
 
     def _initialize_monitors(self) -> Dict[str, Any]:
         monitors = {}
@@ -108,6 +123,34 @@ class SystemDiagnostics:
 
         return monitors
 
+    def _create_scheduler(self, **kwargs: Any) -> DiagnosticsScheduler:
+        """
+        One schedule per enabled monitor. `schedule` in the config maps a
+        monitor name to its interval and timeout in seconds; monitors without
+        an entry run every `check_interval`.
+        """
+        schedule_config = self.config.get("schedule", {})
+        default_interval = self.config.get("check_interval", 300)
+        schedules = [
+            MonitorSchedule(
+                name=name,
+                monitor=monitor,
+                interval=schedule_config.get(name, {}).get(
+                    "interval", default_interval
+                ),
+                timeout=schedule_config.get(name, {}).get("timeout", 10.0),
+            )
+            for name, monitor in self.monitors.items()
+        ]
+        return DiagnosticsScheduler(
+            schedules,
+            on_results=self._record_results,
+            make_error_result=lambda schedule, message: DiagnosticResult(
+                schedule.name, "error", None, metadata={"error": message}
+            ),
+            **kwargs,
+        )
+
     class BaseMonitor:
         def __init__(self, diagnostics: "SystemDiagnostics"):
             self.diagnostics = diagnostics
@@ -388,6 +431,34 @@ class SystemDiagnostics:
             logger.error(f"Error check failed: {e}")
             return {"error": str(e), "timestamp": datetime.utcnow().isoformat()}
 
+    def _record_results(self, results: List[DiagnosticResult]) -> None:
+        """
+        Scheduler callback: every result goes into the ring; only results
+        that changed beyond the delta threshold (or are due a heartbeat) are
+        written to codex.
+        """
+        self.check_results.extend(results)
+        self.last_check = datetime.utcnow()
+        now = self.scheduler.clock()
+        changed = {
+            result.check_type: result.to_dict()
+            for result in results
+            if self.delta_filter.should_persist(result, now)
+        }
+        if changed:
+            self._persist_results(changed)
+
+    def recent_results(
+        self, check_type: Optional[str] = None, limit: Optional[int] = None
+    ) -> List[Dict[str, Any]]:
+        """Most recent results first, optionally for one check type."""
+        results = [
+            result.to_dict()
+            for result in reversed(self.check_results)
+            if check_type is None or result.check_type == check_type
+        ]
+        return results[:limit] if limit is not None else results
+
     def _store_results(self, results: Dict[str, Any]) -> None:
         try:
             for check_type, result in results.items():
@@ -401,8 +472,12 @@ class SystemDiagnostics:
                             metadata=result.get("metadata", {}),
                         )
                     )
-            while len(self.check_results) > self.config["max_history"]:
-                self.check_results.pop(0)
+            self._persist_results(results)
+        except Exception as e:
+            logger.error(f"Failed to store results: {e}")
+
+    def _persist_results(self, results: Dict[str, Any]) -> None:
+        try:
             self.codex.store_memory(
                 content={
                     "type": "diagnostic_results",
@@ -414,7 +489,7 @@ class SystemDiagnostics:
                 confidence=1.0,
             )
         except Exception as e:
-            logger.error(f"Failed to store results: {e}")
+            logger.error(f"Failed to persist results: {e}")
 
     async def _check_alerts(self, results: Dict[str, Any]) -> None:
         try:
@@ -451,32 +526,35 @@ class SystemDiagnostics:
             logger.error(f"Error handling failed: {e}")
 
     def _start_diagnostic_thread(self) -> None:
-        self.diagnostic_thread = threading.Thread(
-            target=lambda: asyncio.run(self._diagnostic_loop()), daemon=True
-        )
-        self.diagnostic_thread.start()
+        # One event loop for the lifetime of the thread; the scheduler sleeps
+        # on it between due checks
+        self.diagnostic_loop = asyncio.new_event_loop()
 
-    async def _diagnostic_loop(self) -> None:
-        """Main diagnostic loop that runs checks and updates results."""
-        while self.running:
+        def run() -> None:
+            asyncio.set_event_loop(self.diagnostic_loop)
             try:
-                # Run all monitor checks
-                for monitor_name, monitor in self.monitors.items():
-                    result = await monitor.check()
-                    self.check_results.append(result)
+                self.diagnostic_loop.run_until_complete(self._diagnostic_loop())
+            finally:
+                self.diagnostic_loop.close()
 
-                # Update last check timestamp
-                self.last_check = datetime.utcnow()
+        self.diagnostic_thread = threading.Thread(target=run, daemon=True)
+        self.diagnostic_thread.start()
 
-                # Trim results to max history
-                while len(self.check_results) > self.config.get("max_history", 100):
-                    self.check_results.pop(0)
+    def stop(self) -> None:
+        """Stops the diagnostic thread, interrupting the scheduler's sleep."""
+        self.running = False
+        loop = self.diagnostic_loop
+        if loop is not None and not loop.is_closed():
+            try:
+                loop.call_soon_threadsafe(self.scheduler.wake)
+            except RuntimeError:
+                pass  # Loop closed in the meantime
+        if self.diagnostic_thread:
+            self.diagnostic_thread.join(timeout=5.0)
 
-                # Sleep for the configured interval
-                await asyncio.sleep(self.config.get("diagnostic_interval", 1))
-            except Exception as e:
-                logger.error(f"Diagnostic loop error: {e}")
-                await asyncio.sleep(1)  # Brief pause on error
+    async def _diagnostic_loop(self) -> None:
+        """Main diagnostic loop: runs each monitor when its cadence is due."""
+        await self.scheduler.run(lambda: self.running)
 
     async def _initiate_recovery(self, component: str) -> None:
         """Initiate recovery procedures for a failing component."""
@@ -0,0 +1,165 @@
+"""
+Diagnostics Scheduler
+---------------------
+Runs SystemDiagnostics monitors on their own cadences on one event loop.
+
+- MonitorSchedule: a monitor's interval, timeout and next due time
+- DeltaFilter: decides which results are worth persisting (status change,
+  value moved beyond a relative threshold, or a heartbeat is due)
+- DiagnosticsScheduler: runs every due monitor concurrently, each under its
+  own timeout, then sleeps until the next one is due
+
+The clock and sleep are injectable so a day of scheduling can be simulated
+without waiting for it.
+"""
+
+import asyncio
+import logging
+import time
+from dataclasses import dataclass, field
+from typing import Any, Awaitable, Callable, Dict, List, Optional
+
+logger = logging.getLogger(__name__)
+
+DEFAULT_TIMEOUT = 10.0
+
+
+@dataclass
+class MonitorSchedule:
+    """When a monitor runs next, and how long a check may take."""
+
+    name: str
+    monitor: Any
+    interval: float
+    timeout: float = DEFAULT_TIMEOUT
+    next_run: float = 0.0
+    runs: int = 0
+    timeouts: int = 0
+
+
+@dataclass
+class DeltaFilter:
+    """
+    Remembers the last persisted result per check type and reports whether a
+    new one differs enough to persist: its status changed, its numeric value
+    moved by more than `threshold` (relative to the last persisted value),
+    a non-numeric value changed, or `heartbeat` seconds passed since the
+    last persisted result for that check.
+    """
+
+    threshold: float = 0.05
+    heartbeat: Optional[float] = 3600.0
+    _last: Dict[str, Any] = field(default_factory=dict)
+
+    def should_persist(self, result: Any, now: float) -> bool:
+        previous = self._last.get(result.check_type)
+        if previous is None:
+            changed = True
+        else:
+            last_result, last_time = previous
+            changed = (
+                result.status != last_result.status
+                or self._value_changed(last_result.value, result.value)
+                or (self.heartbeat is not None and now - last_time >= self.heartbeat)
+            )
+        if changed:
+            self._last[result.check_type] = (result, now)
+        return changed
+
+    def _value_changed(self, old: Any, new: Any) -> bool:
+        numeric = (int, float)
+        if (
+            isinstance(old, numeric)
+            and isinstance(new, numeric)
+            and not isinstance(old, bool)
+            and not isinstance(new, bool)
+        ):
+            if old == 0:
+                return new != 0
+            return abs(new - old) > self.threshold * abs(old)
+        return old != new
+
+
+class DiagnosticsScheduler:
+    """Cadenced, concurrent monitor execution; results go to `on_results`."""
+
+    def __init__(
+        self,
+        schedules: List[MonitorSchedule],
+        on_results: Callable[[List[Any]], Any],
+        make_error_result: Callable[[MonitorSchedule, str], Any],
+        clock: Callable[[], float] = time.monotonic,
+        sleep: Optional[Callable[[float], Awaitable[None]]] = None,
+    ) -> None:
+        self.schedules = {schedule.name: schedule for schedule in schedules}
+        self.on_results = on_results
+        self.make_error_result = make_error_result
+        self.clock = clock
+        self._sleep = sleep or self._wait
+        self._wake: Optional[asyncio.Event] = None
+        self.ticks = 0
+        now = clock()
+        for schedule in self.schedules.values():
+            schedule.next_run = now  # Everything runs once at start-up
+
+    def next_due(self) -> float:
+        return min(
+            (schedule.next_run for schedule in self.schedules.values()),
+            default=float("inf"),
+        )
+
+    async def _run_one(self, schedule: MonitorSchedule) -> Any:
+        schedule.runs += 1
+        try:
+            return await asyncio.wait_for(schedule.monitor.check(), schedule.timeout)
+        except asyncio.TimeoutError:
+            schedule.timeouts += 1
+            message = f"check timed out after {schedule.timeout}s"
+        except Exception as e:
+            message = f"check raised: {e}"
+        logger.warning(f"{schedule.name} {message}")
+        return self.make_error_result(schedule, message)
+
+    async def run_due(self) -> List[Any]:
+        """Runs every monitor that is due, concurrently, and returns their results."""
+        now = self.clock()
+        due = [s for s in self.schedules.values() if s.next_run <= now]
+        if not due:
+            return []
+        self.ticks += 1
+        results = await asyncio.gather(*(self._run_one(s) for s in due))
+        for schedule in due:
+            # Keep the cadence fixed; a stall skips missed runs rather than
+            # replaying them back to back
+            schedule.next_run += schedule.interval
+            if schedule.next_run <= now:
+                missed = int((now - schedule.next_run) // schedule.interval) + 1
+                schedule.next_run += missed * schedule.interval
+        self.on_results(results)
+        return results
+
+    async def run(self, keep_running: Callable[[], bool]) -> None:
+        """Runs due monitors and sleeps until the next is due, while keep_running()."""
+        while keep_running():
+            try:
+                await self.run_due()
+            except Exception as e:
+                logger.error(f"Diagnostics scheduler error: {e}")
+            delay = max(self.next_due() - self.clock(), 0.0)
+            if keep_running():
+                await self._sleep(delay)
+
+    async def _wait(self, delay: float) -> None:
+        """Sleeps for delay, returning early when wake() is called."""
+        if self._wake is None:
+            self._wake = asyncio.Event()
+        try:
+            await asyncio.wait_for(self._wake.wait(), delay)
+        except asyncio.TimeoutError:
+            pass
+        self._wake.clear()
+
+    def wake(self) -> None:
+        """Cuts the current sleep short (call on the scheduler's loop)."""
+        if self._wake is not None:
+            self._wake.set()
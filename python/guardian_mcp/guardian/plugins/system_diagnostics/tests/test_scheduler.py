@@ -0,0 +1,163 @@
+"""
+Diagnostics Scheduler Tests
+---------------------------
+Cadences, concurrency, timeouts and delta persistence, on a fake clock.
+"""
+
+import asyncio
+import json
+import time
+from pathlib import Path
+from unittest.mock import MagicMock
+
+from guardian.codex_awareness import CodexAwareness
+from guardian.plugins.system_diagnostics.main import DiagnosticResult, SystemDiagnostics
+from guardian.plugins.system_diagnostics.scheduler import (
+    DeltaFilter,
+    DiagnosticsScheduler,
+    MonitorSchedule,
+)
+from guardian.threads.thread_manager import ThreadManager
+
+
+class FakeClock:
+    def __init__(self):
+        self.now = 0.0
+
+    def __call__(self):
+        return self.now
+
+    async def sleep(self, delay):
+        self.now += delay
+
+
+class StubMonitor:
+    def __init__(self, name, value=1.0, delay=0.0):
+        self.name, self.value, self.delay = name, value, delay
+        self.calls = 0
+
+    async def check(self):
+        self.calls += 1
+        if self.delay:
+            await asyncio.sleep(self.delay)
+        return DiagnosticResult(self.name, "healthy", self.value, threshold=10.0)
+
+
+def make_scheduler(monitors, intervals, clock=None, timeout=1.0):
+    batches = []
+    clock = clock or FakeClock()
+    scheduler = DiagnosticsScheduler(
+        [
+            MonitorSchedule(name, monitor, intervals[name], timeout)
+            for name, monitor in monitors.items()
+        ],
+        on_results=batches.append,
+        make_error_result=lambda schedule, message: DiagnosticResult(
+            schedule.name, "error", None, metadata={"error": message}
+        ),
+        clock=clock,
+        sleep=clock.sleep,
+    )
+    return scheduler, batches, clock
+
+
+def load_config():
+    with open(Path(__file__).parent.parent / "plugin.json") as f:
+        return json.load(f)["config"]
+
+
+def test_each_monitor_runs_on_its_own_cadence():
+    monitors = {"memory": StubMonitor("memory"), "plugins": StubMonitor("plugins")}
+    scheduler, batches, clock = make_scheduler(monitors, {"memory": 30, "plugins": 300})
+    asyncio.run(scheduler.run(lambda: clock.now < 3600))
+
+    assert monitors["memory"].calls == 120
+    assert monitors["plugins"].calls == 12
+    # Both share a tick whenever their cadences line up
+    assert scheduler.ticks == 120
+    assert [r.check_type for r in batches[0]] == ["memory", "plugins"]
+
+
+def test_due_monitors_run_concurrently_and_time_out_independently():
+    monitors = {
+        "slow_a": StubMonitor("slow_a", delay=0.2),
+        "slow_b": StubMonitor("slow_b", delay=0.2),
+        "hung": StubMonitor("hung", delay=30),
+    }
+    scheduler, batches, _ = make_scheduler(
+        monitors, dict.fromkeys(monitors, 60), clock=FakeClock(), timeout=0.5
+    )
+    start = time.perf_counter()
+    results = asyncio.run(scheduler.run_due())
+    elapsed = time.perf_counter() - start
+
+    assert elapsed < 0.9  # Not 0.2 + 0.2 + 0.5 one after another
+    assert [r.status for r in results] == ["healthy", "healthy", "error"]
+    assert "timed out" in results[2].metadata["error"]
+    assert scheduler.schedules["hung"].timeouts == 1
+
+
+def test_a_stalled_scheduler_skips_missed_runs():
+    monitor = StubMonitor("memory")
+    scheduler, _, clock = make_scheduler({"memory": monitor}, {"memory": 30})
+    asyncio.run(scheduler.run_due())
+    clock.now = 95  # Missed the runs due at 30, 60 and 90
+    asyncio.run(scheduler.run_due())
+    assert monitor.calls == 2
+    assert scheduler.next_due() == 120
+
+
+def test_delta_filter_persists_changes_and_heartbeats():
+    delta = DeltaFilter(threshold=0.05, heartbeat=3600)
+
+    def persist(value, now, status="healthy"):
+        return delta.should_persist(DiagnosticResult("cpu", status, value), now)
+
+    assert persist(50.0, 0)  # First result
+    assert not persist(51.0, 10)  # Within 5% of the last stored value
+    assert not persist(52.4, 20)
+    assert persist(52.6, 30)  # More than 5% above 50
+    assert persist(52.6, 40, status="warning")
+    assert not persist(52.6, 3639, status="warning")
+    assert persist(52.6, 3640, status="warning")  # Heartbeat
+    assert persist(None, 3650, status="error") and not persist(None, 3660, "error")
+
+
+def test_system_diagnostics_persists_only_deltas():
+    config = {**load_config(), "max_history": 100}
+    diagnostics = SystemDiagnostics(config)
+    diagnostics.codex = MagicMock(spec=CodexAwareness)
+    diagnostics.thread_manager = MagicMock(spec=ThreadManager)
+    diagnostics.thread_manager.get_memory_info.return_value = {"usage_percent": 40.0}
+    diagnostics.thread_manager.get_thread_info.return_value = {
+        "active_count": 4,
+        "dead_count": 0,
+    }
+    diagnostics.thread_manager.get_plugins.return_value = []
+    diagnostics.thread_manager.get_agents.return_value = []
+    diagnostics.thread_manager.get_performance_metrics.return_value = {
+        "response_time": 100,
+        "throughput": 50,
+        "cpu_usage": 10,
+        "memory_usage": 40,
+    }
+    clock = FakeClock()
+    diagnostics.scheduler = diagnostics._create_scheduler(
+        clock=clock, sleep=clock.sleep
+    )
+
+    asyncio.run(diagnostics.scheduler.run(lambda: clock.now < 7200))
+
+    memory_runs = diagnostics.scheduler.schedules["memory"].runs
+    assert memory_runs == 7200 // config["schedule"]["memory"]["interval"]
+    assert len(diagnostics.check_results) == config["max_history"]
+    # Values never moved: the start-up results plus the heartbeat an hour in
+    stored = [
+        call.kwargs["content"]["results"]
+        for call in diagnostics.codex.store_memory.call_args_list
+    ]
+    assert len(stored) == 2
+    assert set(stored[0]) == set(diagnostics.monitors)
+
+    latest = diagnostics.recent_results("memory", limit=2)
+    assert [r["value"] for r in latest] == [40.0, 40.0]
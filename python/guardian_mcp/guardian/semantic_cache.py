@@ -0,0 +1,323 @@
+"""
+guardian.semantic_cache
+=======================
+
+Bounded semantic cache: a result is served for any query whose embedding is
+within a cosine similarity threshold of a cached query.
+
+- HashingEmbedder: dependency-free sparse vectors, term frequencies hashed
+  into a fixed number of buckets with a stable hash, L2-normalized
+- SparseIndex: inverted index over those vectors. A lookup only scores
+  entries that share one of the query's rarest terms, probing terms until
+  the rest of the query's weight could not reach the threshold on its own,
+  so the best match above the threshold is still exact.
+- Dense embeddings (any `embed` callable returning a list of floats, e.g.
+  LocalEmbedder.embed) go into memoryos' faiss VectorIndex instead
+- SemanticCache: capacity (LRU) and TTL eviction, both of which remove the
+  entry from the index, plus optional JSON persistence across restarts
+
+Usage:
+    cache = SemanticCache(threshold=0.8, max_entries=10_000, ttl=3600)
+    cache.store("how do I reset my password", answer)
+    cache.lookup("how can I reset my password")  # -> answer
+"""
+
+import heapq
+import json
+import logging
+import math
+import os
+import re
+import threading
+import time
+import zlib
+from collections import OrderedDict
+from typing import Any, Callable, Dict, List, Optional, Sequence, Tuple, Union
+
+logger = logging.getLogger(__name__)
+
+DEFAULT_FEATURES = 2**20
+WORD_RE = re.compile(r"[^\W\d_]+")
+
+SparseVector = Dict[int, float]
+Vector = Union[SparseVector, List[float]]
+
+
+class HashingEmbedder:
+    """Text -> normalized sparse term-frequency vector over hashed word buckets."""
+
+    def __init__(self, n_features: int = DEFAULT_FEATURES) -> None:
+        self.n_features = n_features
+
+    def __call__(self, text: str) -> SparseVector:
+        counts: Dict[int, float] = {}
+        for word in WORD_RE.findall(text.lower()):
+            # crc32 rather than hash(): buckets must survive a restart
+            bucket = zlib.crc32(word.encode()) % self.n_features
+            counts[bucket] = counts.get(bucket, 0.0) + 1.0
+        norm = math.sqrt(sum(v * v for v in counts.values())) or 1.0
+        return {bucket: count / norm for bucket, count in counts.items()}
+
+
+class SparseIndex:
+    """Exact best-match search over sparse unit vectors, pruned by term rarity."""
+
+    def __init__(self) -> None:
+        self._postings: Dict[int, Dict[int, float]] = {}  # term -> {key: weight}
+        self._vectors: Dict[int, SparseVector] = {}
+
+    def __len__(self) -> int:
+        return len(self._vectors)
+
+    def upsert(self, key: int, vector: SparseVector) -> None:
+        self.remove(key)
+        self._vectors[key] = vector
+        for term, weight in vector.items():
+            self._postings.setdefault(term, {})[key] = weight
+
+    def remove(self, key: int) -> None:
+        vector = self._vectors.pop(key, None)
+        if vector is None:
+            return
+        for term in vector:
+            posting = self._postings[term]
+            del posting[key]
+            if not posting:
+                del self._postings[term]
+
+    def search(self, vector: SparseVector, threshold: float) -> List[Tuple[int, float]]:
+        """Entries scoring at least `threshold`, best first."""
+        terms = [
+            (len(self._postings[term]), term, weight)
+            for term, weight in vector.items()
+            if term in self._postings
+        ]
+        terms.sort()
+        remaining = sum(weight * weight for _, _, weight in terms)
+        bound = threshold * threshold - 1e-9 if threshold > 0 else -1.0
+        candidates = set()
+        for _, term, weight in terms:
+            # Unit vectors: the unprobed terms alone score at most their norm
+            if remaining < bound:
+                break
+            candidates.update(self._postings[term])
+            remaining -= weight * weight
+
+        matches = []
+        for key in candidates:
+            other = self._vectors[key]
+            small, large = (
+                (vector, other) if len(vector) <= len(other) else (other, vector)
+            )
+            score = sum(w * large.get(t, 0.0) for t, w in small.items())
+            if score >= threshold:
+                matches.append((key, score))
+        matches.sort(key=lambda match: -match[1])
+        return matches
+
+
+class DenseIndex:
+    """Dense vectors in memoryos' faiss-backed VectorIndex."""
+
+    def __init__(self, source: Callable[[], List[Tuple[str, List[float]]]]) -> None:
+        from memoryos.vector_store.ann_index import VectorIndex
+
+        self._index = VectorIndex(source=source, lazy_delete=True)
+
+    def __len__(self) -> int:
+        return len(self._index)
+
+    def upsert(self, key: int, vector: List[float]) -> None:
+        self._index.upsert(str(key), vector)
+
+    def remove(self, key: int) -> None:
+        self._index.remove(str(key))
+
+    def search(self, vector: List[float], threshold: float) -> List[Tuple[int, float]]:
+        return [
+            (int(key), score)
+            for key, score in self._index.search(vector, top_k=8)
+            if score >= threshold
+        ]
+
+
+def _normalize(vector: Sequence[float]) -> List[float]:
+    norm = math.sqrt(sum(v * v for v in vector)) or 1.0
+    return [v / norm for v in vector]
+
+
+class SemanticCache:
+    """
+    Similarity-keyed result cache.
+
+    `embed` defaults to HashingEmbedder(); pass a dense embedding function to
+    use the faiss index instead. Lookups that hit refresh the entry's
+    recency; once `max_entries` is exceeded the least recently used entry is
+    evicted. Entries older than `ttl` seconds are never served and are
+    purged on the next store or lookup. With `path`, save() writes the live
+    entries (and their vectors) as JSON and a new cache starts from them.
+    """
+
+    def __init__(
+        self,
+        threshold: float = 0.8,
+        max_entries: Optional[int] = 10_000,
+        ttl: Optional[float] = None,
+        embed: Optional[Callable[[str], Vector]] = None,
+        path: Optional[str] = None,
+    ) -> None:
+        self.threshold = threshold
+        self.max_entries = max_entries
+        self.ttl = ttl
+        self.dense = embed is not None and not isinstance(embed, HashingEmbedder)
+        self.embed = embed or HashingEmbedder()
+        self.path = path
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+        self.expired = 0
+        # id -> (query, result, expires_at, vector), least recently used first
+        self._entries: "OrderedDict[int, tuple]" = OrderedDict()
+        self._expiry: List[Tuple[float, int]] = []  # Heap of (expires_at, id)
+        self._next_id = 0
+        self._lock = threading.Lock()
+        if self.dense:
+            self._index: Any = DenseIndex(
+                lambda: [(str(i), e[3]) for i, e in self._entries.items()]
+            )
+        else:
+            self._index = SparseIndex()
+        if path and os.path.exists(path):
+            self.load()
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+    def _vector(self, text: str) -> Vector:
+        vector = self.embed(text)
+        return vector if isinstance(vector, dict) else _normalize(vector)
+
+    # ---- Lookups ----
+    def lookup(self, query: str, threshold: Optional[float] = None) -> Optional[Any]:
+        """The result cached for the most similar query, if similar enough."""
+        vector = self._vector(query)
+        threshold = self.threshold if threshold is None else threshold
+        with self._lock:
+            self._purge_expired(time.time())
+            matches = self._index.search(vector, threshold)
+            if not matches:
+                self.misses += 1
+                return None
+            key, score = matches[0]
+            self._entries.move_to_end(key)
+            self.hits += 1
+            result = self._entries[key][1]
+        logger.debug("Semantic cache hit with score %.2f", score)
+        return result
+
+    # ---- Writes ----
+    def store(self, query: str, result: Any, ttl: Optional[float] = None) -> None:
+        vector = self._vector(query)
+        ttl = self.ttl if ttl is None else ttl
+        expires_at = time.time() + ttl if ttl is not None else None
+        with self._lock:
+            self._insert(query, result, expires_at, vector)
+            self._purge_expired(time.time())
+
+    def _insert(
+        self, query: str, result: Any, expires_at: Optional[float], vector: Vector
+    ) -> None:
+        key = self._next_id
+        self._next_id += 1
+        self._entries[key] = (query, result, expires_at, vector)
+        self._index.upsert(key, vector)
+        if expires_at is not None:
+            heapq.heappush(self._expiry, (expires_at, key))
+            if len(self._expiry) > 2 * len(self._entries) + 64:
+                # Mostly evicted ids: drop them rather than wait for expiry
+                self._expiry = [(t, k) for t, k in self._expiry if k in self._entries]
+                heapq.heapify(self._expiry)
+        while self.max_entries is not None and len(self._entries) > self.max_entries:
+            self._remove(next(iter(self._entries)))
+            self.evictions += 1
+
+    def _remove(self, key: int) -> None:
+        del self._entries[key]
+        self._index.remove(key)
+
+    def _purge_expired(self, now: float) -> None:
+        while self._expiry and self._expiry[0][0] <= now:
+            _, key = heapq.heappop(self._expiry)
+            if key in self._entries:  # Not already evicted
+                self._remove(key)
+                self.expired += 1
+
+    def clear(self) -> None:
+        with self._lock:
+            for key in list(self._entries):
+                self._remove(key)
+            self._expiry.clear()
+
+    def stats(self) -> Dict[str, Any]:
+        with self._lock:
+            return {
+                "hits": self.hits,
+                "misses": self.misses,
+                "evictions": self.evictions,
+                "expired": self.expired,
+                "entries": len(self._entries),
+                "threshold": self.threshold,
+            }
+
+    # ---- Persistence ----
+    def save(self) -> None:
+        """Writes the live entries to `path` (atomically); unserializable results are skipped."""
+        if not self.path:
+            return
+        with self._lock:
+            self._purge_expired(time.time())
+            entries = list(self._entries.values())
+        lines = []
+        for query, result, expires_at, vector in entries:
+            record = {"query": query, "result": result, "expires_at": expires_at}
+            record["vector"] = (
+                list(vector.items()) if isinstance(vector, dict) else vector
+            )
+            try:
+                lines.append(json.dumps(record))
+            except TypeError:
+                logger.debug(f"Not persisting semantic cache entry for {query!r}")
+        tmp_path = f"{self.path}.tmp"
+        try:
+            os.makedirs(os.path.dirname(self.path) or ".", exist_ok=True)
+            with open(tmp_path, "w", encoding="utf-8") as f:
+                f.write("\n".join(lines))
+            os.replace(tmp_path, self.path)
+        except OSError as e:
+            logger.exception(f"Error saving semantic cache to {self.path}: {e}")
+
+    def load(self) -> int:
+        """Adds the unexpired entries saved at `path`, oldest first; returns how many."""
+        now = time.time()
+        loaded = 0
+        try:
+            with open(self.path, encoding="utf-8") as f:
+                records = [json.loads(line) for line in f if line.strip()]
+        except (OSError, ValueError) as e:
+            logger.warning(f"Could not load semantic cache from {self.path}: {e}")
+            return 0
+        with self._lock:
+            for record in records:
+                expires_at = record.get("expires_at")
+                if expires_at is not None and expires_at <= now:
+                    continue
+                vector = record["vector"]
+                sparse = not vector or isinstance(vector[0], list)
+                if sparse != (not self.dense):
+                    # Saved with the other kind of embedding
+                    vector = self._vector(record["query"])
+                elif sparse:
+                    vector = {int(term): weight for term, weight in vector}
+                self._insert(record["query"], record["result"], expires_at, vector)
+                loaded += 1
+        return loaded
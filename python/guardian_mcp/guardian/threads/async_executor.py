@@ -10,7 +10,7 @@ import logging
 from pathlib import Path
 from typing import Any, Dict, Optional
 
-from guardian.utils.performance import rate_limited_plugin_runner
+from guardian.utils.performance import RateLimitedRunner
 from guardian.config import Config
 
 # Configure logging
@@ -24,10 +24,12 @@ class AsyncPluginExecutor:
     def __init__(self):
         """Initialize plugin executor."""
         self.manifest_path = Path("guardian/plugins/plugin_manifest.json")
+        self._runners: Dict[str, RateLimitedRunner] = {}
         self._load_manifest()
 
     def _load_manifest(self) -> None:
         """Load plugin manifest."""
+        self._runners.clear()
         if not self.manifest_path.exists():
             self.manifest = {"plugins": {}}
             return
@@ -78,6 +80,32 @@ class AsyncPluginExecutor:
 
         return True
 
+    def get_runner(self, plugin_name: str) -> RateLimitedRunner:
+        """
+        Get the plugin's rate limiter, built once from its manifest.
+
+        Args:
+            plugin_name: Name of plugin
+
+        Returns:
+            RateLimitedRunner: Limiter shared by all calls to the plugin
+        """
+        runner = self._runners.get(plugin_name)
+        if runner is None:
+            config = self.get_plugin_config(plugin_name)
+            rate_limit = 2.0  # Default 2 calls/sec
+            if "rate_limit" in config:
+                try:
+                    rate_str = config["rate_limit"]
+                    rate_limit = float(rate_str.split("/")[0])
+                except (ValueError, IndexError):
+                    logger.warning(
+                        f"Invalid rate limit format for {plugin_name}: {config['rate_limit']}"
+                    )
+            runner = RateLimitedRunner(plugin_name, rate_limit)
+            self._runners[plugin_name] = runner
+        return runner
+
     async def execute_plugin(
         self, plugin_name: str, *args: Any, **kwargs: Any
     ) -> Optional[Any]:
@@ -96,20 +124,9 @@ class AsyncPluginExecutor:
             logger.error(f"Plugin {plugin_name} validation failed")
             return None
 
-        # Get rate limit from manifest
-        config = self.get_plugin_config(plugin_name)
-        rate_limit = 2.0  # Default 2 calls/sec
-        if "rate_limit" in config:
-            try:
-                rate_str = config["rate_limit"]
-                rate_limit = float(rate_str.split("/")[0])
-            except (ValueError, IndexError):
-                logger.warning(
-                    f"Invalid rate limit format for {plugin_name}: {config['rate_limit']}"
-                )
+        if not self.get_runner(plugin_name).try_run():
+            return None
 
-        # Apply rate limiting decorator
-        @rate_limited_plugin_runner(plugin_name, rate_limit)
         async def run_plugin(*a: Any, **kw: Any) -> Optional[Any]:
             try:
                 # Import and execute plugin
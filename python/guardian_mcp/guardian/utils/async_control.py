@@ -7,8 +7,17 @@ Async-aware rate limiting, debouncing, and throttling.
 import asyncio
 import functools
 import logging
-import time
-from typing import Any, Callable, Dict, TypeVar, Optional, Awaitable
+from typing import (
+    Any,
+    AsyncContextManager,
+    Callable,
+    Dict,
+    TypeVar,
+    Optional,
+    Awaitable,
+)
+
+from guardian.utils import limiter_core
 
 # Configure logging
 logging.basicConfig(level=logging.INFO)
@@ -24,20 +33,16 @@ class AsyncRateLimiter:
     def __init__(self, rate: float):
         """Initialize rate limiter."""
         self.min_interval = 1.0 / rate
-        self.last_called = 0.0
-        self.lock = asyncio.Lock()
+        self._limiter = limiter_core.RateLimiter()
+        self._limiter.set_limit("", rate)
 
     async def acquire(self) -> None:
-        """Acquire rate limit slot."""
-        async with self.lock:
-            current_time = time.time()
-            elapsed = current_time - self.last_called
+        """Acquire rate limit slot (waiters are served in arrival order)."""
+        await self._limiter.acquire_async(spaced=True)
 
-            if elapsed < self.min_interval:
-                wait_time = self.min_interval - elapsed
-                await asyncio.sleep(wait_time)
-
-            self.last_called = time.time()
+    def slot(self) -> AsyncContextManager[None]:
+        """Acquire a slot around one call and keep it until the slot closes."""
+        return self._limiter.slot_async(spaced=True)
 
 
 class AsyncDebouncer:
@@ -94,22 +99,16 @@ class AsyncThrottler:
     def __init__(self, rate: float):
         """Initialize throttler."""
         self.min_interval = 1.0 / rate
-        self.last_called = 0.0
-        self.lock = asyncio.Lock()
+        self._limiter = limiter_core.RateLimiter()
+        self._limiter.set_limit("", rate)
 
     async def __call__(
         self, func: Callable[..., Awaitable[Any]], *args: Any, **kwargs: Any
     ) -> Any:
         """Call the throttled function."""
-        async with self.lock:
-            current_time = time.time()
-            elapsed = current_time - self.last_called
-
-            if elapsed < self.min_interval:
-                return None
-
-            self.last_called = current_time
-            return await func(*args, **kwargs)
+        if not self._limiter.try_acquire():
+            return None
+        return await func(*args, **kwargs)
 
 
 def rate_limited(name: str, rate: float) -> Callable[[AsyncF], AsyncF]:
@@ -124,9 +123,8 @@ def rate_limited(name: str, rate: float) -> Callable[[AsyncF], AsyncF]:
     def decorator(func: AsyncF) -> AsyncF:
         @functools.wraps(func)
         async def wrapper(*args: Any, **kwargs: Any) -> Any:
-            limiter = get_limiter(name)
-            await limiter.acquire()
-            return await func(*args, **kwargs)
+            async with get_limiter(name).slot():
+                return await func(*args, **kwargs)
 
         return wrapper  # type: ignore
 
@@ -8,7 +8,18 @@ import asyncio
 import functools
 import logging
 import time
-from typing import Any, Callable, Dict, List, TypeVar, Optional, Awaitable
+from typing import (
+    Any,
+    AsyncContextManager,
+    Callable,
+    Dict,
+    List,
+    TypeVar,
+    Optional,
+    Awaitable,
+)
+
+from guardian.utils import limiter_core
 
 # Configure logging
 logging.basicConfig(level=logging.INFO)
@@ -24,49 +35,16 @@ class RateController:
     def __init__(self, rate: float):
         """Initialize rate controller."""
         self.min_interval = 1.0 / rate
-        self.last_called = 0.0
-        self.lock = asyncio.Lock()
-        self.queue: List[asyncio.Future] = []
+        self._limiter = limiter_core.RateLimiter()
+        self._limiter.set_limit("", rate)
 
     async def acquire(self) -> None:
-        """Acquire rate limit slot."""
-        future = asyncio.Future()
-
-        async with self.lock:
-            self.queue.append(future)
-
-            if len(self.queue) == 1:  # First in queue
-                current_time = time.time()
-                elapsed = current_time - self.last_called
-
-                if elapsed < self.min_interval:
-                    wait_time = self.min_interval - elapsed
-                    await asyncio.sleep(wait_time)
-
-                self.last_called = time.time()
-                future.set_result(None)
-            else:
-                # Schedule next execution
-                asyncio.create_task(self._process_queue())
-
-        await future
-
-    async def _process_queue(self) -> None:
-        """Process queued requests."""
-        while True:
-            async with self.lock:
-                if not self.queue:
-                    break
+        """Acquire rate limit slot (waiters are served in arrival order)."""
+        await self._limiter.acquire_async(spaced=True)
 
-                current_time = time.time()
-                elapsed = current_time - self.last_called
-
-                if elapsed < self.min_interval:
-                    await asyncio.sleep(self.min_interval - elapsed)
-
-                self.last_called = time.time()
-                future = self.queue.pop(0)
-                future.set_result(None)
+    def slot(self) -> AsyncContextManager[None]:
+        """Acquire a slot around one call and keep it until the slot closes."""
+        return self._limiter.slot_async(spaced=True)
 
 
 class DebounceState:
@@ -140,30 +118,17 @@ class ThrottleState:
     def __init__(self, rate: float):
         """Initialize throttle state."""
         self.min_interval = 1.0 / rate
-        self.last_called = 0.0
-        self.lock = asyncio.Lock()
-        self.call_count = 0
-        self.reset_time = 0.0
+        self._limiter = limiter_core.RateLimiter()
+        self.max_burst = 2  # Allow 2 calls per interval
+        self._limiter.set_limit("", rate * self.max_burst, burst=self.max_burst)
 
     async def execute(
         self, func: Callable[..., Awaitable[Any]], args: Any, kwargs: Any
     ) -> Any:
         """Execute throttled function."""
-        async with self.lock:
-            current_time = time.time()
-
-            # Reset after interval
-            if current_time - self.reset_time >= self.min_interval:
-                self.call_count = 0
-                self.reset_time = current_time
-
-            # Check if we can execute
-            if self.call_count < 2:  # Allow 2 calls per interval
-                self.call_count += 1
-                self.last_called = current_time
-                return await func(*args, **kwargs)
-
+        if not self._limiter.try_acquire():
             return None
+        return await func(*args, **kwargs)
 
 
 def rate_limited(name: str, rate: float) -> Callable[[AsyncF], AsyncF]:
@@ -178,8 +143,8 @@ def rate_limited(name: str, rate: float) -> Callable[[AsyncF], AsyncF]:
     def decorator(func: AsyncF) -> AsyncF:
         @functools.wraps(func)
         async def wrapper(*args: Any, **kwargs: Any) -> Any:
-            await get_controller(name).acquire()
-            return await func(*args, **kwargs)
+            async with get_controller(name).slot():
+                return await func(*args, **kwargs)
 
         return wrapper  # type: ignore
 
@@ -8,7 +8,18 @@ import asyncio
 import functools
 import logging
 import time
-from typing import Any, Callable, Dict, List, TypeVar, Optional, Awaitable
+from typing import (
+    Any,
+    AsyncContextManager,
+    Callable,
+    Dict,
+    List,
+    TypeVar,
+    Optional,
+    Awaitable,
+)
+
+from guardian.utils import limiter_core
 
 # Configure logging
 logging.basicConfig(level=logging.INFO)
@@ -33,48 +44,16 @@ class RateController(FlowController):
         """Initialize rate controller."""
         super().__init__()
         self.min_interval = 1.0 / rate
-        self.last_called = 0.0
-        self.queue: List[asyncio.Future] = []
+        self._limiter = limiter_core.RateLimiter()
+        self._limiter.set_limit("", rate)
 
     async def acquire(self) -> None:
-        """Acquire rate limit slot."""
-        future = asyncio.Future()
+        """Acquire rate limit slot (waiters are served in arrival order)."""
+        await self._limiter.acquire_async(spaced=True)
 
-        async with self.lock:
-            self.queue.append(future)
-
-            if len(self.queue) == 1:  # First in queue
-                current_time = time.time()
-                elapsed = current_time - self.last_called
-
-                if elapsed < self.min_interval:
-                    wait_time = self.min_interval - elapsed
-                    await asyncio.sleep(wait_time)
-
-                self.last_called = time.time()
-                future.set_result(None)
-            else:
-                # Schedule next execution
-                asyncio.create_task(self._process_queue())
-
-        await future
-
-    async def _process_queue(self) -> None:
-        """Process queued requests."""
-        while True:
-            async with self.lock:
-                if not self.queue:
-                    break
-
-                current_time = time.time()
-                elapsed = current_time - self.last_called
-
-                if elapsed < self.min_interval:
-                    await asyncio.sleep(self.min_interval - elapsed)
-
-                self.last_called = time.time()
-                future = self.queue.pop(0)
-                future.set_result(None)
+    def slot(self) -> AsyncContextManager[None]:
+        """Acquire a slot around one call and keep it until the slot closes."""
+        return self._limiter.slot_async(spaced=True)
 
 
 class DebounceController(FlowController):
@@ -155,29 +134,17 @@ class ThrottleController(FlowController):
         """Initialize throttle controller."""
         super().__init__()
         self.min_interval = 1.0 / rate
-        self.last_called = 0.0
-        self.call_count = 0
+        self._limiter = limiter_core.RateLimiter()
         self.max_burst = max(1, int(rate))
+        self._limiter.set_limit("", rate * self.max_burst, burst=self.max_burst)
 
     async def __call__(
         self, func: Callable[..., Awaitable[Any]], *args: Any, **kwargs: Any
     ) -> Any:
         """Execute throttled function call."""
-        async with self.lock:
-            current_time = time.time()
-            elapsed = current_time - self.last_called
-
-            # Reset after interval
-            if elapsed >= self.min_interval:
-                self.call_count = 0
-                self.last_called = current_time
-
-            # Allow call if within rate limit
-            if self.call_count < self.max_burst:
-                self.call_count += 1
-                return await func(*args, **kwargs)
-
+        if not self._limiter.try_acquire():
             return None
+        return await func(*args, **kwargs)
 
 
 def rate_limited(name: str, rate: float) -> Callable[[AsyncF], AsyncF]:
@@ -192,8 +159,8 @@ def rate_limited(name: str, rate: float) -> Callable[[AsyncF], AsyncF]:
     def decorator(func: AsyncF) -> AsyncF:
         @functools.wraps(func)
         async def wrapper(*args: Any, **kwargs: Any) -> Any:
-            await get_controller(name).acquire()
-            return await func(*args, **kwargs)
+            async with get_controller(name).slot():
+                return await func(*args, **kwargs)
 
         return wrapper  # type: ignore
 
@@ -7,9 +7,10 @@ Async-aware decorators and patterns for efficient resource usage.
 import asyncio
 import functools
 import logging
-import time
 from typing import Any, Callable, Dict, TypeVar, Optional, Awaitable
 
+from guardian.utils import limiter_core
+
 # Configure logging
 logging.basicConfig(level=logging.INFO)
 logger = logging.getLogger(__name__)
@@ -22,28 +23,21 @@ AsyncF = TypeVar("AsyncF", bound=Callable[..., Awaitable[Any]])
 class RateLimiter:
     """Thread-safe rate limiter."""
 
-    def __init__(self, rate_limit: float):
+    def __init__(self, rate_limit: float, burst_size: int = 1):
         """
         Initialize rate limiter.
 
         Args:
             rate_limit: Maximum calls per second
+            burst_size: Calls allowed back to back
         """
         self.min_interval = 1.0 / rate_limit
-        self.last_called: float = 0
-        self.lock = asyncio.Lock()
+        self._limiter = limiter_core.RateLimiter()
+        self._limiter.set_limit("", rate_limit, burst=burst_size)
 
     async def acquire(self) -> None:
         """Acquire rate limit slot."""
-        async with self.lock:
-            current_time = time.time()
-            elapsed = current_time - self.last_called
-
-            if elapsed < self.min_interval:
-                wait_time = self.min_interval - elapsed
-                await asyncio.sleep(wait_time)
-
-            self.last_called = time.time()
+        await self._limiter.acquire_async(spaced=True)
 
 
 def async_rate_limited(
@@ -64,7 +58,7 @@ def async_rate_limited(
 
     def get_limiter(key: str) -> RateLimiter:
         if key not in limiters:
-            limiters[key] = RateLimiter(rate_limit)
+            limiters[key] = RateLimiter(rate_limit, burst_size)
         return limiters[key]
 
     def decorator(func: AsyncF) -> AsyncF:
@@ -161,33 +155,18 @@ def async_throttle(rate: float) -> Callable[[AsyncF], AsyncF]:
     Returns:
         Callable: Decorated function
     """
-    min_interval = 1.0 / rate
-    last_called: Dict[str, float] = {}
-    locks: Dict[str, asyncio.Lock] = {}
-
-    def get_lock(key: str) -> asyncio.Lock:
-        if key not in locks:
-            locks[key] = asyncio.Lock()
-        return locks[key]
+    # One bucket per function name, as before
+    limiter = limiter_core.RateLimiter()
+    limiter.set_limit("*", rate)
 
     def decorator(func: AsyncF) -> AsyncF:
         @functools.wraps(func)
         async def wrapper(*args: Any, **kwargs: Any) -> Any:
-            key = func.__name__
-            lock = get_lock(key)
-
-            async with lock:
-                current_time = time.time()
-
-                if key in last_called:
-                    elapsed = current_time - last_called[key]
-                    if elapsed < min_interval:
-                        # Too soon, skip call
-                        logger.debug(f"Throttled call to {func.__name__}")
-                        return None
-
-                last_called[key] = current_time
-                return await func(*args, **kwargs)
+            if not limiter.try_acquire(func.__name__):
+                # Too soon, skip call
+                logger.debug(f"Throttled call to {func.__name__}")
+                return None
+            return await func(*args, **kwargs)
 
         return wrapper  # type: ignore
 
@@ -6,10 +6,10 @@ Thread-safe async rate limiting with event loop safety.
 
 import asyncio
 import logging
-import time
 from typing import Dict, Optional
 
 from guardian.config import Config
+from guardian.utils import limiter_core
 
 # Configure logging
 logging.basicConfig(level=logging.INFO)
@@ -20,15 +20,14 @@ class GlobalCoordinator:
     """Coordinates system-wide rate limiting."""
 
     _instances: Dict[int, "GlobalCoordinator"] = {}
-    _lock = asyncio.Lock()
 
     def __init__(self):
         """Initialize coordinator."""
         self._loop = asyncio.get_running_loop()
         self._loop_id = id(self._loop)
-        self.last_operation = 0.0
         self.operation_count = 0
-        self.lock = asyncio.Lock()
+        self._limiter = limiter_core.RateLimiter()
+        self._limits: Dict[float, limiter_core.GCRA] = {}
 
     @classmethod
     async def get_instance(cls) -> "GlobalCoordinator":
@@ -36,10 +35,11 @@ class GlobalCoordinator:
         loop = asyncio.get_running_loop()
         loop_id = id(loop)
 
-        if loop_id not in cls._instances:
-            async with cls._lock:
-                if loop_id not in cls._instances:
-                    cls._instances[loop_id] = cls()
+        # No await in between, so no lock (which would tie it to one loop).
+        # A closed loop's id can be reused by a new one.
+        instance = cls._instances.get(loop_id)
+        if instance is None or instance._loop is not loop:
+            cls._instances[loop_id] = cls()
         return cls._instances[loop_id]
 
     async def check_rate(self, min_interval: float) -> None:
@@ -52,21 +52,16 @@ class GlobalCoordinator:
         if self._loop != asyncio.get_running_loop():
             raise RuntimeError("GlobalCoordinator used in wrong event loop")
 
-        async with self.lock:
-            current_time = time.time()
-            elapsed = current_time - self.last_operation
+        # Apply safe mode rate reduction if enabled
+        if Config.SAFE_MODE:
+            safe_interval = 1.0 / Config.SAFE_MODE_RATE_LIMIT
+            min_interval = max(min_interval, safe_interval)
 
-            # Apply safe mode rate reduction if enabled
-            if Config.SAFE_MODE:
-                safe_interval = 1.0 / Config.SAFE_MODE_RATE_LIMIT
-                min_interval = max(min_interval, safe_interval)
-
-            if elapsed < min_interval:
-                delay = min_interval - elapsed
-                await asyncio.sleep(delay)
-
-            self.last_operation = time.time()
-            self.operation_count += 1
+        limit = self._limits.get(min_interval)
+        if limit is None:
+            limit = self._limits[min_interval] = limiter_core.GCRA(1.0 / min_interval)
+        await self._limiter.acquire_async(limit=limit, spaced=True)
+        self.operation_count += 1
 
 
 class RateLimiter:
@@ -82,8 +77,8 @@ class RateLimiter:
         self._loop = asyncio.get_running_loop()
         self._loop_id = id(self._loop)
         self.min_interval = 1.0 / rate
-        self.last_operation = 0.0
-        self.lock = asyncio.Lock()
+        self._limiter = limiter_core.RateLimiter()
+        self._limiter.set_limit("", rate)
 
     async def acquire(self) -> None:
         """
@@ -103,15 +98,7 @@ class RateLimiter:
         await coordinator.check_rate(self.min_interval)
 
         # Enforce local limits
-        async with self.lock:
-            current_time = time.time()
-            elapsed = current_time - self.last_operation
-
-            if elapsed < self.min_interval:
-                delay = self.min_interval - elapsed
-                await asyncio.sleep(delay)
-
-            self.last_operation = time.time()
+        await self._limiter.acquire_async(spaced=True)
 
 
 def rate_limit(rate: float):
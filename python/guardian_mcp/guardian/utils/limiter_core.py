@@ -0,0 +1,567 @@
+"""
+Limiter Core
+------------
+One rate-limiting engine behind guardian.utils' limiters, throttles and
+call counters.
+
+- GCRA and TokenBucket: a rate (permits per second) plus a burst. GCRA keeps
+  one float per key (the theoretical arrival time), the token bucket keeps
+  its tokens and their timestamp; either way a decision is O(1).
+- Hierarchical keys: "plugins/weather/user:42" is charged against every
+  prefix that has a limit ("", "plugins", "plugins/weather", ...) in one
+  atomic step, so a global budget, a per-plugin budget and a per-user budget
+  all hold at once. A "parent/*" limit gives each child its own bucket.
+- try_acquire() decides now (throttling). reserve() books the earliest slot
+  every level allows and returns how long to wait, so acquire() and
+  acquire_async() sleep without holding a lock and waiters are served in
+  arrival order. slot_async() also keeps the slot until it has closed.
+- MemoryBackend keeps state per process; SQLiteBackend keeps it in one file
+  (one BEGIN IMMEDIATE transaction per decision) so several worker
+  processes share a single budget.
+
+Usage:
+    limiter = RateLimiter()
+    limiter.set_limit("", rate=50)  # Everything together
+    limiter.set_limit("plugins/*", rate=2, burst=4)  # Each plugin
+    if limiter.try_acquire("plugins/weather"):
+        ...
+    await limiter.acquire_async("plugins/weather")
+"""
+
+import asyncio
+import contextlib
+import functools
+import logging
+import os
+import sqlite3
+import threading
+import time
+from typing import (
+    Any,
+    AsyncIterator,
+    Callable,
+    Dict,
+    List,
+    Optional,
+    Sequence,
+    Tuple,
+)
+
+logger = logging.getLogger(__name__)
+
+# A key's state is a tuple of floats whose first item is the time after which
+# the key is back to a full bucket, i.e. the state could be forgotten
+State = Tuple[float, ...]
+Step = Callable[[List[Optional[State]]], Tuple[Any, Optional[List[State]]]]
+
+PRUNE_EVERY = 1024  # Decisions between sweeps of idle keys (SQLite)
+MAX_PLANS = 10_000  # Cached key -> limits resolutions
+
+
+class GCRA:
+    """Generic cell rate algorithm: `burst` permits at once, `rate` per second."""
+
+    name = "gcra"
+
+    def __init__(self, rate: float, burst: float = 1.0) -> None:
+        if rate <= 0 or burst <= 0:
+            raise ValueError(f"rate and burst must be positive, got {rate}/{burst}")
+        self.rate = rate
+        self.burst = burst
+        self.interval = 1.0 / rate
+
+    def __repr__(self) -> str:
+        return f"{type(self).__name__}(rate={self.rate}, burst={self.burst})"
+
+    def ready_at(self, state: Optional[State], now: float, cost: float) -> float:
+        """Earliest time `cost` permits conform (a cost above the burst waits for a full bucket)."""
+        if state is None:
+            return now
+        slack = (self.burst - min(cost, self.burst)) * self.interval
+        return max(now, state[0] - slack)
+
+    def take(self, state: Optional[State], at: float, cost: float) -> State:
+        tat = at if state is None else max(state[0], at)
+        return (tat + cost * self.interval,)
+
+
+class TokenBucket(GCRA):
+    """Token bucket holding up to `burst` tokens, refilled at `rate` per second."""
+
+    name = "token_bucket"
+
+    def _tokens(self, state: State, at: float) -> float:
+        _, tokens, stamp = state
+        return min(self.burst, tokens + max(0.0, at - stamp) * self.rate)
+
+    def ready_at(self, state: Optional[State], now: float, cost: float) -> float:
+        if state is None:
+            return now
+        base = max(now, state[2])
+        missing = min(cost, self.burst) - self._tokens(state, base)
+        return base if missing <= 0 else base + missing * self.interval
+
+    def take(self, state: Optional[State], at: float, cost: float) -> State:
+        if state is None:
+            tokens, stamp = self.burst - cost, at
+        else:
+            stamp = max(at, state[2])
+            tokens = self._tokens(state, stamp) - cost
+        return (stamp + (self.burst - tokens) * self.interval, tokens, stamp)
+
+
+ALGORITHMS = {cls.name: cls for cls in (GCRA, TokenBucket)}
+
+
+class MemoryBackend:
+    """Limiter state in a dict, for one process."""
+
+    clock = staticmethod(time.monotonic)
+
+    def __init__(self) -> None:
+        self._states: Dict[str, State] = {}
+        self._lock = threading.Lock()
+        self._prune_at = PRUNE_EVERY
+
+    def __len__(self) -> int:
+        return len(self._states)
+
+    def update(self, keys: Sequence[str], now: float, step: Step) -> Any:
+        """Runs step(states) atomically and stores the new states it returns."""
+        with self._lock:
+            states = self._states
+            result, new_states = step([states.get(key) for key in keys])
+            if new_states is not None:
+                for key, state in zip(keys, new_states):
+                    states[key] = state
+                if len(states) >= self._prune_at:
+                    self._prune(now)
+            return result
+
+    def _prune(self, now: float) -> None:
+        # Idle keys are back to a full bucket, the same as no state at all
+        for key in [k for k, state in self._states.items() if state[0] <= now]:
+            del self._states[key]
+        self._prune_at = max(PRUNE_EVERY, 2 * len(self._states))
+
+    def clear(self) -> None:
+        with self._lock:
+            self._states.clear()
+
+    def close(self) -> None:
+        pass
+
+
+class SQLiteBackend:
+    """
+    Limiter state in a SQLite file shared by every process that opens it.
+
+    Each decision is one BEGIN IMMEDIATE transaction (read the keys' states,
+    write the new ones), so concurrent processes are serialized by SQLite's
+    write lock. Uses the wall clock, which all processes agree on.
+    """
+
+    clock = staticmethod(time.time)
+
+    def __init__(self, db_path: str, timeout: float = 30.0) -> None:
+        self.db_path = str(db_path)
+        self.timeout = timeout
+        self._local = threading.local()
+        self._pid = os.getpid()
+        self._connections: List[sqlite3.Connection] = []
+        self._connections_lock = threading.Lock()
+        self._decisions = 0
+        conn = self._connect()
+        conn.execute(
+            "CREATE TABLE IF NOT EXISTS limiter_state ("
+            "key TEXT PRIMARY KEY, idle_at REAL NOT NULL, s1 REAL, s2 REAL)"
+        )
+
+    def _connect(self) -> sqlite3.Connection:
+        if self._pid != os.getpid():
+            # Forked: never share the parent's connections
+            self._pid = os.getpid()
+            self._local = threading.local()
+            self._connections = []
+            self._connections_lock = threading.Lock()
+        conn = getattr(self._local, "conn", None)
+        if conn is None:
+            dirname = os.path.dirname(self.db_path)
+            if dirname:
+                os.makedirs(dirname, exist_ok=True)
+            conn = sqlite3.connect(
+                self.db_path,
+                timeout=self.timeout,
+                isolation_level=None,  # Transactions are explicit
+                check_same_thread=False,  # close() may run on another thread
+            )
+            conn.execute("PRAGMA journal_mode=WAL")
+            conn.execute("PRAGMA synchronous=NORMAL")
+            self._local.conn = conn
+            with self._connections_lock:
+                self._connections.append(conn)
+        return conn
+
+    def __len__(self) -> int:
+        return (
+            self._connect().execute("SELECT COUNT(*) FROM limiter_state").fetchone()[0]
+        )
+
+    def update(self, keys: Sequence[str], now: float, step: Step) -> Any:
+        conn = self._connect()
+        conn.execute("BEGIN IMMEDIATE")
+        try:
+            placeholders = ",".join("?" * len(keys))
+            rows = conn.execute(
+                f"SELECT key, idle_at, s1, s2 FROM limiter_state "
+                f"WHERE key IN ({placeholders})",
+                list(keys),
+            ).fetchall()
+            found = {row[0]: tuple(v for v in row[1:] if v is not None) for row in rows}
+            result, new_states = step([found.get(key) for key in keys])
+            if new_states is not None:
+                conn.executemany(
+                    "INSERT OR REPLACE INTO limiter_state VALUES (?, ?, ?, ?)",
+                    [
+                        (key,) + state + (None,) * (3 - len(state))
+                        for key, state in zip(keys, new_states)
+                    ],
+                )
+                self._decisions += 1
+                if self._decisions % PRUNE_EVERY == 0:
+                    conn.execute("DELETE FROM limiter_state WHERE idle_at <= ?", (now,))
+            conn.execute("COMMIT")
+        except BaseException:
+            conn.execute("ROLLBACK")
+            raise
+        return result
+
+    def clear(self) -> None:
+        self._connect().execute("DELETE FROM limiter_state")
+
+    def close(self) -> None:
+        with self._connections_lock:
+            connections, self._connections = self._connections, []
+        for conn in connections:
+            try:
+                conn.close()
+            except sqlite3.Error as e:
+                logger.warning(f"Error closing limiter connection: {e}")
+        self._local = threading.local()
+
+
+class RateLimiter:
+    """
+    Hierarchical rate limiter over a state backend.
+
+    Limits are set per key prefix with set_limit(); a key without any limit
+    on its path is never delayed. All methods are thread-safe; the blocking
+    ones sleep after the decision, never while holding a lock.
+    """
+
+    def __init__(
+        self, backend: Optional[Any] = None, clock: Optional[Callable[[], float]] = None
+    ) -> None:
+        self.backend = backend if backend is not None else MemoryBackend()
+        self.clock = clock or self.backend.clock
+        self.granted = 0
+        self.denied = 0
+        self.waited = 0.0
+        self._limits: Dict[str, GCRA] = {}
+        self._plans: Dict[str, List[Tuple[str, GCRA]]] = {}
+        self._starts = MemoryBackend()
+
+    # ---- Configuration ----
+    def set_limit(
+        self, key: str, rate: float, burst: float = 1.0, algorithm: str = "gcra"
+    ) -> None:
+        """Limits `key` (and everything under it) to `rate` per second."""
+        try:
+            cls = ALGORITHMS[algorithm]
+        except KeyError:
+            raise ValueError(
+                f"Unknown rate limit algorithm {algorithm!r}; "
+                f"expected one of {sorted(ALGORITHMS)}"
+            ) from None
+        self._limits[key] = cls(rate, burst)
+        self._plans.clear()
+
+    def remove_limit(self, key: str) -> None:
+        self._limits.pop(key, None)
+        self._plans.clear()
+
+    def get_limit(self, key: str) -> Optional[GCRA]:
+        return self._limits.get(key)
+
+    def _plan(self, key: str) -> List[Tuple[str, GCRA]]:
+        """(state key, limit) for every level of `key` that has a limit, root first."""
+        plan = self._plans.get(key)
+        if plan is None:
+            plan = []
+            limits = self._limits
+            prefix = ""
+            parts = key.split("/") if key else []
+            for level in [""] + parts:
+                parent = prefix
+                prefix = f"{prefix}/{level}" if prefix else level
+                limit = limits.get(prefix)
+                if limit is None and prefix:
+                    limit = limits.get(f"{parent}/*" if parent else "*")
+                if limit is not None:
+                    plan.append((prefix, limit))
+            if len(self._plans) >= MAX_PLANS:
+                self._plans.clear()
+            self._plans[key] = plan
+        return plan
+
+    # ---- Decisions ----
+    def _decide(
+        self,
+        key: str,
+        cost: float,
+        max_wait: float,
+        commit: bool = True,
+        override: Optional[GCRA] = None,
+        backend: Optional[Any] = None,
+    ) -> Tuple[bool, float]:
+        """(granted, seconds to wait); commits only what it grants."""
+        plan = self._plan(key)
+        if override is not None:
+            plan = [level for level in plan if level[0] != key] + [(key, override)]
+        if not plan:
+            self.granted += 1
+            return True, 0.0
+        now = self.clock()
+
+        def step(states):  # Unannotated: annotations are evaluated per call
+            ready = now
+            for (_, limit), state in zip(plan, states):
+                at = limit.ready_at(state, now, cost)
+                if at > ready:
+                    ready = at
+            wait = ready - now
+            if wait > max_wait or not commit:
+                return (wait <= max_wait, wait), None
+            new_states = [
+                limit.take(state, ready, cost)
+                for (_, limit), state in zip(plan, states)
+            ]
+            return (True, wait), new_states
+
+        keys = [level[0] for level in plan]
+        if backend is not None:
+            return backend.update(keys, now, step)
+        granted, wait = self.backend.update(keys, now, step)
+        if commit and granted:
+            self.granted += 1
+            self.waited += wait
+        elif commit:
+            self.denied += 1
+        return granted, wait
+
+    def try_acquire(self, key: str = "", cost: float = 1.0) -> bool:
+        """Takes `cost` permits if every level has them right now."""
+        return self._decide(key, cost, 0.0)[0]
+
+    def would_allow(self, key: str = "", cost: float = 1.0) -> bool:
+        """Whether try_acquire would succeed now, without taking anything."""
+        return self._decide(key, cost, 0.0, commit=False)[0]
+
+    def reserve(
+        self,
+        key: str = "",
+        cost: float = 1.0,
+        max_wait: float = float("inf"),
+        limit: Optional[GCRA] = None,
+    ) -> Optional[float]:
+        """
+        Books the earliest slot for `cost` permits and returns the seconds
+        until it, or None (booking nothing) if that is more than `max_wait`
+        away. `limit` replaces the configured limit of `key` itself.
+        """
+        granted, wait = self._decide(key, cost, max_wait, override=limit)
+        return wait if granted else None
+
+    def acquire(
+        self,
+        key: str = "",
+        cost: float = 1.0,
+        timeout: Optional[float] = None,
+        limit: Optional[GCRA] = None,
+        spaced: bool = False,
+    ) -> bool:
+        """
+        Blocks until `cost` permits are available; False if `timeout` would be
+        exceeded. With `spaced`, actual start times are kept apart as well
+        (see _settle), at the price of some throughput.
+        """
+        wait = self.reserve(
+            key, cost, float("inf") if timeout is None else timeout, limit
+        )
+        if wait is None:
+            return False
+        slot = self.clock() + wait  # Read after booking, so never early
+        wait = self._remaining(slot, key, cost, limit, spaced)
+        while wait > 0:
+            time.sleep(wait)
+            wait = self._remaining(slot, key, cost, limit, spaced)
+        return True
+
+    async def acquire_async(
+        self,
+        key: str = "",
+        cost: float = 1.0,
+        timeout: Optional[float] = None,
+        limit: Optional[GCRA] = None,
+        spaced: bool = False,
+    ) -> bool:
+        """acquire() for coroutines: awaits the wait instead of blocking the loop."""
+        wait = self.reserve(
+            key, cost, float("inf") if timeout is None else timeout, limit
+        )
+        if wait is None:
+            return False
+        slot = self.clock() + wait  # Read after booking, so never early
+        wait = self._remaining(slot, key, cost, limit, spaced)
+        while wait > 0:
+            await asyncio.sleep(wait)
+            wait = self._remaining(slot, key, cost, limit, spaced)
+        return True
+
+    @contextlib.asynccontextmanager
+    async def slot_async(
+        self, key: str = "", cost: float = 1.0, spaced: bool = False
+    ) -> AsyncIterator[None]:
+        """
+        Holds one slot of `key` around a call: waits until the slot opens, and
+        after a call that returns, until it has closed again (cost / rate of
+        the tightest level after it opened). Back-to-back callers are then
+        paced at the rate, and n calls take at least n slots even when each
+        call is shorter than its slot.
+        """
+        await self.acquire_async(key, cost, spaced=spaced)
+        closes = self.clock() + max(
+            (cost * limit.interval for _, limit in self._plan(key)), default=0.0
+        )
+        yield
+        remaining = closes - self.clock()
+        if remaining > 0:
+            await asyncio.sleep(remaining)
+
+    def _remaining(
+        self,
+        slot: float,
+        key: str,
+        cost: float,
+        limit: Optional[GCRA],
+        spaced: bool,
+    ) -> float:
+        """Seconds a waiter still has to sleep before it may start."""
+        early = slot - self.clock()
+        if early > 0:
+            return early
+        if spaced:
+            return self._settle(key, cost, limit) or 0.0
+        return 0.0
+
+    def _settle(self, key: str, cost: float, limit: Optional[GCRA]) -> Optional[float]:
+        """
+        Records the start of a waiter that just woke up, or returns how much
+        longer it has to wait.
+
+        Timers fire late by varying amounts, so two waiters booked one
+        interval apart can wake up closer together than that. Actual start
+        times go through the limits a second time (in this process) and a
+        start that comes early by that jitter waits it out.
+        """
+        granted, wait = self._decide(
+            key, cost, 0.0, override=limit, backend=self._starts
+        )
+        return None if granted else wait
+
+    def record(self, key: str = "", cost: float = 1.0) -> None:
+        """Charges `cost` permits now even if that overdraws a level."""
+        plan = self._plan(key)
+        if not plan:
+            return
+        now = self.clock()
+
+        def step(states):  # Unannotated: annotations are evaluated per call
+            return None, [
+                limit.take(state, now, cost) for (_, limit), state in zip(plan, states)
+            ]
+
+        self.backend.update([level[0] for level in plan], now, step)
+
+    def set_backend(self, backend: Any) -> None:
+        """Switches state storage (usage so far is not carried over)."""
+        old, self.backend = self.backend, backend
+        self.clock = backend.clock
+        self._starts = MemoryBackend()
+        old.close()
+
+    def reset(self) -> None:
+        """Forgets all usage (the limits stay)."""
+        self.backend.clear()
+        self._starts.clear()
+
+    def stats(self) -> Dict[str, Any]:
+        return {
+            "granted": self.granted,
+            "denied": self.denied,
+            "waited": self.waited,
+            "limits": {key: repr(limit) for key, limit in self._limits.items()},
+        }
+
+
+def limited(
+    key: str,
+    rate: Optional[float] = None,
+    burst: float = 1.0,
+    limiter: Optional[RateLimiter] = None,
+    block: bool = True,
+) -> Callable:
+    """
+    Rate-limits a sync or async function under `key` of `limiter` (the shared
+    default_limiter by default), setting the key's limit when `rate` is given.
+    With block=False calls over the limit are skipped and return None.
+    """
+    target = default_limiter if limiter is None else limiter
+    if rate is not None:
+        target.set_limit(key, rate, burst)
+
+    def decorator(func: Callable) -> Callable:
+        if asyncio.iscoroutinefunction(func):
+
+            @functools.wraps(func)
+            async def async_wrapper(*args: Any, **kwargs: Any) -> Any:
+                if block:
+                    await target.acquire_async(key)
+                elif not target.try_acquire(key):
+                    logger.debug(f"Rate limited call to {func.__name__}")
+                    return None
+                return await func(*args, **kwargs)
+
+            return async_wrapper
+
+        @functools.wraps(func)
+        def wrapper(*args: Any, **kwargs: Any) -> Any:
+            if block:
+                target.acquire(key)
+            elif not target.try_acquire(key):
+                logger.debug(f"Rate limited call to {func.__name__}")
+                return None
+            return func(*args, **kwargs)
+
+        return wrapper
+
+    return decorator
+
+
+def use_shared_backend(db_path: str) -> None:
+    """Keeps default_limiter's state in a SQLite file shared across processes."""
+    default_limiter.set_backend(SQLiteBackend(db_path))
+
+
+# Process-wide limiter for named budgets ("models", "plugins/<name>", ...)
+default_limiter = RateLimiter()
@@ -0,0 +1,190 @@
+"""
+Online Statistics
+-----------------
+Constant-time-per-sample statistics for metric streams.
+
+- RunningStats: Welford mean/variance, with removal for sliding windows
+- EWMA: exponentially weighted moving average and variance
+- WindowedStats: last-N mean/variance plus min/max via monotonic deques
+- PeakDetector: strict local maxima found as samples arrive
+
+Variances are population variances (divided by n), matching the batch
+computations they replace.
+"""
+
+import math
+from collections import deque
+from typing import Deque, Iterable, List, Optional, Tuple
+
+
+class RunningStats:
+    """Welford's running mean and variance."""
+
+    __slots__ = ("count", "mean", "_m2")
+
+    def __init__(self) -> None:
+        self.count = 0
+        self.mean = 0.0
+        self._m2 = 0.0
+
+    def push(self, value: float) -> None:
+        self.count += 1
+        delta = value - self.mean
+        self.mean += delta / self.count
+        self._m2 += delta * (value - self.mean)
+
+    def remove(self, value: float) -> None:
+        """Takes back a previously pushed value (Welford in reverse)."""
+        if self.count <= 1:
+            self.count, self.mean, self._m2 = 0, 0.0, 0.0
+            return
+        self.count -= 1
+        delta = value - self.mean
+        self.mean -= delta / self.count
+        # Rounding can leave a tiny negative sum of squares; clamp it
+        self._m2 = max(self._m2 - delta * (value - self.mean), 0.0)
+
+    @property
+    def variance(self) -> float:
+        return self._m2 / self.count if self.count else 0.0
+
+    @property
+    def std(self) -> float:
+        return math.sqrt(self.variance)
+
+
+class EWMA:
+    """Exponentially weighted moving average and variance (West's update)."""
+
+    __slots__ = ("alpha", "mean", "variance", "count")
+
+    def __init__(self, alpha: float = 0.1) -> None:
+        if not 0.0 < alpha <= 1.0:
+            raise ValueError("alpha must be in (0, 1]")
+        self.alpha = alpha
+        self.mean = 0.0
+        self.variance = 0.0
+        self.count = 0
+
+    def push(self, value: float) -> None:
+        self.count += 1
+        if self.count == 1:
+            self.mean = value
+            return
+        delta = value - self.mean
+        increment = self.alpha * delta
+        self.mean += increment
+        self.variance = (1.0 - self.alpha) * (self.variance + delta * increment)
+
+    @property
+    def std(self) -> float:
+        return math.sqrt(self.variance)
+
+
+class WindowedStats:
+    """
+    Statistics over the last `size` samples: a ring buffer feeding a
+    RunningStats, and monotonic deques of (index, value) whose heads are the
+    window's minimum and maximum.
+    """
+
+    def __init__(self, size: int) -> None:
+        if size < 1:
+            raise ValueError("size must be >= 1")
+        self.size = size
+        self.values: Deque[float] = deque()
+        self.stats = RunningStats()
+        self._index = 0
+        self._min: Deque[Tuple[int, float]] = deque()
+        self._max: Deque[Tuple[int, float]] = deque()
+
+    def __len__(self) -> int:
+        return len(self.values)
+
+    def push(self, value: float) -> None:
+        if len(self.values) == self.size:
+            self.stats.remove(self.values.popleft())
+        self.values.append(value)
+        self.stats.push(value)
+
+        index = self._index
+        self._index += 1
+        while self._min and self._min[-1][1] >= value:
+            self._min.pop()
+        self._min.append((index, value))
+        while self._max and self._max[-1][1] <= value:
+            self._max.pop()
+        self._max.append((index, value))
+        oldest = index - len(self.values) + 1
+        if self._min[0][0] < oldest:
+            self._min.popleft()
+        if self._max[0][0] < oldest:
+            self._max.popleft()
+
+    def extend(self, values: Iterable[float]) -> None:
+        for value in values:
+            self.push(value)
+
+    @property
+    def mean(self) -> float:
+        return self.stats.mean
+
+    @property
+    def variance(self) -> float:
+        return self.stats.variance
+
+    @property
+    def std(self) -> float:
+        return self.stats.std
+
+    @property
+    def min(self) -> Optional[float]:
+        return self._min[0][1] if self._min else None
+
+    @property
+    def max(self) -> Optional[float]:
+        return self._max[0][1] if self._max else None
+
+
+class PeakDetector:
+    """
+    Strict local maxima (greater than both neighbours) of a stream. A sample
+    is confirmed as a peak once the next one arrives. Keeps the first and
+    last peak index and a count rather than the peaks themselves, which is
+    all the mean peak interval needs.
+    """
+
+    __slots__ = ("index", "count", "first", "last", "_prev", "_rising")
+
+    def __init__(self) -> None:
+        self.index = -1  # Index of the latest sample
+        self.count = 0
+        self.first: Optional[int] = None
+        self.last: Optional[int] = None
+        self._prev: Optional[float] = None
+        self._rising = False  # Whether the latest sample exceeded the one before
+
+    def push(self, value: float) -> Optional[int]:
+        """Adds a sample; returns the index of the peak it confirms, if any."""
+        self.index += 1
+        peak = None
+        if self._prev is not None:
+            if self._rising and value < self._prev:
+                peak = self.index - 1
+                self.count += 1
+                if self.first is None:
+                    self.first = peak
+                self.last = peak
+            self._rising = value > self._prev
+        self._prev = value
+        return peak
+
+    def extend(self, values: Iterable[float]) -> List[int]:
+        return [peak for peak in map(self.push, values) if peak is not None]
+
+    @property
+    def mean_interval(self) -> Optional[float]:
+        """Average distance between consecutive peaks (needs two peaks)."""
+        if self.count < 2:
+            return None
+        return (self.last - self.first) / (self.count - 1)
@@ -11,6 +11,8 @@ import time
 from typing import Any, Callable, List, Optional, TypeVar, Dict
 from collections import deque
 
+from guardian.utils import limiter_core
+
 # Configure logging
 logging.basicConfig(level=logging.INFO)
 logger = logging.getLogger(__name__)
@@ -76,24 +78,17 @@ def throttle(rate: float) -> Callable[[F], F]:
     Returns:
         Callable: Decorated function
     """
-    min_interval = 1.0 / rate
 
     def decorator(func: F) -> F:
-        last_called = 0.0
+        limiter = limiter_core.RateLimiter()
+        limiter.set_limit("", rate)
 
         @functools.wraps(func)
         def wrapper(*args: Any, **kwargs: Any) -> Any:
-            nonlocal last_called
-
-            current_time = time.time()
-            elapsed = current_time - last_called
-
-            if elapsed < min_interval:
+            if not limiter.try_acquire():
                 # Too soon, skip call
                 logger.debug(f"Throttled call to {func.__name__}")
                 return None
-
-            last_called = current_time
             return func(*args, **kwargs)
 
         return wrapper  # type: ignore
@@ -124,7 +119,12 @@ async def batch_flush(
 
 
 class RateLimitedRunner:
-    """Rate-limited execution manager for plugins."""
+    """
+    Rate-limited execution manager for plugins.
+
+    The budget is the "plugins/<name>" key of limiter_core.default_limiter,
+    so every runner for the same plugin shares it.
+    """
 
     def __init__(self, name: str, rate_limit: float = 2.0):
         """
@@ -136,27 +136,38 @@ class RateLimitedRunner:
         """
         self.name = name
         self.min_interval = 1.0 / rate_limit
-        self.last_called = 0.0
+        self.key = f"plugins/{name}"
+        self.limiter = limiter_core.default_limiter
+        limit = self.limiter.get_limit(self.key)
+        if limit is None or limit.rate != rate_limit:
+            self.limiter.set_limit(self.key, rate_limit)
         self.call_history: deque = deque(maxlen=100)
 
+    def _warn(self) -> None:
+        logger.warning(
+            f"Plugin {self.name} exceeded rate limit "
+            f"({1.0/self.min_interval:.1f}/sec)"
+        )
+
     def can_run(self) -> bool:
         """Check if execution is allowed."""
-        current_time = time.time()
-        elapsed = current_time - self.last_called
-
-        if elapsed < self.min_interval:
-            logger.warning(
-                f"Plugin {self.name} exceeded rate limit "
-                f"({1.0/self.min_interval:.1f}/sec)"
-            )
-            return False
-
-        return True
+        if self.limiter.would_allow(self.key):
+            return True
+        self._warn()
+        return False
 
     def record_call(self) -> None:
         """Record successful execution."""
-        self.last_called = time.time()
-        self.call_history.append(self.last_called)
+        self.limiter.record(self.key)
+        self.call_history.append(time.time())
+
+    def try_run(self) -> bool:
+        """can_run() and record_call() in one atomic step."""
+        if not self.limiter.try_acquire(self.key):
+            self._warn()
+            return False
+        self.call_history.append(time.time())
+        return True
 
     def get_call_count(self, window_secs: float = 60.0) -> int:
         """
@@ -190,12 +201,9 @@ def rate_limited_plugin_runner(
     def decorator(func: F) -> F:
         @functools.wraps(func)
         def wrapper(*args: Any, **kwargs: Any) -> Any:
-            if not limiter.can_run():
+            if not limiter.try_run():
                 return None
-
-            result = func(*args, **kwargs)
-            limiter.record_call()
-            return result
+            return func(*args, **kwargs)
 
         return wrapper  # type: ignore
 
@@ -1,7 +1,7 @@
 """
 Rate Limiter Module
 ----------------
-Simple, reliable rate limiting implementation.
+Simple, reliable rate limiting implementation on top of limiter_core.
 """
 
 import asyncio
@@ -9,6 +9,8 @@ import logging
 import time
 from typing import Any, Callable, Dict, Optional
 
+from guardian.utils import limiter_core
+
 # Configure logging
 logging.basicConfig(level=logging.INFO)
 logger = logging.getLogger(__name__)
@@ -25,19 +27,12 @@ class SimpleRateLimiter:
             rate: Maximum operations per second
         """
         self.min_interval = 1.0 / rate
-        self.last_call = 0.0
-        self.lock = asyncio.Lock()
+        self._limiter = limiter_core.RateLimiter()
+        self._limiter.set_limit("", rate)
 
     async def acquire(self) -> None:
         """Wait until rate limit allows execution."""
-        async with self.lock:
-            now = time.time()
-            elapsed = now - self.last_call
-
-            if elapsed < self.min_interval:
-                await asyncio.sleep(self.min_interval - elapsed)
-
-            self.last_call = time.time()
+        await self._limiter.acquire_async(spaced=True)
 
 
 def rate_limit(rate: float):
@@ -4,12 +4,12 @@ SafeGuard Module
 Centralized protection mechanisms for rate limiting, throttling, and resource management.
 """
 
-import asyncio
 import functools
 import logging
 from typing import Any, Callable, Dict, Optional, TypeVar
 
 from guardian.config import Config
+from guardian.utils import limiter_core
 from guardian.utils.async_final import rate_limited, debounced, throttled
 from guardian.cache import memoize_to_disk, lru_cache_safe
 
@@ -24,29 +24,30 @@ F = TypeVar("F", bound=Callable[..., Any])
 class SafeGuardManager:
     """Manages system-wide safety mechanisms."""
 
+    MODEL_KEY = "models"
+
     def __init__(self):
         """Initialize safety manager."""
-        self.model_call_count = 0
-        self.last_reset = 0.0
-        self.lock = asyncio.Lock()
+        self.limiter = limiter_core.default_limiter
+
+    def _model_key(self) -> str:
+        # Up to MAX_MODEL_CALLS_PER_MIN at once, refilled evenly over a minute
+        if self.limiter.get_limit(self.MODEL_KEY) is None:
+            per_minute = Config.MAX_MODEL_CALLS_PER_MIN
+            self.limiter.set_limit(self.MODEL_KEY, per_minute / 60.0, burst=per_minute)
+        return self.MODEL_KEY
 
     def can_make_model_call(self) -> bool:
         """Check if model call is allowed under current rate limits."""
-        import time
-
-        current_time = time.time()
-
-        # Reset counter after a minute
-        if current_time - self.last_reset >= 60:
-            self.model_call_count = 0
-            self.last_reset = current_time
+        return self.limiter.would_allow(self._model_key())
 
-        return self.model_call_count < Config.MAX_MODEL_CALLS_PER_MIN
+    def try_model_call(self) -> bool:
+        """Take a model call from the budget if one is left."""
+        return self.limiter.try_acquire(self._model_key())
 
     async def increment_model_calls(self) -> None:
-        """Safely increment model call counter."""
-        async with self.lock:
-            self.model_call_count += 1
+        """Count a model call against the budget."""
+        self.limiter.record(self._model_key())
 
 
 # Global manager instance
@@ -66,12 +67,11 @@ def safe_model_call(func: F) -> F:
 
     @functools.wraps(func)
     async def wrapper(*args: Any, **kwargs: Any) -> Any:
-        if not safe_guard.can_make_model_call():
+        if not safe_guard.try_model_call():
             logger.warning("Model call rate limit exceeded")
             return None
 
         try:
-            await safe_guard.increment_model_calls()
             return await func(*args, **kwargs)
         except Exception as e:
             logger.error(f"Model call failed: {e}")
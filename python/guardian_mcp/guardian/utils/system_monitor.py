@@ -181,10 +181,18 @@ class SystemMonitor:
         gc.collect()
 
         # Clear caches
-        from guardian.cache import CacheConfig
+        from guardian.cache import CacheConfig, disk_cache
 
+        try:
+            disk_cache().clear()
+        except Exception as e:
+            logger.error(f"Failed to clear disk cache: {e}")
         if CacheConfig.CACHE_DIR.exists():
+            # Left over from the JSONL memoize_to_disk; the semantic cache
+            # persists to the same directory and is kept
             for cache_file in CacheConfig.CACHE_DIR.glob("*.jsonl"):
+                if cache_file.name == CacheConfig.SEMANTIC_CACHE_FILE:
+                    continue
                 try:
                     cache_file.unlink()
                 except Exception as e:
@@ -4,12 +4,11 @@ System Rate Limiter
 Thread-safe async rate limiting with system-wide coordination.
 """
 
-import asyncio
 import logging
-import time
 from typing import Dict, Optional
 
 from guardian.config import Config
+from guardian.utils import limiter_core
 
 # Configure logging
 logging.basicConfig(level=logging.INFO)
@@ -17,24 +16,28 @@ logger = logging.getLogger(__name__)
 
 
 class GlobalRateCoordinator:
-    """Coordinates system-wide rate limiting."""
+    """
+    Coordinates system-wide rate limiting.
+
+    The spacing lives under the "system" key of limiter_core.default_limiter,
+    so it also holds across processes once that uses a shared backend.
+    """
 
     _instance: Optional["GlobalRateCoordinator"] = None
-    _lock = asyncio.Lock()
+    KEY = "system"
 
     def __init__(self):
         """Initialize coordinator."""
-        self.last_operation = 0.0
         self.operation_count = 0
-        self.lock = asyncio.Lock()
+        self._limits: Dict[float, limiter_core.GCRA] = {}
 
     @classmethod
     async def get_instance(cls) -> "GlobalRateCoordinator":
         """Get or create singleton instance."""
-        async with cls._lock:
-            if not cls._instance:
-                cls._instance = cls()
-            return cls._instance
+        # No await in between, so no lock (which would tie it to one loop)
+        if not cls._instance:
+            cls._instance = cls()
+        return cls._instance
 
     async def check_rate(self, min_interval: float) -> None:
         """
@@ -43,21 +46,18 @@ class GlobalRateCoordinator:
         Args:
             min_interval: Minimum time between operations
         """
-        async with self.lock:
-            current_time = time.time()
-            elapsed = current_time - self.last_operation
-
-            # Apply safe mode rate reduction if enabled
-            if Config.SAFE_MODE:
-                safe_interval = 1.0 / Config.SAFE_MODE_RATE_LIMIT
-                min_interval = max(min_interval, safe_interval)
+        # Apply safe mode rate reduction if enabled
+        if Config.SAFE_MODE:
+            safe_interval = 1.0 / Config.SAFE_MODE_RATE_LIMIT
+            min_interval = max(min_interval, safe_interval)
 
-            if elapsed < min_interval:
-                delay = min_interval - elapsed
-                await asyncio.sleep(delay)
-
-            self.last_operation = time.time()
-            self.operation_count += 1
+        limit = self._limits.get(min_interval)
+        if limit is None:
+            limit = self._limits[min_interval] = limiter_core.GCRA(1.0 / min_interval)
+        await limiter_core.default_limiter.acquire_async(
+            self.KEY, limit=limit, spaced=True
+        )
+        self.operation_count += 1
 
 
 class RateLimiter:
@@ -71,8 +71,8 @@ class RateLimiter:
             rate: Maximum operations per second
         """
         self.min_interval = 1.0 / rate
-        self.last_operation = 0.0
-        self.lock = asyncio.Lock()
+        self._limiter = limiter_core.RateLimiter()
+        self._limiter.set_limit("", rate)
         self._coordinator = None
 
     async def _get_coordinator(self) -> GlobalRateCoordinator:
@@ -91,15 +91,7 @@ class RateLimiter:
         await coordinator.check_rate(self.min_interval)
 
         # Then enforce local limits
-        async with self.lock:
-            current_time = time.time()
-            elapsed = current_time - self.last_operation
-
-            if elapsed < self.min_interval:
-                delay = self.min_interval - elapsed
-                await asyncio.sleep(delay)
-
-            self.last_operation = time.time()
+        await self._limiter.acquire_async(spaced=True)
 
 
 def rate_limit(rate: float):
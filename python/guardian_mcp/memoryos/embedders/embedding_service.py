@@ -0,0 +1,169 @@
+import logging
+
+logger = logging.getLogger(__name__)
+
+import hashlib
+import os
+import sqlite3
+import threading
+from collections import OrderedDict
+from typing import List, Optional
+
+import numpy as np
+
+DEFAULT_MODEL_NAME = "all-MiniLM-L6-v2"
+DEFAULT_BATCH_SIZE = 64
+MEMO_SIZE = 4096  # Recently used vectors kept in process on top of the disk cache
+
+
+def content_hash(model_name: str, text: str) -> str:
+    return hashlib.sha256(f"{model_name}\0{text}".encode("utf-8")).hexdigest()
+
+
+class EmbeddingCache:
+    """Content-hash keyed SQLite store of float32 embedding vectors."""
+
+    def __init__(self, path: str):
+        self.path = path
+        os.makedirs(os.path.dirname(os.path.abspath(path)), exist_ok=True)
+        self._lock = threading.Lock()
+        self._conn = sqlite3.connect(path, check_same_thread=False)
+        self._conn.execute("PRAGMA journal_mode=WAL")
+        self._conn.execute("PRAGMA synchronous=NORMAL")
+        self._conn.execute(
+            "CREATE TABLE IF NOT EXISTS embeddings ("
+            "hash TEXT PRIMARY KEY, dim INTEGER NOT NULL, vec BLOB NOT NULL)"
+        )
+        self._conn.commit()
+
+    def get_many(self, hashes: List[str]) -> dict:
+        found = {}
+        with self._lock:
+            # Stay well under SQLite's bound-parameter limit
+            for i in range(0, len(hashes), 500):
+                chunk = hashes[i : i + 500]
+                placeholders = ",".join("?" * len(chunk))
+                rows = self._conn.execute(
+                    f"SELECT hash, vec FROM embeddings WHERE hash IN ({placeholders})",
+                    chunk,
+                ).fetchall()
+                for h, blob in rows:
+                    found[h] = np.frombuffer(blob, dtype=np.float32)
+        return found
+
+    def put_many(self, items: dict):
+        if not items:
+            return
+        with self._lock:
+            self._conn.executemany(
+                "INSERT OR REPLACE INTO embeddings (hash, dim, vec) VALUES (?, ?, ?)",
+                [
+                    (h, int(v.shape[0]), np.asarray(v, dtype=np.float32).tobytes())
+                    for h, v in items.items()
+                ],
+            )
+            self._conn.commit()
+
+    def __len__(self):
+        with self._lock:
+            return self._conn.execute("SELECT COUNT(*) FROM embeddings").fetchone()[0]
+
+    def close(self):
+        with self._lock:
+            self._conn.close()
+
+
+class EmbeddingService:
+    """
+    Batched, deduplicating embedding front-end shared by every memory tier.
+
+    Texts are hashed together with the model name; hits come from an in-process
+    memo or the optional on-disk cache, and only the distinct misses are sent
+    to the encoder, `batch_size` at a time.
+    """
+
+    def __init__(
+        self,
+        embedder=None,
+        model_name: Optional[str] = None,
+        batch_size: int = DEFAULT_BATCH_SIZE,
+        cache_path: Optional[str] = None,
+    ):
+        self.embedder = embedder
+        self.model_name = (
+            model_name or getattr(embedder, "model_name", None) or DEFAULT_MODEL_NAME
+        )
+        self.batch_size = batch_size
+        self.cache = EmbeddingCache(cache_path) if cache_path else None
+        self._memo = OrderedDict()
+        self._memo_lock = threading.Lock()
+        self.stats = {"requested": 0, "encoded": 0, "memo_hits": 0, "disk_hits": 0}
+
+    def _encode(self, texts: List[str]) -> np.ndarray:
+        model = getattr(self.embedder, "model", None)
+        if model is not None and hasattr(model, "encode"):
+            return np.asarray(
+                model.encode(texts, batch_size=self.batch_size, convert_to_numpy=True),
+                dtype=np.float32,
+            )
+        if self.embedder is not None:
+            vecs = []
+            for i in range(0, len(texts), self.batch_size):
+                vecs.extend(self.embedder.embed_batch(texts[i : i + self.batch_size]))
+            return np.asarray(vecs, dtype=np.float32)
+
+        from memoryos.utils import get_embeddings
+
+        return get_embeddings(texts, self.model_name, batch_size=self.batch_size)
+
+    def _remember(self, h, vec):
+        with self._memo_lock:
+            self._memo[h] = vec
+            self._memo.move_to_end(h)
+            while len(self._memo) > MEMO_SIZE:
+                self._memo.popitem(last=False)
+
+    def embed_batch(self, texts: List[str]) -> List[np.ndarray]:
+        if not texts:
+            return []
+        self.stats["requested"] += len(texts)
+        hashes = [content_hash(self.model_name, t) for t in texts]
+
+        vectors = {}
+        with self._memo_lock:
+            for h in hashes:
+                vec = self._memo.get(h)
+                if vec is not None:
+                    vectors[h] = vec
+        self.stats["memo_hits"] += len(vectors)
+
+        missing = [h for h in dict.fromkeys(hashes) if h not in vectors]
+        if missing and self.cache is not None:
+            found = self.cache.get_many(missing)
+            self.stats["disk_hits"] += len(found)
+            vectors.update(found)
+            for h, vec in found.items():
+                self._remember(h, vec)
+
+        # Encode each distinct missing text once, in order of first appearance
+        to_encode = {}
+        for h, text in zip(hashes, texts):
+            if h not in vectors and h not in to_encode:
+                to_encode[h] = text
+        if to_encode:
+            encoded = self._encode(list(to_encode.values()))
+            self.stats["encoded"] += len(to_encode)
+            fresh = dict(zip(to_encode.keys(), encoded))
+            vectors.update(fresh)
+            for h, vec in fresh.items():
+                self._remember(h, vec)
+            if self.cache is not None:
+                self.cache.put_many(fresh)
+
+        return [vectors[h] for h in hashes]
+
+    def embed(self, text: str) -> np.ndarray:
+        return self.embed_batch([text])[0]
+
+    def __call__(self, text: str) -> np.ndarray:
+        return self.embed(text)
@@ -5,6 +5,7 @@ from functools import lru_cache
 class LocalEmbedder:
     def __init__(self, model_name: str = None):
         model_name = model_name or os.getenv("LOCAL_EMBEDDER_MODEL", "all-MiniLM-L6-v2")
+        self.model_name = model_name
         self.model = SentenceTransformer(model_name)
         _ = self.model.encode("preloading model")
 
@@ -21,14 +22,17 @@ class LocalEmbedder:
         """
         return self.model.encode(text).tolist()
 
-    def embed_batch(self, texts: list[str]) -> list[list[float]]:
+    def embed_batch(self, texts: list[str], batch_size: int = 32) -> list[list[float]]:
         """
         Embed a list of strings using the sentence-transformers model.
         
         Args:
             texts (list[str]): The list of texts to embed.
+            batch_size (int): Number of texts per forward pass.
         
         Returns:
             list[list[float]]: List of embedding vectors for each input string.
         """
-        return self.model.encode(texts, convert_to_numpy=False)
\ No newline at end of file
+        return self.model.encode(
+            texts, batch_size=batch_size, convert_to_numpy=True
+        ).tolist()
\ No newline at end of file
@@ -0,0 +1,223 @@
+"""
+Session heat and LFU priorities for MidTermMemory.
+
+IndexedHeap is a binary min-heap with a position map, so changing or removing
+an item's key is O(log n) instead of a rebuild of the whole heap.
+
+SessionHeatQueue keeps two of them over the mid-term sessions:
+- the heat heap, keyed by (-H_segment, session_id), the same order the old
+  rebuild-on-every-change heap used; hottest() peeks at the hottest session;
+- the LFU heap, keyed by (access_frequency, insertion order), so pop_lfu()
+  evicts the same session `min(access_frequency, key=access_frequency.get)`
+  picked (the first minimum in dict order).
+
+Recency decay is evaluated lazily. Last-visit timestamps are kept as epoch
+floats, and a session's heat key is its H_segment when it was last updated,
+an upper bound on its current heat (R_recency only decays). hottest()
+re-evaluates the decay of the top entry only, lowers its key and repeats until
+the top entry's key is exact, so nothing walks the whole store as time passes.
+"""
+
+import math
+import time
+from itertools import count
+from typing import Any, Dict, Hashable, Iterator, List, Optional, Tuple
+
+from .utils import timestamp_to_epoch
+
+
+class IndexedHeap:
+    """Min-heap of (key, item) with O(log n) push/update/remove by item."""
+
+    def __init__(self):
+        self._entries: List[Tuple[Any, Hashable]] = []
+        self._pos: Dict[Hashable, int] = {}
+
+    def __len__(self):
+        return len(self._entries)
+
+    def __contains__(self, item):
+        return item in self._pos
+
+    def __iter__(self) -> Iterator[Tuple[Any, Hashable]]:
+        return iter(self._entries)
+
+    def key(self, item):
+        return self._entries[self._pos[item]][0]
+
+    def peek(self) -> Optional[Tuple[Any, Hashable]]:
+        return self._entries[0] if self._entries else None
+
+    def set(self, item, key) -> None:
+        """Inserts item, or moves it to its new key."""
+        index = self._pos.get(item)
+        if index is None:
+            self._entries.append((key, item))
+            self._pos[item] = len(self._entries) - 1
+            self._sift_up(len(self._entries) - 1)
+            return
+        old_key = self._entries[index][0]
+        self._entries[index] = (key, item)
+        if key < old_key:
+            self._sift_up(index)
+        elif old_key < key:
+            self._sift_down(index)
+
+    def remove(self, item) -> bool:
+        index = self._pos.pop(item, None)
+        if index is None:
+            return False
+        last = self._entries.pop()
+        if index < len(self._entries):
+            self._entries[index] = last
+            self._pos[last[1]] = index
+            self._sift_up(index)
+            self._sift_down(self._pos[last[1]])
+        return True
+
+    def pop(self) -> Optional[Tuple[Any, Hashable]]:
+        top = self.peek()
+        if top is not None:
+            self.remove(top[1])
+        return top
+
+    def clear(self) -> None:
+        self._entries = []
+        self._pos = {}
+
+    def heapify(self, entries) -> None:
+        self._entries = list(entries)
+        self._pos = {item: index for index, (_, item) in enumerate(self._entries)}
+        for index in reversed(range(len(self._entries) // 2)):
+            self._sift_down(index)
+
+    def _swap(self, i, j):
+        entries = self._entries
+        entries[i], entries[j] = entries[j], entries[i]
+        self._pos[entries[i][1]] = i
+        self._pos[entries[j][1]] = j
+
+    def _sift_up(self, index):
+        entries = self._entries
+        while index > 0:
+            parent = (index - 1) // 2
+            if not entries[index] < entries[parent]:
+                break
+            self._swap(index, parent)
+            index = parent
+
+    def _sift_down(self, index):
+        entries = self._entries
+        size = len(entries)
+        while True:
+            smallest = index
+            for child in (2 * index + 1, 2 * index + 2):
+                if child < size and entries[child] < entries[smallest]:
+                    smallest = child
+            if smallest == index:
+                return
+            self._swap(index, smallest)
+            index = smallest
+
+
+class SessionHeatQueue:
+    def __init__(self, alpha=1.0, beta=1.0, gamma=1.0, tau_hours=24):
+        self.alpha = alpha
+        self.beta = beta
+        self.gamma = gamma
+        self.tau_seconds = tau_hours * 3600.0
+        self._heat = IndexedHeap()
+        self._lfu = IndexedHeap()
+        # session_id -> (alpha * N_visit + beta * L_interaction, last visit epoch)
+        self._terms: Dict[str, Tuple[float, Optional[float]]] = {}
+        self._order = count()
+        self._seq: Dict[str, int] = {}
+
+    def __len__(self):
+        return len(self._heat)
+
+    def __contains__(self, session_id):
+        return session_id in self._heat
+
+    def _recency(self, last_visit: Optional[float], now: float) -> float:
+        # Same rules as compute_segment_heat: no visit yet -> 1.0, bad timestamp -> 0.1
+        if last_visit is None:
+            return 1.0
+        if math.isnan(last_visit):
+            return 0.1
+        return math.exp(-(now - last_visit) / self.tau_seconds)
+
+    def update_heat(self, session_id: str, session: dict) -> None:
+        """Re-keys a session after its heat fields (or H_segment) changed."""
+        last_visit = session.get("last_visit_time")
+        epoch = None
+        if last_visit:
+            epoch = timestamp_to_epoch(last_visit)
+            if epoch is None:
+                epoch = math.nan
+        self._terms[session_id] = (
+            self.alpha * session.get("N_visit", 0)
+            + self.beta * session.get("L_interaction", 0),
+            epoch,
+        )
+        self._heat.set(session_id, (-session.get("H_segment", 0.0), session_id))
+
+    def update_frequency(self, session_id: str, frequency: int) -> None:
+        if session_id not in self._seq:
+            self._seq[session_id] = next(self._order)
+        self._lfu.set(session_id, (frequency, self._seq[session_id]))
+
+    def remove(self, session_id: str) -> None:
+        self._heat.remove(session_id)
+        self._lfu.remove(session_id)
+        self._terms.pop(session_id, None)
+        self._seq.pop(session_id, None)
+
+    def heat(self, session_id: str, now: Optional[float] = None) -> float:
+        """Current heat: the stored visit/length terms plus recency decayed to now."""
+        base, last_visit = self._terms[session_id]
+        now = time.time() if now is None else now
+        return base + self.gamma * self._recency(last_visit, now)
+
+    def hottest(self, now: Optional[float] = None) -> Optional[Tuple[str, float]]:
+        """(session_id, current heat) of the hottest session, or None if empty."""
+        now = time.time() if now is None else now
+        while True:
+            top = self._heat.peek()
+            if top is None:
+                return None
+            (neg_key, _), session_id = top
+            current = self.heat(session_id, now)
+            if current >= -neg_key:
+                # Keys only ever overestimate, so an exact top key wins
+                return session_id, -neg_key
+            self._heat.set(session_id, (-current, session_id))
+            if self._heat.peek()[1] == session_id:
+                return session_id, current
+
+    def peek_lfu(self) -> Optional[str]:
+        top = self._lfu.peek()
+        return top[1] if top else None
+
+    def pop_lfu(self) -> Optional[str]:
+        session_id = self.peek_lfu()
+        if session_id is not None:
+            self.remove(session_id)
+        return session_id
+
+    def entries(self) -> List[Tuple[float, str]]:
+        """(-heat key, session_id) pairs, hottest first."""
+        return sorted(key for key, _ in self._heat)
+
+    def rebuild(self, sessions: Dict[str, dict], frequencies: Dict[str, int]) -> None:
+        self._heat.clear()
+        self._lfu.clear()
+        self._terms = {}
+        self._seq = {}
+        for session_id, session in sessions.items():
+            self.update_heat(session_id, session)
+        lfu_entries = []
+        for session_id, frequency in frequencies.items():
+            self._seq[session_id] = next(self._order)
+            lfu_entries.append(((frequency, self._seq[session_id]), session_id))
+        self._lfu.heapify(lfu_entries)
@@ -0,0 +1,102 @@
+"""
+Local keyword extraction and keyword ids for MidTermMemory.
+
+rake_keywords is a RAKE-style extractor (Rapid Automatic Keyword Extraction):
+candidate phrases are the runs of words between stopwords and punctuation,
+each word scores degree / frequency and a phrase scores the sum of its words.
+It needs no network, so it backs llm_extract_keywords_batch whenever there is
+no client or the LLM reply can't be parsed.
+
+KeywordVocabulary interns keyword strings as ints, so session keyword sets are
+built once and keyword overlap is computed over small int sets.
+"""
+
+import re
+from collections import Counter, defaultdict
+from typing import Dict, FrozenSet, Iterable, List, Tuple
+
+MAX_PHRASE_WORDS = 3
+
+STOPWORDS = frozenset(
+    """
+    a about above after again against all also am an and any are as at be because
+    been before being below between both but by can could did do does doing done
+    down during each few for from further get got had has have having he her here
+    hers herself him himself his how i if in into is it its itself just let like
+    me more most my myself no nor not now of off on once only or other our ours
+    ourselves out over own really same she should so some such than that the
+    their theirs them themselves then there these they this those through to too
+    under until up very was we were what when where which while who whom why will
+    with would you your yours yourself yourselves okay ok yes yeah sure please
+    thanks thank hi hello well one thing things something make use want need know
+    think go going
+    user assistant
+    """.split()
+)  # "user"/"assistant" are the speaker labels MidTermMemory puts in page text
+
+_SPLIT = re.compile(r"[.,;:!?()\[\]{}\"\n\r\t]+|\s[-–—]\s")
+_WORD = re.compile(r"[a-z0-9][a-z0-9+#'_-]*")
+
+
+def _candidate_phrases(text: str) -> List[Tuple[str, ...]]:
+    phrases = []
+    for chunk in _SPLIT.split(text.lower()):
+        phrase: List[str] = []
+        for word in _WORD.findall(chunk):
+            word = word.strip("'-_")
+            if not word or word in STOPWORDS or word.isdigit():
+                if phrase:
+                    phrases.append(tuple(phrase))
+                phrase = []
+                continue
+            phrase.append(word)
+            if len(phrase) == MAX_PHRASE_WORDS:
+                phrases.append(tuple(phrase))
+                phrase = []
+        if phrase:
+            phrases.append(tuple(phrase))
+    return phrases
+
+
+def rake_keywords(text: str, max_keywords: int = 5) -> List[str]:
+    """Top phrases of text by RAKE score, best first."""
+    phrases = _candidate_phrases(text or "")
+    if not phrases:
+        return []
+    frequency: Counter = Counter()
+    degree: Dict[str, int] = defaultdict(int)
+    for phrase in phrases:
+        for word in phrase:
+            frequency[word] += 1
+            degree[word] += len(phrase)
+    scored: Dict[Tuple[str, ...], float] = {}
+    for phrase in phrases:
+        if phrase not in scored:
+            scored[phrase] = sum(degree[w] / frequency[w] for w in phrase)
+    # Phrases seen more often rank higher among equal scores; first seen wins ties
+    counts = Counter(phrases)
+    ranked = sorted(scored, key=lambda p: (-scored[p], -counts[p]))
+    return [" ".join(phrase) for phrase in ranked[:max_keywords]]
+
+
+class KeywordVocabulary:
+    """Interns keywords as-is (no case folding), matching set-of-strings overlap."""
+
+    def __init__(self):
+        self._ids: Dict[str, int] = {}
+
+    def __len__(self):
+        return len(self._ids)
+
+    def add(self, keywords: Iterable[str]) -> FrozenSet[int]:
+        """Ids of keywords, assigning new ids to unseen ones."""
+        return frozenset(
+            self._ids.setdefault(keyword, len(self._ids))
+            for keyword in keywords
+            if keyword
+        )
+
+    def lookup(self, keywords: Iterable[str]) -> Tuple[FrozenSet[int], int]:
+        """(ids of the known keywords, number of distinct keywords)."""
+        distinct = {keyword for keyword in keywords if keyword}
+        return frozenset(self._ids[k] for k in distinct if k in self._ids), len(distinct)
@@ -0,0 +1,219 @@
+import logging
+
+logger = logging.getLogger(__name__)
+
+import asyncio
+import hashlib
+import json
+import os
+import random
+import sqlite3
+import threading
+from typing import List, Optional
+
+from openai import AsyncOpenAI
+
+LLM_ERROR_RESPONSE = "Error: Could not get response from LLM."
+NON_RETRYABLE_STATUS = {400, 401, 403, 404, 422}
+
+
+def request_hash(model, messages, temperature, max_tokens) -> str:
+    payload = json.dumps(
+        {
+            "model": model,
+            "messages": messages,
+            "temperature": temperature,
+            "max_tokens": max_tokens,
+        },
+        sort_keys=True,
+        ensure_ascii=False,
+    )
+    return hashlib.sha256(payload.encode("utf-8")).hexdigest()
+
+
+class LLMResponseCache:
+    """SQLite store of completions for deterministic (temperature 0) requests."""
+
+    def __init__(self, path: str):
+        self.path = path
+        os.makedirs(os.path.dirname(os.path.abspath(path)), exist_ok=True)
+        self._lock = threading.Lock()
+        self._conn = sqlite3.connect(path, check_same_thread=False)
+        self._conn.execute("PRAGMA journal_mode=WAL")
+        self._conn.execute(
+            "CREATE TABLE IF NOT EXISTS llm_responses ("
+            "hash TEXT PRIMARY KEY, model TEXT, response TEXT NOT NULL, "
+            "created_at REAL DEFAULT (strftime('%s','now')))"
+        )
+        self._conn.commit()
+
+    def get(self, key: str) -> Optional[str]:
+        with self._lock:
+            row = self._conn.execute(
+                "SELECT response FROM llm_responses WHERE hash = ?", (key,)
+            ).fetchone()
+        return row[0] if row else None
+
+    def put(self, key: str, model: str, response: str):
+        with self._lock:
+            self._conn.execute(
+                "INSERT OR REPLACE INTO llm_responses (hash, model, response) VALUES (?, ?, ?)",
+                (key, model, response),
+            )
+            self._conn.commit()
+
+
+class AsyncLLMClient:
+    """
+    Concurrent OpenAI-compatible chat client.
+
+    - at most `max_concurrency` requests in flight
+    - retries with exponential backoff and jitter on transient errors
+    - `timeout` is a per-call deadline covering every retry
+    - temperature-0 responses are cached by request hash when `cache_path` is set
+    - `gather` runs a batch of requests and returns responses in order
+
+    The client owns a background event loop, so synchronous callers can use
+    `run` / `gather_sync` and coroutines can await it from any loop.
+    """
+
+    def __init__(
+        self,
+        api_key,
+        base_url=None,
+        max_concurrency=8,
+        max_retries=3,
+        backoff_base=0.5,
+        backoff_max=8.0,
+        timeout=60.0,
+        cache_path=None,
+    ):
+        self.api_key = api_key
+        self.base_url = base_url if base_url else "https://api.openai.com/v1"
+        self.max_concurrency = max_concurrency
+        self.max_retries = max_retries
+        self.backoff_base = backoff_base
+        self.backoff_max = backoff_max
+        self.timeout = timeout
+        self.cache = LLMResponseCache(cache_path) if cache_path else None
+        self.stats = {"calls": 0, "cache_hits": 0, "retries": 0, "failures": 0}
+        self._loop = None
+        self._loop_lock = threading.Lock()
+        self._client = None  # Created on the client loop
+        self._semaphore = None
+
+    # ---- Event loop plumbing ----
+    def _ensure_loop(self):
+        with self._loop_lock:
+            if self._loop is None:
+                self._loop = asyncio.new_event_loop()
+                threading.Thread(
+                    target=self._loop.run_forever, name="async-llm-client", daemon=True
+                ).start()
+        return self._loop
+
+    async def _on_loop(self, coro):
+        loop = self._ensure_loop()
+        try:
+            running = asyncio.get_running_loop()
+        except RuntimeError:
+            running = None
+        if running is loop:
+            return await coro
+        return await asyncio.wrap_future(asyncio.run_coroutine_threadsafe(coro, loop))
+
+    def run(self, coro):
+        """Runs a coroutine on the client loop and blocks for its result."""
+        return asyncio.run_coroutine_threadsafe(coro, self._ensure_loop()).result()
+
+    def close(self):
+        if self._loop is None:
+            return
+        if self._client is not None:
+            self.run(self._client.close())
+        self._loop.call_soon_threadsafe(self._loop.stop)
+        self._loop = None
+        self._client = None
+        self._semaphore = None
+
+    # ---- Requests ----
+    def _is_retryable(self, exc):
+        status = getattr(exc, "status_code", None)
+        return status not in NON_RETRYABLE_STATUS
+
+    async def _complete(self, model, messages, temperature, max_tokens, timeout):
+        if self._client is None:
+            # max_retries=0: the retry policy lives here, not in the SDK
+            self._client = AsyncOpenAI(
+                api_key=self.api_key, base_url=self.base_url, max_retries=0
+            )
+            self._semaphore = asyncio.Semaphore(self.max_concurrency)
+
+        key = None
+        if self.cache is not None and temperature == 0:
+            key = request_hash(model, messages, temperature, max_tokens)
+            cached = self.cache.get(key)
+            if cached is not None:
+                self.stats["cache_hits"] += 1
+                return cached
+
+        loop = asyncio.get_running_loop()
+        deadline = loop.time() + (timeout if timeout is not None else self.timeout)
+        attempt = 0
+        while True:
+            remaining = deadline - loop.time()
+            try:
+                if remaining <= 0:
+                    raise asyncio.TimeoutError()
+                async with self._semaphore:
+                    self.stats["calls"] += 1
+                    response = await asyncio.wait_for(
+                        self._client.chat.completions.create(
+                            model=model,
+                            messages=messages,
+                            temperature=temperature,
+                            max_tokens=max_tokens,
+                        ),
+                        timeout=remaining,
+                    )
+                content = response.choices[0].message.content.strip()
+                if key is not None:
+                    self.cache.put(key, model, content)
+                return content
+            except Exception as e:
+                delay = min(self.backoff_max, self.backoff_base * (2**attempt))
+                delay *= 0.5 + random.random() / 2  # Jitter
+                out_of_time = deadline - loop.time() <= delay
+                if (
+                    attempt >= self.max_retries
+                    or out_of_time
+                    or not self._is_retryable(e)
+                ):
+                    self.stats["failures"] += 1
+                    logger.error(
+                        f"Error calling OpenAI API after {attempt + 1} attempt(s): {e!r}"
+                    )
+                    return LLM_ERROR_RESPONSE
+                attempt += 1
+                self.stats["retries"] += 1
+                logger.warning(
+                    f"LLM call failed ({e!r}); retry {attempt}/{self.max_retries} in {delay:.2f}s"
+                )
+                await asyncio.sleep(delay)
+
+    async def chat_completion(
+        self, model, messages, temperature=0.7, max_tokens=2000, timeout=None
+    ):
+        logger.info(f"Calling OpenAI API (async). Model: {model}")
+        return await self._on_loop(
+            self._complete(model, messages, temperature, max_tokens, timeout)
+        )
+
+    async def gather(self, requests: List[dict]) -> List[str]:
+        """Runs chat_completion for each kwargs dict concurrently; results keep request order."""
+        return await asyncio.gather(
+            *(self.chat_completion(**request) for request in requests)
+        )
+
+    def gather_sync(self, requests: List[dict]) -> List[str]:
+        return self.run(self.gather(requests))
@@ -5,19 +5,94 @@ logger = logging.getLogger(__name__)
 import json
 from collections import deque
 import memoryos.prompts as prompts
-import faiss
-import numpy as np
 from memoryos.utils import (
+    embed_texts,
     ensure_directory_exists,
     get_embedding,
+    get_query_embedding,
     get_timestamp,
     normalize_vector,
 )
+from memoryos.storage.backends import JsonExportMixin, SequenceKeys, make_storage
+from memoryos.vector_store.ann_index import VectorIndex
+
+
+class KnowledgeIndex:
+    """
+    Long-lived vector index mirroring one knowledge deque.
+
+    Appends are indexed incrementally; entries pushed out by the deque's maxlen
+    are tombstoned and the index is compacted once enough of them accumulate.
+    """
+
+    def __init__(self, knowledge_deque: deque, version: int = 0):
+        self.knowledge_deque = knowledge_deque
+        self.version = version  # Owner's mutation count this index reflects
+        self.entries = {}  # {key: entry}
+        self.keys = deque()  # Keys in the same order as knowledge_deque
+        self.next_key = 0
+        self.index = VectorIndex(source=self._live_embeddings, lazy_delete=True)
+        self.rebuild()
+
+    def _live_embeddings(self):
+        return ((k, self.entries[k].get("knowledge_embedding")) for k in self.keys)
+
+    def _track(self, entry):
+        key = str(self.next_key)
+        self.next_key += 1
+        self.entries[key] = entry
+        self.keys.append(key)
+        return key
+
+    def rebuild(self):
+        self.entries = {}
+        self.keys = deque()
+        for entry in self.knowledge_deque:
+            if not entry.get("knowledge_embedding"):
+                logger.warning(
+                    f"Warning: Entry without embedding found in knowledge_deque: {entry.get('knowledge','N/A')[:50]}"
+                )
+            self._track(entry)
+        self.index.rebuild()
+
+    def in_sync(self, knowledge_deque: deque, version: int):
+        return (
+            self.knowledge_deque is knowledge_deque
+            and self.version == version
+            and len(self.keys) == len(knowledge_deque)
+        )
+
+    def append(self, entry):
+        """Appends to the deque and the index, tombstoning the entry maxlen evicts."""
+        maxlen = self.knowledge_deque.maxlen
+        if maxlen is not None and len(self.knowledge_deque) >= maxlen and self.keys:
+            dropped_key = self.keys.popleft()
+            self.entries.pop(dropped_key, None)
+            self.index.remove(dropped_key)
+        self.knowledge_deque.append(entry)
+        key = self._track(entry)
+        self.index.upsert(key, entry["knowledge_embedding"])
+
+    def search(self, query_vec, threshold=0.1, top_k=5):
+        hits = self.index.search(query_vec, min(top_k, len(self.index)))
+        return [self.entries[key] for key, score in hits if score >= threshold]
 
 
-class LongTermMemory:
-    def __init__(self, file_path, knowledge_capacity=100):
+EMPTY_KNOWLEDGE_MARKERS = ["", "none", "- none", "- none."]
+
+
+class LongTermMemory(JsonExportMixin):
+    def __init__(
+        self,
+        file_path,
+        knowledge_capacity=100,
+        embedding_service=None,
+        storage="oplog",
+    ):
         self.file_path = file_path
+        # Shared with the other tiers so knowledge and queries hit one vector
+        # cache; unset, get_embedding is called per text
+        self.embedding_service = embedding_service
         ensure_directory_exists(self.file_path)
         self.knowledge_capacity = knowledge_capacity
         self.user_profiles = (
@@ -31,8 +106,42 @@ class LongTermMemory:
             maxlen=self.knowledge_capacity
         )  # For assistant specific knowledge
         self.conversation_summaries = {}
+        self._knowledge_indexes = {}  # {id(deque): KnowledgeIndex}
+        self._knowledge_versions = {}  # {id(deque): mutation count}
+        # "oplog" appends only changed records; "json" rewrites file_path on every save
+        self.storage = make_storage(storage, self.file_path)
+        self._knowledge_keys = SequenceKeys("knowledge")
+        self._assistant_keys = SequenceKeys("assistant_knowledge")
         self.load()
 
+    def mark_knowledge_changed(self, knowledge_deque: deque) -> int:
+        """
+        Records an edit to a knowledge deque made outside add_knowledge_entries,
+        so its index is rebuilt before the next search. Returns the new count.
+        """
+        version = self._knowledge_versions.get(id(knowledge_deque), 0) + 1
+        self._knowledge_versions[id(knowledge_deque)] = version
+        return version
+
+    def _knowledge_index_for(self, knowledge_deque: deque) -> KnowledgeIndex:
+        """Returns the index for a deque, rebuilding it if the deque was replaced or edited."""
+        version = self._knowledge_versions.get(id(knowledge_deque), 0)
+        state = self._knowledge_indexes.get(id(knowledge_deque))
+        if state is None or state.knowledge_deque is not knowledge_deque:
+            live = {id(self.knowledge_base), id(self.assistant_knowledge)}
+            self._knowledge_indexes = {
+                k: v for k, v in self._knowledge_indexes.items() if k in live
+            }
+            self._knowledge_versions = {
+                k: v for k, v in self._knowledge_versions.items() if k in live
+            }
+            state = KnowledgeIndex(knowledge_deque, version)
+            self._knowledge_indexes[id(knowledge_deque)] = state
+        elif not state.in_sync(knowledge_deque, version):
+            state.rebuild()
+            state.version = version
+        return state
+
     def update_user_profile(self, user_id, new_data, merge=True):
         if (
             merge
@@ -63,30 +172,41 @@ class LongTermMemory:
     def get_user_profile_data(self, user_id):
         return self.user_profiles.get(user_id, {})
 
-    def add_knowledge_entry(
-        self, knowledge_text, knowledge_deque: deque, type_name="knowledge"
+    def add_knowledge_entries(
+        self, knowledge_texts, knowledge_deque: deque, type_name="knowledge"
     ):
-        if not knowledge_text or knowledge_text.strip().lower() in [
-            "",
-            "none",
-            "- none",
-            "- none.",
-        ]:
+        """Embeds all non-empty texts in one batch, appends them and saves once."""
+        texts = [
+            t
+            for t in knowledge_texts
+            if t and t.strip().lower() not in EMPTY_KNOWLEDGE_MARKERS
+        ]
+        if not texts:
             logger.info(f"LongTermMemory: Empty {type_name} received, not saving.")
             return
 
         # If deque is full, the oldest item is automatically removed when appending.
-        vec = get_embedding(knowledge_text)
-        vec = normalize_vector(vec).tolist()
-        entry = {
-            "knowledge": knowledge_text,
-            "timestamp": get_timestamp(),
-            "knowledge_embedding": vec,
-        }
-        knowledge_deque.append(entry)
-        logger.info(f"LongTermMemory: Added {type_name}. Current count: {len(knowledge_deque)}.")
+        vecs = embed_texts(texts, self.embedding_service, embed_fn=get_embedding)
+        state = self._knowledge_index_for(knowledge_deque)
+        for knowledge_text, vec in zip(texts, vecs):
+            entry = {
+                "knowledge": knowledge_text,
+                "timestamp": get_timestamp(),
+                "knowledge_embedding": normalize_vector(vec).tolist(),
+            }
+            state.append(entry)
+            # The index was updated alongside the deque, so it stays in sync
+            state.version = self.mark_knowledge_changed(knowledge_deque)
+        logger.info(
+            f"LongTermMemory: Added {len(texts)} {type_name}. Current count: {len(knowledge_deque)}."
+        )
         self.save()
 
+    def add_knowledge_entry(
+        self, knowledge_text, knowledge_deque: deque, type_name="knowledge"
+    ):
+        self.add_knowledge_entries([knowledge_text], knowledge_deque, type_name)
+
     def add_user_knowledge(self, knowledge_text):
         self.add_knowledge_entry(knowledge_text, self.knowledge_base, "user knowledge")
 
@@ -95,6 +215,16 @@ class LongTermMemory:
             knowledge_text, self.assistant_knowledge, "assistant knowledge"
         )
 
+    def add_user_knowledge_batch(self, knowledge_texts):
+        self.add_knowledge_entries(
+            knowledge_texts, self.knowledge_base, "user knowledge"
+        )
+
+    def add_assistant_knowledge_batch(self, knowledge_texts):
+        self.add_knowledge_entries(
+            knowledge_texts, self.assistant_knowledge, "assistant knowledge"
+        )
+
     def get_user_knowledge(self):
         return list(self.knowledge_base)
 
@@ -107,53 +237,15 @@ class LongTermMemory:
         if not knowledge_deque:
             return []
 
-        query_vec = get_embedding(query)
-        query_vec = normalize_vector(query_vec)
-
-        embeddings = []
-        valid_entries = []
-        for entry in knowledge_deque:
-            if "knowledge_embedding" in entry and entry["knowledge_embedding"]:
-                embeddings.append(
-                    np.array(entry["knowledge_embedding"], dtype=np.float32)
-                )
-                valid_entries.append(entry)
-            else:
-                print(
-                    logger.warning(f"Warning: Entry without embedding found in knowledge_deque: {entry.get('knowledge','N/A')[:50]}")
-                )
-
-        if not embeddings:
-            return []
-
-        embeddings_np = np.array(embeddings, dtype=np.float32)
-        if embeddings_np.ndim == 1:  # Single item case
-            if embeddings_np.shape[0] == 0:
-                return []  # Empty embeddings
-            embeddings_np = embeddings_np.reshape(1, -1)
-
-        if embeddings_np.shape[0] == 0:  # No valid embeddings
-            return []
-
-        dim = embeddings_np.shape[1]
-        index = faiss.IndexFlatIP(dim)  # Using Inner Product for similarity
-        index.add(embeddings_np)
-
-        query_arr = np.array([query_vec], dtype=np.float32)
-        distances, indices = index.search(
-            query_arr, min(top_k, len(valid_entries))
-        )  # Search at most k or length of valid_entries
-
-        results = []
-        for i, idx in enumerate(indices[0]):
-            if idx != -1:  # faiss returns -1 for no valid index
-                similarity_score = float(
-                    distances[0][i]
-                )  # For IndexFlatIP, distance is the dot product (similarity)
-                if similarity_score >= threshold:
-                    results.append(valid_entries[idx])  # Add the original entry dict
-
-        return results  # FAISS with IndexFlatIP already returns sorted by descending similarity
+        # Reuses the turn's query embedding if a query_embedding_scope is active
+        embed_fn = (
+            self.embedding_service.embed if self.embedding_service else get_embedding
+        )
+        query_vec = get_query_embedding(query, embed_fn=embed_fn)
+        # FAISS with IndexFlatIP returns results sorted by descending similarity
+        return self._knowledge_index_for(knowledge_deque).search(
+            query_vec, threshold=threshold, top_k=top_k
+        )
 
     def search_user_knowledge(self, query, threshold=0.1, top_k=5):
         results = self._search_knowledge_deque(
@@ -169,8 +261,9 @@ class LongTermMemory:
         logger.info(f"LongTermMemory: Searched assistant knowledge for '{query[:30]}...'. Found {len(results)} matches.")
         return results
 
-    def save(self):
-        data = {
+    # ---- Storage hooks (see memoryos.storage.backends) ----
+    def _to_document(self):
+        return {
             "user_profiles": self.user_profiles,
             "knowledge_base": list(
                 self.knowledge_base
@@ -178,28 +271,69 @@ class LongTermMemory:
             "assistant_knowledge": list(self.assistant_knowledge),
             "conversation_summaries": getattr(self, "conversation_summaries", {}),
         }
+
+    def _from_document(self, data):
+        self.user_profiles = data.get("user_profiles", {})
+        # Load into deques, respecting maxlen
+        kb_data = data.get("knowledge_base", [])
+        self.knowledge_base = deque(kb_data, maxlen=self.knowledge_capacity)
+
+        ak_data = data.get("assistant_knowledge", [])
+        self.assistant_knowledge = deque(ak_data, maxlen=self.knowledge_capacity)
+
+        self.conversation_summaries = data.get("conversation_summaries", {})
+
+    def _to_records(self):
+        records, vectors = {}, {}
+        for user_id, profile in self.user_profiles.items():
+            records[f"profile:{user_id}"] = profile
+        for conversation_id, summary in getattr(
+            self, "conversation_summaries", {}
+        ).items():
+            records[f"summary:{conversation_id}"] = summary
+        for keys, knowledge_deque in (
+            (self._knowledge_keys, self.knowledge_base),
+            (self._assistant_keys, self.assistant_knowledge),
+        ):
+            for key, entry in zip(keys.keys_for(knowledge_deque), knowledge_deque):
+                records[key] = {
+                    k: v for k, v in entry.items() if k != "knowledge_embedding"
+                }
+                vectors[key] = entry.get("knowledge_embedding")
+        return records, vectors
+
+    def _from_records(self, records, get_vector):
+        self.user_profiles, self.conversation_summaries = {}, {}
+        for key, value in records.items():
+            kind, _, name = key.partition(":")
+            if kind == "profile":
+                self.user_profiles[name] = value
+            elif kind == "summary":
+                self.conversation_summaries[name] = value
+        self.knowledge_base = self._knowledge_keys.load(
+            records, maxlen=self.knowledge_capacity
+        )
+        self.assistant_knowledge = self._assistant_keys.load(
+            records, maxlen=self.knowledge_capacity
+        )
+        for keys, knowledge_deque in (
+            (self._knowledge_keys, self.knowledge_base),
+            (self._assistant_keys, self.assistant_knowledge),
+        ):
+            for key, entry in zip(keys.keys_for(knowledge_deque), knowledge_deque):
+                vec = get_vector(key)
+                if vec is not None:
+                    entry["knowledge_embedding"] = vec.tolist()
+
+    def save(self):
         try:
-            with open(self.file_path, "w", encoding="utf-8") as f:
-                json.dump(data, f, ensure_ascii=False, indent=2)
+            self.storage.save(self)
         except IOError as e:
             logger.exception(f"Error saving LongTermMemory to {self.file_path}: {e}")
 
     def load(self):
         try:
-            with open(self.file_path, "r", encoding="utf-8") as f:
-                data = json.load(f)
-                self.user_profiles = data.get("user_profiles", {})
-                # Load into deques, respecting maxlen
-                kb_data = data.get("knowledge_base", [])
-                self.knowledge_base = deque(kb_data, maxlen=self.knowledge_capacity)
-
-                ak_data = data.get("assistant_knowledge", [])
-                self.assistant_knowledge = deque(
-                    ak_data, maxlen=self.knowledge_capacity
-                )
-
-                self.conversation_summaries = data.get("conversation_summaries", {})
-
+            self.storage.load(self)
             logger.info(f"LongTermMemory: Loaded from {self.file_path}.")
         except FileNotFoundError:
             logger.info(f"LongTermMemory: No history file found at {self.file_path}. Initializing new memory.")
@@ -8,36 +8,30 @@ def get_threads_by_project(self, project_id: str) -> list:
     return self.user_long_term_memory.get_threads_for_project(project_id)
 
 
-def get_conversations_by_thread(self, thread_id: str) -> list:
-    """Returns conversations associated with a given thread ID."""
-    return self.user_long_term_memory.get_conversations_for_thread(thread_id)
-
-
-def get_conversation_by_id(self, conversation_id: str) -> dict:
-    """Returns a specific conversation given its ID."""
-    return self.user_long_term_memory.get_conversation(conversation_id)
-
-
 import json
 import os
 
 import memoryos.prompts as prompts
+from memoryos.embedders.embedding_service import EmbeddingService
+from memoryos.llm_client import AsyncLLMClient
 from memoryos.long_term import LongTermMemory
 from memoryos.mid_term import MidTermMemory, compute_segment_heat
 from memoryos.retriever import Retriever
 from memoryos.short_term import ShortTermMemory
+from memoryos.summary_scheduler import RollingSummaryScheduler
+from memoryos.token_ledger import TokenLedger
 from memoryos.updater import Updater
 from memoryos.utils import (
     OpenAIClient,
     ensure_directory_exists,
-    generate_id,
     get_timestamp,
-    gpt_knowledge_extraction,
     gpt_update_profile,
-    gpt_user_profile_analysis,
+    knowledge_extraction_messages,
+    parse_knowledge_extraction,
+    user_profile_analysis_messages,
 )
 
-from guardian.codemap.generate_codemap import generate_codemap as load_codemap
+from guardian.codemap.index import get_codemap_index
 
 # Heat threshold for triggering profile/knowledge update from mid-term memory
 H_PROFILE_UPDATE_THRESHOLD = 5.0
@@ -47,6 +41,11 @@ mid_term_capacity = 50
 long_term_knowledge_capacity = 1000
 retrieval_queue_capacity = 50
 mid_term_heat_threshold = 5.0
+codemap_top_k = 15  # Codemap entries handed to the LLM per question
+branch_token_threshold = 80000  # 100k total context - 20k reserved
+rolling_summary_every_n = 10  # Thread messages that trigger a summary update
+rolling_summary_idle_seconds = 30.0  # ...or idle time after the last one
+rolling_summary_max_delta = 40  # Newest unsummarized exchanges folded in per update
 
 
 class Memoryos:
@@ -66,10 +65,17 @@ class Memoryos:
         self.assistant_id = assistant_id
         self.llm_model = llm_model
 
-        # Load codemap once during initialization
-        self.codemap = load_codemap()
-        print(f"Memoryos: Loaded codemap with {len(self.codemap)} top-level entries.")
+        # Shared, incremental codemap; refreshes in the background so
+        # construction never waits on a repo parse
+        self.codemap_index = get_codemap_index()
         self.client = OpenAIClient(api_key=llm_api_key, base_url=llm_base_url)
+        # Concurrent client for independent background calls; temperature-0
+        # responses are cached on disk by request hash
+        self.async_client = AsyncLLMClient(
+            api_key=llm_api_key,
+            base_url=llm_base_url,
+            cache_path=os.path.join(self.data_storage_path, "llm_cache.sqlite"),
+        )
 
         # Define file paths for user-specific data
         self.user_data_dir = os.path.join(self.data_storage_path, "users", self.user_id)
@@ -95,6 +101,13 @@ class Memoryos:
         ensure_directory_exists(user_long_term_path)
         ensure_directory_exists(assistant_long_term_path)
 
+        # Shared embedding pipeline: batches through the pluggable embedder and
+        # caches vectors by content hash across calls and restarts
+        self.embedding_service = EmbeddingService(
+            embedder=self.embedder,
+            cache_path=os.path.join(self.data_storage_path, "embedding_cache.sqlite"),
+        )
+
         # Initialize Memory Modules for User
         self.short_term_memory = ShortTermMemory(
             file_path=user_short_term_path, max_capacity=short_term_capacity
@@ -103,16 +116,35 @@ class Memoryos:
             file_path=user_mid_term_path,
             client=self.client,
             max_capacity=mid_term_capacity,
+            embedding_service=self.embedding_service,
         )
         self.user_long_term_memory = LongTermMemory(
             file_path=user_long_term_path,
             knowledge_capacity=long_term_knowledge_capacity,
+            embedding_service=self.embedding_service,
+        )
+
+        # Thread conversations with per-message token counts and running
+        # totals, so the auto-branch check doesn't re-tokenize the thread
+        self.token_ledger = TokenLedger(
+            os.path.join(self.user_data_dir, "conversations.sqlite")
+        )
+        # Rolling thread summaries, updated in the background every few
+        # messages or once a thread goes idle, from the new messages only
+        self.summary_scheduler = RollingSummaryScheduler(
+            self.token_ledger,
+            client=self.client,
+            model=self.llm_model,
+            every_n_messages=rolling_summary_every_n,
+            idle_seconds=rolling_summary_idle_seconds,
+            max_delta_messages=rolling_summary_max_delta,
         )
 
         # Initialize Memory Module for Assistant Knowledge
         self.assistant_long_term_memory = LongTermMemory(
             file_path=assistant_long_term_path,
             knowledge_capacity=long_term_knowledge_capacity,
+            embedding_service=self.embedding_service,
         )
 
         # Initialize Orchestration Modules
@@ -122,28 +154,33 @@ class Memoryos:
             long_term_memory=self.user_long_term_memory,
             client=self.client,
             llm_model=self.llm_model,
-            codemap=self.codemap,
+            codemap=self.codemap_index,
+            async_client=self.async_client,
+        )
+        self.retriever = Retriever(
+            mid_term_memory=self.mid_term_memory,
+            long_term_memory=self.user_long_term_memory,
+            assistant_long_term_memory=self.assistant_long_term_memory,
+            retrieval_queue_capacity=retrieval_queue_capacity,
         )
-        self.retriever = Retriever()
 
         self.mid_term_heat_threshold = mid_term_heat_threshold
 
-        # Load codemap once during initialization
-        self.codemap = load_codemap()
-        print(f"Memoryos: Loaded codemap with {len(self.codemap)} top-level entries.")
+    @property
+    def codemap(self) -> list:
+        """Full codemap entries; blocks until the first background refresh is done."""
+        return self.codemap_index.entries()
 
     def _trigger_profile_and_knowledge_update_if_needed(self):
         """
         Checks mid-term memory for hot segments and triggers profile/knowledge update if threshold is met.
         Adapted from main_memoybank.py's update_user_profile_from_top_segment.
         """
-        if not self.mid_term_memory.heap:
+        # Hottest segment, with its recency decayed to now
+        hottest = self.mid_term_memory.hottest_session()
+        if hottest is None:
             return
-
-        # Peek at the top of the heap (hottest segment)
-        # MidTermMemory heap stores (-H_segment, sid)
-        neg_heat, sid = self.mid_term_memory.heap[0]
-        current_heat = -neg_heat
+        sid, current_heat = hottest
 
         if current_heat >= self.mid_term_heat_threshold:
             session = self.mid_term_memory.sessions.get(sid)
@@ -162,16 +199,24 @@ class Memoryos:
                     f"Memoryos: Mid-term session {sid} heat ({current_heat:.2f}) exceeded threshold. Analyzing {len(unanalyzed_pages)} pages for profile/knowledge update."
                 )
 
-                # Perform user profile analysis and knowledge extraction separately
-                # First call: User profile analysis
-                new_user_profile_text = gpt_user_profile_analysis(
-                    unanalyzed_pages, self.client, model=self.llm_model
+                # User profile analysis and knowledge extraction (user private data and
+                # assistant knowledge) are independent, so they run concurrently
+                profile_response, knowledge_response = self.async_client.gather_sync(
+                    [
+                        {
+                            "model": self.llm_model,
+                            "messages": user_profile_analysis_messages(unanalyzed_pages),
+                        },
+                        {
+                            "model": self.llm_model,
+                            "messages": knowledge_extraction_messages(unanalyzed_pages),
+                        },
+                    ]
                 )
-
-                # Second call: Knowledge extraction (user private data and assistant knowledge)
-                knowledge_result = gpt_knowledge_extraction(
-                    unanalyzed_pages, self.client, model=self.llm_model
+                new_user_profile_text = (
+                    profile_response.strip() if profile_response else "None"
                 )
+                knowledge_result = parse_knowledge_extraction(knowledge_response)
                 new_user_private_knowledge = knowledge_result.get("private")
                 new_assistant_knowledge = knowledge_result.get("assistant_knowledge")
 
@@ -198,28 +243,19 @@ class Memoryos:
                     new_user_private_knowledge
                     and new_user_private_knowledge.lower() != "none"
                 ):
-                    for line in new_user_private_knowledge.split("\n"):
-                        if line.strip() and line.strip().lower() not in [
-                            "none",
-                            "- none",
-                            "- none.",
-                        ]:
-                            self.user_long_term_memory.add_user_knowledge(line.strip())
+                    # Embedded and saved as one batch; empty/"none" lines are skipped
+                    self.user_long_term_memory.add_user_knowledge_batch(
+                        [line.strip() for line in new_user_private_knowledge.split("\n")]
+                    )
 
                 # Add Assistant Knowledge to assistant's LTM
                 if (
                     new_assistant_knowledge
                     and new_assistant_knowledge.lower() != "none"
                 ):
-                    for line in new_assistant_knowledge.split("\n"):
-                        if line.strip() and line.strip().lower() not in [
-                            "none",
-                            "- none",
-                            "- none.",
-                        ]:
-                            self.assistant_long_term_memory.add_assistant_knowledge(
-                                line.strip()
-                            )  # Save to dedicated assistant LTM
+                    self.assistant_long_term_memory.add_assistant_knowledge_batch(
+                        [line.strip() for line in new_assistant_knowledge.split("\n")]
+                    )  # Save to dedicated assistant LTM
 
                 # Mark pages as analyzed and reset session heat contributors
                 for p in session["details"]:
@@ -236,7 +272,7 @@ class Memoryos:
                 )  # Recompute heat with reset factors
                 session["last_visit_time"] = get_timestamp()  # Update last visit time
 
-                self.mid_term_memory.rebuild_heap()  # Heap needs rebuild due to H_segment change
+                self.mid_term_memory.refresh_heat(sid)  # Re-key after the H_segment change
                 self.mid_term_memory.save()
                 print(
                     f"Memoryos: Profile/Knowledge update for session {sid} complete. Heat reset."
@@ -283,81 +319,101 @@ class Memoryos:
 
         # --- Auto-branching logic based on conversation token count ---
         if meta_data and "thread_id" in meta_data:
-            thread_id = meta_data["thread_id"]
-            # Find all conversations in this thread
-            all_conversations = self.user_long_term_memory.get_conversations_for_thread(
-                thread_id
+            conversation_id, token_total = self.token_ledger.append(
+                meta_data["thread_id"],
+                user_input,
+                agent_response,
+                timestamp=timestamp,
+                project_id=meta_data.get("project_id"),
             )
-            for convo in all_conversations:
-                messages = convo.get("messages", [])
-                token_count = 0
-                for msg in messages:
-                    token_count += len(self.client.tokenize(msg.get("user_input", "")))
-                    token_count += len(
-                        self.client.tokenize(msg.get("agent_response", ""))
-                    )
-                if token_count > 80000:  # 100k total context - 20k reserved
-                    print(
-                        f"Memoryos: Conversation {convo['conversation_id']} exceeded 80,000 tokens. Auto-branching..."
-                    )
-                    self.summarize_and_branch_conversation(convo["conversation_id"])
+            if token_total > branch_token_threshold:
+                print(
+                    f"Memoryos: Conversation {conversation_id} exceeded {branch_token_threshold:,} tokens. Auto-branching..."
+                )
+                self.summarize_and_branch_conversation(conversation_id)
 
         # After any memory addition that might impact mid-term, check for profile updates
         self._trigger_profile_and_knowledge_update_if_needed()
 
-        # Update rolling summary for the thread, if applicable
-        meta_data_for_memory = meta_data if meta_data else {}
-        if "thread_id" in meta_data_for_memory:
-            thread_id = meta_data_for_memory["thread_id"]
-            self.update_rolling_summary(thread_id)
+        # Schedule a rolling summary update for the thread, if applicable;
+        # the summarizer runs off the request path
+        if meta_data and "thread_id" in meta_data:
+            self.summary_scheduler.note_message(meta_data["thread_id"])
 
     def update_rolling_summary(self, thread_id: str):
         """
-        Generates or updates a rolling summary for the given thread by summarizing recent messages.
-        This summary is overwritten each time it's updated (rolling state, not permanent memory).
+        Brings the rolling summary of the given thread up to date now, folding the
+        messages since the last summary into it. add_memory schedules this in the
+        background instead; call it when a summary covering every message is needed.
         """
         print(f"Memoryos: Updating rolling summary for thread '{thread_id}'")
+        try:
+            summary = self.summary_scheduler.summarize_now(thread_id)
+        except RuntimeError as e:
+            print(f"Memoryos: {e}. Keeping the previous rolling summary.")
+            return self.get_rolling_summary(thread_id)
+        if summary is None:
+            print("Memoryos: No new messages for thread. Rolling summary unchanged.")
+            return self.get_rolling_summary(thread_id)
+        return summary
+
+    def get_rolling_summary(self, thread_id: str):
+        """Returns the latest completed rolling summary of the thread, or None."""
+        return self.summary_scheduler.get_summary(thread_id)
 
-        # Retrieve all conversations in the thread
-        conversations = self.user_long_term_memory.get_conversations_for_thread(
-            thread_id
-        )
-        recent_messages = []
-        for convo in conversations:
-            recent_messages.extend(convo.get("messages", []))
-
-        if not recent_messages:
-            print("Memoryos: No messages found for thread. Skipping rolling summary.")
-            return
+    def summarize_and_branch_conversation(self, conversation_id: str):
+        """
+        Summarizes the specified conversation and creates a child conversation linked to it.
+        Stores summary inside the original conversation object; the child becomes
+        the thread's active conversation.
+        """
+        print(f"Memoryos: Summarizing and branching conversation '{conversation_id}'")
 
-        # Cap the number of messages to avoid overload
-        recent_messages = recent_messages[-40:]  # Only consider the last 40 exchanges
+        # Retrieve the full conversation
+        conversation = self.token_ledger.get_conversation(conversation_id)
+        if not conversation:
+            print(f"Memoryos: Conversation '{conversation_id}' not found.")
+            return None
 
+        # Compose content for summarization
+        messages = conversation.get("messages", [])
         convo_text = "\n".join(
             [
                 f"User: {m['user_input']}\nAssistant: {m['agent_response']}"
-                for m in recent_messages
+                for m in messages
             ]
         )
 
         system_prompt = (
-            "You are a rolling summarizer. Provide a short, updated summary of the recent conversation. "
-            "Summarize key points and overall direction. Keep it concise and overwrite previous versions."
+            "You are an archival summarizer. Create a succinct summary of the following conversation. "
+            "Highlight key decisions, emotional tone, turning points, and intended next steps. Output 1 short paragraph."
         )
 
-        summary = self.client.chat_completion(
+        summary_result = self.client.chat_completion(
             model=self.llm_model,
             messages=[
                 {"role": "system", "content": system_prompt},
                 {"role": "user", "content": convo_text},
             ],
-            temperature=0.4,
-            max_tokens=300,
+            temperature=0.5,
+            max_tokens=400,
         )
 
-        self.user_long_term_memory.attach_rolling_summary_to_thread(
-            thread_id, summary.strip()
+        # Store the summary on the parent and start the child conversation
+        summary_blob = self.token_ledger.branch(conversation_id, summary_result)
+
+        print(
+            f"Memoryos: Summary complete. Child conversation '{summary_blob['child_conversation_id']}' created."
         )
+        return summary_blob
+
+    def get_conversations_by_thread(self, thread_id: str) -> list:
+        """Returns conversations associated with a given thread ID."""
+        return self.token_ledger.get_conversations_for_thread(thread_id)
+
+    def get_conversation_by_id(self, conversation_id: str) -> dict:
+        """Returns a specific conversation given its ID."""
+        return self.token_ledger.get_conversation(conversation_id)
 
     def get_response(
         self,
@@ -538,6 +594,11 @@ class Memoryos:
         self._trigger_profile_and_knowledge_update_if_needed()
         self.mid_term_heat_threshold = original_threshold  # Restore original threshold
 
+    def close(self):
+        """Finishes pending rolling-summary updates, then closes the conversation ledger."""
+        self.summary_scheduler.close()
+        self.token_ledger.close()
+
     def __repr__(self):
         return f"<Memoryos user_id='{self.user_id}' assistant_id='{self.assistant_id}' data_path='{self.data_storage_path}'>"
 
@@ -545,11 +606,14 @@ class Memoryos:
         """
         Uses LLM to answer natural language questions about the codebase using codemap context.
         """
-        if not self.codemap:
-            return "Codemap is not loaded or is empty."
+        matches = self.codemap_index.query(query, top_k=codemap_top_k)
+        if not matches:
+            return "No codemap entries match this question."
 
         codemap_context = "\n".join(
-            [f"- {filename}: {desc}" for filename, desc in self.codemap.items()]
+            f"- {m['path']}:{m['line']} {m['kind']} {m['name']}"
+            + (f": {m['docstring'].splitlines()[0]}" if m["docstring"] else "")
+            for m in matches
         )
 
         system_prompt = (
@@ -575,7 +639,7 @@ class Memoryos:
         """
         Returns a brief summary of codemap keys for inspection or debugging.
         """
-        return list(self.codemap.keys())
+        return [entry["path"] for entry in self.codemap]
 
     def cli_codemap_query(self):
         """
@@ -792,71 +856,6 @@ def get_conversation_by_id(conversation_id):
     print(f"\n--- CONVERSATION {conversation_id} ---\n")
     print(json.dumps(convo, indent=2))
 
-    def summarize_and_branch_conversation(self, conversation_id: str):
-        """
-        Summarizes the specified conversation and creates a child conversation linked to it.
-        Stores summary inside the original conversation object.
-        """
-        print(f"Memoryos: Summarizing and branching conversation '{conversation_id}'")
-
-        # Retrieve the full conversation
-        conversation = self.user_long_term_memory.get_conversation(conversation_id)
-        if not conversation:
-            print(f"Memoryos: Conversation '{conversation_id}' not found.")
-            return None
-
-        # Compose content for summarization
-        messages = conversation.get("messages", [])
-        convo_text = "\n".join(
-            [
-                f"User: {m['user_input']}\nAssistant: {m['agent_response']}"
-                for m in messages
-            ]
-        )
-
-        system_prompt = (
-            "You are an archival summarizer. Create a succinct summary of the following conversation. "
-            "Highlight key decisions, emotional tone, turning points, and intended next steps. Output 1 short paragraph."
-        )
-
-        summary_result = self.client.chat_completion(
-            model=self.llm_model,
-            messages=[
-                {"role": "system", "content": system_prompt},
-                {"role": "user", "content": convo_text},
-            ],
-            temperature=0.5,
-            max_tokens=400,
-        )
-
-        # Generate new child conversation ID
-        new_convo_id = generate_id()
-        child_convo = {
-            "conversation_id": new_convo_id,
-            "title": f"Child of {conversation_id}",
-            "messages": [],
-            "parent_id": conversation_id,
-            "created_at": get_timestamp(),
-        }
-
-        # Store child conversation and update parent with summary
-        self.user_long_term_memory.store_conversation(child_convo)
-
-        summary_blob = {
-            "summary_text": summary_result,
-            "created_at": get_timestamp(),
-            "child_conversation_id": new_convo_id,
-        }
-
-        self.user_long_term_memory.attach_summary_to_conversation(
-            conversation_id, summary_blob
-        )
-
-        print(
-            f"Memoryos: Summary complete. Child conversation '{new_convo_id}' created."
-        )
-        return summary_blob
-
 
 # --- CLI command for memory:summarize-and-branch ---
 @cli.command("memory:summarize-and-branch")
@@ -1,20 +1,27 @@
-import heapq
 import json
+import os
 from collections import defaultdict
 from datetime import datetime
 
-import faiss
 import numpy as np
 from .utils import (
     OpenAIClient,
     compute_time_decay,
     ensure_directory_exists,
     generate_id,
+    embed_texts,
     get_embedding,
+    get_query_embedding,
     get_timestamp,
     llm_extract_keywords,
+    llm_extract_keywords_batch,
     normalize_vector,
 )
+from .heat_queue import SessionHeatQueue
+from .page_index import PageLinkGraph, PageRegistry
+from .session_matcher import SessionMatcher
+from .storage.backends import JsonExportMixin, make_storage
+from .vector_store.ann_index import VectorIndex
 
 # Heat computation constants (can be tuned or made configurable)
 HEAT_ALPHA = 1.0
@@ -22,6 +29,17 @@ HEAT_BETA = 1.0
 HEAT_GAMMA = 1
 RECENCY_TAU_HOURS = 24  # For R_recency calculation in compute_segment_heat
 
+# Session fields persisted in the small "heat:<sid>" record, so access updates
+# don't rewrite the session or its pages
+HEAT_FIELDS = (
+    "N_visit",
+    "L_interaction",
+    "R_recency",
+    "H_segment",
+    "last_visit_time",
+    "access_count_lfu",
+)
+
 
 def compute_segment_heat(
     session,
@@ -44,40 +62,122 @@ def compute_segment_heat(
     return alpha * N_visit + beta * L_interaction + gamma * R_recency
 
 
-class MidTermMemory:
-    def __init__(self, file_path: str, client: OpenAIClient, max_capacity=2000):
+class MidTermMemory(JsonExportMixin):
+    def __init__(
+        self,
+        file_path: str,
+        client: OpenAIClient,
+        max_capacity=2000,
+        index_backend="auto",
+        embedding_service=None,
+        storage="oplog",
+    ):
         self.file_path = file_path
         ensure_directory_exists(self.file_path)
         self.client = client
         self.max_capacity = max_capacity
+        # Summaries and pages of an insert are embedded as one batch through it
+        # when given; unset, each text is embedded with get_embedding
+        self.embedding_service = embedding_service
         self.sessions = {}  # {session_id: session_object}
         self.access_frequency = defaultdict(int)  # {session_id: access_count_for_lfu}
-        self.heap = []  # Min-heap storing (-H_segment, session_id) for hottest segments
+        # Indexed heat and LFU priorities; updates and evictions are O(log n)
+        self.heat_queue = SessionHeatQueue(
+            HEAT_ALPHA, HEAT_BETA, HEAT_GAMMA, RECENCY_TAU_HOURS
+        )
+        # page_id -> (session_id, position), and the pre_page/next_page links between pages
+        self.page_registry = PageRegistry()
+        self.page_graph = PageLinkGraph()
+        # Summary embedding matrix and keyword ids for scoring insertions against every session
+        self.session_matcher = SessionMatcher()
+        # "oplog" appends only changed records; "json" rewrites file_path on every save
+        self.storage = make_storage(storage, self.file_path)
+        # Persistent ANN index over session summary embeddings, stored next to the JSON file
+        self.session_index = VectorIndex(
+            path=os.path.splitext(self.file_path)[0] + ".faiss",
+            source=self._session_embeddings,
+            backend=index_backend,
+        )
         self.load()
 
+    def _embed_texts(self, texts):
+        vecs = embed_texts(texts, self.embedding_service, embed_fn=get_embedding)
+        return [normalize_vector(v) for v in vecs]
+
+    def _embed_fn(self):
+        return self.embedding_service.embed if self.embedding_service else get_embedding
+
+    def _session_embeddings(self):
+        return (
+            (sid, session.get("summary_embedding"))
+            for sid, session in self.sessions.items()
+        )
+
     def get_page_by_id(self, page_id):
-        for session in self.sessions.values():
-            for page in session.get("details", []):
-                if page.get("page_id") == page_id:
-                    return page
-        return None
+        location = self.page_registry.locate(page_id)
+        if location is None:
+            return None
+        session_id, position = location
+        details = self.sessions.get(session_id, {}).get("details", [])
+        if position < len(details) and details[position].get("page_id") == page_id:
+            return details[position]
+        # Sessions were changed behind the registry's back; index them again
+        self._reindex_pages()
+        location = self.page_registry.locate(page_id)
+        if location is None:
+            return None
+        return self.sessions[location[0]]["details"][location[1]]
+
+    def linked_pages(self, page_id):
+        """Stored pages reachable from page_id over pre_page/next_page links."""
+        return [self.get_page_by_id(pid) for pid in self.page_graph.chain(page_id)]
+
+    def chain_bounds(self, page_id):
+        """(first, last) page_id of the conversation chain through page_id."""
+        return self.page_graph.bounds(page_id)
 
     def update_page_connections(self, prev_page_id, next_page_id):
         if prev_page_id:
             prev_page = self.get_page_by_id(prev_page_id)
             if prev_page:
                 prev_page["next_page"] = next_page_id
+                self._sync_page_links(prev_page_id)
         if next_page_id:
             next_page = self.get_page_by_id(next_page_id)
             if next_page:
                 next_page["pre_page"] = prev_page_id
+                self._sync_page_links(next_page_id)
         # self.save() # Avoid saving on every minor update; save at higher level operations
 
+    def _sync_page_links(self, page_id):
+        """Mirrors the links of the page get_page_by_id resolves page_id to."""
+        page = self.get_page_by_id(page_id)
+        if page is None:
+            self.page_graph.remove(page_id)
+        else:
+            self.page_graph.set(page_id, page.get("pre_page"), page.get("next_page"))
+
+    def _index_pages(self, session_id, start=0):
+        """Registers the session's pages from position `start` on."""
+        pages = self.sessions[session_id].get("details", [])
+        self.page_registry.add_pages(session_id, pages, start)
+        for page in pages[start:]:
+            if page.get("page_id"):
+                self._sync_page_links(page["page_id"])
+
+    def _reindex_pages(self):
+        self.page_registry.rebuild(self.sessions)
+        self.page_graph.rebuild(
+            self.get_page_by_id(page_id) for page_id in self.page_registry
+        )
+
     def evict_lfu(self):
         if not self.access_frequency or not self.sessions:
             return
 
-        lfu_sid = min(self.access_frequency, key=self.access_frequency.get)
+        if len(self.heat_queue) < len(self.sessions):
+            self.rebuild_heap()  # Sessions were added behind the queue's back
+        lfu_sid = self.heat_queue.peek_lfu()  # First least-frequent in dict order
         print(
             f"MidTermMemory: LFU eviction. Session {lfu_sid} has lowest access frequency."
         )
@@ -86,55 +186,69 @@ class MidTermMemory:
             del self.access_frequency[
                 lfu_sid
             ]  # Clean up access frequency if session already gone
-            self.rebuild_heap()
+            self.heat_queue.remove(lfu_sid)
             return
 
         session_to_delete = self.sessions.pop(lfu_sid)  # Remove from sessions
         del self.access_frequency[lfu_sid]  # Remove from LFU tracking
+        self.heat_queue.remove(lfu_sid)
+        self.session_index.remove(lfu_sid)
+        self.session_matcher.remove(lfu_sid)
+
+        # Pages stored only in this session leave the registry and the link graph;
+        # links into them from other sessions stay, and traversal stops there
+        evicted_pages = session_to_delete.get("details", [])
+        self.page_registry.remove_session(lfu_sid, evicted_pages)
+        for page in evicted_pages:
+            if page.get("page_id"):
+                self._sync_page_links(page["page_id"])
 
-        # Clean up page connections if this session's pages were linked
-        for page in session_to_delete.get("details", []):
-            prev_page_id = page.get("pre_page")
-            next_page_id = page.get("next_page")
-            # If a page from this session was linked to an external page, nullify the external link
-            if prev_page_id and not self.get_page_by_id(
-                prev_page_id
-            ):  # Check if prev page is still in memory
-                # This case should ideally not happen if connections are within sessions or handled carefully
-                pass
-            if next_page_id and not self.get_page_by_id(next_page_id):
-                pass
-            # More robustly, one might need to search all other sessions if inter-session linking was allowed
-            # For now, assuming internal consistency or that MemoryOS class manages higher-level links
-
-        self.rebuild_heap()
         self.save()
         print(f"MidTermMemory: Evicted session {lfu_sid}.")
 
     def add_session(self, summary, details):
-        session_id = generate_id("session")
-        summary_vec = get_embedding(summary)
-        summary_vec = normalize_vector(summary_vec).tolist()
-        summary_keywords = list(llm_extract_keywords(summary, client=self.client))
-
-        processed_details = []
-        for page_data in details:
-            page_id = page_data.get("page_id", generate_id("page"))
-            full_text = f"User: {page_data.get('user_input','')} Assistant: {page_data.get('agent_response','')}"
-            inp_vec = get_embedding(full_text)
-            inp_vec = normalize_vector(inp_vec).tolist()
-            page_keywords = list(llm_extract_keywords(full_text, client=self.client))
-
+        prepared = self._prepare_batches([(summary, [], details)])
+        return self._create_session(summary, details, prepared)
+
+    def _prepare_batches(self, batches):
+        """
+        Embeddings and keywords for the summaries and distinct page texts of
+        (summary, keywords, pages) batches: one embedding call and one keyword
+        extraction call, and pages inserted under several themes are done once.
+        """
+        positions = {}  # text -> position
+        for summary, _, pages in batches:
+            positions.setdefault(summary, len(positions))
+            for page_data in pages:
+                positions.setdefault(self._page_text(page_data), len(positions))
+        texts = list(positions)
+        vecs = self._embed_texts(texts)
+        keywords = llm_extract_keywords_batch(texts, client=self.client)
+        return {text: (vecs[i], keywords[i]) for i, text in enumerate(texts)}
+
+    def _process_pages(self, pages, prepared, new_session=False):
+        processed_pages = []
+        for page_data in pages:
+            page_vec, page_keywords = prepared[self._page_text(page_data)]
             processed_page = {
                 **page_data,  # Carry over existing fields like user_input, agent_response, timestamp
-                "page_id": page_id,
-                "page_embedding": inp_vec,
-                "page_keywords": page_keywords,
-                "preloaded": page_data.get("preloaded", False),  # Preserve if passed
-                "analyzed": page_data.get("analyzed", False),  # Preserve if passed
+                "page_id": page_data.get("page_id", generate_id("page")),
+                "page_embedding": page_vec.tolist(),
+                "page_keywords": list(page_keywords),
                 # pre_page, next_page, meta_info are handled by DynamicUpdater
             }
-            processed_details.append(processed_page)
+            if new_session:
+                processed_page["preloaded"] = page_data.get("preloaded", False)
+                processed_page["analyzed"] = page_data.get("analyzed", False)
+            processed_pages.append(processed_page)
+        return processed_pages
+
+    def _create_session(self, summary, details, prepared, save=True):
+        session_id = generate_id("session")
+        summary_vec, summary_keywords = prepared[summary]
+        summary_vec = summary_vec.tolist()
+        summary_keywords = list(summary_keywords)
+        processed_details = self._process_pages(details, prepared, new_session=True)
 
         current_ts = get_timestamp()
         session_obj = {
@@ -153,26 +267,44 @@ class MidTermMemory:
         }
         session_obj["H_segment"] = compute_segment_heat(session_obj)
         self.sessions[session_id] = session_obj
+        self._index_pages(session_id)
         self.access_frequency[session_id] = 0  # Initialize for LFU
-        heapq.heappush(
-            self.heap, (-session_obj["H_segment"], session_id)
-        )  # Use negative heat for max-heap behavior
+        self.session_index.upsert(session_id, summary_vec)
+        self.session_matcher.upsert(session_id, summary_vec, summary_keywords)
+        self.refresh_heat(session_id)
 
         print(
             f"MidTermMemory: Added new session {session_id}. Initial heat: {session_obj['H_segment']:.2f}."
         )
         if len(self.sessions) > self.max_capacity:
             self.evict_lfu()
-        self.save()
+        if save:
+            self.save()
         return session_id
 
+    @staticmethod
+    def _page_text(page_data):
+        return f"User: {page_data.get('user_input','')} Assistant: {page_data.get('agent_response','')}"
+
+    @property
+    def heap(self):
+        """(-H_segment, session_id) pairs, hottest first."""
+        return self.heat_queue.entries()
+
+    def hottest_session(self):
+        """(session_id, heat with recency decayed to now) of the hottest session, or None."""
+        return self.heat_queue.hottest()
+
+    def refresh_heat(self, session_id):
+        """Re-keys one session after its heat fields or access_frequency changed."""
+        self.heat_queue.update_heat(session_id, self.sessions[session_id])
+        self.heat_queue.update_frequency(
+            session_id, self.access_frequency.get(session_id, 0)
+        )
+
     def rebuild_heap(self):
-        self.heap = []
-        for sid, session_data in self.sessions.items():
-            # Ensure H_segment is up-to-date before rebuilding heap if necessary
-            # session_data["H_segment"] = compute_segment_heat(session_data)
-            heapq.heappush(self.heap, (-session_data["H_segment"], sid))
-        # heapq.heapify(self.heap) # Not needed if pushing one by one
+        """Re-keys every session, for callers that edited sessions or access_frequency directly."""
+        self.heat_queue.rebuild(self.sessions, self.access_frequency)
         # No save here, it's an internal operation often followed by other ops that save
 
     def insert_pages_into_session(
@@ -183,79 +315,94 @@ class MidTermMemory:
         similarity_threshold=0.6,
         keyword_similarity_alpha=1.0,
     ):
-        if not self.sessions:  # If no existing sessions, just add as a new one
-            print("MidTermMemory: No existing sessions. Adding new session directly.")
-            return self.add_session(summary_for_new_pages, pages_to_insert)
-
-        new_summary_vec = get_embedding(summary_for_new_pages)
-        new_summary_vec = normalize_vector(new_summary_vec)
-
-        best_sid = None
-        best_overall_score = -1
-
-        for sid, existing_session in self.sessions.items():
-            existing_summary_vec = np.array(
-                existing_session["summary_embedding"], dtype=np.float32
-            )
-            semantic_sim = float(np.dot(existing_summary_vec, new_summary_vec))
-
-            # Keyword similarity (Jaccard index based)
-            existing_keywords = set(existing_session.get("summary_keywords", []))
-            new_keywords_set = set(keywords_for_new_pages)
-            s_topic_keywords = 0
-            if existing_keywords and new_keywords_set:
-                intersection = len(existing_keywords.intersection(new_keywords_set))
-                union = len(existing_keywords.union(new_keywords_set))
-                if union > 0:
-                    s_topic_keywords = intersection / union
-
-            overall_score = semantic_sim + keyword_similarity_alpha * s_topic_keywords
+        return self.insert_page_batches(
+            [(summary_for_new_pages, keywords_for_new_pages, pages_to_insert)],
+            similarity_threshold=similarity_threshold,
+            keyword_similarity_alpha=keyword_similarity_alpha,
+        )[0]
+
+    def insert_page_batches(
+        self, batches, similarity_threshold=0.6, keyword_similarity_alpha=1.0
+    ):
+        """
+        Inserts (summary, keywords, pages) batches, one per summary theme, with
+        the result of calling insert_pages_into_session for each in turn: a batch
+        merges into the best scoring session (earlier batches' new sessions
+        included) if it reaches similarity_threshold, else starts a new one.
+        All summaries are scored against all sessions in one pass, and the
+        pages are embedded and keyworded once. Returns the session id per batch.
+        """
+        batches = [
+            (summary, list(keywords or []), pages) for summary, keywords, pages in batches
+        ]
+        if not batches:
+            return []
+        if len(self.session_matcher) < len(self.sessions):
+            self.session_matcher.rebuild(self.sessions)  # Sessions set behind its back
+
+        prepared = self._prepare_batches(batches)
+        summary_vecs = np.stack([prepared[summary][0] for summary, _, _ in batches])
+        base_sids, base_scores = self.session_matcher.scores(
+            summary_vecs,
+            [keywords for _, keywords, _ in batches],
+            keyword_similarity_alpha,
+        )
 
-            if overall_score > best_overall_score:
-                best_overall_score = overall_score
-                best_sid = sid
+        created, session_ids = [], []
+        for i, (summary, keywords, pages) in enumerate(batches):
+            sids, scores = base_sids, base_scores[i]
+            new_sids = [sid for sid in created if sid in self.session_matcher]
+            if new_sids:
+                extra_sids, extra_scores = self.session_matcher.scores(
+                    summary_vecs[i], [keywords], keyword_similarity_alpha, new_sids
+                )
+                sids = base_sids + extra_sids
+                scores = np.concatenate([scores, extra_scores[0]])
+            best_sid, best_overall_score = self._best_session(sids, scores)
 
-        if best_sid and best_overall_score >= similarity_threshold:
-            print(
-                f"MidTermMemory: Merging pages into session {best_sid}. Score: {best_overall_score:.2f} (Threshold: {similarity_threshold})"
-            )
-            target_session = self.sessions[best_sid]
-
-            processed_new_pages = []
-            for page_data in pages_to_insert:
-                page_id = page_data.get(
-                    "page_id", generate_id("page")
-                )  # Use existing or generate new ID
-                full_text = f"User: {page_data.get('user_input','')} Assistant: {page_data.get('agent_response','')}"
-                inp_vec = get_embedding(full_text)
-                inp_vec = normalize_vector(inp_vec).tolist()
-                page_keywords_current = list(
-                    llm_extract_keywords(full_text, client=self.client)
+            if best_sid and best_overall_score >= similarity_threshold:
+                print(
+                    f"MidTermMemory: Merging pages into session {best_sid}. Score: {best_overall_score:.2f} (Threshold: {similarity_threshold})"
                 )
+                self._merge_pages(best_sid, pages, prepared)
+                session_ids.append(best_sid)
+                continue
+            if best_sid is None and not self.sessions:
+                print("MidTermMemory: No existing sessions. Adding new session directly.")
+            else:
+                print(
+                    f"MidTermMemory: No suitable session to merge (best score {best_overall_score:.2f} < threshold {similarity_threshold}). Creating new session."
+                )
+            session_id = self._create_session(summary, pages, prepared, save=False)
+            created.append(session_id)
+            session_ids.append(session_id)
 
-                processed_page = {
-                    **page_data,  # Carry over existing fields
-                    "page_id": page_id,
-                    "page_embedding": inp_vec,
-                    "page_keywords": page_keywords_current,
-                    # analyzed, preloaded flags should be part of page_data if set
-                }
-                target_session["details"].append(processed_page)
-                processed_new_pages.append(processed_page)
-
-            target_session["L_interaction"] += len(pages_to_insert)
-            target_session["last_visit_time"] = (
-                get_timestamp()
-            )  # Update last visit time on modification
-            target_session["H_segment"] = compute_segment_heat(target_session)
-            self.rebuild_heap()  # Rebuild heap as heat has changed
-            self.save()
-            return best_sid
-        else:
-            print(
-                f"MidTermMemory: No suitable session to merge (best score {best_overall_score:.2f} < threshold {similarity_threshold}). Creating new session."
-            )
-            return self.add_session(summary_for_new_pages, pages_to_insert)
+        self.save()
+        return session_ids
+
+    def _best_session(self, sids, scores):
+        """Highest scoring session still stored, first in session order on ties."""
+        scores = np.array(scores, dtype=np.float32)  # Copy; evicted ones get masked
+        while len(scores):
+            best = int(np.argmax(scores))
+            if not scores[best] > -1:
+                break
+            if sids[best] in self.sessions:
+                return sids[best], float(scores[best])
+            scores[best] = -np.inf
+        return None, -1
+
+    def _merge_pages(self, session_id, pages, prepared):
+        target_session = self.sessions[session_id]
+        first_new_position = len(target_session["details"])
+        target_session["details"].extend(self._process_pages(pages, prepared))
+        self._index_pages(session_id, first_new_position)
+        target_session["L_interaction"] += len(pages)
+        target_session["last_visit_time"] = (
+            get_timestamp()
+        )  # Update last visit time on modification
+        target_session["H_segment"] = compute_segment_heat(target_session)
+        self.refresh_heat(session_id)
 
     def search_sessions(
         self,
@@ -269,40 +416,22 @@ class MidTermMemory:
         if not self.sessions:
             return []
 
-        query_vec = get_embedding(query_text)
-        query_vec = normalize_vector(query_vec)
+        query_vec = get_query_embedding(query_text, embed_fn=self._embed_fn())
         query_keywords = set(llm_extract_keywords(query_text, client=self.client))
 
-        candidate_sessions = []
-        session_ids = list(self.sessions.keys())
-        if not session_ids:
-            return []
-
-        summary_embeddings_list = [
-            self.sessions[s]["summary_embedding"] for s in session_ids
-        ]
-        summary_embeddings_np = np.array(summary_embeddings_list, dtype=np.float32)
-
-        dim = summary_embeddings_np.shape[1]
-        index = faiss.IndexFlatIP(dim)  # Inner product for similarity
-        index.add(summary_embeddings_np)
-
-        query_arr_np = np.array([query_vec], dtype=np.float32)
-        distances, indices = index.search(
-            query_arr_np, min(top_k_sessions, len(session_ids))
+        # Maintained incrementally; no per-query index build over every session
+        hits = self.session_index.search(
+            query_vec, min(top_k_sessions, len(self.sessions))
         )
 
         results = []
         current_time_str = get_timestamp()
 
-        for i, idx in enumerate(indices[0]):
-            if idx == -1:
+        for session_id, semantic_sim_score in hits:
+            session = self.sessions.get(session_id)
+            if session is None:
                 continue
 
-            session_id = session_ids[idx]
-            session = self.sessions[session_id]
-            semantic_sim_score = float(distances[0][i])  # This is the dot product
-
             # Keyword similarity for session summary
             session_keywords = set(session.get("summary_keywords", []))
             s_topic_keywords = 0
@@ -341,7 +470,7 @@ class MidTermMemory:
                     session["access_count_lfu"] = session.get("access_count_lfu", 0) + 1
                     self.access_frequency[session_id] = session["access_count_lfu"]
                     session["H_segment"] = compute_segment_heat(session)
-                    self.rebuild_heap()  # Heat changed
+                    self.refresh_heat(session_id)
 
                     results.append(
                         {
@@ -360,33 +489,99 @@ class MidTermMemory:
         # Sort final results by session_relevance_score
         return sorted(results, key=lambda x: x["session_relevance_score"], reverse=True)
 
-    def save(self):
-        # Make a copy for saving to avoid modifying heap during iteration if it happens
-        # Though current heap is list of tuples, so direct modification risk is low
-        # sessions_to_save = {sid: data for sid, data in self.sessions.items()}
-        data_to_save = {
+    # ---- Storage hooks (see memoryos.storage.backends) ----
+    def _to_document(self):
+        return {
             "sessions": self.sessions,
             "access_frequency": dict(
                 self.access_frequency
             ),  # Convert defaultdict to dict for JSON
-            # Heap is derived, no need to save typically, but can if desired for faster load
-            # "heap_snapshot": self.heap
         }
+
+    def _from_document(self, data):
+        self.sessions = data.get("sessions", {})
+        self.access_frequency = defaultdict(int, data.get("access_frequency", {}))
+        self._reindex_pages()
+        self.rebuild_heap()
+        self.session_matcher.rebuild(self.sessions)
+
+    @staticmethod
+    def _page_key(session_id, page, position):
+        return f"page:{session_id}:{page.get('page_id') or position}"
+
+    def _to_records(self):
+        """
+        Records per session body, session heat stats and page; embeddings are
+        returned separately for the vector side file.
+        """
+        records, vectors = {}, {}
+        for sid, session in self.sessions.items():
+            pages = session.get("details", [])
+            body = {
+                k: v
+                for k, v in session.items()
+                if k not in HEAT_FIELDS and k not in ("details", "summary_embedding")
+            }
+            body["page_keys"] = [
+                self._page_key(sid, page, i) for i, page in enumerate(pages)
+            ]
+            records[f"session:{sid}"] = body
+            vectors[f"session:{sid}"] = session.get("summary_embedding")
+            heat = {f: session[f] for f in HEAT_FIELDS if f in session}
+            heat["access_frequency"] = self.access_frequency.get(sid, 0)
+            records[f"heat:{sid}"] = heat
+            for page_key, page in zip(body["page_keys"], pages):
+                records[page_key] = {
+                    k: v for k, v in page.items() if k != "page_embedding"
+                }
+                vectors[page_key] = page.get("page_embedding")
+        return records, vectors
+
+    def _from_records(self, records, get_vector):
+        sessions = {}
+        access_frequency = defaultdict(int)
+        for key, body in records.items():
+            kind, _, sid = key.partition(":")
+            if kind != "session":
+                continue
+            session = {k: v for k, v in body.items() if k != "page_keys"}
+            heat = dict(records.get(f"heat:{sid}", {}))
+            access_frequency[sid] = heat.pop("access_frequency", 0)
+            session.update(heat)
+            summary_vec = get_vector(key)
+            if summary_vec is not None:
+                session["summary_embedding"] = summary_vec.tolist()
+            details = []
+            for page_key in body.get("page_keys", []):
+                if page_key not in records:
+                    continue
+                page = records[page_key]
+                page_vec = get_vector(page_key)
+                if page_vec is not None:
+                    page["page_embedding"] = page_vec.tolist()
+                details.append(page)
+            session["details"] = details
+            sessions[sid] = session
+        self.sessions = sessions
+        self.access_frequency = access_frequency
+        self._reindex_pages()
+        self.rebuild_heap()
+        self.session_matcher.rebuild(self.sessions)
+
+    def save(self):
         try:
-            with open(self.file_path, "w", encoding="utf-8") as f:
-                json.dump(data_to_save, f, ensure_ascii=False, indent=2)
+            self.storage.save(self)
         except IOError as e:
             print(f"Error saving MidTermMemory to {self.file_path}: {e}")
+        self.session_index.save()  # No-op unless the index changed
+
+    def compact(self):
+        """Snapshots the op log (a full rewrite with the json backend)."""
+        self.storage.compact(self)
 
     def load(self):
         try:
-            with open(self.file_path, "r", encoding="utf-8") as f:
-                data = json.load(f)
-                self.sessions = data.get("sessions", {})
-                self.access_frequency = defaultdict(
-                    int, data.get("access_frequency", {})
-                )
-                self.rebuild_heap()  # Rebuild heap from loaded sessions
+            self.storage.load(self)  # Also rebuilds the page index and heat queue
             print(
                 f"MidTermMemory: Loaded from {self.file_path}. Sessions: {len(self.sessions)}."
             )
@@ -402,3 +597,6 @@ class MidTermMemory:
             print(
                 f"MidTermMemory: An unexpected error occurred during load from {self.file_path}: {e}. Initializing new memory."
             )
+        # Reuse the persisted index when it matches the loaded sessions and their
+        # summary embeddings, else rebuild it
+        self.session_index.load_or_rebuild(expected_items=self._session_embeddings())
@@ -0,0 +1,183 @@
+"""
+Page lookups and page-link chains for MidTermMemory.
+
+PageRegistry maps page_id -> (session_id, position in session["details"]), so
+get_page_by_id is a dict lookup instead of a scan over every page. The same
+page_id can be stored in several sessions (one batch is inserted once per
+summary theme); the registry keeps every location and resolves to the one a
+scan in session order would find first.
+
+PageLinkGraph mirrors the pre_page/next_page links of the pages the registry
+resolves to, plus the reverse edges. chain(page_id) is the set of stored pages
+reachable over those links (breadth first, the order the updater's meta-info
+propagation used), and bounds(page_id) the first and last page of the linked
+list around a page. Both are cached per page; a link change drops the cached
+results of exactly the pages that can reach it, so traversal and invalidation
+cost O(chain length) whatever the size of the store.
+"""
+
+from collections import defaultdict
+from typing import Dict, Iterable, List, Optional, Set, Tuple
+
+Location = Tuple[str, int]
+
+
+class PageRegistry:
+    def __init__(self):
+        self._locations: Dict[str, List[Location]] = {}
+        self._session_order: Dict[str, int] = {}  # Order of the sessions dict
+        self._next_order = 0
+
+    def __len__(self):
+        return len(self._locations)
+
+    def __contains__(self, page_id):
+        return page_id in self._locations
+
+    def __iter__(self):
+        return iter(self._locations)
+
+    def add_pages(self, session_id: str, pages: List[dict], start: int = 0) -> None:
+        """Registers pages[start:] of a session (new, or appended to)."""
+        if session_id not in self._session_order:
+            self._session_order[session_id] = self._next_order
+            self._next_order += 1
+        for position in range(start, len(pages)):
+            page_id = pages[position].get("page_id")
+            if page_id:
+                self._locations.setdefault(page_id, []).append((session_id, position))
+
+    def remove_session(self, session_id: str, pages: List[dict]) -> None:
+        for position, page in enumerate(pages):
+            page_id = page.get("page_id")
+            locations = self._locations.get(page_id)
+            if not locations:
+                continue
+            try:
+                locations.remove((session_id, position))
+            except ValueError:
+                pass
+            if not locations:
+                del self._locations[page_id]
+        self._session_order.pop(session_id, None)
+
+    def locate(self, page_id: str) -> Optional[Location]:
+        locations = self._locations.get(page_id)
+        if not locations:
+            return None
+        if len(locations) == 1:
+            return locations[0]
+        order = self._session_order
+        return min(locations, key=lambda loc: (order[loc[0]], loc[1]))
+
+    def rebuild(self, sessions: Dict[str, dict]) -> None:
+        self._locations = {}
+        self._session_order = {}
+        self._next_order = 0
+        for session_id, session in sessions.items():
+            self.add_pages(session_id, session.get("details", []))
+
+
+class PageLinkGraph:
+    def __init__(self):
+        self.links: Dict[str, Tuple[Optional[str], Optional[str]]] = {}
+        self.referrers: Dict[str, Set[str]] = defaultdict(set)  # Reverse edges
+        self._chains: Dict[str, Tuple[str, ...]] = {}
+        self._bounds: Dict[str, Tuple[str, str]] = {}
+
+    def __len__(self):
+        return len(self.links)
+
+    def __contains__(self, page_id):
+        return page_id in self.links
+
+    def set(self, page_id: str, pre_page: Optional[str], next_page: Optional[str]):
+        """Stores (or updates) a page's outgoing links."""
+        if self.links.get(page_id) == (pre_page, next_page):
+            return
+        self._invalidate(page_id)
+        self._unlink(page_id)
+        self.links[page_id] = (pre_page, next_page)
+        for target in (pre_page, next_page):
+            if target:
+                self.referrers[target].add(page_id)
+
+    def remove(self, page_id: str) -> None:
+        if page_id not in self.links:
+            return
+        self._invalidate(page_id)
+        self._unlink(page_id)
+        del self.links[page_id]
+
+    def clear(self) -> None:
+        self.links.clear()
+        self.referrers.clear()
+        self._chains.clear()
+        self._bounds.clear()
+
+    def _unlink(self, page_id: str) -> None:
+        for target in self.links.get(page_id, (None, None)):
+            if target and target in self.referrers:
+                self.referrers[target].discard(page_id)
+                if not self.referrers[target]:
+                    del self.referrers[target]
+
+    def _invalidate(self, page_id: str) -> None:
+        """Drops cached results of every page that can reach page_id."""
+        if not self._chains and not self._bounds:
+            return
+        stack, seen = [page_id], {page_id}
+        while stack:
+            current = stack.pop()
+            self._chains.pop(current, None)
+            self._bounds.pop(current, None)
+            for referrer in self.referrers.get(current, ()):
+                if referrer not in seen:
+                    seen.add(referrer)
+                    stack.append(referrer)
+
+    def chain(self, page_id: str) -> Tuple[str, ...]:
+        """Stored pages reachable from page_id over pre/next links, breadth first."""
+        cached = self._chains.get(page_id)
+        if cached is not None:
+            return cached
+        order: List[str] = []
+        queue, visited, head = [page_id], {page_id}, 0
+        while head < len(queue):
+            current = queue[head]
+            head += 1
+            links = self.links.get(current)
+            if links is None:
+                continue
+            order.append(current)
+            for neighbour in links:
+                if neighbour and neighbour not in visited:
+                    visited.add(neighbour)
+                    queue.append(neighbour)
+        result = self._chains[page_id] = tuple(order)
+        return result
+
+    def bounds(self, page_id: str) -> Optional[Tuple[str, str]]:
+        """First and last stored page of the linked list through page_id."""
+        if page_id not in self.links:
+            return None
+        cached = self._bounds.get(page_id)
+        if cached is not None:
+            return cached
+        ends = []
+        for side in (0, 1):  # pre_page, then next_page
+            current, seen = page_id, {page_id}
+            while True:
+                following = self.links[current][side]
+                if not following or following not in self.links or following in seen:
+                    break
+                seen.add(following)
+                current = following
+            ends.append(current)
+        result = self._bounds[page_id] = (ends[0], ends[1])
+        return result
+
+    def rebuild(self, pages: Iterable[dict]) -> None:
+        self.clear()
+        for page in pages:
+            self.set(page["page_id"], page.get("pre_page"), page.get("next_page"))
@@ -214,6 +214,10 @@ EXTRACT_THEME_USER_PROMPT = (
 EXTRACT_KEYWORDS_SYSTEM_PROMPT = "You are an expert in keyword extraction. Extract only the most essential keywords from the text. Return 3-5 keywords maximum as a comma-separated list. Be extremely selective."
 EXTRACT_KEYWORDS_USER_PROMPT = "Please extract the 3-5 most important keywords from the following text. Be very selective and concise:\n{text}\n\nKeywords:"
 
+# Prompt for extracting keywords of many texts in one call (from utils.py, llm_extract_keywords_batch)
+EXTRACT_KEYWORDS_BATCH_SYSTEM_PROMPT = 'You are an expert in keyword extraction. For each numbered text, extract only its 3-5 most essential keywords. Respond with JSON only, in the form {"keywords": [["keyword", ...], ...]}: one list per text, in the order of the texts.'
+EXTRACT_KEYWORDS_BATCH_USER_PROMPT = "Please extract the 3-5 most important keywords from each of the following {count} texts. Be very selective and concise:\n{texts}\n\nJSON:"
+
 # Prompt for conversation continuity check (from dynamic_update.py, _is_conversation_continuing)
 CONTINUITY_CHECK_SYSTEM_PROMPT = (
     "You are a conversation continuity detector. Return ONLY 'true' or 'false'."
@@ -244,3 +248,7 @@ META_INFO_USER_PROMPT = """Update the conversation meta-summary by incorporating
     {new_dialogue}
 
     Updated Meta-summary:"""
+
+# Prompt for folding new messages into a thread's rolling summary (from summary_scheduler.py, RollingSummaryScheduler)
+ROLLING_SUMMARY_SYSTEM_PROMPT = "You are a rolling summarizer. Provide a short, updated summary of the conversation so far. Summarize key points and overall direction. Keep it concise and output ONLY the updated summary."
+ROLLING_SUMMARY_USER_PROMPT = "Update the rolling summary of this conversation with the new exchanges. If there is no previous summary, write one from the new exchanges alone.\n\nPrevious Summary:\n{previous_summary}\n\nNew Exchanges:\n{new_messages}\n\nUpdated Summary:"
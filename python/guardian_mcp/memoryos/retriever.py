@@ -1,7 +1,47 @@
+from memoryos.utils import query_embedding_scope
+
+
 class Retriever:
-    def retrieve_context(self, user_query, user_id):
+    def __init__(
+        self,
+        mid_term_memory=None,
+        long_term_memory=None,
+        assistant_long_term_memory=None,
+        retrieval_queue_capacity=7,
+    ):
+        # Memory tiers are optional; a Retriever without them returns empty context
+        self.mid_term_memory = mid_term_memory
+        self.long_term_memory = long_term_memory
+        self.assistant_long_term_memory = assistant_long_term_memory
+        self.retrieval_queue_capacity = retrieval_queue_capacity
+
+    def retrieve_context(self, user_query, user_id=None, limit=None):
+        limit = limit or self.retrieval_queue_capacity
+        retrieved_pages = []
+        retrieved_user_knowledge = []
+        retrieved_assistant_knowledge = []
+
+        # One scope per turn: the query is embedded once for all three searches
+        with query_embedding_scope():
+            if self.mid_term_memory is not None:
+                matched = []
+                for session in self.mid_term_memory.search_sessions(user_query):
+                    matched.extend(session["matched_pages"])
+                matched.sort(key=lambda x: x["score"], reverse=True)
+                retrieved_pages = [m["page_data"] for m in matched[:limit]]
+            if self.long_term_memory is not None:
+                retrieved_user_knowledge = self.long_term_memory.search_user_knowledge(
+                    user_query
+                )
+            if self.assistant_long_term_memory is not None:
+                retrieved_assistant_knowledge = (
+                    self.assistant_long_term_memory.search_assistant_knowledge(
+                        user_query
+                    )
+                )
+
         return {
-            "retrieved_pages": [],
-            "retrieved_user_knowledge": [],
-            "retrieved_assistant_knowledge": [],
-        }
\ No newline at end of file
+            "retrieved_pages": retrieved_pages,
+            "retrieved_user_knowledge": retrieved_user_knowledge,
+            "retrieved_assistant_knowledge": retrieved_assistant_knowledge,
+        }
@@ -0,0 +1,185 @@
+"""
+Scores new page batches against every mid-term session at once.
+
+SessionMatcher keeps the session summary embeddings in one contiguous float32
+matrix (rows in session insertion order) and each session's summary keywords
+as a set of KeywordVocabulary ids, with an inverted index keyword id -> rows.
+scores() then rates many queries against all sessions with one matrix
+multiply for the semantic part, and the keyword Jaccard part touches only the
+rows sharing a keyword with the query:
+
+    score = summary_embedding . query_vec + alpha * |K_s & K_q| / |K_s | K_q|
+
+which is what insert_pages_into_session computed session by session.
+
+Removed sessions leave a dead row behind so row order (and argmax tie-breaking
+in session order) is kept; the matrix is compacted once half the rows are dead.
+"""
+
+from collections import defaultdict
+from typing import Dict, FrozenSet, Iterable, List, Optional, Sequence, Set, Tuple
+
+import numpy as np
+
+from .keywords import KeywordVocabulary
+
+MIN_ROWS = 64
+COMPACT_MIN_DEAD = 256
+
+
+class SessionMatcher:
+    def __init__(self):
+        self.vocabulary = KeywordVocabulary()
+        self._reset()
+
+    def _reset(self) -> None:
+        self._matrix: Optional[np.ndarray] = None
+        self._live = np.zeros(0, dtype=bool)
+        self._keyword_counts = np.zeros(0, dtype=np.float32)
+        self._sids: List[Optional[str]] = []
+        self._keyword_ids: List[FrozenSet[int]] = []
+        self._rows: Dict[str, int] = {}
+        self._postings: Dict[int, Set[int]] = defaultdict(set)
+        self._dead = 0
+
+    def __len__(self):
+        return len(self._rows)
+
+    def __contains__(self, session_id):
+        return session_id in self._rows
+
+    def upsert(self, session_id: str, embedding, keywords: Iterable[str] = ()) -> None:
+        """Adds a session (re-adding moves it to the end); no embedding, no row."""
+        if session_id in self._rows:
+            self.remove(session_id)
+        if embedding is None:
+            return
+        vec = np.asarray(embedding, dtype=np.float32)
+        size = len(self._sids)
+        if self._matrix is None or size == len(self._matrix):
+            self._grow(vec.shape[0])
+        self._matrix[size] = vec
+        keyword_ids = self.vocabulary.add(keywords)
+        self._live[size] = True
+        self._keyword_counts[size] = len(keyword_ids)
+        self._sids.append(session_id)
+        self._keyword_ids.append(keyword_ids)
+        self._rows[session_id] = size
+        for keyword_id in keyword_ids:
+            self._postings[keyword_id].add(size)
+
+    def remove(self, session_id: str) -> None:
+        row = self._rows.pop(session_id, None)
+        if row is None:
+            return
+        self._live[row] = False
+        for keyword_id in self._keyword_ids[row]:
+            rows = self._postings.get(keyword_id)
+            if rows is not None:
+                rows.discard(row)
+                if not rows:
+                    del self._postings[keyword_id]
+        self._sids[row] = None
+        self._keyword_ids[row] = frozenset()
+        self._dead += 1
+        if self._dead >= COMPACT_MIN_DEAD and self._dead * 2 >= len(self._sids):
+            self._compact()
+
+    def rebuild(self, sessions: Dict[str, dict]) -> None:
+        self.vocabulary = KeywordVocabulary()
+        self._reset()
+        for session_id, session in sessions.items():
+            self.upsert(
+                session_id,
+                session.get("summary_embedding"),
+                session.get("summary_keywords", []),
+            )
+
+    def scores(
+        self,
+        query_vecs,
+        query_keywords: Sequence[Iterable[str]],
+        keyword_alpha: float = 1.0,
+        session_ids: Optional[Sequence[str]] = None,
+    ) -> Tuple[List[Optional[str]], np.ndarray]:
+        """
+        (row session ids, scores of shape (queries, rows)). Rows are every
+        stored session in insertion order, or session_ids in the given order;
+        dead rows are None with a score of -inf.
+        """
+        query_vecs = np.atleast_2d(np.asarray(query_vecs, dtype=np.float32))
+        if session_ids is None:
+            rows = None
+            sids = list(self._sids)
+        else:
+            rows = np.array([self._rows[sid] for sid in session_ids], dtype=np.int64)
+            sids = list(session_ids)
+        if not sids:
+            return sids, np.zeros((len(query_vecs), 0), dtype=np.float32)
+
+        matrix = self._matrix[: len(self._sids)] if rows is None else self._matrix[rows]
+        scores = query_vecs @ matrix.T  # One multiply for every query and session
+        if rows is None and self._dead:
+            scores[:, ~self._live[: len(sids)]] = -np.inf
+
+        positions = None
+        if rows is not None:
+            positions = {int(row): i for i, row in enumerate(rows)}
+        for q, keywords in enumerate(query_keywords):
+            keyword_ids, query_size = self.vocabulary.lookup(keywords)
+            if not keyword_ids:
+                continue  # No shared keyword, no overlap term
+            overlap: Dict[int, int] = defaultdict(int)
+            for keyword_id in keyword_ids:
+                for row in self._postings.get(keyword_id, ()):
+                    overlap[row] += 1
+            if positions is not None:
+                overlap = {
+                    positions[row]: n for row, n in overlap.items() if row in positions
+                }
+                if not overlap:
+                    continue
+            columns = np.fromiter(overlap.keys(), dtype=np.int64, count=len(overlap))
+            shared = np.fromiter(overlap.values(), dtype=np.float32, count=len(overlap))
+            counts = self._keyword_counts[
+                columns if rows is None else rows[columns]
+            ]
+            scores[q, columns] += keyword_alpha * shared / (query_size + counts - shared)
+        return sids, scores
+
+    def _grow(self, dim: int) -> None:
+        old_size = 0 if self._matrix is None else len(self._matrix)
+        if self._matrix is not None and self._matrix.shape[1] != dim:
+            raise ValueError(
+                f"Session embedding has dimension {dim}, expected {self._matrix.shape[1]}"
+            )
+        capacity = max(MIN_ROWS, old_size * 2)
+        matrix = np.zeros((capacity, dim), dtype=np.float32)
+        live = np.zeros(capacity, dtype=bool)
+        counts = np.zeros(capacity, dtype=np.float32)
+        if self._matrix is not None:
+            matrix[:old_size] = self._matrix
+            live[:old_size] = self._live
+            counts[:old_size] = self._keyword_counts
+        self._matrix, self._live, self._keyword_counts = matrix, live, counts
+
+    def _compact(self) -> None:
+        keep = [row for row, sid in enumerate(self._sids) if sid is not None]
+        matrix = self._matrix[keep] if keep else None
+        sids = [self._sids[row] for row in keep]
+        keyword_ids = [self._keyword_ids[row] for row in keep]
+        self._reset()
+        if matrix is None:
+            return
+        self._grow(matrix.shape[1])
+        while len(self._matrix) < len(keep):
+            self._grow(matrix.shape[1])
+        for row, (sid, ids) in enumerate(zip(sids, keyword_ids)):
+            self._matrix[row] = matrix[row]
+            self._live[row] = True
+            self._keyword_counts[row] = len(ids)
+            self._sids.append(sid)
+            self._keyword_ids.append(ids)
+            self._rows[sid] = row
+            for keyword_id in ids:
+                self._postings[keyword_id].add(row)
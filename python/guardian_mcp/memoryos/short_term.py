@@ -1,15 +1,19 @@
 import json
 from collections import deque
 
+from .storage.backends import JsonExportMixin, SequenceKeys, make_storage
 from .utils import ensure_directory_exists, get_timestamp
 
 
-class ShortTermMemory:
-    def __init__(self, file_path, max_capacity=10):
+class ShortTermMemory(JsonExportMixin):
+    def __init__(self, file_path, max_capacity=10, storage="oplog"):
         self.max_capacity = max_capacity
         self.file_path = file_path
         ensure_directory_exists(self.file_path)
         self.memory = deque(maxlen=max_capacity)
+        # "oplog" appends only changed QA pairs; "json" rewrites file_path on every save
+        self.storage = make_storage(storage, self.file_path)
+        self._qa_keys = SequenceKeys("qa")
         self.load()
 
     def add_qa_pair(self, qa_pair):
@@ -37,22 +41,32 @@ class ShortTermMemory:
             return msg
         return None
 
+    # ---- Storage hooks (see memoryos.storage.backends) ----
+    def _to_document(self):
+        return list(self.memory)
+
+    def _from_document(self, data):
+        # Ensure items are loaded correctly, especially if file was empty or malformed
+        if isinstance(data, list):
+            self.memory = deque(data, maxlen=self.max_capacity)
+        else:
+            self.memory = deque(maxlen=self.max_capacity)
+
+    def _to_records(self):
+        return dict(zip(self._qa_keys.keys_for(self.memory), self.memory)), {}
+
+    def _from_records(self, records, get_vector):
+        self.memory = self._qa_keys.load(records, maxlen=self.max_capacity)
+
     def save(self):
         try:
-            with open(self.file_path, "w", encoding="utf-8") as f:
-                json.dump(list(self.memory), f, ensure_ascii=False, indent=2)
+            self.storage.save(self)
         except IOError as e:
             print(f"Error saving ShortTermMemory to {self.file_path}: {e}")
 
     def load(self):
         try:
-            with open(self.file_path, "r", encoding="utf-8") as f:
-                data = json.load(f)
-                # Ensure items are loaded correctly, especially if file was empty or malformed
-                if isinstance(data, list):
-                    self.memory = deque(data, maxlen=self.max_capacity)
-                else:
-                    self.memory = deque(maxlen=self.max_capacity)
+            self.storage.load(self)
             print(f"ShortTermMemory: Loaded from {self.file_path}.")
         except FileNotFoundError:
             self.memory = deque(maxlen=self.max_capacity)
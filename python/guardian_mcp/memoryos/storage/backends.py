@@ -0,0 +1,162 @@
+"""
+Pluggable persistence for the memoryos tiers.
+
+A tier describes its state through four hooks:
+- _to_document() / _from_document(data): the JSON file layout
+- _to_records() -> (records, vectors) / _from_records(records, get_vector):
+  the same state as flat keyed records, with embeddings split out per key
+
+JsonFileBackend rewrites the whole JSON document on every save (the original
+behaviour). OpLogBackend diffs the records against the last save and appends
+only what changed to an OpLogStore, with embeddings in its .npy side file, so
+a page insert or a heat update costs a few hundred bytes instead of the whole
+file. The JSON layout remains the import/export format, and an existing JSON
+file is imported the first time a tier opens with the op log.
+"""
+
+import json
+import logging
+import os
+from collections import deque
+from typing import Any, Callable, Dict, List, Optional, Tuple, Union
+
+from memoryos.storage.oplog import OpLogStore
+
+logger = logging.getLogger(__name__)
+
+Records = Tuple[Dict[str, Any], Dict[str, Any]]
+
+
+class JsonFileBackend:
+    kind = "json"
+
+    def __init__(self, file_path: str, indent: Optional[int] = 2):
+        self.file_path = file_path
+        self.indent = indent
+        self.bytes_written = 0
+
+    def load(self, tier):
+        with open(self.file_path, "r", encoding="utf-8") as f:
+            tier._from_document(json.load(f))
+
+    def save(self, tier):
+        text = json.dumps(tier._to_document(), ensure_ascii=False, indent=self.indent)
+        with open(self.file_path, "w", encoding="utf-8") as f:
+            f.write(text)
+        self.bytes_written += len(text.encode("utf-8"))
+
+    def compact(self, tier):
+        self.save(tier)
+
+    def close(self):
+        pass
+
+
+class OpLogBackend:
+    kind = "oplog"
+
+    def __init__(self, file_path: str, fsync: bool = True, **store_options):
+        self.file_path = file_path  # Legacy JSON file, imported on first open
+        self.store = OpLogStore(
+            os.path.splitext(file_path)[0], fsync=fsync, **store_options
+        )
+
+    @property
+    def bytes_written(self) -> int:
+        return self.store.bytes_written
+
+    def load(self, tier):
+        if self.store.exists():
+            tier._from_records(self.store.load(), self.store.get_vector)
+        elif os.path.exists(self.file_path):
+            with open(self.file_path, "r", encoding="utf-8") as f:
+                tier._from_document(json.load(f))
+            self.store.sync(*tier._to_records(), snapshot=True)
+            logger.info(f"Imported {self.file_path} into {self.store.log_path}")
+        else:
+            raise FileNotFoundError(self.store.log_path)
+
+    def save(self, tier):
+        self.store.sync(*tier._to_records())
+
+    def compact(self, tier):
+        """Writes a snapshot of the current state and truncates the log."""
+        self.store.sync(*tier._to_records(), snapshot=True)
+
+    def close(self):
+        self.store.close()
+
+
+STORAGE_BACKENDS: Dict[str, Callable[[str], Any]] = {
+    "json": JsonFileBackend,
+    "oplog": OpLogBackend,
+}
+
+
+def make_storage(storage: Union[str, Any], file_path: str):
+    """Resolves a backend name from STORAGE_BACKENDS; backend instances pass through."""
+    if not isinstance(storage, str):
+        return storage
+    try:
+        return STORAGE_BACKENDS[storage](file_path)
+    except KeyError:
+        raise ValueError(
+            f"Unknown storage backend {storage!r}; expected one of {sorted(STORAGE_BACKENDS)}"
+        ) from None
+
+
+class JsonExportMixin:
+    """export_json/import_json in the tier's JSON layout, whatever the backend."""
+
+    def export_json(self, path: Optional[str] = None):
+        path = path or self.file_path
+        with open(path, "w", encoding="utf-8") as f:
+            json.dump(self._to_document(), f, ensure_ascii=False, indent=2)
+        return path
+
+    def import_json(self, path: Optional[str] = None):
+        with open(path or self.file_path, "r", encoding="utf-8") as f:
+            self._from_document(json.load(f))
+        self.save()
+
+
+class SequenceKeys:
+    """
+    Stable, order-preserving record keys ("<prefix>:<seq>") for deque entries.
+
+    Entries are plain dicts, so they are tracked by identity; the entry is kept
+    alongside its key so its id cannot be reused while the mapping holds it,
+    and entries that left the deque are dropped on every call.
+    """
+
+    def __init__(self, prefix: str):
+        self.prefix = prefix
+        self._keys: Dict[int, Tuple[str, Any]] = {}
+        self._next = 0
+
+    def owns(self, key: str) -> bool:
+        return key.startswith(f"{self.prefix}:")
+
+    def keys_for(self, entries) -> List[str]:
+        tracked: Dict[int, Tuple[str, Any]] = {}
+        keys = []
+        for entry in entries:
+            known = self._keys.get(id(entry))
+            if known is not None and known[1] is entry:
+                key = known[0]
+            else:
+                key = f"{self.prefix}:{self._next:012d}"
+                self._next += 1
+            tracked[id(entry)] = (key, entry)
+            keys.append(key)
+        self._keys = tracked
+        return keys
+
+    def load(self, records: Dict[str, Any], maxlen: Optional[int] = None) -> deque:
+        """Rebuilds the deque from this prefix's records, oldest first."""
+        keys = sorted(k for k in records if self.owns(k))
+        entries = deque((records[k] for k in keys), maxlen=maxlen)
+        keys = keys[len(keys) - len(entries) :]  # maxlen may have dropped the oldest
+        self._keys = {id(e): (k, e) for k, e in zip(keys, entries)}
+        self._next = int(keys[-1].rsplit(":", 1)[1]) + 1 if keys else 0
+        return entries
@@ -0,0 +1,469 @@
+"""
+Append-only operation log with snapshots and a memory-mapped vector side file.
+
+A store at `<base>` keeps three files:
+- <base>.log          ops appended since the last snapshot
+- <base>.snapshot     the full state as of op number N
+- <base>.vectors.npy  float32 (capacity, dim) rows, one per vector slot
+
+Every frame is `<length:u32><crc32:u32><payload>` with a compact JSON payload.
+On open, a torn or corrupted tail is detected by its length/checksum and
+truncated; everything before it is replayed. Ops:
+
+    {"op": "upsert", "k": key, "v": value, "n": seq}
+    {"op": "delete", "k": key, "n": seq}             drops the key's vector too
+    {"op": "vector", "k": key, "s": slot, "n": seq}  or "x": [...] stored inline
+    {"op": "unvector", "k": key, "n": seq}
+
+sync() diffs the caller's records against what is stored and commits only the
+changes in one append: new vector rows are written to free slots and flushed
+first, then the log is fsynced, so a committed op never points at a row that is
+not on disk. Slots are reused only after the op releasing them has committed.
+
+Once the log outgrows the snapshot it is compacted: the state is written to a
+temporary snapshot, fsynced and renamed into place, then the log is truncated.
+Replay skips ops the snapshot already covers, so a crash between the two steps
+is harmless.
+"""
+
+import json
+import logging
+import os
+import struct
+import threading
+import zlib
+from typing import Any, Dict, List, Optional, Tuple
+
+import numpy as np
+
+logger = logging.getLogger(__name__)
+
+LOG_MAGIC = b"MOSLOG1\n"
+SNAPSHOT_MAGIC = b"MOSSNP1\n"
+FRAME_HEADER = struct.Struct("<II")  # payload length, crc32 of payload
+MAX_FRAME_BYTES = 256 * 1024 * 1024  # Larger lengths can only come from corruption
+
+SNAPSHOT_MIN_BYTES = 1 << 20  # Never compact a log smaller than this
+SNAPSHOT_RATIO = 1.0  # Compact once the log outgrows the snapshot by this factor
+
+
+class CorruptStoreError(RuntimeError):
+    """Raised when a snapshot fails its checksums; logs are repaired instead."""
+
+
+# Canonical form: sorted keys make a record's encoding (and fingerprint) stable
+# across a save/load cycle
+_encoder = json.JSONEncoder(ensure_ascii=False, separators=(",", ":"), sort_keys=True)
+encode_json = _encoder.encode
+
+
+def _frame(payload: str) -> bytes:
+    data = payload.encode("utf-8")
+    return FRAME_HEADER.pack(len(data), zlib.crc32(data)) + data
+
+
+def read_frames(path: str, magic: bytes) -> Tuple[List[dict], int, bool]:
+    """Returns (ops, offset after the last good frame, whether the file ended there)."""
+    with open(path, "rb") as f:
+        data = f.read()
+    if len(data) < len(magic):
+        return [], 0, not data
+    if not data.startswith(magic):
+        raise CorruptStoreError(f"{path} is not a memoryos op log")
+    ops, offset = [], len(magic)
+    while offset + FRAME_HEADER.size <= len(data):
+        length, crc = FRAME_HEADER.unpack_from(data, offset)
+        start = offset + FRAME_HEADER.size
+        payload = data[start : start + length]
+        if (
+            length > MAX_FRAME_BYTES
+            or len(payload) < length
+            or zlib.crc32(payload) != crc
+        ):
+            break
+        try:
+            ops.append(json.loads(payload))
+        except ValueError:
+            break
+        offset = start + length
+    return ops, offset, offset == len(data)
+
+
+def _fsync_dir(path: str):
+    try:
+        fd = os.open(os.path.dirname(os.path.abspath(path)), os.O_RDONLY)
+    except OSError:
+        return  # Not supported on this platform
+    try:
+        os.fsync(fd)
+    except OSError:
+        pass
+    finally:
+        os.close(fd)
+
+
+class VectorFile:
+    """float32 rows in a .npy file, memory-mapped and grown by doubling."""
+
+    MIN_CAPACITY = 64
+
+    def __init__(self, path: str, fsync: bool = True):
+        self.path = path
+        self.fsync = fsync
+        self.array: Optional[np.memmap] = None
+        if os.path.exists(path):
+            try:
+                self.array = np.load(path, mmap_mode="r+")
+            except (OSError, ValueError) as e:
+                logger.warning(f"Ignoring unreadable vector file {path}: {e}")
+
+    @property
+    def capacity(self) -> int:
+        return 0 if self.array is None else self.array.shape[0]
+
+    def fits(self, vector: np.ndarray) -> bool:
+        if vector.ndim != 1 or not len(vector):
+            return False
+        return self.array is None or self.array.shape[1] == len(vector)
+
+    def write(self, slot: int, vector: np.ndarray):
+        if slot >= self.capacity:
+            self._grow(max(slot + 1, 2 * self.capacity, self.MIN_CAPACITY), len(vector))
+        self.array[slot] = vector
+
+    def read(self, slot: int) -> Optional[np.ndarray]:
+        if slot >= self.capacity:
+            return None  # Side file lost or truncated
+        return np.array(self.array[slot])
+
+    def flush(self):
+        if self.array is not None:
+            self.array.flush()
+
+    def _grow(self, capacity: int, dim: int):
+        tmp_path = f"{self.path}.tmp"
+        grown = np.lib.format.open_memmap(
+            tmp_path, mode="w+", dtype=np.float32, shape=(capacity, dim)
+        )
+        if self.array is not None:
+            grown[: self.capacity] = self.array
+        grown.flush()
+        del grown
+        if self.fsync:
+            with open(tmp_path, "rb+") as f:
+                os.fsync(f.fileno())
+        self.array = None
+        os.replace(tmp_path, self.path)
+        if self.fsync:
+            _fsync_dir(self.path)
+        self.array = np.load(self.path, mmap_mode="r+")
+
+    def close(self):
+        self.flush()
+        self.array = None
+
+
+class OpLogStore:
+    """
+    Keyed JSON records plus one optional vector per key, persisted as an op log.
+
+    Vectors are treated as immutable objects: sync() skips a vector it has
+    already written unless a different object is passed for that key.
+    """
+
+    def __init__(
+        self,
+        base_path: str,
+        fsync: bool = True,
+        snapshot_min_bytes: int = SNAPSHOT_MIN_BYTES,
+        snapshot_ratio: float = SNAPSHOT_RATIO,
+    ):
+        self.base_path = base_path
+        self.log_path = f"{base_path}.log"
+        self.snapshot_path = f"{base_path}.snapshot"
+        self.fsync = fsync
+        self.snapshot_min_bytes = snapshot_min_bytes
+        self.snapshot_ratio = snapshot_ratio
+        self.vectors = VectorFile(f"{base_path}.vectors.npy", fsync=fsync)
+        self.seq = 0
+        self._fingerprints: Dict[str, int] = {}  # key -> hash of its stored JSON
+        self._slots: Dict[str, Any] = {}  # key -> row in the side file, or inline list
+        # key -> hash of the float32 bytes last synced; catches replaced and
+        # in-place edited vectors alike
+        self._vector_digests: Dict[str, int] = {}
+        self._free_slots: List[int] = []
+        self._next_slot = 0
+        self._log = None
+        self._log_bytes = 0
+        self._snapshot_bytes = 0
+        self._lock = threading.Lock()
+        self.stats = {
+            "commits": 0,
+            "ops": 0,
+            "snapshots": 0,
+            "log_bytes": 0,
+            "vector_bytes": 0,
+            "snapshot_bytes": 0,
+        }
+
+    @property
+    def bytes_written(self) -> int:
+        return (
+            self.stats["log_bytes"]
+            + self.stats["vector_bytes"]
+            + self.stats["snapshot_bytes"]
+        )
+
+    def exists(self) -> bool:
+        return os.path.exists(self.log_path) or os.path.exists(self.snapshot_path)
+
+    # ---- Recovery ----
+    @staticmethod
+    def _apply(op: dict, records: Dict[str, Any], slots: Dict[str, Any]):
+        kind, key = op.get("op"), op.get("k")
+        if kind == "upsert":
+            records[key] = op["v"]
+        elif kind == "delete":
+            records.pop(key, None)
+            slots.pop(key, None)
+        elif kind == "vector":
+            slots[key] = op["x"] if "x" in op else op["s"]
+        elif kind == "unvector":
+            slots.pop(key, None)
+
+    def load(self) -> Dict[str, Any]:
+        """Replays snapshot + log and returns the records; repairs a torn log tail."""
+        with self._lock:
+            records: Dict[str, Any] = {}
+            slots: Dict[str, Any] = {}
+            seq = 0
+            if os.path.exists(self.snapshot_path):
+                ops, end, clean = read_frames(self.snapshot_path, SNAPSHOT_MAGIC)
+                if not clean or not ops or ops[0].get("op") != "snapshot":
+                    raise CorruptStoreError(f"Snapshot {self.snapshot_path} is damaged")
+                seq = ops[0]["n"]
+                for op in ops[1:]:
+                    self._apply(op, records, slots)
+                self._snapshot_bytes = end
+            if os.path.exists(self.log_path):
+                ops, end, clean = read_frames(self.log_path, LOG_MAGIC)
+                for op in ops:
+                    if op.get("n", 0) > seq:  # Older ops are already in the snapshot
+                        self._apply(op, records, slots)
+                        seq = op["n"]
+                if not clean:
+                    logger.warning(
+                        f"Truncating torn tail of {self.log_path} at byte {end}"
+                    )
+                    with open(self.log_path, "r+b") as f:
+                        f.truncate(end)
+                        if end == 0:
+                            f.write(LOG_MAGIC)
+                            end = len(LOG_MAGIC)
+                        f.flush()
+                        os.fsync(f.fileno())
+                self._log_bytes = end
+
+            self.seq = seq
+            self._slots = slots
+            self._fingerprints = {k: hash(encode_json(v)) for k, v in records.items()}
+            self._vector_digests = {}
+            used = {s for s in slots.values() if isinstance(s, int)}
+            self._next_slot = max(used) + 1 if used else 0
+            self._free_slots = sorted(
+                (s for s in range(self._next_slot) if s not in used), reverse=True
+            )
+            return records
+
+    def get_vector(self, key: str) -> Optional[np.ndarray]:
+        slot = self._slots.get(key)
+        if slot is None:
+            return None
+        if isinstance(slot, list):
+            return np.asarray(slot, dtype=np.float32)
+        return self.vectors.read(slot)
+
+    # ---- Writes ----
+    def sync(
+        self,
+        records: Dict[str, Any],
+        vectors: Dict[str, Any],
+        snapshot: bool = False,
+    ) -> int:
+        """
+        Makes the store hold exactly `records` and `vectors` (key -> sequence of
+        floats or None) by appending the differing ops, then commits them.
+        Returns the number of ops written.
+        """
+        with self._lock:
+            seq = self.seq
+            frames: List[bytes] = []
+            fingerprints: Dict[str, Optional[int]] = {}
+            slots: Dict[str, Any] = {}  # key -> new slot, None when dropped
+            released: List[int] = []
+            taken: List[int] = []
+            vector_bytes = 0
+            digests: Dict[str, int] = {}  # key -> digest of the vector passed in
+
+            def append(payload: str):
+                frames.append(_frame(payload))
+
+            for key, value in records.items():
+                encoded = encode_json(value)
+                fingerprint = hash(encoded)
+                if self._fingerprints.get(key) != fingerprint:
+                    seq += 1
+                    append(
+                        '{"k":%s,"n":%d,"op":"upsert","v":%s}'
+                        % (encode_json(key), seq, encoded)
+                    )
+                    fingerprints[key] = fingerprint
+            for key in self._fingerprints:
+                if key not in records:
+                    seq += 1
+                    append(encode_json({"op": "delete", "k": key, "n": seq}))
+                    fingerprints[key] = None
+                    slots[key] = None
+
+            for key, vector in vectors.items():
+                if key in slots:
+                    continue
+                if vector is None or not len(vector):
+                    if key in self._slots:
+                        seq += 1
+                        append(encode_json({"op": "unvector", "k": key, "n": seq}))
+                        slots[key] = None
+                    continue
+                array = np.asarray(vector, dtype=np.float32).ravel()
+                digest = hash(array.tobytes())
+                digests[key] = digest
+                if self._vector_digests.get(key) == digest and key in self._slots:
+                    continue
+                current = self.get_vector(key)
+                if current is not None and np.array_equal(current, array):
+                    continue
+                seq += 1
+                if self.vectors.fits(array):
+                    slot = self._free_slots.pop() if self._free_slots else None
+                    if slot is None:
+                        slot, self._next_slot = self._next_slot, self._next_slot + 1
+                    taken.append(slot)
+                    self.vectors.write(slot, array)
+                    vector_bytes += array.nbytes
+                    slots[key] = slot
+                    append(encode_json({"op": "vector", "k": key, "s": slot, "n": seq}))
+                else:  # Width differs from the side file (e.g. a new embedding model)
+                    slots[key] = array.tolist()
+                    append(
+                        encode_json(
+                            {"op": "vector", "k": key, "x": slots[key], "n": seq}
+                        )
+                    )
+            for key in self._slots:
+                if key not in slots and key not in vectors:
+                    seq += 1
+                    append(encode_json({"op": "unvector", "k": key, "n": seq}))
+                    slots[key] = None
+
+            if frames:
+                try:
+                    self._commit(frames)
+                except Exception:
+                    self._free_slots.extend(taken)  # Nothing references them yet
+                    raise
+            self.seq = seq
+            for key, fingerprint in fingerprints.items():
+                if fingerprint is None:
+                    self._fingerprints.pop(key, None)
+                else:
+                    self._fingerprints[key] = fingerprint
+            for key, slot in slots.items():
+                previous = self._slots.pop(key, None)
+                if isinstance(previous, int):
+                    released.append(previous)
+                if slot is not None:
+                    self._slots[key] = slot
+                else:
+                    self._vector_digests.pop(key, None)
+            for key, digest in digests.items():
+                if key in self._slots:
+                    self._vector_digests[key] = digest
+            self._free_slots.extend(released)
+            self._free_slots.sort(reverse=True)
+            self.stats["vector_bytes"] += vector_bytes
+            self.stats["ops"] += len(frames)
+
+            if snapshot or self._log_bytes > max(
+                self.snapshot_min_bytes, self.snapshot_ratio * self._snapshot_bytes
+            ):
+                self._write_snapshot(records)
+            return len(frames)
+
+    def _open_log(self):
+        if self._log is None:
+            self._log = open(self.log_path, "ab")
+            if self._log.tell() == 0:
+                self._log.write(LOG_MAGIC)
+            self._log_bytes = self._log.tell()
+        return self._log
+
+    def _commit(self, frames: List[bytes]):
+        if self.fsync:
+            self.vectors.flush()  # Rows must be durable before ops point at them
+        log = self._open_log()
+        blob = b"".join(frames)
+        log.write(blob)
+        log.flush()
+        if self.fsync:
+            os.fsync(log.fileno())
+        self._log_bytes += len(blob)
+        self.stats["log_bytes"] += len(blob)
+        self.stats["commits"] += 1
+
+    def _write_snapshot(self, records: Dict[str, Any]):
+        tmp_path = f"{self.snapshot_path}.tmp"
+        with open(tmp_path, "wb") as f:
+            f.write(SNAPSHOT_MAGIC)
+            f.write(_frame(encode_json({"op": "snapshot", "n": self.seq})))
+            for key, value in records.items():
+                f.write(
+                    _frame(
+                        '{"k":%s,"op":"upsert","v":%s}'
+                        % (encode_json(key), encode_json(value))
+                    )
+                )
+            for key, slot in self._slots.items():
+                op = {"op": "vector", "k": key}
+                op["x" if isinstance(slot, list) else "s"] = slot
+                f.write(_frame(encode_json(op)))
+            f.flush()
+            if self.fsync:
+                os.fsync(f.fileno())
+            size = f.tell()
+        os.replace(tmp_path, self.snapshot_path)
+        if self.fsync:
+            _fsync_dir(self.snapshot_path)
+
+        # Everything in the log is now covered by the snapshot
+        if self._log is not None:
+            self._log.close()
+            self._log = None
+        with open(self.log_path, "wb") as f:
+            f.write(LOG_MAGIC)
+            f.flush()
+            if self.fsync:
+                os.fsync(f.fileno())
+        self._log_bytes = len(LOG_MAGIC)
+        self._snapshot_bytes = size
+        self.stats["snapshot_bytes"] += size
+        self.stats["snapshots"] += 1
+        logger.info(
+            f"Compacted {self.log_path} into a {size}-byte snapshot at op {self.seq}"
+        )
+
+    def close(self):
+        with self._lock:
+            if self._log is not None:
+                self._log.close()
+                self._log = None
+            self.vectors.close()
@@ -0,0 +1,224 @@
+"""
+Debounced, incremental rolling summaries for conversation threads.
+
+add_memory used to re-summarize the last 40 messages of a thread with an LLM
+call after every single message, so chat throughput was bounded by the
+summarizer. RollingSummaryScheduler takes that call off the request path:
+
+- note_message() only bumps a per-thread counter and a due time; a thread is
+  due once every_n_messages have arrived or idle_seconds after its last one,
+  so a burst of messages coalesces into one update
+- one background worker runs the due updates, one thread at a time
+- an update folds only the messages after the last summarized one into the
+  previous summary (incremental summarization); past max_delta_messages of
+  them only the newest are folded in
+
+The summary and the id of the last message it covers are stored together in
+the TokenLedger, and a summary only replaces one covering fewer messages, so
+reads always return the latest completed summary. flush() brings a thread's
+summary up to date and waits for it.
+"""
+
+import logging
+import threading
+import time
+from dataclasses import dataclass
+from typing import Dict, Iterable, List, Optional
+
+from . import prompts
+from .token_ledger import TokenLedger
+
+logger = logging.getLogger(__name__)
+
+DEFAULT_EVERY_N_MESSAGES = 10
+DEFAULT_IDLE_SECONDS = 30.0
+DEFAULT_MAX_DELTA_MESSAGES = 40
+
+
+def rolling_summary_messages(previous_summary: Optional[str], delta: List[dict]) -> list:
+    new_messages = "\n".join(
+        f"User: {m['user_input']}\nAssistant: {m['agent_response']}" for m in delta
+    )
+    return [
+        {"role": "system", "content": prompts.ROLLING_SUMMARY_SYSTEM_PROMPT},
+        {
+            "role": "user",
+            "content": prompts.ROLLING_SUMMARY_USER_PROMPT.format(
+                previous_summary=previous_summary or "None",
+                new_messages=new_messages,
+            ),
+        },
+    ]
+
+
+@dataclass
+class _ThreadState:
+    pending: int = 0  # Messages noted since the last update started
+    last_message_at: float = 0.0
+    due_at: Optional[float] = None
+    running: bool = False
+    started: int = 0
+    finished: int = 0
+
+
+class RollingSummaryScheduler:
+    def __init__(
+        self,
+        ledger: TokenLedger,
+        client,
+        model: str = "gpt-4",
+        every_n_messages: int = DEFAULT_EVERY_N_MESSAGES,
+        idle_seconds: float = DEFAULT_IDLE_SECONDS,
+        max_delta_messages: int = DEFAULT_MAX_DELTA_MESSAGES,
+    ):
+        self.ledger = ledger
+        self.client = client
+        self.model = model
+        self.every_n_messages = every_n_messages
+        self.idle_seconds = idle_seconds
+        self.max_delta_messages = max_delta_messages
+        self._states: Dict[str, _ThreadState] = {}
+        self._cond = threading.Condition()
+        self._worker: Optional[threading.Thread] = None
+        self._closed = False
+
+    def note_message(self, thread_id: str) -> None:
+        """Records a new message in the thread; never waits on the summarizer."""
+        now = time.monotonic()
+        with self._cond:
+            if self._closed:
+                return
+            state = self._states.setdefault(thread_id, _ThreadState())
+            state.pending += 1
+            state.last_message_at = now
+            self._schedule(state, now)
+            self._ensure_worker()
+            self._cond.notify_all()
+
+    def get_summary(self, thread_id: str) -> Optional[str]:
+        """The latest completed rolling summary of the thread."""
+        return self.ledger.get_rolling_summary(thread_id)
+
+    def flush(
+        self, thread_ids: Optional[Iterable[str]] = None, timeout: Optional[float] = None
+    ) -> bool:
+        """
+        Runs the pending updates of thread_ids (default: every thread) now and
+        waits until they are done, whether they succeeded or not. Returns
+        False if timeout ran out first.
+        """
+        with self._cond:
+            ids = list(self._states) if thread_ids is None else list(thread_ids)
+            targets = {}
+            now = time.monotonic()
+            for thread_id in ids:
+                state = self._states.get(thread_id)
+                if state is None or (not state.pending and not state.running):
+                    continue
+                # An update started after this call, or the running one if it
+                # already covers every noted message
+                targets[thread_id] = state.started + (1 if state.pending else 0)
+                if state.pending:
+                    state.due_at = now
+            if not targets:
+                return True
+            self._cond.notify_all()
+            return self._cond.wait_for(
+                lambda: self._closed
+                or all(self._states[t].finished >= n for t, n in targets.items()),
+                timeout,
+            )
+
+    def close(self, flush: bool = True, timeout: Optional[float] = None) -> None:
+        if flush:
+            self.flush(timeout=timeout)
+        with self._cond:
+            self._closed = True
+            self._cond.notify_all()
+            worker = self._worker
+        if worker is not None:
+            worker.join(timeout)
+
+    def summarize_now(self, thread_id: str) -> Optional[str]:
+        """
+        Folds the thread's unsummarized messages into its rolling summary on
+        the calling thread. Returns the stored summary, or None if there was
+        nothing new. Raises RuntimeError if the LLM call failed.
+        """
+        previous, through = self.ledger.rolling_summary_state(thread_id)
+        delta = self.ledger.messages_since(thread_id, through, self.max_delta_messages)
+        if not delta:
+            return None
+        response = self.client.chat_completion(
+            model=self.model,
+            messages=rolling_summary_messages(previous, delta),
+            temperature=0.4,
+            max_tokens=300,
+        )
+        if not response or response.startswith("Error:"):
+            raise RuntimeError(f"Rolling summary for thread '{thread_id}' failed")
+        summary = response.strip()
+        self.ledger.set_rolling_summary(thread_id, summary, delta[-1]["message_id"])
+        return summary
+
+    def _schedule(self, state: _ThreadState, now: float) -> None:
+        if not state.pending:
+            state.due_at = None
+        elif state.pending >= self.every_n_messages:
+            state.due_at = now
+        else:
+            state.due_at = state.last_message_at + self.idle_seconds
+
+    def _ensure_worker(self) -> None:
+        if self._worker is None:
+            self._worker = threading.Thread(
+                target=self._run, name="rolling-summary-worker", daemon=True
+            )
+            self._worker.start()
+
+    def _next_due(self):
+        """(thread id due now or None, seconds until the next due time or None)."""
+        now = time.monotonic()
+        next_at = None
+        for thread_id, state in self._states.items():
+            if state.running or state.due_at is None:
+                continue
+            if state.due_at <= now:
+                return thread_id, None
+            if next_at is None or state.due_at < next_at:
+                next_at = state.due_at
+        return None, None if next_at is None else next_at - now
+
+    def _run(self) -> None:
+        while True:
+            with self._cond:
+                while True:
+                    if self._closed:
+                        return
+                    thread_id, wait = self._next_due()
+                    if thread_id is not None:
+                        break
+                    self._cond.wait(wait)
+                state = self._states[thread_id]
+                state.running = True
+                state.started += 1
+                noted, state.pending, state.due_at = state.pending, 0, None
+
+            ok = True
+            try:
+                self.summarize_now(thread_id)
+            except Exception:
+                ok = False
+                logger.exception(f"Rolling summary update for '{thread_id}' failed")
+
+            with self._cond:
+                state.running = False
+                state.finished += 1
+                if not ok:
+                    # The messages are still unsummarized; retry after the next
+                    # message or idle period rather than in a tight loop
+                    state.pending += noted
+                    state.due_at = time.monotonic() + self.idle_seconds
+                else:
+                    self._schedule(state, time.monotonic())
+                self._cond.notify_all()
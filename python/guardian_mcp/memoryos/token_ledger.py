@@ -0,0 +1,382 @@
+"""
+Per-message token counts and running conversation/thread totals.
+
+Auto-branching used to re-tokenize every message of every conversation in a
+thread on each add_memory, so checking the branch threshold cost O(thread
+size) per message. TokenLedger counts a message once, when it is appended,
+and in the same SQLite transaction adds that count to its conversation's and
+thread's running totals. The branch check then reads one integer.
+
+A thread has one active conversation that new messages go to. branch() closes
+it with a summary and starts a child conversation, which becomes the active
+one, so a branched conversation is never checked (or branched) again. A thread
+also keeps its rolling summary and the id of the last message the summary
+covers, so the summary can be brought up to date from the messages after it.
+
+TokenCounter uses tiktoken when it is installed and a regex approximation
+otherwise. Counts are memoised by content hash, so repeated texts (retries,
+boilerplate replies, re-imports) are only tokenized once.
+"""
+
+import hashlib
+import os
+import re
+import sqlite3
+import threading
+from collections import OrderedDict
+from typing import List, Optional, Tuple
+
+from .utils import generate_id, get_timestamp
+
+DEFAULT_ENCODING = "cl100k_base"
+COUNT_CACHE_SIZE = 8192
+
+# Words of up to four characters are usually one BPE token, longer ones about
+# one per four characters; punctuation is a token per character
+_APPROX_TOKEN = re.compile(r"\w+|[^\w\s]")
+
+
+def content_hash(text: str) -> bytes:
+    return hashlib.blake2b(text.encode("utf-8"), digest_size=16).digest()
+
+
+def approximate_token_count(text: str) -> int:
+    return sum(
+        (len(piece) + 3) // 4 if piece[0].isalnum() or piece[0] == "_" else 1
+        for piece in _APPROX_TOKEN.findall(text)
+    )
+
+
+class TokenCounter:
+    """Token counts with an in-process LRU cache keyed by content hash."""
+
+    def __init__(
+        self, encoding: str = DEFAULT_ENCODING, cache_size: int = COUNT_CACHE_SIZE
+    ):
+        self.cache_size = cache_size
+        self._cache: "OrderedDict[bytes, int]" = OrderedDict()
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+        try:
+            import tiktoken
+
+            self._encode = tiktoken.get_encoding(encoding).encode
+        except Exception:  # Not installed, or the encoding can't be loaded offline
+            self._encode = None
+
+    @property
+    def exact(self) -> bool:
+        return self._encode is not None
+
+    def count(self, text: str) -> int:
+        if not text:
+            return 0
+        key = content_hash(text)
+        with self._lock:
+            cached = self._cache.get(key)
+            if cached is not None:
+                self._cache.move_to_end(key)
+                self.hits += 1
+                return cached
+        if self._encode is not None:
+            tokens = len(self._encode(text, disallowed_special=()))
+        else:
+            tokens = approximate_token_count(text)
+        with self._lock:
+            self.misses += 1
+            self._cache[key] = tokens
+            if len(self._cache) > self.cache_size:
+                self._cache.popitem(last=False)
+        return tokens
+
+
+class TokenLedger:
+    """
+    SQLite store of thread conversations, their messages with token counts,
+    and running token totals per conversation and per thread.
+    """
+
+    def __init__(self, path: str, counter: Optional[TokenCounter] = None):
+        self.path = path
+        self.counter = counter or TokenCounter()
+        os.makedirs(os.path.dirname(os.path.abspath(path)), exist_ok=True)
+        self._lock = threading.Lock()
+        self._conn = sqlite3.connect(path, check_same_thread=False)
+        self._conn.row_factory = sqlite3.Row
+        self._conn.execute("PRAGMA journal_mode=WAL")
+        self._conn.execute("PRAGMA synchronous=NORMAL")
+        self._conn.executescript(
+            """
+            CREATE TABLE IF NOT EXISTS threads (
+                thread_id TEXT PRIMARY KEY,
+                project_id TEXT,
+                active_conversation_id TEXT,
+                token_total INTEGER NOT NULL DEFAULT 0,
+                message_count INTEGER NOT NULL DEFAULT 0,
+                rolling_summary TEXT,
+                summarized_through INTEGER NOT NULL DEFAULT 0
+            );
+            CREATE TABLE IF NOT EXISTS conversations (
+                conversation_id TEXT PRIMARY KEY,
+                thread_id TEXT NOT NULL,
+                title TEXT,
+                parent_id TEXT,
+                created_at TEXT,
+                token_total INTEGER NOT NULL DEFAULT 0,
+                message_count INTEGER NOT NULL DEFAULT 0,
+                summary_text TEXT,
+                summary_created_at TEXT,
+                child_conversation_id TEXT
+            );
+            CREATE INDEX IF NOT EXISTS conversations_by_thread
+                ON conversations (thread_id);
+            CREATE TABLE IF NOT EXISTS messages (
+                message_id INTEGER PRIMARY KEY AUTOINCREMENT,
+                conversation_id TEXT NOT NULL,
+                thread_id TEXT NOT NULL,
+                user_input TEXT,
+                agent_response TEXT,
+                timestamp TEXT,
+                tokens INTEGER NOT NULL
+            );
+            CREATE INDEX IF NOT EXISTS messages_by_conversation
+                ON messages (conversation_id, message_id);
+            CREATE INDEX IF NOT EXISTS messages_by_thread
+                ON messages (thread_id, message_id);
+            """
+        )
+        columns = {row[1] for row in self._conn.execute("PRAGMA table_info(threads)")}
+        if "summarized_through" not in columns:  # Ledgers from before incremental summaries
+            self._conn.execute(
+                "ALTER TABLE threads ADD COLUMN "
+                "summarized_through INTEGER NOT NULL DEFAULT 0"
+            )
+        self._conn.commit()
+
+    def message_tokens(self, user_input: str, agent_response: str) -> int:
+        return self.counter.count(user_input or "") + self.counter.count(
+            agent_response or ""
+        )
+
+    def append(
+        self,
+        thread_id: str,
+        user_input: str,
+        agent_response: str,
+        timestamp: Optional[str] = None,
+        project_id: Optional[str] = None,
+    ) -> Tuple[str, int]:
+        """
+        Appends a QA pair to the thread's active conversation (creating the
+        thread and conversation on first use). Returns (conversation_id,
+        conversation token total including this message).
+        """
+        tokens = self.message_tokens(user_input, agent_response)  # Outside the lock
+        timestamp = timestamp or get_timestamp()
+        with self._lock, self._conn:
+            row = self._conn.execute(
+                "SELECT active_conversation_id FROM threads WHERE thread_id = ?",
+                (thread_id,),
+            ).fetchone()
+            if row is None:
+                self._conn.execute(
+                    "INSERT INTO threads (thread_id, project_id) VALUES (?, ?)",
+                    (thread_id, project_id),
+                )
+            conversation_id = row["active_conversation_id"] if row else None
+            if conversation_id is None:
+                conversation_id = self._new_conversation(thread_id, None, None)
+            self._conn.execute(
+                "INSERT INTO messages (conversation_id, thread_id, user_input, "
+                "agent_response, timestamp, tokens) VALUES (?, ?, ?, ?, ?, ?)",
+                (conversation_id, thread_id, user_input, agent_response, timestamp, tokens),
+            )
+            self._conn.execute(
+                "UPDATE threads SET token_total = token_total + ?, "
+                "message_count = message_count + 1, "
+                "project_id = COALESCE(project_id, ?) WHERE thread_id = ?",
+                (tokens, project_id, thread_id),
+            )
+            self._conn.execute(
+                "UPDATE conversations SET token_total = token_total + ?, "
+                "message_count = message_count + 1 WHERE conversation_id = ?",
+                (tokens, conversation_id),
+            )
+            total = self._conn.execute(
+                "SELECT token_total FROM conversations WHERE conversation_id = ?",
+                (conversation_id,),
+            ).fetchone()[0]
+        return conversation_id, total
+
+    def branch(self, conversation_id: str, summary_text: str) -> Optional[dict]:
+        """
+        Attaches summary_text to the conversation and starts a child
+        conversation, which becomes its thread's active one if the parent was.
+        Returns the summary blob, or None for an unknown conversation.
+        """
+        created_at = get_timestamp()
+        with self._lock, self._conn:
+            parent = self._conn.execute(
+                "SELECT thread_id FROM conversations WHERE conversation_id = ?",
+                (conversation_id,),
+            ).fetchone()
+            if parent is None:
+                return None
+            thread_id = parent["thread_id"]
+            child_id = self._new_conversation(
+                thread_id, conversation_id, f"Child of {conversation_id}"
+            )
+            self._conn.execute(
+                "UPDATE conversations SET summary_text = ?, summary_created_at = ?, "
+                "child_conversation_id = ? WHERE conversation_id = ?",
+                (summary_text, created_at, child_id, conversation_id),
+            )
+            self._conn.execute(
+                "UPDATE threads SET active_conversation_id = ? "
+                "WHERE thread_id = ? AND active_conversation_id = ?",
+                (child_id, thread_id, conversation_id),
+            )
+        return {
+            "summary_text": summary_text,
+            "created_at": created_at,
+            "child_conversation_id": child_id,
+        }
+
+    def _new_conversation(
+        self, thread_id: str, parent_id: Optional[str], title: Optional[str]
+    ) -> str:
+        conversation_id = generate_id("conversation")
+        self._conn.execute(
+            "INSERT INTO conversations (conversation_id, thread_id, title, "
+            "parent_id, created_at) VALUES (?, ?, ?, ?, ?)",
+            (conversation_id, thread_id, title, parent_id, get_timestamp()),
+        )
+        if parent_id is None:
+            self._conn.execute(
+                "UPDATE threads SET active_conversation_id = ? WHERE thread_id = ?",
+                (conversation_id, thread_id),
+            )
+        return conversation_id
+
+    def conversation_tokens(self, conversation_id: str) -> int:
+        with self._lock:
+            row = self._conn.execute(
+                "SELECT token_total FROM conversations WHERE conversation_id = ?",
+                (conversation_id,),
+            ).fetchone()
+        return row[0] if row else 0
+
+    def thread_tokens(self, thread_id: str) -> int:
+        with self._lock:
+            row = self._conn.execute(
+                "SELECT token_total FROM threads WHERE thread_id = ?", (thread_id,)
+            ).fetchone()
+        return row[0] if row else 0
+
+    def active_conversation(self, thread_id: str) -> Optional[str]:
+        with self._lock:
+            row = self._conn.execute(
+                "SELECT active_conversation_id FROM threads WHERE thread_id = ?",
+                (thread_id,),
+            ).fetchone()
+        return row[0] if row else None
+
+    def get_conversation(self, conversation_id: str) -> Optional[dict]:
+        """The conversation with its messages in append order, or None."""
+        with self._lock:
+            row = self._conn.execute(
+                "SELECT * FROM conversations WHERE conversation_id = ?",
+                (conversation_id,),
+            ).fetchone()
+            if row is None:
+                return None
+            messages = self._conn.execute(
+                "SELECT user_input, agent_response, timestamp, tokens FROM messages "
+                "WHERE conversation_id = ? ORDER BY message_id",
+                (conversation_id,),
+            ).fetchall()
+        conversation = self._conversation_dict(row)
+        conversation["messages"] = [dict(m) for m in messages]
+        return conversation
+
+    def get_conversations_for_thread(self, thread_id: str) -> List[dict]:
+        """Conversations of a thread, oldest first, without their messages."""
+        with self._lock:
+            rows = self._conn.execute(
+                "SELECT * FROM conversations WHERE thread_id = ? ORDER BY rowid",
+                (thread_id,),
+            ).fetchall()
+        return [self._conversation_dict(row) for row in rows]
+
+    def messages_since(
+        self, thread_id: str, after_message_id: int, limit: Optional[int] = None
+    ) -> List[dict]:
+        """
+        The thread's messages after after_message_id, oldest first, with their
+        message_id. With a limit, only the newest `limit` of them.
+        """
+        with self._lock:
+            rows = self._conn.execute(
+                "SELECT message_id, user_input, agent_response, timestamp, tokens "
+                "FROM messages WHERE thread_id = ? AND message_id > ? "
+                "ORDER BY message_id DESC LIMIT ?",
+                (thread_id, after_message_id, -1 if limit is None else limit),
+            ).fetchall()
+        return [dict(row) for row in reversed(rows)]
+
+    def get_rolling_summary(self, thread_id: str) -> Optional[str]:
+        return self.rolling_summary_state(thread_id)[0]
+
+    def rolling_summary_state(self, thread_id: str) -> Tuple[Optional[str], int]:
+        """(rolling summary, id of the last message it covers; 0 for none)."""
+        with self._lock:
+            row = self._conn.execute(
+                "SELECT rolling_summary, summarized_through FROM threads "
+                "WHERE thread_id = ?",
+                (thread_id,),
+            ).fetchone()
+        return (row[0], row[1]) if row else (None, 0)
+
+    def set_rolling_summary(
+        self, thread_id: str, summary: str, through_message_id: int
+    ) -> bool:
+        """
+        Stores the thread's rolling summary, covering messages up to
+        through_message_id, unless a summary covering later messages has been
+        stored already; returns whether it was stored.
+        """
+        with self._lock, self._conn:
+            cursor = self._conn.execute(
+                "INSERT INTO threads (thread_id, rolling_summary, summarized_through) "
+                "VALUES (?, ?, ?) ON CONFLICT(thread_id) DO UPDATE "
+                "SET rolling_summary = excluded.rolling_summary, "
+                "summarized_through = excluded.summarized_through "
+                "WHERE excluded.summarized_through >= threads.summarized_through",
+                (thread_id, summary, through_message_id),
+            )
+            return cursor.rowcount > 0
+
+    @staticmethod
+    def _conversation_dict(row: sqlite3.Row) -> dict:
+        conversation = {
+            "conversation_id": row["conversation_id"],
+            "thread_id": row["thread_id"],
+            "title": row["title"],
+            "parent_id": row["parent_id"],
+            "created_at": row["created_at"],
+            "token_total": row["token_total"],
+            "message_count": row["message_count"],
+            "summary": None,
+        }
+        if row["child_conversation_id"] is not None:
+            conversation["summary"] = {
+                "summary_text": row["summary_text"],
+                "created_at": row["summary_created_at"],
+                "child_conversation_id": row["child_conversation_id"],
+            }
+        return conversation
+
+    def close(self):
+        with self._lock:
+            self._conn.close()
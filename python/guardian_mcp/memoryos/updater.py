@@ -1,16 +1,21 @@
+import asyncio
 from typing import Dict, Optional
 
+from memoryos.llm_client import AsyncLLMClient
 from memoryos.long_term import LongTermMemory
 from memoryos.mid_term import MidTermMemory
 from memoryos.short_term import ShortTermMemory
 from memoryos.utils import (
     OpenAIClient,
     check_conversation_continuity,
+    continuity_check_request,
     generate_id,
     generate_page_meta_info,
     get_timestamp,
     gpt_generate_multi_summary,
     llm_extract_keywords,
+    page_meta_info_request,
+    parse_continuity_response,
 )
 
 
@@ -23,12 +28,15 @@ class Updater:
         client: OpenAIClient,
         topic_similarity_threshold=0.5,
         llm_model="gpt-4o-mini",
-        codemap: Optional[Dict] = None,
+        codemap=None,  # guardian.codemap.index.CodemapIndex
+        async_client: Optional[AsyncLLMClient] = None,
     ):
         self.short_term_memory = short_term_memory
         self.mid_term_memory = mid_term_memory
         self.long_term_memory = long_term_memory
         self.client = client
+        # When set, per-page continuity/meta-info calls are issued concurrently
+        self.async_client = async_client
         self.topic_similarity_threshold = topic_similarity_threshold
         self.last_evicted_page_for_continuity = (
             None  # Tracks the actual last page object for continuity checks
@@ -40,33 +48,82 @@ class Updater:
     def _update_linked_pages_meta_info(self, start_page_id, new_meta_info):
         """
         Updates meta_info for a chain of connected pages starting from start_page_id.
-        This is a simplified version. Assumes that once a chain is broken (no pre_page),
-        we don't need to go further back. Updates forward as well.
+        Follows pre_page and next_page links in both directions until the chain is
+        broken; the chain comes from MidTermMemory's page-link graph, so this costs
+        O(chain length) rather than a scan of every stored page per hop.
         """
-        # Go backward
-        q = [start_page_id]
-        visited = {start_page_id}
-
-        head = 0
-        while head < len(q):
-            current_page_id = q[head]
-            head += 1
-            page = self.mid_term_memory.get_page_by_id(current_page_id)
-            if page:
-                page["meta_info"] = new_meta_info
-                # Check previous page
-                prev_id = page.get("pre_page")
-                if prev_id and prev_id not in visited:
-                    q.append(prev_id)
-                    visited.add(prev_id)
-                # Check next page
-                next_id = page.get("next_page")
-                if next_id and next_id not in visited:
-                    q.append(next_id)
-                    visited.add(next_id)
-        if q:  # If any pages were updated
+        pages = self.mid_term_memory.linked_pages(start_page_id)
+        for page in pages:
+            page["meta_info"] = new_meta_info
+        if pages:  # If any pages were updated
             self.mid_term_memory.save()  # Save mid-term memory after updates
 
+    def _analyze_batch(self, pages, prev_page):
+        """
+        Sequential continuity checks and meta-info generation for a batch of pages.
+        Returns (continuity flags, meta_info per page).
+        """
+        continuity = []
+        metas = []
+        last_page = prev_page
+        for page in pages:
+            is_continuous = bool(last_page) and check_conversation_continuity(
+                last_page, page, self.client, model=self.llm_model
+            )
+            last_meta = last_page.get("meta_info") if is_continuous else None
+            meta = generate_page_meta_info(
+                last_meta, page, self.client, model=self.llm_model
+            )
+            # Later pages in the chain build on this page's meta
+            page["meta_info"] = meta
+            continuity.append(is_continuous)
+            metas.append(meta)
+            last_page = page
+        return continuity, metas
+
+    async def _analyze_batch_async(self, pages, prev_page):
+        """
+        Concurrent version of _analyze_batch. All continuity checks run at once;
+        meta-info is sequential within a chain (each builds on the previous meta)
+        while independent chains run concurrently.
+        """
+        previous = [prev_page] + pages[:-1]
+        check_idx = [i for i, prev in enumerate(previous) if prev]
+        responses = await self.async_client.gather(
+            [
+                continuity_check_request(previous[i], pages[i], model=self.llm_model)
+                for i in check_idx
+            ]
+        )
+        continuity = [False] * len(pages)
+        for i, response in zip(check_idx, responses):
+            continuity[i] = parse_continuity_response(response)
+
+        chains = []
+        for i in range(len(pages)):
+            if continuity[i] and chains and chains[-1][-1] == i - 1:
+                chains[-1].append(i)
+            else:
+                chains.append([i])
+
+        metas = [None] * len(pages)
+
+        async def run_chain(chain):
+            first = chain[0]
+            last_meta = (
+                previous[first].get("meta_info") if continuity[first] else None
+            )
+            for i in chain:
+                meta = await self.async_client.chat_completion(
+                    **page_meta_info_request(last_meta, pages[i], model=self.llm_model)
+                )
+                metas[i] = meta.strip()
+                pages[i]["meta_info"] = metas[i]
+                last_meta = metas[i]
+
+        await asyncio.gather(*(run_chain(chain) for chain in chains))
+        return continuity, metas
+
     def process_short_term_to_mid_term(self):
         evicted_qas = []
         while self.short_term_memory.is_full():
@@ -83,13 +140,8 @@ class Updater:
         )
 
         # 1. Create page structures and handle continuity within the evicted batch
-        current_batch_pages = []
-        temp_last_page_in_batch = (
-            self.last_evicted_page_for_continuity
-        )  # Carry over from previous batch if any
-
-        for qa_pair in evicted_qas:
-            current_page_obj = {
+        current_batch_pages = [
+            {
                 "page_id": generate_id("page"),
                 "user_input": qa_pair.get("user_input", ""),
                 "agent_response": qa_pair.get("agent_response", ""),
@@ -100,49 +152,33 @@ class Updater:
                 "next_page": None,
                 "meta_info": None,
             }
-
-            is_continuous = check_conversation_continuity(
-                temp_last_page_in_batch,
-                current_page_obj,
-                self.client,
-                model=self.llm_model,
+            for qa_pair in evicted_qas
+        ]
+        # Carry over from previous batch if any
+        prev_page = self.last_evicted_page_for_continuity
+        if self.async_client is not None:
+            continuity, metas = self.async_client.run(
+                self._analyze_batch_async(current_batch_pages, prev_page)
             )
+        else:
+            continuity, metas = self._analyze_batch(current_batch_pages, prev_page)
 
-            if is_continuous and temp_last_page_in_batch:
+        for i, current_page_obj in enumerate(current_batch_pages):
+            temp_last_page_in_batch = prev_page if i == 0 else current_batch_pages[i - 1]
+            current_page_obj["meta_info"] = metas[i]
+            if continuity[i]:
+                # The link from current to previous is set here; MidTermMemory's
+                # update_page_connections fixes the other side once pages are stored.
                 current_page_obj["pre_page"] = temp_last_page_in_batch["page_id"]
-                # The actual next_page for temp_last_page_in_batch will be set when it's stored in mid-term
-                # or if it's already there, it needs an update. This linking is tricky.
-                # For now, we establish the link from current to previous.
-                # MidTermMemory's update_page_connections can fix the other side if pages are already there.
-
-                # Meta info generation based on continuity
-                last_meta = temp_last_page_in_batch.get("meta_info")
-                new_meta = generate_page_meta_info(
-                    last_meta, current_page_obj, self.client, model=self.llm_model
-                )
-                current_page_obj["meta_info"] = new_meta
-                # If temp_last_page_in_batch was part of a chain, its meta_info and subsequent ones should update.
-                # This implies that meta_info should perhaps be updated more globally or propagated.
-                # For now, new_meta applies to current_page_obj and potentially its chain.
-                # We can call _update_linked_pages_meta_info if temp_last_page_in_batch is in mid-term already.
+                # If the previous page is already in mid-term, propagate the new meta along its chain
                 if temp_last_page_in_batch.get(
                     "page_id"
                 ) and self.mid_term_memory.get_page_by_id(
                     temp_last_page_in_batch["page_id"]
                 ):
                     self._update_linked_pages_meta_info(
-                        temp_last_page_in_batch["page_id"], new_meta
+                        temp_last_page_in_batch["page_id"], metas[i]
                     )
-            else:
-                # Start of a new chain or no previous page
-                current_page_obj["meta_info"] = generate_page_meta_info(
-                    None, current_page_obj, self.client, model=self.llm_model
-                )
-
-            current_batch_pages.append(current_page_obj)
-            temp_last_page_in_batch = (
-                current_page_obj  # Update for the next iteration in this batch
-            )
 
         # Update the global last evicted page for the next run of this method
         if current_batch_pages:
@@ -164,8 +200,9 @@ class Updater:
             input_text_for_summary, self.client, model=self.llm_model
         )
 
-        # 3. Insert pages into MidTermMemory based on summaries
+        # 3. Insert pages into MidTermMemory based on summaries, all themes in one batch
         if multi_summary_result and multi_summary_result.get("summaries"):
+            theme_batches = []
             for summary_item in multi_summary_result["summaries"]:
                 theme_summary = summary_item.get(
                     "content", "General summary of recent interactions."
@@ -174,14 +211,13 @@ class Updater:
                 print(
                     f"Updater: Processing theme '{summary_item.get('theme')}' for mid-term insertion."
                 )
-
-                # Pass the already processed pages (with IDs, embeddings to be added by MidTermMemory if not present)
-                self.mid_term_memory.insert_pages_into_session(
-                    summary_for_new_pages=theme_summary,
-                    keywords_for_new_pages=theme_keywords,
-                    pages_to_insert=current_batch_pages,  # These pages now have pre_page, next_page, meta_info set up
-                    similarity_threshold=self.topic_similarity_threshold,
+                # The same pages (with IDs, pre_page and meta_info set up) go in under every theme
+                theme_batches.append(
+                    (theme_summary, theme_keywords, current_batch_pages)
                 )
+            self.mid_term_memory.insert_page_batches(
+                theme_batches, similarity_threshold=self.topic_similarity_threshold
+            )
         else:
             # Fallback: if no summaries, add as one session or handle as a single block
             print(
@@ -244,23 +280,15 @@ class Updater:
                 f"Updater: Adding user private knowledge for {user_id} to LongTermMemory."
             )
             # Split if multiple lines, assuming each line is a distinct piece of knowledge
-            for line in user_private_knowledge.split("\n"):
-                if line.strip() and line.strip().lower() not in [
-                    "none",
-                    "- none",
-                    "- none.",
-                ]:
-                    self.long_term_memory.add_user_knowledge(line.strip())
+            self.long_term_memory.add_user_knowledge_batch(
+                [line.strip() for line in user_private_knowledge.split("\n")]
+            )
 
         assistant_knowledge_text = profile_analysis_result.get("assistant_knowledge")
         if assistant_knowledge_text and assistant_knowledge_text.lower() != "none":
             print("Updater: Adding assistant knowledge to LongTermMemory.")
-            for line in assistant_knowledge_text.split("\n"):
-                if line.strip() and line.strip().lower() not in [
-                    "none",
-                    "- none",
-                    "- none.",
-                ]:
-                    self.long_term_memory.add_assistant_knowledge(line.strip())
+            self.long_term_memory.add_assistant_knowledge_batch(
+                [line.strip() for line in assistant_knowledge_text.split("\n")]
+            )
 
         # LongTermMemory.save() is called by its add/update methods
@@ -2,14 +2,18 @@ import logging
 
 logger = logging.getLogger(__name__)
 
+import contextvars
 import json
 import os
 import time
 import uuid
+from contextlib import contextmanager
+from functools import lru_cache
 
 import numpy as np
 import openai
 import memoryos.prompts as prompts
+from memoryos.keywords import rake_keywords
 from openai import OpenAI
 from sentence_transformers import SentenceTransformer
 
@@ -57,15 +61,39 @@ def ensure_directory_exists(path):
 _model_cache = {}
 
 
-def get_embedding(text, model_name="all-MiniLM-L6-v2"):
+def _get_model(model_name):
     if model_name not in _model_cache:
         logger.info(f"Loading sentence transformer model: {model_name}")
         _model_cache[model_name] = SentenceTransformer(model_name)
-    model = _model_cache[model_name]
+    return _model_cache[model_name]
+
+
+def get_embedding(text, model_name="all-MiniLM-L6-v2"):
+    model = _get_model(model_name)
     embedding = model.encode([text], convert_to_numpy=True)[0]
     return embedding
 
 
+def get_embeddings(texts, model_name="all-MiniLM-L6-v2", batch_size=64):
+    """Encodes a list of texts in batches; returns an (n, dim) float32 array."""
+    model = _get_model(model_name)
+    return np.asarray(
+        model.encode(list(texts), batch_size=batch_size, convert_to_numpy=True),
+        dtype=np.float32,
+    )
+
+
+def embed_texts(texts, embedding_service=None, embed_fn=None):
+    """
+    Embeds many texts through the injected EmbeddingService (batched and cached)
+    or, without one, one at a time through `embed_fn` (default get_embedding).
+    """
+    if embedding_service is not None:
+        return embedding_service.embed_batch(list(texts))
+    embed_fn = embed_fn or get_embedding
+    return [embed_fn(t) for t in texts]
+
+
 def normalize_vector(vec):
     vec = np.array(vec, dtype=np.float32)
     norm = np.linalg.norm(vec)
@@ -74,18 +102,55 @@ def normalize_vector(vec):
     return vec / norm
 
 
-# ---- Time Decay Function ----
-def compute_time_decay(event_timestamp_str, current_timestamp_str, tau_hours=24):
-    from datetime import datetime
+# ---- Per-request Query Embedding Memo ----
+_query_embedding_memo = contextvars.ContextVar("query_embedding_memo", default=None)
+
 
-    fmt = "%Y-%m-%d %H:%M:%S"
+@contextmanager
+def query_embedding_scope():
+    """
+    Memoizes normalized query embeddings for the duration of one request, so a
+    single turn embeds its query once across mid-term and long-term searches.
+    Nested scopes share the outermost memo.
+    """
+    if _query_embedding_memo.get() is not None:
+        yield
+        return
+    token = _query_embedding_memo.set({})
     try:
-        t_event = datetime.strptime(event_timestamp_str, fmt)
-        t_current = datetime.strptime(current_timestamp_str, fmt)
-        delta_hours = (t_current - t_event).total_seconds() / 3600.0
-        return np.exp(-delta_hours / tau_hours)
-    except ValueError:  # Handle cases where timestamp might be invalid
+        yield
+    finally:
+        _query_embedding_memo.reset(token)
+
+
+def get_query_embedding(text, embed_fn=None):
+    """Returns the normalized embedding for a query, reusing it within a query_embedding_scope."""
+    memo = _query_embedding_memo.get()
+    if memo is not None and text in memo:
+        return memo[text]
+    vec = normalize_vector((embed_fn or get_embedding)(text))
+    if memo is not None:
+        memo[text] = vec
+    return vec
+
+
+# ---- Time Decay Function ----
+@lru_cache(maxsize=65536)
+def timestamp_to_epoch(timestamp_str):
+    """Epoch seconds for a get_timestamp() string, or None if it doesn't parse."""
+    try:
+        return time.mktime(time.strptime(timestamp_str, "%Y-%m-%d %H:%M:%S"))
+    except (TypeError, ValueError, OverflowError):
+        return None
+
+
+def compute_time_decay(event_timestamp_str, current_timestamp_str, tau_hours=24):
+    t_event = timestamp_to_epoch(event_timestamp_str)
+    t_current = timestamp_to_epoch(current_timestamp_str)
+    if t_event is None or t_current is None:  # Invalid timestamp
         return 0.1  # Default low recency
+    delta_hours = (t_current - t_event) / 3600.0
+    return np.exp(-delta_hours / tau_hours)
 
 
 # ---- LLM-based Utility Functions ----
@@ -129,50 +194,60 @@ def gpt_generate_multi_summary(text, client: OpenAIClient, model="gpt-4o-mini"):
     return {"input": text, "summaries": summaries}
 
 
-def gpt_user_profile_analysis(
-    dialogs, client: OpenAIClient, model="gpt-4o-mini", known_user_traits="None"
-):
-    """Analyze user personality profile from dialogs"""
-    conversation = "\n".join(
+def _timestamped_conversation(dialogs):
+    return "\n".join(
         [
             f"User: {d.get('user_input','')} (Timestamp: {d.get('timestamp', '')})\nAssistant: {d.get('agent_response','')} (Timestamp: {d.get('timestamp', '')})"
             for d in dialogs
         ]
     )
-    messages = [
+
+
+def user_profile_analysis_messages(dialogs, known_user_traits="None"):
+    return [
         {"role": "system", "content": prompts.PERSONALITY_ANALYSIS_SYSTEM_PROMPT},
         {
             "role": "user",
             "content": prompts.PERSONALITY_ANALYSIS_USER_PROMPT.format(
-                conversation=conversation, known_user_traits=known_user_traits
+                conversation=_timestamped_conversation(dialogs),
+                known_user_traits=known_user_traits,
             ),
         },
     ]
+
+
+def gpt_user_profile_analysis(
+    dialogs, client: OpenAIClient, model="gpt-4o-mini", known_user_traits="None"
+):
+    """Analyze user personality profile from dialogs"""
+    messages = user_profile_analysis_messages(dialogs, known_user_traits)
     logger.info("Calling LLM for user profile analysis...")
     result_text = client.chat_completion(model=model, messages=messages)
     return result_text.strip() if result_text else "None"
 
 
-def gpt_knowledge_extraction(dialogs, client: OpenAIClient, model="gpt-4o-mini"):
-    """Extract user private data and assistant knowledge from dialogs"""
-    conversation = "\n".join(
-        [
-            f"User: {d.get('user_input','')} (Timestamp: {d.get('timestamp', '')})\nAssistant: {d.get('agent_response','')} (Timestamp: {d.get('timestamp', '')})"
-            for d in dialogs
-        ]
-    )
-    messages = [
+def knowledge_extraction_messages(dialogs):
+    return [
         {"role": "system", "content": prompts.KNOWLEDGE_EXTRACTION_SYSTEM_PROMPT},
         {
             "role": "user",
             "content": prompts.KNOWLEDGE_EXTRACTION_USER_PROMPT.format(
-                conversation=conversation
+                conversation=_timestamped_conversation(dialogs)
             ),
         },
     ]
+
+
+def gpt_knowledge_extraction(dialogs, client: OpenAIClient, model="gpt-4o-mini"):
+    """Extract user private data and assistant knowledge from dialogs"""
+    messages = knowledge_extraction_messages(dialogs)
     logger.info("Calling LLM for knowledge extraction...")
     result_text = client.chat_completion(model=model, messages=messages)
+    return parse_knowledge_extraction(result_text)
 
+
+def parse_knowledge_extraction(result_text):
+    """Splits a knowledge extraction response into private data and assistant knowledge."""
     private_data = "None"
     assistant_knowledge = "None"
 
@@ -268,10 +343,74 @@ def llm_extract_keywords(text, client: OpenAIClient, model="gpt-4o-mini"):
     return [kw.strip() for kw in response.split(",") if kw.strip()]
 
 
+KEYWORD_BATCH_SIZE = 50  # Texts per LLM call; keeps the JSON reply well under max_tokens
+
+
+def parse_keyword_batch(response, count):
+    """Keyword lists from a batch extraction reply; None for texts it doesn't cover."""
+    text = (response or "").strip()
+    if text.startswith("```"):
+        text = text.strip("`")
+        text = text[text.find("\n") + 1 :] if "\n" in text else ""
+    try:
+        data = json.loads(text)
+    except json.JSONDecodeError:
+        return [None] * count
+    if isinstance(data, dict):
+        data = data.get("keywords", data)
+    if isinstance(data, dict):  # {"0": [...], "1": [...]}
+        data = [data.get(str(i)) for i in range(count)]
+    if not isinstance(data, list):
+        return [None] * count
+    results = []
+    for i in range(count):
+        item = data[i] if i < len(data) else None
+        if isinstance(item, list):
+            results.append([str(kw).strip() for kw in item if str(kw).strip()])
+        else:
+            results.append(None)
+    return results
+
+
+def llm_extract_keywords_batch(texts, client: OpenAIClient, model="gpt-4o-mini"):
+    """
+    Keywords for many texts with one LLM call per KEYWORD_BATCH_SIZE texts.
+    Without a client, or for texts the reply doesn't cover, keywords come from
+    the local rake_keywords extractor instead.
+    """
+    results = [None] * len(texts)
+    if client is not None:
+        for start in range(0, len(texts), KEYWORD_BATCH_SIZE):
+            chunk = texts[start : start + KEYWORD_BATCH_SIZE]
+            numbered = "\n".join(f"[{i}] {text}" for i, text in enumerate(chunk))
+            messages = [
+                {"role": "system", "content": prompts.EXTRACT_KEYWORDS_BATCH_SYSTEM_PROMPT},
+                {
+                    "role": "user",
+                    "content": prompts.EXTRACT_KEYWORDS_BATCH_USER_PROMPT.format(
+                        count=len(chunk), texts=numbered
+                    ),
+                },
+            ]
+            logger.info(f"Calling LLM to extract keywords for {len(chunk)} texts...")
+            response = client.chat_completion(
+                model=model, messages=messages, max_tokens=200 + 40 * len(chunk)
+            )
+            results[start : start + len(chunk)] = parse_keyword_batch(
+                response, len(chunk)
+            )
+    missing = sum(1 for keywords in results if keywords is None)
+    if client is not None and missing:
+        logger.warning(f"Batch keyword reply missed {missing} texts; using local extraction.")
+    return [
+        keywords if keywords is not None else rake_keywords(text)
+        for text, keywords in zip(texts, results)
+    ]
+
+
 # ---- Functions from dynamic_update.py (to be used by Updater class) ----
-def check_conversation_continuity(
-    previous_page, current_page, client: OpenAIClient, model="gpt-4o-mini"
-):
+def continuity_check_request(previous_page, current_page, model="gpt-4o-mini"):
+    """chat_completion kwargs for a continuity check (usable with AsyncLLMClient.gather)."""
     prev_user = previous_page.get("user_input", "") if previous_page else ""
     prev_agent = previous_page.get("agent_response", "") if previous_page else ""
 
@@ -285,15 +424,24 @@ def check_conversation_continuity(
         {"role": "system", "content": prompts.CONTINUITY_CHECK_SYSTEM_PROMPT},
         {"role": "user", "content": user_prompt},
     ]
-    response = client.chat_completion(
-        model=model, messages=messages, temperature=0.0, max_tokens=10
-    )
+    return {"model": model, "messages": messages, "temperature": 0.0, "max_tokens": 10}
+
+
+def parse_continuity_response(response):
     return response.strip().lower() == "true"
 
 
-def generate_page_meta_info(
-    last_page_meta, current_page, client: OpenAIClient, model="gpt-4o-mini"
+def check_conversation_continuity(
+    previous_page, current_page, client: OpenAIClient, model="gpt-4o-mini"
 ):
+    response = client.chat_completion(
+        **continuity_check_request(previous_page, current_page, model=model)
+    )
+    return parse_continuity_response(response)
+
+
+def page_meta_info_request(last_page_meta, current_page, model="gpt-4o-mini"):
+    """chat_completion kwargs for a page meta-info update (usable with AsyncLLMClient.gather)."""
     current_conversation = f"User: {current_page.get('user_input', '')}\nAssistant: {current_page.get('agent_response', '')}"
     user_prompt = prompts.META_INFO_USER_PROMPT.format(
         last_meta=last_page_meta if last_page_meta else "None",
@@ -303,6 +451,12 @@ def generate_page_meta_info(
         {"role": "system", "content": prompts.META_INFO_SYSTEM_PROMPT},
         {"role": "user", "content": user_prompt},
     ]
+    return {"model": model, "messages": messages, "temperature": 0.3, "max_tokens": 100}
+
+
+def generate_page_meta_info(
+    last_page_meta, current_page, client: OpenAIClient, model="gpt-4o-mini"
+):
     return client.chat_completion(
-        model=model, messages=messages, temperature=0.3, max_tokens=100
+        **page_meta_info_request(last_page_meta, current_page, model=model)
     ).strip()
@@ -0,0 +1,315 @@
+import hashlib
+import json
+import logging
+import os
+from typing import Callable, Dict, Iterable, List, Optional, Tuple
+
+import faiss
+import numpy as np
+
+logger = logging.getLogger(__name__)
+
+# Backend selection thresholds (number of live vectors)
+FLAT_MAX_SIZE = 10_000  # Exact search below this size
+IVF_MAX_SIZE = 100_000  # IVF between FLAT_MAX_SIZE and this size, HNSW above
+HNSW_M = 32
+HNSW_EF_SEARCH = 128
+IVF_NPROBE = 16
+TOMBSTONE_COMPACT_RATIO = 0.2  # Rebuild once this share of rows is tombstoned
+
+BACKENDS = ("flat", "ivf", "hnsw")
+
+
+def vector_checksum(vector) -> str:
+    """Digest of a vector's float32 bytes, to tell a re-embedded entry from a stale one."""
+    data = np.ascontiguousarray(np.asarray(vector, dtype=np.float32)).tobytes()
+    return hashlib.blake2b(data, digest_size=8).hexdigest()
+
+
+def choose_backend(size: int) -> str:
+    if size < FLAT_MAX_SIZE:
+        return "flat"
+    if size < IVF_MAX_SIZE:
+        return "ivf"
+    return "hnsw"
+
+
+class VectorIndex:
+    """
+    Persistent inner-product index over normalized vectors, keyed by string ids.
+
+    Every add is given a fresh int64 id through an IndexIDMap so entries can be
+    replaced or removed incrementally. Backends that cannot delete (HNSW) keep
+    tombstones and are compacted from `source` once too many rows are dead;
+    `lazy_delete=True` applies the same policy to every backend, which suits
+    high-churn owners such as bounded deques. `source` is a callable returning
+    the authoritative (key, vector) pairs and is used for rebuilds (startup
+    mismatch, backend migration, compaction).
+    """
+
+    def __init__(
+        self,
+        path: Optional[str] = None,
+        source: Optional[Callable[[], Iterable[Tuple[str, list]]]] = None,
+        backend: str = "auto",
+        lazy_delete: bool = False,
+    ):
+        if backend != "auto" and backend not in BACKENDS:
+            raise ValueError(f"Unknown vector index backend: {backend}")
+        self.path = path
+        self.source = source
+        self.requested_backend = backend
+        self.lazy_delete = lazy_delete
+        self.backend = None
+        self.dim = None
+        self.index = None
+        self.key_to_id = {}  # {key: int64 id currently live in the index}
+        self.id_to_key = {}  # {int64 id: key}, dead ids are absent
+        self.key_to_checksum = {}  # {key: vector_checksum of its live vector}
+        self.next_id = 0
+        self.dead_rows = 0  # Tombstoned rows still physically in the index
+        self.dirty = False
+
+    # ---- Properties ----
+    def __len__(self):
+        return len(self.key_to_id)
+
+    def __contains__(self, key):
+        return key in self.key_to_id
+
+    def keys(self):
+        return set(self.key_to_id)
+
+    # ---- Construction ----
+    def _new_index(self, backend: str, dim: int, train_vecs=None):
+        if backend == "flat":
+            return faiss.IndexIDMap(faiss.IndexFlatIP(dim))
+        if backend == "hnsw":
+            hnsw = faiss.IndexHNSWFlat(dim, HNSW_M, faiss.METRIC_INNER_PRODUCT)
+            hnsw.hnsw.efSearch = HNSW_EF_SEARCH
+            return faiss.IndexIDMap(hnsw)
+        # IVF keeps its own ids and supports remove_ids natively
+        nlist = max(1, int(np.sqrt(len(train_vecs))))
+        quantizer = faiss.IndexFlatIP(dim)
+        ivf = faiss.IndexIVFFlat(quantizer, dim, nlist, faiss.METRIC_INNER_PRODUCT)
+        ivf.train(train_vecs)
+        ivf.nprobe = min(IVF_NPROBE, nlist)
+        return ivf
+
+    def rebuild(self, items: Optional[Iterable[Tuple[str, list]]] = None):
+        """Rebuilds the whole index from `items` (or `source`), picking the backend by size."""
+        if items is None:
+            items = self.source() if self.source else []
+        keys = []
+        vecs = []
+        for key, vec in items:
+            if vec is None or len(vec) == 0:
+                continue
+            keys.append(key)
+            vecs.append(vec)
+
+        self.key_to_id = {}
+        self.id_to_key = {}
+        self.key_to_checksum = {}
+        self.next_id = 0
+        self.dead_rows = 0
+        self.dirty = True
+        if not vecs:
+            self.index = None
+            self.backend = None
+            return
+
+        matrix = np.ascontiguousarray(np.array(vecs, dtype=np.float32))
+        self.dim = matrix.shape[1]
+        self.backend = self._target_backend(len(keys))
+        self.index = self._new_index(self.backend, self.dim, train_vecs=matrix)
+        ids = np.arange(len(keys), dtype=np.int64)
+        self.index.add_with_ids(matrix, ids)
+        for key, id_, row in zip(keys, ids.tolist(), matrix):
+            self.key_to_id[key] = id_
+            self.id_to_key[id_] = key
+            self.key_to_checksum[key] = vector_checksum(row)
+        self.next_id = len(keys)
+        logger.info(
+            f"VectorIndex: Rebuilt {self.backend} index with {len(keys)} vectors."
+        )
+
+    def _target_backend(self, size):
+        if self.requested_backend == "auto":
+            return choose_backend(size)
+        return self.requested_backend
+
+    def _maybe_migrate(self):
+        if self.source is None or not self.key_to_id:
+            return
+        if self._target_backend(len(self.key_to_id)) != self.backend:
+            self.rebuild()
+
+    # ---- Incremental updates ----
+    def upsert(self, key: str, vector):
+        vec = np.ascontiguousarray(np.array([vector], dtype=np.float32))
+        if self.index is None:
+            self.dim = vec.shape[1]
+            # IVF needs training data; start flat and migrate once there is some
+            self.backend = self._target_backend(1)
+            if self.backend == "ivf":
+                self.backend = "flat"
+            self.index = self._new_index(self.backend, self.dim)
+        if key in self.key_to_id:
+            self._drop(key)
+
+        id_ = self.next_id
+        self.next_id += 1
+        self.index.add_with_ids(vec, np.array([id_], dtype=np.int64))
+        self.key_to_id[key] = id_
+        self.id_to_key[id_] = key
+        self.key_to_checksum[key] = vector_checksum(vec[0])
+        self.dirty = True
+        self._maybe_migrate()
+        self._maybe_compact()
+
+    def remove(self, key: str):
+        if key not in self.key_to_id:
+            return
+        self._drop(key)
+        self.dirty = True
+        # Backends only migrate on growth so sizes hovering at a threshold do not flap
+        self._maybe_compact()
+
+    def _drop(self, key):
+        id_ = self.key_to_id.pop(key)
+        self.id_to_key.pop(id_, None)
+        self.key_to_checksum.pop(key, None)
+        if self.lazy_delete or self.backend == "hnsw":
+            self.dead_rows += 1  # Tombstone; filtered at search time
+        else:
+            self.index.remove_ids(np.array([id_], dtype=np.int64))
+
+    def _maybe_compact(self):
+        if (
+            self.source is not None
+            and self.dead_rows
+            and self.dead_rows > TOMBSTONE_COMPACT_RATIO * max(1, self.index.ntotal)
+        ):
+            self.compact()
+
+    def compact(self):
+        """Drops tombstoned rows by rebuilding from the authoritative source."""
+        if self.dead_rows == 0:
+            return
+        logger.info(f"VectorIndex: Compacting {self.dead_rows} tombstoned rows.")
+        self.rebuild()
+
+    # ---- Query ----
+    def search(self, query_vec, top_k: int) -> List[Tuple[str, float]]:
+        if self.index is None or not self.key_to_id or top_k <= 0:
+            return []
+        query = np.ascontiguousarray(np.array([query_vec], dtype=np.float32))
+        k = min(top_k + self.dead_rows, self.index.ntotal)
+        distances, ids = self.index.search(query, k)
+
+        results = []
+        for score, id_ in zip(distances[0], ids[0]):
+            if id_ == -1:
+                continue
+            key = self.id_to_key.get(int(id_))
+            if key is None:  # Tombstoned row
+                continue
+            results.append((key, float(score)))
+            if len(results) >= top_k:
+                break
+        return results
+
+    # ---- Persistence ----
+    def _meta_path(self):
+        return f"{self.path}.meta.json"
+
+    def save(self, force=False):
+        if not self.path or not (self.dirty or force):
+            return
+        try:
+            if self.index is None:
+                for p in (self.path, self._meta_path()):
+                    if os.path.exists(p):
+                        os.remove(p)
+            else:
+                tmp_path = f"{self.path}.tmp"
+                faiss.write_index(self.index, tmp_path)
+                os.replace(tmp_path, self.path)
+                meta = {
+                    "backend": self.backend,
+                    "requested_backend": self.requested_backend,
+                    "dim": self.dim,
+                    "next_id": self.next_id,
+                    "dead_rows": self.dead_rows,
+                    "keys": self.key_to_id,
+                    "checksums": self.key_to_checksum,
+                }
+                tmp_meta = f"{self._meta_path()}.tmp"
+                with open(tmp_meta, "w", encoding="utf-8") as f:
+                    json.dump(meta, f, ensure_ascii=False)
+                os.replace(tmp_meta, self._meta_path())
+            self.dirty = False
+        except (IOError, RuntimeError) as e:
+            logger.exception(f"Error saving VectorIndex to {self.path}: {e}")
+
+    def load(
+        self, expected_items: Optional[Iterable[Tuple[str, list]]] = None
+    ) -> bool:
+        """
+        Loads the persisted index. Returns False (and leaves the index empty) if the
+        files are missing, unreadable or out of sync with `expected_items`, the
+        authoritative (key, vector) pairs: a key added, removed or re-embedded since
+        the index was saved makes it stale.
+        """
+        if not self.path or not os.path.exists(self.path):
+            return False
+        try:
+            with open(self._meta_path(), "r", encoding="utf-8") as f:
+                meta = json.load(f)
+            if meta.get("requested_backend", "auto") != self.requested_backend:
+                return False
+            index = faiss.read_index(self.path)
+        except (IOError, ValueError, RuntimeError) as e:
+            logger.warning(f"VectorIndex: Could not load index from {self.path}: {e}")
+            return False
+
+        key_to_id = {k: int(v) for k, v in meta.get("keys", {}).items()}
+        key_to_checksum = meta.get("checksums", {})
+        if expected_items is not None and key_to_checksum != self._checksums(
+            expected_items
+        ):
+            logger.info(
+                f"VectorIndex: Persisted index at {self.path} is stale. Rebuilding."
+            )
+            return False
+
+        self.index = index
+        self.backend = meta.get("backend")
+        self.dim = meta.get("dim")
+        self.next_id = meta.get("next_id", len(key_to_id))
+        self.dead_rows = meta.get("dead_rows", 0)
+        self.key_to_id = key_to_id
+        self.id_to_key = {v: k for k, v in key_to_id.items()}
+        self.key_to_checksum = key_to_checksum
+        if self.backend == "hnsw":
+            faiss.downcast_index(self.index.index).hnsw.efSearch = HNSW_EF_SEARCH
+        elif self.backend == "ivf":
+            self.index.nprobe = min(IVF_NPROBE, self.index.nlist)
+        self.dirty = False
+        return True
+
+    @staticmethod
+    def _checksums(items: Iterable[Tuple[str, list]]) -> Dict[str, str]:
+        # Same filter as rebuild(): entries without a vector are never indexed
+        return {
+            key: vector_checksum(vec)
+            for key, vec in items
+            if vec is not None and len(vec) > 0
+        }
+
+    def load_or_rebuild(
+        self, expected_items: Optional[Iterable[Tuple[str, list]]] = None
+    ):
+        if not self.load(expected_items):
+            self.rebuild()
@@ -0,0 +1,187 @@
+"""
+Benchmark: inserting one evicted short-term batch of 100 pages under two
+summary themes into a mid-term store of 5k sessions.
+
+- before: insert_pages_into_session per theme, one llm_extract_keywords round
+  trip per page (and per new session summary), and a Python loop scoring the
+  theme summary against every session with np.dot plus set Jaccard
+- after: insert_page_batches, one embedding call and one keyword extraction
+  call per 50 distinct texts for both themes, and one matrix multiply scoring
+  both summaries against the SessionMatcher's embedding matrix
+
+The LLM is a fake that sleeps --llm-latency seconds per call; embeddings are
+fakes and saves are skipped on both sides. One theme matches an existing
+session and merges, the other starts a new session.
+
+Run with: python tests/benchmark_batched_insert.py [--sessions 5000] [--pages 100]
+"""
+
+import argparse
+import contextlib
+import io
+import json
+import os
+import tempfile
+import time
+
+import numpy as np
+
+import memoryos.mid_term as mid_term
+from memoryos.mid_term import MidTermMemory, compute_segment_heat
+from memoryos.utils import generate_id, get_timestamp
+
+DIM = 384
+
+
+def fake_embedding(text, dim=DIM):
+    rng = np.random.default_rng(abs(hash(text)) % (2**32))
+    vec = rng.standard_normal(dim).astype(np.float32)
+    return vec / np.linalg.norm(vec)
+
+
+class SlowKeywordClient:
+    def __init__(self, latency):
+        self.latency = latency
+        self.calls = 0
+
+    def chat_completion(self, model, messages, temperature=0.7, max_tokens=2000):
+        self.calls += 1
+        time.sleep(self.latency)
+        content = messages[1]["content"]
+        count = content.count("\n[")
+        if "JSON:" in content:  # Batch prompt
+            return json.dumps({"keywords": [["topic", "k1"]] * count})
+        return "topic, k1"
+
+
+class LegacyMidTermMemory(MidTermMemory):
+    """insert_pages_into_session and add_session before batching."""
+
+    def add_session(self, summary, details):
+        vecs = self._embed_texts([summary] + [self._page_text(p) for p in details])
+        keywords = mid_term.llm_extract_keywords(summary, self.client)
+        prepared = {summary: (vecs[0], keywords)}
+        for page, vec in zip(details, vecs[1:]):
+            text = self._page_text(page)
+            prepared[text] = (vec, mid_term.llm_extract_keywords(text, self.client))
+        return self._create_session(summary, details, prepared)
+
+    def insert_pages_into_session(
+        self,
+        summary_for_new_pages,
+        keywords_for_new_pages,
+        pages_to_insert,
+        similarity_threshold=0.6,
+        keyword_similarity_alpha=1.0,
+    ):
+        new_summary_vec = self._embed_texts([summary_for_new_pages])[0]
+        best_sid, best_overall_score = None, -1
+        for sid, existing_session in self.sessions.items():
+            existing_summary_vec = np.array(
+                existing_session["summary_embedding"], dtype=np.float32
+            )
+            semantic_sim = float(np.dot(existing_summary_vec, new_summary_vec))
+            existing_keywords = set(existing_session.get("summary_keywords", []))
+            new_keywords_set = set(keywords_for_new_pages)
+            s_topic_keywords = 0
+            if existing_keywords and new_keywords_set:
+                intersection = len(existing_keywords.intersection(new_keywords_set))
+                union = len(existing_keywords.union(new_keywords_set))
+                s_topic_keywords = intersection / union
+            overall_score = semantic_sim + keyword_similarity_alpha * s_topic_keywords
+            if overall_score > best_overall_score:
+                best_overall_score, best_sid = overall_score, sid
+
+        if best_sid and best_overall_score >= similarity_threshold:
+            texts = [self._page_text(p) for p in pages_to_insert]
+            prepared = {
+                text: (vec, mid_term.llm_extract_keywords(text, self.client))
+                for text, vec in zip(texts, self._embed_texts(texts))
+            }
+            self._merge_pages(best_sid, pages_to_insert, prepared)
+            self.save()
+            return best_sid
+        return self.add_session(summary_for_new_pages, pages_to_insert)
+
+
+def seed_sessions(count):
+    sessions = {}
+    for s in range(count):
+        sid = f"session_{s}"
+        sessions[sid] = {
+            "id": sid,
+            "summary": f"summary {s}",
+            "summary_keywords": ["topic", f"k{s}"],
+            "summary_embedding": fake_embedding(f"summary {s}").tolist(),
+            "details": [],
+            "L_interaction": 0,
+            "R_recency": 1.0,
+            "N_visit": 0,
+            "timestamp": get_timestamp(),
+            "last_visit_time": get_timestamp(),
+            "access_count_lfu": 0,
+        }
+        sessions[sid]["H_segment"] = compute_segment_heat(sessions[sid])
+    return sessions
+
+
+def run(legacy, sessions, pages, latency, data_dir):
+    client = SlowKeywordClient(latency)
+    mtm_class = LegacyMidTermMemory if legacy else MidTermMemory
+    mtm = mtm_class(
+        os.path.join(data_dir, f"mtm_{legacy}.json"),
+        client=client,
+        max_capacity=sessions * 2,
+    )
+    mtm.save = lambda: None
+    mtm.sessions = seed_sessions(sessions)
+    mtm.access_frequency.update({sid: 0 for sid in mtm.sessions})
+    mtm.rebuild_heap()
+    mtm.session_matcher.rebuild(mtm.sessions)  # What load() does
+
+    batch = [
+        {
+            "page_id": generate_id("page"),
+            "user_input": f"new question {i}",
+            "agent_response": f"new answer {i}",
+        }
+        for i in range(pages)
+    ]
+    themes = [
+        ("summary 17", ["topic", "k17"], batch),  # Merges into session_17
+        ("an unseen theme", ["fresh"], batch),  # Starts a new session
+    ]
+    start = time.perf_counter()
+    if legacy:
+        for summary, keywords, theme_pages in themes:
+            mtm.insert_pages_into_session(summary, keywords, theme_pages, 0.6)
+    else:
+        mtm.insert_page_batches(themes, similarity_threshold=0.6)
+    elapsed = time.perf_counter() - start
+    assert len(mtm.sessions["session_17"]["details"]) == pages
+    return elapsed, client.calls
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--sessions", type=int, default=5_000)
+    parser.add_argument("--pages", type=int, default=100)
+    parser.add_argument("--llm-latency", type=float, default=0.05)
+    args = parser.parse_args()
+
+    mid_term.get_embedding = fake_embedding
+    with tempfile.TemporaryDirectory() as data_dir:
+        for legacy in (True, False):
+            with contextlib.redirect_stdout(io.StringIO()):
+                elapsed, calls = run(
+                    legacy, args.sessions, args.pages, args.llm_latency, data_dir
+                )
+            label = "before: per page/session" if legacy else "after: batched"
+            print(
+                f"sessions={args.sessions} pages={args.pages} {label:<25} "
+                f"{elapsed * 1000:9.1f} ms, {calls} LLM calls"
+            )
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,94 @@
+"""
+Benchmark: per-call overhead of lru_cache_safe on cache hits, and insert
+cost once the cache is full, against functools.lru_cache.
+
+- before: lru_cache_safe as it was (sha256 of json.dumps per call, O(n)
+  min() scan to evict)
+- after: lru_cache_safe on guardian.cache_core (hashable args used as the
+  key, OrderedDict LRU / bucketed LFU)
+- functools.lru_cache as the floor
+
+Run with: python tests/benchmark_cache_core.py [--calls 200000] [--maxsize 1000]
+"""
+
+import argparse
+import functools
+import hashlib
+import json
+import time
+
+from guardian.cache import lru_cache_safe
+
+
+def legacy_lru_cache_safe(maxsize=128, expire=3600):
+    def decorator(func):
+        cache = {}
+
+        @functools.wraps(func)
+        def wrapper(*args, **kwargs):
+            serialized = json.dumps({"args": args, "kwargs": kwargs}, sort_keys=True)
+            key = hashlib.sha256(serialized.encode()).hexdigest()
+            if key in cache:
+                result, timestamp = cache[key]
+                if time.time() - timestamp < expire:
+                    return result
+                del cache[key]
+            result = func(*args, **kwargs)
+            cache[key] = (result, time.time())
+            if maxsize and len(cache) > maxsize:
+                oldest_key = min(cache.keys(), key=lambda k: cache[k][1])
+                del cache[oldest_key]
+            return result
+
+        return wrapper
+
+    return decorator
+
+
+def lookup(x, limit=10):
+    return x
+
+
+def variants(maxsize):
+    return {
+        "before": legacy_lru_cache_safe(maxsize=maxsize)(lookup),
+        "after (lru)": lru_cache_safe(maxsize=maxsize, policy="lru")(lookup),
+        "after (lfu)": lru_cache_safe(maxsize=maxsize, policy="lfu")(lookup),
+        "functools": functools.lru_cache(maxsize=maxsize)(lookup),
+    }
+
+
+def per_call_ns(fn, calls, args_for):
+    start = time.perf_counter()
+    for i in range(calls):
+        fn(*args_for(i))
+    return (time.perf_counter() - start) / calls * 1e9
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--calls", type=int, default=200_000)
+    parser.add_argument("--maxsize", type=int, default=1000)
+    args = parser.parse_args()
+
+    workloads = {
+        "hit, int arg": lambda i: (i % 100,),
+        "hit, str + int args": lambda i: (f"k{i % 100}", 10),
+        "miss, full cache": lambda i: (i,),
+    }
+    print(f"ns/call over {args.calls} calls, maxsize={args.maxsize}")
+    print(f"{'':<22}" + "".join(f"{name:>14}" for name in variants(1)))
+    for label, args_for in workloads.items():
+        row = []
+        for name, fn in variants(args.maxsize).items():
+            calls = args.calls
+            if name == "before" and label.startswith("miss"):
+                calls = min(calls, 5000)  # O(maxsize) per insert
+            for i in range(args.maxsize):  # Warm up / fill
+                fn(*args_for(i))
+            row.append(per_call_ns(fn, calls, args_for))
+        print(f"{label:<22}" + "".join(f"{ns:14,.0f}" for ns in row))
+
+
+if __name__ == "__main__":
+    main()
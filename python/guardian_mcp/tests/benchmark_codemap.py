@@ -0,0 +1,124 @@
+"""
+Benchmark: codemap cost of Memoryos construction on this repo.
+
+- before: two full generate_codemap passes (walk + ast.parse of every file),
+  as the old Memoryos.__init__ did
+- after: CodemapIndex refresh with a cold (empty) and warm parse cache
+- Memoryos() construction itself, cold and warm, when its dependencies import
+
+Run with: python tests/benchmark_codemap.py [--repeat 3]
+"""
+
+import argparse
+import os
+import tempfile
+import time
+
+from guardian.codemap import index as codemap_index
+from guardian.codemap.generate_codemap import BASE_DIR, extract_python_metadata
+from guardian.codemap.index import CodemapIndex
+
+
+def old_full_parse():
+    codemap = []
+    for root, _, files in os.walk(BASE_DIR):
+        for file in files:
+            if file.endswith(".py"):
+                full_path = os.path.join(root, file)
+                metadata = extract_python_metadata(full_path)
+                if metadata:
+                    codemap.append(
+                        {
+                            "path": os.path.relpath(full_path, BASE_DIR),
+                            "metadata": metadata,
+                        }
+                    )
+    return codemap
+
+
+def best_of(repeat, fn):
+    timings = []
+    for _ in range(repeat):
+        start = time.perf_counter()
+        fn()
+        timings.append(time.perf_counter() - start)
+    return min(timings)
+
+
+def bench_memoryos(cache_path, repeat):
+    try:
+        from memoryos.memoryos import Memoryos
+    except ImportError as e:
+        print(f"Memoryos() construction skipped: {e}")
+        return
+
+    class NullEmbedder:
+        model_name = "null"
+
+        def embed_batch(self, texts, batch_size=32):
+            return [[0.0] for _ in texts]
+
+    def construct(cold):
+        if cold and os.path.exists(cache_path):
+            os.remove(cache_path)
+        codemap_index._shared_index = CodemapIndex(cache_path=cache_path).start()
+        with tempfile.TemporaryDirectory() as tmp:
+            start = time.perf_counter()
+            memory = Memoryos(
+                user_id="bench",
+                data_storage_path=tmp,
+                embedder=NullEmbedder(),
+                llm_api_key="bench",
+            )
+            built = time.perf_counter() - start
+            memory.codemap_index.wait()
+            ready = time.perf_counter() - start
+            memory.async_client.close()
+        return built, ready
+
+    for label, cold in (("cold", True), ("warm", False)):
+        runs = [construct(cold) for _ in range(repeat)]
+        built, ready = min(runs)
+        print(
+            f"after: Memoryos() {label:<4}           {built * 1000:8.1f} ms (codemap ready after {ready * 1000:.1f} ms)"
+        )
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--repeat", type=int, default=3)
+    args = parser.parse_args()
+
+    before = best_of(args.repeat, lambda: (old_full_parse(), old_full_parse()))
+    print(f"before: 2x full codemap parse     {before * 1000:8.1f} ms")
+
+    with tempfile.TemporaryDirectory() as tmp:
+        cache_path = os.path.join(tmp, "codemap_cache.json")
+
+        def cold():
+            if os.path.exists(cache_path):
+                os.remove(cache_path)
+            CodemapIndex(cache_path=cache_path).refresh()
+
+        print(
+            f"after: CodemapIndex cold cache    {best_of(args.repeat, cold) * 1000:8.1f} ms"
+        )
+        warm = best_of(
+            args.repeat, lambda: CodemapIndex(cache_path=cache_path).refresh()
+        )
+        print(f"after: CodemapIndex warm cache    {warm * 1000:8.1f} ms")
+
+        index = CodemapIndex(cache_path=cache_path)
+        index.refresh()
+        start = time.perf_counter()
+        for _ in range(100):
+            index.query("embedding cache service", top_k=10)
+        print(
+            f"after: top-10 query               {(time.perf_counter() - start) * 10:8.3f} ms"
+        )
+
+        bench_memoryos(cache_path, args.repeat)
+
+
+if __name__ == "__main__":
+    main()
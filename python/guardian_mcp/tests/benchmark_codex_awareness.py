@@ -0,0 +1,163 @@
+"""
+Benchmark: CodexAwareness with 100k artifacts, before and after the SQLite store.
+
+- before: the old in-memory dict scanned linearly (json.dumps per artifact for
+  every query), artifacts.json rewritten on each store_memory, and related
+  artifacts walked recursively in Python. Its per-artifact debug logging is
+  left out, so the old numbers are a lower bound.
+- after: CodexAwareness on guardian.artifact_store (indexes, tag join table,
+  FTS5 trigram index, recursive CTE)
+
+Run with: python tests/benchmark_codex_awareness.py [--artifacts 100000]
+"""
+
+import argparse
+import json
+import random
+import tempfile
+import time
+from datetime import datetime, timedelta
+from pathlib import Path
+
+from guardian.codex_awareness import CodexAwareness, MemoryArtifact
+
+WORDS = (
+    "memory pattern decision insight thread agent signal drift anchor echo "
+    "vector summary context plugin latency window"
+).split()
+TAGS = ["conversation", "decision", "pattern", "insight", "reflection", "test"]
+SOURCES = ["codexify", "memoryos", "vestige", "axis", "echoform"]
+
+
+def make_artifacts(n, seed=1):
+    rng = random.Random(seed)
+    start = datetime(2024, 1, 1)
+    artifacts = []
+    for i in range(n):
+        artifacts.append(
+            MemoryArtifact(
+                id=f"artifact_{i}",
+                content={
+                    "type": rng.choice(TAGS[:4]),
+                    "content": " ".join(rng.choice(WORDS) for _ in range(12)),
+                    "metadata": {"ref": f"ref{i}", "user": f"user{i % 100}"},
+                },
+                source=rng.choice(SOURCES),
+                timestamp=start + timedelta(seconds=i),
+                tags=rng.sample(TAGS, rng.randint(1, 3)),
+                confidence=round(rng.random(), 2),
+                related_artifacts=[
+                    f"artifact_{rng.randrange(n)}" for _ in range(rng.randint(0, 3))
+                ],
+            )
+        )
+    return artifacts
+
+
+def old_query(
+    artifacts, query, source_filter=None, tags=None, min_confidence=0.0, limit=10
+):
+    results = []
+    for artifact in artifacts.values():
+        if source_filter and artifact.source != source_filter:
+            continue
+        if tags and not all(tag in artifact.tags for tag in tags):
+            continue
+        if artifact.confidence < min_confidence:
+            continue
+        if query in json.dumps(artifact.content).lower() or any(
+            query.lower() in tag.lower() for tag in artifact.tags
+        ):
+            results.append(artifact)
+        if len(results) >= limit:
+            break
+    return results
+
+
+def old_related(artifacts, artifact_id, max_depth=2):
+    related, visited = [], set()
+
+    def traverse(current_id, depth):
+        if depth <= 0 or current_id in visited:
+            return
+        visited.add(current_id)
+        for related_id in artifacts[current_id].related_artifacts:
+            if related_id in artifacts:
+                if artifacts[related_id] not in related:
+                    related.append(artifacts[related_id])
+                traverse(related_id, depth - 1)
+
+    traverse(artifact_id, max_depth)
+    return related
+
+
+def old_store(artifacts, path, artifact):
+    artifacts[artifact.id] = artifact
+    with open(path, "w") as f:
+        json.dump([a.to_dict() for a in artifacts.values()], f, indent=2)
+
+
+def timed(fn, repeat):
+    start = time.perf_counter()
+    for _ in range(repeat):
+        result = fn()
+    return (time.perf_counter() - start) / repeat * 1000, result
+
+
+QUERIES = [
+    ("rare term", {"query": "ref99999"}),
+    ("common term", {"query": "drift"}),
+    (
+        "term + tag + source",
+        {"query": "anchor", "tags": ["insight"], "source_filter": "axis"},
+    ),
+    ("no match", {"query": "nonexistent"}),
+    (
+        "tags only, min conf",
+        {"query": "", "tags": ["reflection", "test"], "min_confidence": 0.9},
+    ),
+]
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--artifacts", type=int, default=100_000)
+    parser.add_argument("--repeat", type=int, default=5)
+    args = parser.parse_args()
+
+    artifacts = make_artifacts(args.artifacts)
+    old = {a.id: a for a in artifacts}
+    with tempfile.TemporaryDirectory() as tmp:
+        codex = CodexAwareness(memory_path=Path(tmp))
+        start = time.perf_counter()
+        codex.store.put_many(a.to_dict() for a in artifacts)
+        print(
+            f"{args.artifacts} artifacts loaded into SQLite in {time.perf_counter() - start:.1f} s"
+        )
+
+        print(f"{'query':<22} {'before ms':>10} {'after ms':>10}")
+        for label, kwargs in QUERIES:
+            before, expected = timed(lambda: old_query(old, **kwargs), args.repeat)
+            after, results = timed(lambda: codex.query_memory(**kwargs), args.repeat)
+            assert [a.id for a in results] == [a.id for a in expected], label
+            print(f"{label:<22} {before:10.2f} {after:10.2f}")
+
+        root = "artifact_42"
+        before, expected = timed(lambda: old_related(old, root, 3), args.repeat)
+        after, results = timed(lambda: codex.get_related_memories(root, 3), args.repeat)
+        assert {a.id for a in results} >= {a.id for a in expected}
+        print(f"{'related, depth 3':<22} {before:10.2f} {after:10.2f}")
+
+        extra = make_artifacts(1, seed=2)[0]
+        extra.id = "artifact_extra"
+        json_path = Path(tmp) / "artifacts.json"
+        before, _ = timed(lambda: old_store(old, json_path, extra), 1)
+        after, _ = timed(
+            lambda: codex.store_memory(extra.content, extra.source, extra.tags), 1
+        )
+        print(f"{'store_memory':<22} {before:10.2f} {after:10.2f}")
+        codex.close()
+
+
+if __name__ == "__main__":
+    main()
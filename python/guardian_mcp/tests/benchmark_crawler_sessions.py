@@ -0,0 +1,204 @@
+"""
+Benchmark: research crawler pages/sec for 100 URLs on a local fixture site.
+
+- before: Crawl as it was, a blocking requests.get per URL to check for PDFs,
+  then a new AsyncWebCrawler started and closed around every page
+  (get_url_llm/get_table), or around one arun_many batch (get_summary)
+- after: guardian.core.research.Modules.browser.session.CrawlerSessions,
+  HEAD checks on httpx, pages fetched politely into the on-disk page cache
+  and rendered on a pool of long-lived browsers; then the same 100 URLs
+  again with a warm cache
+
+The site is http.server in a thread, adding --latency seconds to every
+response. By default the browser is crawl4ai's headless Chromium; with
+--stand-in it is replaced by a crawler whose start() takes --startup seconds
+and whose arun() takes --render seconds (plus the HTTP fetch for live URLs),
+for machines without a browser.
+
+Run with: python tests/benchmark_crawler_sessions.py [--urls 100] [--stand-in]
+"""
+
+import argparse
+import asyncio
+import shutil
+import tempfile
+import threading
+import time
+import urllib.request
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+import requests
+
+from guardian.core.research.Modules.browser.session import CrawlerSessions
+
+LATENCY = 0.02
+
+
+class Site(BaseHTTPRequestHandler):
+    def log_message(self, *args):
+        pass
+
+    def do_HEAD(self):
+        self._respond(False)
+
+    def do_GET(self):
+        self._respond(True)
+
+    def _respond(self, with_body):
+        time.sleep(LATENCY)
+        body = (
+            f"<html><head><title>{self.path}</title></head><body>"
+            + "<p>Research notes on retrieval and memory.</p>" * 50
+            + "</body></html>"
+        ).encode()
+        self.send_response(200)
+        self.send_header("Content-Type", "text/html")
+        self.send_header("Content-Length", str(len(body)))
+        self.send_header("ETag", f'"{self.path}"')
+        self.send_header("Cache-Control", "max-age=3600")
+        self.end_headers()
+        if with_body:
+            self.wfile.write(body)
+
+
+class StandInCrawler:
+    startup = 1.0
+    render = 0.05
+
+    def __init__(self, config=None):
+        pass
+
+    async def start(self):
+        await asyncio.sleep(self.startup)
+
+    async def close(self):
+        pass
+
+    async def arun(self, url, config=None):
+        if not url.startswith("raw:"):
+            await asyncio.to_thread(lambda: urllib.request.urlopen(url).read())
+        await asyncio.sleep(self.render)
+        return url
+
+    async def arun_many(self, urls, config=None):
+        return await asyncio.gather(*[self.arun(u, config) for u in urls])
+
+
+def browser_factory(stand_in):
+    if stand_in:
+        return StandInCrawler
+    from crawl4ai import AsyncWebCrawler, BrowserConfig
+
+    return lambda: AsyncWebCrawler(config=BrowserConfig(headless=True, verbose=False))
+
+
+def run_config(stand_in):
+    if stand_in:
+        return None
+    from crawl4ai import CacheMode, CrawlerRunConfig
+
+    return CrawlerRunConfig(cache_mode=CacheMode.BYPASS, verbose=False)
+
+
+def legacy_is_pdf(url):
+    response = requests.get(url, stream=True, allow_redirects=True, timeout=10)
+    response.raise_for_status()
+    if "application/pdf" in response.headers.get("Content-Type", "").lower():
+        return True
+    return response.raw.read(5) == b"%PDF-"
+
+
+async def legacy_per_page(urls, factory, config):
+    """get_url_llm/get_table: one browser per call."""
+    for url in urls:
+        legacy_is_pdf(url)
+        crawler = factory()
+        await crawler.start()
+        await crawler.arun(url=url, config=config)
+        await crawler.close()
+
+
+async def legacy_summary(urls, factory, config):
+    """get_summary: PDF checks one by one, then one browser for the batch."""
+    pages = [url for url in urls if not legacy_is_pdf(url)]
+    crawler = factory()
+    await crawler.start()
+    await crawler.arun_many(urls=pages, config=config)
+    await crawler.close()
+
+
+def timed(coro_fn, count):
+    start = time.perf_counter()
+    asyncio.run(coro_fn())
+    return count / (time.perf_counter() - start)
+
+
+def main():
+    global LATENCY
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--urls", type=int, default=100)
+    parser.add_argument("--pool", type=int, default=4)
+    parser.add_argument("--latency", type=float, default=0.02)
+    parser.add_argument("--stand-in", action="store_true")
+    parser.add_argument("--startup", type=float, default=1.0)
+    parser.add_argument("--render", type=float, default=0.05)
+    args = parser.parse_args()
+    LATENCY = args.latency
+    StandInCrawler.startup, StandInCrawler.render = args.startup, args.render
+
+    server = ThreadingHTTPServer(("127.0.0.1", 0), Site)
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    base = f"http://127.0.0.1:{server.server_address[1]}"
+    # Several hosts, as a result page links out to different sites
+    hosts = [base, base.replace("127.0.0.1", "localhost")]
+    urls = [f"{hosts[i % len(hosts)]}/paper/{i}" for i in range(args.urls)]
+    factory, config = browser_factory(args.stand_in), run_config(args.stand_in)
+    browser = (
+        f"stand-in browser ({args.startup:g} s startup, {args.render:g} s render)"
+        if args.stand_in
+        else "headless Chromium"
+    )
+    print(f"{args.urls} URLs, {args.latency * 1000:g} ms per response, {browser}:")
+
+    rate = timed(lambda: legacy_per_page(urls, factory, config), len(urls))
+    print(f"  {'before: browser per page':<34} {rate:8.2f} pages/s")
+    rate = timed(lambda: legacy_summary(urls, factory, config), len(urls))
+    print(f"  {'before: browser per batch':<34} {rate:8.2f} pages/s")
+
+    tmp = tempfile.mkdtemp()
+    try:
+        sessions = CrawlerSessions(
+            pool_size=args.pool,
+            cache_dir=tmp,
+            host_rate=50.0,
+            host_burst=10.0,
+            host_concurrency=4,
+            crawler_factory=factory,
+        )
+
+        async def pooled():
+            await asyncio.gather(*[sessions.is_pdf(url) for url in urls])
+            await sessions.crawl_many(urls, config)
+
+        async def both_passes():
+            elapsed = []
+            for _ in range(2):  # Cold cache, then warm
+                start = time.perf_counter()
+                await pooled()
+                elapsed.append(time.perf_counter() - start)
+            await sessions.close()
+            return elapsed
+
+        cold, warm = asyncio.run(both_passes())
+        label = f"after: pool of {args.pool}, cold cache"
+        print(f"  {label:<34} {len(urls) / cold:8.2f} pages/s")
+        label = f"after: pool of {args.pool}, warm cache"
+        print(f"  {label:<34} {len(urls) / warm:8.2f} pages/s")
+        print(f"  {sessions.stats()}")
+    finally:
+        shutil.rmtree(tmp)
+        server.shutdown()
+
+
+if __name__ == "__main__":
+    main()
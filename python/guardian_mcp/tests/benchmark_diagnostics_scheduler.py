@@ -0,0 +1,149 @@
+"""
+Benchmark: a simulated 24h of SystemDiagnostics on a fake clock.
+
+Metrics drift slowly, with noise and an incident every few hours.
+- before: every monitor run one after another each check_interval, and
+  every cycle's full result set written to codex
+- after: DiagnosticsScheduler with the plugin.json cadences (cheap checks
+  every 30-60 s, plugin/agent sweeps every 5 min), concurrent runs and
+  delta-only persistence
+
+Reports checks run, codex records and bytes written, and the scheduler's
+own CPU cost per tick (monitors are in-memory fakes, so the run time is
+almost all scheduling and persistence).
+
+Run with: python tests/benchmark_diagnostics_scheduler.py [--hours 24]
+"""
+
+import argparse
+import asyncio
+import json
+import math
+import random
+import time
+from pathlib import Path
+
+from guardian.plugins.system_diagnostics.main import SystemDiagnostics
+
+PLUGIN_JSON = (
+    Path(__file__).resolve().parent.parent
+    / "guardian/plugins/system_diagnostics/plugin.json"
+)
+
+
+class FakeClock:
+    def __init__(self):
+        self.now = 0.0
+
+    def __call__(self):
+        return self.now
+
+    async def sleep(self, delay):
+        self.now += delay
+
+
+class SimulatedThreadManager:
+    """Metrics as a function of simulated time."""
+
+    def __init__(self, clock, seed=0):
+        self.clock = clock
+        self.rng = random.Random(seed)
+
+    def _incident(self):
+        return (self.clock() % (4 * 3600)) < 600  # 10 minutes every 4 hours
+
+    def get_memory_info(self):
+        base = 55 + 10 * math.sin(self.clock() / 7200)
+        usage = base + self.rng.gauss(0, 0.5) + (30 if self._incident() else 0)
+        return {"usage_percent": round(usage, 1), "total": 16384}
+
+    def get_thread_info(self):
+        return {"active_count": 12, "dead_count": 3 if self._incident() else 0}
+
+    def get_plugins(self):
+        return []
+
+    def get_agents(self):
+        return []
+
+    def get_performance_metrics(self):
+        rt = 120 * (1 + self.rng.gauss(0, 0.02)) * (4 if self._incident() else 1)
+        return {
+            "response_time": round(rt, 1),
+            "throughput": 50,
+            "cpu_usage": 20,
+            "memory_usage": 40,
+        }
+
+
+class RecordingCodex:
+    def __init__(self):
+        self.records = 0
+        self.bytes = 0
+
+    def store_memory(self, content, **kwargs):
+        self.records += 1
+        self.bytes += len(json.dumps(content, default=str))
+        return f"record_{self.records}"
+
+
+def make_diagnostics(config, clock):
+    diagnostics = SystemDiagnostics(config)
+    diagnostics.codex = RecordingCodex()
+    diagnostics.thread_manager = SimulatedThreadManager(clock)
+    return diagnostics
+
+
+async def run_before(config, clock, seconds):
+    diagnostics = make_diagnostics(config, clock)
+    checks = 0
+    while clock.now < seconds:
+        results = {}
+        for name, monitor in diagnostics.monitors.items():
+            result = await monitor.check()
+            diagnostics.check_results.append(result)
+            results[name] = result.to_dict()
+            checks += 1
+        diagnostics._persist_results(results)
+        await clock.sleep(config["check_interval"])
+    return diagnostics.codex, checks, None
+
+
+async def run_after(config, clock, seconds):
+    diagnostics = make_diagnostics(config, clock)
+    diagnostics.scheduler = diagnostics._create_scheduler(
+        clock=clock, sleep=clock.sleep
+    )
+    await diagnostics.scheduler.run(lambda: clock.now < seconds)
+    checks = sum(s.runs for s in diagnostics.scheduler.schedules.values())
+    return diagnostics.codex, checks, diagnostics.scheduler.ticks
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--hours", type=float, default=24)
+    args = parser.parse_args()
+
+    with open(PLUGIN_JSON) as f:
+        config = json.load(f)["config"]
+    seconds = args.hours * 3600
+
+    print(f"{args.hours:g}h simulated")
+    print(f"{'':<8} {'checks':>8} {'records':>8} {'KiB written':>12} {'us/tick':>9}")
+    totals = {}
+    for label, run in (("before", run_before), ("after", run_after)):
+        clock = FakeClock()
+        start = time.process_time()
+        codex, checks, ticks = asyncio.run(run(config, clock, seconds))
+        cpu = time.process_time() - start
+        ticks = ticks or codex.records
+        totals[label] = codex.bytes
+        print(
+            f"{label:<8} {checks:>8} {codex.records:>8} {codex.bytes / 1024:12.1f} "
+            f"{cpu / ticks * 1e6:9.0f}"
+        )
+    print(f"storage reduction: {totals['before'] / totals['after']:.1f}x")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,116 @@
+"""
+Benchmark: memoize_to_disk lookup latency (p50/p99) with 100k cached entries.
+
+- before: the JSONL file memoize_to_disk appended to, scanned line by line
+  on every lookup (a miss reads the whole file)
+- after: guardian.disk_cache.DiskCache, one index seek per lookup
+
+Also reports fill throughput and the file size after the cache is capped at
+half the entries and compacted.
+
+Run with: python tests/benchmark_disk_cache.py [--entries 100000] [--lookups 2000]
+"""
+
+import argparse
+import hashlib
+import json
+import os
+import random
+import tempfile
+import time
+
+from guardian.disk_cache import DiskCache
+
+
+def percentile(samples, pct):
+    ordered = sorted(samples)
+    return ordered[min(len(ordered) - 1, int(len(ordered) * pct / 100))]
+
+
+def key_for(i):
+    return hashlib.sha256(str(i).encode()).hexdigest()
+
+
+def value_for(i):
+    return [{"id": i, "content": f"memory {i}", "tags": ["test", f"t{i % 50}"]}]
+
+
+def jsonl_lookup(path, key, expire=3600):
+    with open(path) as f:
+        for line in f:
+            entry = json.loads(line)
+            if entry["key"] == key and time.time() - entry["timestamp"] < expire:
+                return entry["result"]
+    return None
+
+
+def timed(lookup, keys):
+    samples = []
+    for key in keys:
+        start = time.perf_counter()
+        lookup(key)
+        samples.append((time.perf_counter() - start) * 1000)
+    return samples
+
+
+def report(label, samples):
+    print(
+        f"{label:<22} p50 {percentile(samples, 50):9.3f} ms"
+        f"   p99 {percentile(samples, 99):9.3f} ms"
+    )
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--entries", type=int, default=100_000)
+    parser.add_argument("--lookups", type=int, default=2000)
+    parser.add_argument("--legacy-lookups", type=int, default=20)
+    args = parser.parse_args()
+
+    rng = random.Random(0)
+    hits = [key_for(rng.randrange(args.entries)) for _ in range(args.lookups)]
+    misses = [key_for(args.entries + i) for i in range(args.lookups)]
+
+    with tempfile.TemporaryDirectory() as tmp:
+        legacy = os.path.join(tmp, "func.jsonl")
+        now = time.time()
+        with open(legacy, "w") as f:
+            for i in range(args.entries):
+                entry = {"key": key_for(i), "timestamp": now, "result": value_for(i)}
+                f.write(json.dumps(entry) + "\n")
+        n = args.legacy_lookups
+        report("before: jsonl hit", timed(lambda k: jsonl_lookup(legacy, k), hits[:n]))
+        report(
+            "before: jsonl miss", timed(lambda k: jsonl_lookup(legacy, k), misses[:n])
+        )
+
+        path = os.path.join(tmp, "memoize.db")
+        cache = DiskCache(path, compact_interval=None)
+        start = time.perf_counter()
+        for i in range(args.entries):
+            cache.set("bench.func", key_for(i), value_for(i), expire=3600)
+        elapsed = time.perf_counter() - start
+        print(f"fill: {args.entries / elapsed:,.0f} sets/sec")
+
+        report(
+            "after: disk cache hit", timed(lambda k: cache.get("bench.func", k), hits)
+        )
+        report(
+            "after: disk cache miss",
+            timed(lambda k: cache.get("bench.func", k), misses),
+        )
+        print(cache.stats())
+
+        size = os.path.getsize(path)
+        cache.max_entries = args.entries // 2
+        cache.compact()
+        print(
+            f"capped at {cache.max_entries}: {size / 2**20:.1f} MiB -> "
+            f"{os.path.getsize(path) / 2**20:.1f} MiB, "
+            f"{cache.stats()['evictions']} evicted"
+        )
+        cache.close()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,76 @@
+"""
+Benchmark: page-ingest embedding throughput (pages/sec) on a synthetic 10k-page
+conversation, one get_embedding call per page (old MidTermMemory behaviour) vs
+the batched, deduplicating EmbeddingService (cold and warm disk cache).
+
+Run with: python tests/benchmark_embedding_ingest.py [--pages 10000] [--batch-size 64]
+"""
+
+import argparse
+import os
+import random
+import tempfile
+import time
+
+from memoryos.embedders.embedding_service import EmbeddingService
+from memoryos.utils import get_embedding
+
+TOPICS = ["deploy", "memory", "ritual", "codex", "thread", "plugin", "agent", "voice"]
+
+
+def synthetic_pages(n, seed=7):
+    """Chat-like pages; roughly a fifth repeat earlier turns verbatim."""
+    rng = random.Random(seed)
+    pages = []
+    for i in range(n):
+        if pages and rng.random() < 0.2:
+            pages.append(rng.choice(pages))
+            continue
+        topic = rng.choice(TOPICS)
+        pages.append(
+            f"User: how is the {topic} work going, step {i}? "
+            f"Assistant: the {topic} task {rng.randint(0, 500)} is in progress."
+        )
+    return pages
+
+
+def timed(label, fn, n):
+    start = time.perf_counter()
+    fn()
+    elapsed = time.perf_counter() - start
+    print(f"{label:<28} {n / elapsed:10.1f} pages/sec ({elapsed:.2f}s)")
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--pages", type=int, default=10_000)
+    parser.add_argument("--batch-size", type=int, default=64)
+    args = parser.parse_args()
+
+    pages = synthetic_pages(args.pages)
+    get_embedding("warm up")  # Exclude model load from the baseline
+
+    timed("before: per-page encode", lambda: [get_embedding(p) for p in pages], len(pages))
+
+    with tempfile.TemporaryDirectory() as tmp:
+        cache_path = os.path.join(tmp, "embedding_cache.sqlite")
+        service = EmbeddingService(batch_size=args.batch_size, cache_path=cache_path)
+        # Updater hands pages over a few at a time, so ingest in small groups
+        groups = [pages[i : i + 10] for i in range(0, len(pages), 10)]
+
+        timed(
+            "after: batched, cold cache",
+            lambda: service.embed_batch(pages),
+            len(pages),
+        )
+        warm = EmbeddingService(batch_size=args.batch_size, cache_path=cache_path)
+        timed(
+            "after: warm disk cache",
+            lambda: [warm.embed_batch(g) for g in groups],
+            len(pages),
+        )
+        print(f"distinct texts encoded: {service.stats['encoded']} / {len(pages)}")
+
+
+if __name__ == "__main__":
+    main()
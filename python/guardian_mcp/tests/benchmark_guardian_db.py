@@ -0,0 +1,188 @@
+"""
+Benchmark: GuardianDB write throughput (inserts/sec) and get_chat_history
+latency (p50/p99) on a 1M-row chat_log, plus keyword search via LIKE scans
+vs the FTS5 index.
+
+Compares the old access pattern (fresh connection per call, no indexes) with
+the pooled WAL connections, lookup indexes and executemany bulk inserts.
+
+Run with: python tests/benchmark_guardian_db.py [--rows 1000000] [--queries 500]
+"""
+
+import argparse
+import os
+import random
+import sqlite3
+import tempfile
+import time
+
+from guardian.core.db import CHAT_LOG_INSERT, GuardianDB
+
+SESSIONS = 2000
+USERS = 50
+REFS = 50_000  # Rare tokens, so keyword queries are selective
+
+
+def synthetic_entries(n, seed=11):
+    rng = random.Random(seed)
+    for i in range(n):
+        session = rng.randrange(SESSIONS)
+        yield {
+            "timestamp": f"2025-01-01T00:00:{i % 60:02d}",
+            "session_id": f"session-{session}",
+            "user_id": f"user-{session % USERS}",
+            "role": "user" if i % 2 == 0 else "assistant",
+            "message": f"message {i} about thread {rng.randrange(100)} ref{rng.randrange(REFS)}",
+            "backend": "bench",
+        }
+
+
+def percentile(samples, pct):
+    ordered = sorted(samples)
+    return ordered[min(len(ordered) - 1, int(len(ordered) * pct / 100))]
+
+
+def baseline_schema(db_path):
+    """Current schema without the lookup indexes, in rollback-journal mode."""
+    db = GuardianDB(db_path)
+    with db._connect() as conn:
+        drop_chat_log_indexes(conn)
+    db.close()
+    with sqlite3.connect(db_path) as conn:
+        conn.execute("PRAGMA journal_mode=DELETE")
+
+
+def drop_chat_log_indexes(conn):
+    for (name,) in conn.execute(
+        "SELECT name FROM sqlite_master WHERE type='index' AND tbl_name='chat_log' "
+        "AND sql IS NOT NULL"
+    ).fetchall():
+        conn.execute(f"DROP INDEX {name}")
+
+
+def bench_single_inserts(db_path, n):
+    """Old GuardianDB behaviour: one sqlite3.connect and commit per row."""
+    baseline_schema(db_path)
+    start = time.perf_counter()
+    for e in synthetic_entries(n):
+        with sqlite3.connect(db_path) as conn:
+            conn.execute(
+                CHAT_LOG_INSERT,
+                (
+                    e["timestamp"], e["session_id"], e["user_id"], e["role"],
+                    e["message"], None, e["backend"], "test-model", None, None, None,
+                ),
+            )
+            conn.commit()
+    return n / (time.perf_counter() - start)
+
+
+def bench_pooled_inserts(db, n):
+    start = time.perf_counter()
+    for e in synthetic_entries(n):
+        db.add_chat_log(**e)
+    return n / (time.perf_counter() - start)
+
+
+def bench_bulk_inserts(db, n, chunk=10_000):
+    entries = synthetic_entries(n)
+    start = time.perf_counter()
+    while True:
+        batch = [e for _, e in zip(range(chunk), entries)]
+        if not batch:
+            break
+        db.insert_chat_logs_bulk(batch)
+    return n / (time.perf_counter() - start)
+
+
+def bench_history(query_fn, queries, seed=3):
+    rng = random.Random(seed)
+    samples = []
+    for _ in range(queries):
+        session = rng.randrange(SESSIONS)
+        start = time.perf_counter()
+        query_fn(f"session-{session}", f"user-{session % USERS}")
+        samples.append((time.perf_counter() - start) * 1000)
+    return percentile(samples, 50), percentile(samples, 99)
+
+
+def bench_keyword(search_fn, words, queries, seed=5):
+    rng = random.Random(seed)
+    samples = []
+    for _ in range(queries):
+        start = time.perf_counter()
+        search_fn(rng.choice(words))
+        samples.append((time.perf_counter() - start) * 1000)
+    return percentile(samples, 50), percentile(samples, 99)
+
+
+def like_search(db):
+    """Old keyword path: substring match over every chat_log row."""
+
+    def query(word):
+        kw = f"%{word}%"
+        with db._connect() as conn:
+            return conn.execute(
+                "SELECT * FROM chat_log WHERE message LIKE ? OR response LIKE ? "
+                "ORDER BY id DESC LIMIT 20",
+                (kw, kw),
+            ).fetchall()
+
+    return query
+
+
+def unindexed_history(db_path):
+    """Old read path: fresh connection per call and no chat_log indexes."""
+
+    def query(session_id, user_id):
+        with sqlite3.connect(db_path) as conn:
+            return conn.execute(
+                "SELECT * FROM chat_log WHERE session_id = ? AND user_id = ? "
+                "ORDER BY id DESC LIMIT 20 OFFSET 0",
+                (session_id, user_id),
+            ).fetchall()
+
+    return query
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--rows", type=int, default=1_000_000)
+    parser.add_argument("--single-rows", type=int, default=5_000)
+    parser.add_argument("--queries", type=int, default=500)
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as tmp:
+        single = bench_single_inserts(os.path.join(tmp, "single.db"), args.single_rows)
+        print(f"before: connect-per-insert      {single:12,.0f} inserts/sec")
+
+        db = GuardianDB(os.path.join(tmp, "pooled.db"))
+        pooled = bench_pooled_inserts(db, args.single_rows)
+        print(f"after: pooled add_chat_log      {pooled:12,.0f} inserts/sec")
+
+        bulk = bench_bulk_inserts(db, args.rows)
+        print(f"after: insert_chat_logs_bulk    {bulk:12,.0f} inserts/sec ({args.rows:,} rows)")
+
+        p50, p99 = bench_history(
+            lambda s, u: db.get_chat_history(session_id=s, user_id=u), args.queries
+        )
+        print(f"after: get_chat_history         p50 {p50:7.3f} ms  p99 {p99:7.3f} ms")
+
+        words = [f"ref{n}" for n in range(REFS)]
+        p50, p99 = bench_keyword(
+            lambda w: db.search_chat_log(w, limit=20), words, args.queries
+        )
+        print(f"after: search_chat_log (FTS5)   p50 {p50:7.3f} ms  p99 {p99:7.3f} ms")
+        p50, p99 = bench_keyword(like_search(db), words, min(args.queries, 50))
+        print(f"before: LIKE '%kw%' scan        p50 {p50:7.3f} ms  p99 {p99:7.3f} ms")
+
+        # Same rows without the lookup indexes, queried the old way
+        with db._connect() as conn:
+            drop_chat_log_indexes(conn)
+        db.close()
+        p50, p99 = bench_history(unindexed_history(db.db_path), args.queries)
+        print(f"before: unindexed, per-call conn p50 {p50:7.3f} ms  p99 {p99:7.3f} ms")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,109 @@
+"""
+Benchmark: mid-term session heat updates and LFU evictions.
+
+- before: every heat change rebuilds the (-H_segment, session_id) heap from
+  all sessions (MidTermMemory.rebuild_heap), and every eviction runs
+  min() over access_frequency
+- after: memoryos.heat_queue.SessionHeatQueue, an indexed heap per priority
+  with O(log n) re-keying and eviction
+
+Each update bumps one random session's N_visit and access_frequency, the way
+search_sessions does for a matched session. The legacy side runs --legacy-updates
+updates and its rate is extrapolated to --updates, since at 5k sessions a
+1M-update run takes far too long.
+
+Run with: python tests/benchmark_heat_queue.py [--sessions 5000] [--updates 1000000]
+"""
+
+import argparse
+import heapq
+import random
+import time
+
+from memoryos.heat_queue import SessionHeatQueue
+from memoryos.utils import get_timestamp
+
+
+def seed_sessions(count):
+    now = get_timestamp()
+    return {
+        f"session_{i}": {
+            "N_visit": 0,
+            "L_interaction": 5,
+            "H_segment": 6.0,
+            "last_visit_time": now,
+        }
+        for i in range(count)
+    }
+
+
+def touch(session):
+    session["N_visit"] += 1
+    session["H_segment"] = session["N_visit"] + session["L_interaction"] + 1.0
+
+
+def run_legacy(sessions, frequencies, updates, rng):
+    sids = list(sessions)
+    start = time.perf_counter()
+    for _ in range(updates):
+        sid = rng.choice(sids)
+        touch(sessions[sid])
+        frequencies[sid] += 1
+        heap = []
+        for other, session in sessions.items():
+            heapq.heappush(heap, (-session["H_segment"], other))
+    update_s = time.perf_counter() - start
+
+    start = time.perf_counter()
+    for _ in range(len(sessions) // 10):
+        del frequencies[min(frequencies, key=frequencies.get)]
+    evict_s = time.perf_counter() - start
+    return update_s, evict_s
+
+
+def run_queue(sessions, frequencies, updates, rng):
+    sids = list(sessions)
+    queue = SessionHeatQueue()
+    queue.rebuild(sessions, frequencies)
+    start = time.perf_counter()
+    for _ in range(updates):
+        sid = rng.choice(sids)
+        touch(sessions[sid])
+        frequencies[sid] += 1
+        queue.update_heat(sid, sessions[sid])
+        queue.update_frequency(sid, frequencies[sid])
+    update_s = time.perf_counter() - start
+
+    start = time.perf_counter()
+    for _ in range(len(sessions) // 10):
+        queue.pop_lfu()
+    evict_s = time.perf_counter() - start
+    return update_s, evict_s
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--sessions", type=int, default=5_000)
+    parser.add_argument("--updates", type=int, default=1_000_000)
+    parser.add_argument("--legacy-updates", type=int, default=500)
+    args = parser.parse_args()
+
+    evictions = args.sessions // 10
+    for label, runner, updates in (
+        ("before: rebuild + min()", run_legacy, args.legacy_updates),
+        ("after: SessionHeatQueue", run_queue, args.updates),
+    ):
+        sessions = seed_sessions(args.sessions)
+        frequencies = {sid: 0 for sid in sessions}
+        update_s, evict_s = runner(sessions, frequencies, updates, random.Random(0))
+        per_update_us = update_s / updates * 1e6
+        total_s = per_update_us * args.updates / 1e6
+        print(
+            f"sessions={args.sessions} {label:<24} {per_update_us:9.2f} us/update "
+            f"({args.updates} updates: {total_s:9.2f} s), "
+            f"{evict_s / evictions * 1e6:8.2f} us/eviction"
+        )
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,177 @@
+"""
+Benchmark: rate-limit decisions/sec under contention from 32 concurrent
+callers, and how close blocking acquires get to the target rate.
+
+- before: the per-module limiters guardian.utils used to carry, an
+  asyncio.Lock held across the sleep (rate_limiter.SimpleRateLimiter) and a
+  lock-guarded list of call times per throttle (async_final)
+- after: guardian.utils.limiter_core.RateLimiter, GCRA state per key,
+  reservations booked under a short lock and slept off outside it
+
+The locked list filters every call time inside the window on each decision,
+so its cost grows with the rate; GCRA's does not. Also reports 32 threads on
+the MemoryBackend against the SQLiteBackend, and the SQLiteBackend shared by
+several processes.
+
+Run with: python tests/benchmark_limiter_core.py [--tasks 32] [--decisions 2000]
+"""
+
+import argparse
+import asyncio
+import multiprocessing
+import os
+import tempfile
+import threading
+import time
+
+from guardian.utils.limiter_core import RateLimiter, SQLiteBackend
+
+
+class LegacyLockedLimiter:
+    def __init__(self, rate):
+        self.min_interval = 1.0 / rate
+        self.last_call = 0.0
+        self.lock = asyncio.Lock()
+
+    async def acquire(self):
+        async with self.lock:
+            elapsed = time.time() - self.last_call
+            if elapsed < self.min_interval:
+                await asyncio.sleep(self.min_interval - elapsed)
+            self.last_call = time.time()
+
+
+class LegacyThrottle:
+    def __init__(self, rate, per):
+        self.rate = rate
+        self.per = per
+        self.calls = []
+        self.lock = asyncio.Lock()
+
+    async def allow(self):
+        async with self.lock:
+            now = time.time()
+            self.calls = [t for t in self.calls if now - t < self.per]
+            if len(self.calls) < self.rate:
+                self.calls.append(now)
+                return True
+            return False
+
+
+def core_limiter(rate, burst=1.0, backend=None):
+    limiter = RateLimiter(backend)
+    limiter.set_limit("", rate, burst)
+    return limiter
+
+
+async def contend(tasks, decisions, decide):
+    async def worker():
+        for _ in range(decisions):
+            await decide()
+
+    start = time.perf_counter()
+    await asyncio.gather(*[worker() for _ in range(tasks)])
+    return tasks * decisions / (time.perf_counter() - start)
+
+
+async def paced(tasks, permits, acquire):
+    """Achieved permits/sec when `tasks` callers share `permits` permits."""
+    per_task = permits // tasks
+
+    async def worker():
+        for _ in range(per_task):
+            await acquire()
+
+    start = time.perf_counter()
+    await asyncio.gather(*[worker() for _ in range(tasks)])
+    return tasks * per_task / (time.perf_counter() - start)
+
+
+def threaded(threads, decisions, limiter):
+    def worker():
+        for _ in range(decisions):
+            limiter.try_acquire()
+
+    workers = [threading.Thread(target=worker) for _ in range(threads)]
+    start = time.perf_counter()
+    for t in workers:
+        t.start()
+    for t in workers:
+        t.join()
+    return threads * decisions / (time.perf_counter() - start)
+
+
+def _process_worker(path, decisions, queue):
+    limiter = RateLimiter(SQLiteBackend(path))
+    limiter.set_limit("", 1e9, 1e9)
+    start = time.perf_counter()
+    for _ in range(decisions):
+        limiter.try_acquire()
+    queue.put(time.perf_counter() - start)
+    limiter.backend.close()
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--tasks", type=int, default=32)
+    parser.add_argument("--decisions", type=int, default=2000)
+    parser.add_argument("--throttle-rates", type=float, nargs="+", default=[10, 1000])
+    parser.add_argument("--rate", type=float, default=500.0)
+    parser.add_argument("--processes", type=int, default=4)
+    args = parser.parse_args()
+    n, d = args.tasks, args.decisions
+
+    for rate in args.throttle_rates:
+        print(f"throttle at {rate:g}/s, decisions/sec from {n} asyncio tasks x {d}:")
+        legacy = LegacyThrottle(rate=rate, per=1.0)
+        core = core_limiter(rate, burst=rate)
+
+        async def core_allow():
+            return core.try_acquire()
+
+        for label, decide in (
+            ("before: locked list", legacy.allow),
+            ("after: GCRA", core_allow),
+        ):
+            print(f"  {label:<24} {asyncio.run(contend(n, d, decide)):12,.0f}")
+
+    permits = int(args.rate * 2)
+    print(f"blocking acquires, {n} tasks sharing {permits} permits at {args.rate:g}/s:")
+    for label, limiter in (
+        ("before: lock across sleep", LegacyLockedLimiter(args.rate)),
+        ("after: reservations", core_limiter(args.rate)),
+    ):
+        acquire = getattr(limiter, "acquire_async", None) or limiter.acquire
+        achieved = asyncio.run(paced(n, permits, acquire))
+        print(
+            f"  {label:<24} {achieved:9.1f}/s ({achieved / args.rate:6.1%} of target)"
+        )
+
+    print(f"try_acquire decisions/sec, {n} threads x {d}:")
+    with tempfile.TemporaryDirectory() as tmp:
+        path = os.path.join(tmp, "limits.db")
+        for label, backend in (
+            ("MemoryBackend", None),
+            ("SQLiteBackend", SQLiteBackend(path)),
+        ):
+            limiter = core_limiter(1e9, 1e9, backend)
+            print(f"  {label:<24} {threaded(n, d, limiter):12,.0f}")
+            limiter.backend.close()
+
+        ctx = multiprocessing.get_context("spawn")
+        queue = ctx.Queue()
+        workers = [
+            ctx.Process(target=_process_worker, args=(path, d, queue))
+            for _ in range(args.processes)
+        ]
+        for p in workers:
+            p.start()
+        slowest = max(queue.get() for _ in workers)
+        for p in workers:
+            p.join()
+        total = args.processes * d / slowest
+        print(f"SQLiteBackend shared by {args.processes} processes: {total:12,.0f}/s")
+
+
+if __name__ == "__main__":
+    main()
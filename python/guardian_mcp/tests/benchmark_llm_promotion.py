@@ -0,0 +1,86 @@
+"""
+Benchmark: end-to-end short-term -> mid-term promotion latency for 50 QA pairs
+against the local fake OpenAI server, with the sequential OpenAIClient path vs
+the concurrent AsyncLLMClient path in Updater.
+
+Run with: python tests/benchmark_llm_promotion.py [--pairs 50] [--latency 0.1]
+"""
+
+import argparse
+import os
+import sys
+import tempfile
+import time
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), "memoryos"))
+
+import memoryos.mid_term as mid_term
+import memoryos.updater as updater_module
+from fake_openai_server import FakeOpenAIServer
+from memoryos.llm_client import AsyncLLMClient
+from memoryos.mid_term import MidTermMemory
+from memoryos.short_term import ShortTermMemory
+from memoryos.updater import Updater
+from memoryos.utils import OpenAIClient
+
+
+def responder(payload):
+    if payload.get("max_tokens") == 10:  # Continuity check
+        current = payload["messages"][-1]["content"].split("Current Page:")[1]
+        # A topic shift every fourth page, so the batch splits into chains
+        return "false" if "shift" in current else "true"
+    return "[]"
+
+
+def promote(pairs, base_url, use_async):
+    with tempfile.TemporaryDirectory() as tmp:
+        stm = ShortTermMemory(os.path.join(tmp, "short.json"), max_capacity=pairs)
+        for i in range(pairs):
+            tag = "shift" if i % 4 == 0 else "same"
+            stm.add_qa_pair({"user_input": f"{tag} topic {i}", "agent_response": "ok"})
+        client = OpenAIClient(api_key="bench", base_url=base_url)
+        async_client = (
+            AsyncLLMClient(api_key="bench", base_url=base_url, max_concurrency=16)
+            if use_async
+            else None
+        )
+        updater = Updater(
+            short_term_memory=stm,
+            mid_term_memory=MidTermMemory(os.path.join(tmp, "mid.json"), client=client),
+            long_term_memory=None,
+            client=client,
+            async_client=async_client,
+        )
+        start = time.perf_counter()
+        updater.process_short_term_to_mid_term()
+        elapsed = time.perf_counter() - start
+        if async_client is not None:
+            async_client.close()
+        return elapsed
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--pairs", type=int, default=50)
+    parser.add_argument("--latency", type=float, default=0.1)
+    args = parser.parse_args()
+
+    # Keep embeddings and keyword extraction out of the measurement
+    mid_term.get_embedding = lambda text: [1.0, 0.0, 0.0]
+    mid_term.llm_extract_keywords = lambda text, client=None: []
+    updater_module.llm_extract_keywords = lambda text, client, model=None: []
+
+    with FakeOpenAIServer(responder=responder, latency=args.latency) as server:
+        sync_s = promote(args.pairs, server.base_url, use_async=False)
+        calls_sync = len(server.requests)
+        async_s = promote(args.pairs, server.base_url, use_async=True)
+        calls_async = len(server.requests) - calls_sync
+
+    print(f"{args.pairs} QA pairs, {args.latency * 1000:.0f} ms simulated LLM latency")
+    print(f"sequential OpenAIClient : {sync_s:7.2f}s ({calls_sync} calls)")
+    print(f"concurrent AsyncLLMClient: {async_s:7.2f}s ({calls_async} calls)")
+    print(f"speedup: {sync_s / async_s:.1f}x")
+
+
+if __name__ == "__main__":
+    main()
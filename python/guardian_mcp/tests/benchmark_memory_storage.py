@@ -0,0 +1,136 @@
+"""
+Benchmark: bytes written to disk per add_memory with ~10k mid-term pages.
+
+Each simulated add_memory does the persistence work of the real one: the QA
+pair lands in short-term memory, a page is merged into an existing mid-term
+session and a retrieval bumps session heat. Both tiers are measured with
+- before: the JSON backend (whole file rewritten on each save)
+- after: the op-log backend (changed records appended, vectors in a .npy file)
+
+Run with: python tests/benchmark_memory_storage.py [--pages 10000] [--adds 50]
+"""
+
+import argparse
+import os
+import tempfile
+import time
+
+import numpy as np
+
+import memoryos.mid_term as mid_term
+import memoryos.short_term as short_term
+from memoryos.mid_term import MidTermMemory
+from memoryos.short_term import ShortTermMemory
+from memoryos.utils import generate_id, get_timestamp
+
+PAGES_PER_SESSION = 5
+
+
+def fake_embedding(text, dim):
+    rng = np.random.default_rng(abs(hash(text)) % (2**32))
+    vec = rng.standard_normal(dim).astype(np.float32)
+    return vec / np.linalg.norm(vec)
+
+
+def seed_sessions(pages, dim):
+    sessions = {}
+    for s in range(pages // PAGES_PER_SESSION):
+        sid = generate_id("session")
+        details = [
+            {
+                "page_id": generate_id("page"),
+                "user_input": f"question {s}.{p} " * 4,
+                "agent_response": f"answer {s}.{p} " * 12,
+                "timestamp": get_timestamp(),
+                "page_embedding": fake_embedding(f"{s}.{p}", dim).tolist(),
+                "page_keywords": ["topic", f"k{s}"],
+                "preloaded": False,
+                "analyzed": False,
+                "pre_page": None,
+                "next_page": None,
+                "meta_info": None,
+            }
+            for p in range(PAGES_PER_SESSION)
+        ]
+        sessions[sid] = {
+            "id": sid,
+            "summary": f"summary of session {s}",
+            "summary_keywords": ["topic"],
+            "summary_embedding": fake_embedding(f"summary {s}", dim).tolist(),
+            "details": details,
+            "L_interaction": len(details),
+            "R_recency": 1.0,
+            "N_visit": 0,
+            "H_segment": 5.0,
+            "timestamp": get_timestamp(),
+            "last_visit_time": get_timestamp(),
+            "access_count_lfu": 0,
+        }
+    return sessions
+
+
+def run(storage, sessions, adds, data_dir):
+    stm = ShortTermMemory(
+        os.path.join(data_dir, "short_term.json"), max_capacity=10, storage=storage
+    )
+    mtm = MidTermMemory(
+        os.path.join(data_dir, "mid_term.json"),
+        client=None,
+        max_capacity=len(sessions) + adds,
+        storage=storage,
+    )
+    mtm.sessions = sessions
+    mtm.access_frequency.update({sid: 0 for sid in sessions})
+    mtm.rebuild_heap()
+    mtm.compact()  # Initial state on disk; not counted below
+    target = next(iter(sessions.values()))
+
+    written = stm.storage.bytes_written + mtm.storage.bytes_written
+    start = time.perf_counter()
+    for i in range(adds):
+        stm.add_qa_pair({"user_input": f"new question {i}", "agent_response": "ok"})
+        mtm.insert_pages_into_session(
+            target["summary"],
+            target["summary_keywords"],
+            [{"user_input": f"new question {i}", "agent_response": "ok"}],
+            similarity_threshold=0.0,
+        )
+        target["N_visit"] += 1  # Heat bump from the retrieval step
+        mtm.save()
+    elapsed = time.perf_counter() - start
+    written = stm.storage.bytes_written + mtm.storage.bytes_written - written
+    stm.storage.close()
+    mtm.storage.close()
+    return written / adds, elapsed / adds
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--pages", type=int, default=10_000)
+    parser.add_argument("--adds", type=int, default=50)
+    parser.add_argument("--dim", type=int, default=384)
+    args = parser.parse_args()
+
+    mid_term.get_embedding = lambda text: fake_embedding(text, args.dim)
+    mid_term.llm_extract_keywords = lambda text, client=None: ["topic"]
+    mid_term.print = lambda *a, **k: None  # The tiers print on every operation
+    short_term.print = mid_term.print
+
+    print(f"{args.pages} mid-term pages, dim {args.dim}, {args.adds} adds")
+    results = {}
+    for label, storage in (
+        ("before: json rewrite", "json"),
+        ("after: op log", "oplog"),
+    ):
+        sessions = seed_sessions(args.pages, args.dim)
+        with tempfile.TemporaryDirectory() as tmp:
+            per_add, seconds = run(storage, sessions, args.adds, tmp)
+        results[storage] = per_add
+        print(
+            f"{label:<22} {per_add / 1024:12.1f} KiB/add_memory  {seconds * 1000:8.1f} ms/add_memory"
+        )
+    print(f"reduction: {results['json'] / results['oplog']:.0f}x fewer bytes written")
+
+
+if __name__ == "__main__":
+    main()
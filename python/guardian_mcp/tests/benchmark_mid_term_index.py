@@ -0,0 +1,82 @@
+"""
+Benchmark: mid-term session search with a per-query IndexFlatIP build (old
+MidTermMemory.search_sessions behaviour) vs the persistent VectorIndex.
+
+Run with: python tests/benchmark_mid_term_index.py [--dim 384] [--queries 50]
+"""
+
+import argparse
+import time
+
+import faiss
+import numpy as np
+
+from memoryos.vector_store.ann_index import VectorIndex
+
+
+def _unit_rows(n, dim, rng):
+    x = rng.standard_normal((n, dim)).astype(np.float32)
+    return x / np.linalg.norm(x, axis=1, keepdims=True)
+
+
+def bench_size(n, dim, queries, top_k=5):
+    rng = np.random.default_rng(n)
+    vecs = _unit_rows(n, dim, rng)
+    keys = [f"session_{i}" for i in range(n)]
+    qs = _unit_rows(queries, dim, rng)
+
+    # Old path: stack every embedding and build a fresh flat index per query
+    start = time.perf_counter()
+    for q in qs:
+        matrix = np.array([v.tolist() for v in vecs], dtype=np.float32)
+        index = faiss.IndexFlatIP(dim)
+        index.add(matrix)
+        index.search(q.reshape(1, -1), top_k)
+    old_ms = (time.perf_counter() - start) * 1000 / queries
+
+    # New path: index built once, queried many times
+    index = VectorIndex(source=lambda: zip(keys, vecs))
+    start = time.perf_counter()
+    index.rebuild()
+    build_s = time.perf_counter() - start
+    start = time.perf_counter()
+    for q in qs:
+        index.search(q, top_k)
+    new_ms = (time.perf_counter() - start) * 1000 / queries
+
+    # Incremental insert cost
+    extra = _unit_rows(100, dim, rng)
+    start = time.perf_counter()
+    for i, v in enumerate(extra):
+        index.upsert(f"extra_{i}", v)
+    insert_ms = (time.perf_counter() - start) * 1000 / len(extra)
+
+    # Recall of the chosen backend against exact search
+    exact = faiss.IndexFlatIP(dim)
+    exact.add(vecs)
+    _, truth = exact.search(qs, top_k)
+    hits = 0
+    for q, row in zip(qs, truth):
+        got = {key for key, _ in index.search(q, top_k)}
+        hits += len(got & {keys[i] for i in row})
+    recall = hits / (queries * top_k)
+
+    print(
+        f"n={n:>7} backend={index.backend:<5} old={old_ms:9.2f} ms/query "
+        f"new={new_ms:7.3f} ms/query build={build_s:6.2f}s "
+        f"insert={insert_ms:6.3f} ms recall@{top_k}={recall:.3f}"
+    )
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--dim", type=int, default=384)
+    parser.add_argument("--queries", type=int, default=50)
+    parser.add_argument("--sizes", type=int, nargs="+", default=[1_000, 10_000, 100_000])
+    args = parser.parse_args()
+    for n in args.sizes:
+        bench_size(n, args.dim, args.queries)
+
+
+if __name__ == "__main__":
+    main()
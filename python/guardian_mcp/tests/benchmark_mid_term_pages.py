@@ -0,0 +1,200 @@
+"""
+Benchmark: Updater.process_short_term_to_mid_term latency as the mid-term
+store grows to 50k pages.
+
+- before: MidTermMemory.get_page_by_id scanning every session's pages, called
+  for the continuity check, once per hop of the meta-info propagation walk
+  and twice per update_page_connections
+- after: the page registry (page_id -> session, position) and the cached
+  page-link graph in memoryos.page_index
+
+Pages are seeded in conversation chains of --chain pages, and every call moves
+one QA pair from short-term memory, continuous with the previous one with
+probability 1 - 1/--chain. LLM calls and embeddings are fakes and saves are
+skipped on both sides (the op log's cost is measured by
+benchmark_memory_storage.py), so the numbers are the in-memory work only.
+
+Run with: python tests/benchmark_mid_term_pages.py [--sizes 5000 20000 50000]
+"""
+
+import argparse
+import contextlib
+import io
+import os
+import random
+import tempfile
+import time
+
+import numpy as np
+
+import memoryos.mid_term as mid_term
+import memoryos.updater as updater
+from memoryos.mid_term import MidTermMemory
+from memoryos.short_term import ShortTermMemory
+from memoryos.updater import Updater
+from memoryos.utils import get_timestamp
+
+DIM = 64
+PAGES_PER_SESSION = 5
+
+
+def fake_embedding(text, dim=DIM):
+    rng = np.random.default_rng(abs(hash(text)) % (2**32))
+    vec = rng.standard_normal(dim).astype(np.float32)
+    return vec / np.linalg.norm(vec)
+
+
+class LegacyMidTermMemory(MidTermMemory):
+    def _index_pages(self, session_id, start=0):
+        pass
+
+    def _reindex_pages(self):
+        pass
+
+    def get_page_by_id(self, page_id):
+        for session in self.sessions.values():
+            for page in session.get("details", []):
+                if page.get("page_id") == page_id:
+                    return page
+        return None
+
+    def update_page_connections(self, prev_page_id, next_page_id):
+        if prev_page_id:
+            prev_page = self.get_page_by_id(prev_page_id)
+            if prev_page:
+                prev_page["next_page"] = next_page_id
+        if next_page_id:
+            next_page = self.get_page_by_id(next_page_id)
+            if next_page:
+                next_page["pre_page"] = prev_page_id
+
+
+class LegacyUpdater(Updater):
+    def _update_linked_pages_meta_info(self, start_page_id, new_meta_info):
+        q = [start_page_id]
+        visited = {start_page_id}
+        head = 0
+        while head < len(q):
+            current_page_id = q[head]
+            head += 1
+            page = self.mid_term_memory.get_page_by_id(current_page_id)
+            if page:
+                page["meta_info"] = new_meta_info
+                prev_id = page.get("pre_page")
+                if prev_id and prev_id not in visited:
+                    q.append(prev_id)
+                    visited.add(prev_id)
+                next_id = page.get("next_page")
+                if next_id and next_id not in visited:
+                    q.append(next_id)
+                    visited.add(next_id)
+        if q:
+            self.mid_term_memory.save()
+
+
+def seed_sessions(pages, chain):
+    """Sessions of PAGES_PER_SESSION pages, linked in chains across sessions."""
+    sessions, previous = {}, None
+    for s in range(pages // PAGES_PER_SESSION):
+        sid = f"session_{s}"
+        details = []
+        for p in range(PAGES_PER_SESSION):
+            n = s * PAGES_PER_SESSION + p
+            page = {
+                "page_id": f"page_{n}",
+                "user_input": f"question {n}",
+                "agent_response": f"answer {n}",
+                "timestamp": get_timestamp(),
+                "page_embedding": [],
+                "page_keywords": [],
+                "pre_page": previous["page_id"] if n % chain else None,
+                "next_page": None,
+                "meta_info": f"meta {n // chain}",
+            }
+            if page["pre_page"]:
+                previous["next_page"] = page["page_id"]
+            details.append(page)
+            previous = page
+        sessions[sid] = {
+            "id": sid,
+            "summary": f"summary of session {s}",
+            "summary_keywords": ["topic", f"k{s}"],
+            "summary_embedding": fake_embedding(f"summary {s}").tolist(),
+            "details": details,
+            "L_interaction": len(details),
+            "R_recency": 1.0,
+            "N_visit": 0,
+            "H_segment": 1.0,
+            "timestamp": get_timestamp(),
+            "last_visit_time": get_timestamp(),
+            "access_count_lfu": 0,
+        }
+    return sessions
+
+
+def run(size, calls, chain, legacy, data_dir):
+    rng = random.Random(size)
+    updater.check_conversation_continuity = (
+        lambda prev, page, client, model=None: rng.random() > 1 / chain
+    )
+    mtm_class, updater_class = (
+        (LegacyMidTermMemory, LegacyUpdater) if legacy else (MidTermMemory, Updater)
+    )
+    stm = ShortTermMemory(os.path.join(data_dir, f"stm_{size}_{legacy}.json"), 1)
+    mtm = mtm_class(
+        os.path.join(data_dir, f"mtm_{size}_{legacy}.json"),
+        client=None,
+        max_capacity=size,
+    )
+    mtm.save = lambda: None
+    mtm.sessions = seed_sessions(size, chain)
+    mtm.access_frequency.update({sid: 0 for sid in mtm.sessions})
+    mtm.rebuild_heap()
+    start = time.perf_counter()
+    mtm._reindex_pages()  # What load() now does on top of reading the store
+    index_s = time.perf_counter() - start
+    memory_updater = updater_class(stm, mtm, None, client=None)
+    memory_updater.last_evicted_page_for_continuity = mtm.get_page_by_id(
+        f"page_{size - 1}"
+    )
+
+    latencies = []
+    for i in range(calls):
+        stm.add_qa_pair({"user_input": f"new question {i}", "agent_response": "ok"})
+        start = time.perf_counter()
+        memory_updater.process_short_term_to_mid_term()
+        latencies.append(time.perf_counter() - start)
+    stm.storage.close()
+    return np.median(latencies) * 1000, max(latencies) * 1000, index_s
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--sizes", type=int, nargs="+", default=[5_000, 20_000, 50_000])
+    parser.add_argument("--calls", type=int, default=50)
+    parser.add_argument("--chain", type=int, default=8)
+    args = parser.parse_args()
+
+    mid_term.get_embedding = fake_embedding
+    mid_term.llm_extract_keywords = lambda text, client=None: []
+    updater.generate_page_meta_info = lambda meta, page, client, model=None: "meta"
+    updater.gpt_generate_multi_summary = lambda text, client, model=None: {
+        "summaries": [{"theme": "t", "content": text, "keywords": ["topic"]}]
+    }
+    with tempfile.TemporaryDirectory() as data_dir:
+        for size in args.sizes:
+            for legacy in (True, False):
+                with contextlib.redirect_stdout(io.StringIO()):
+                    median, worst, index_s = run(
+                        size, args.calls, args.chain, legacy, data_dir
+                    )
+                label = "before: page scans" if legacy else "after: page registry"
+                extra = "" if legacy else f" (index built in {index_s * 1000:.0f} ms)"
+                print(
+                    f"pages={size:>6} {label:<22} median {median:8.2f} ms/call, "
+                    f"max {worst:8.2f} ms{extra}"
+                )
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,98 @@
+"""
+Load test: orchestrator agent-task throughput (requests/sec) with a fresh
+pebble ProcessPool per call (old orchestrate()) vs the warm AgentWorkerPool.
+
+In-process mode drives both pools from concurrent client threads with a small
+simulated agent. With --url it instead POSTs /orchestrate requests at a
+running pulse_orchestrator (e.g. before and after deploying the change).
+
+Run with: python tests/benchmark_orchestrator_pool.py [--requests 200] [--clients 8]
+      or: python tests/benchmark_orchestrator_pool.py --url http://127.0.0.1:8000
+"""
+
+import argparse
+import json
+import os
+import time
+import urllib.request
+from concurrent.futures import ThreadPoolExecutor
+
+from pebble import ProcessPool
+
+from guardian.core.orchestrator.worker_pool import AgentWorkerPool
+
+
+def simulated_agent(work_ms):
+    """Stands in for an agent call: a little CPU, a little waiting."""
+    deadline = time.perf_counter() + work_ms / 2000
+    while time.perf_counter() < deadline:
+        pass
+    time.sleep(work_ms / 2000)
+    return {"status": "ok", "pid": os.getpid()}
+
+
+def per_call_pool(work_ms, timeout):
+    with ProcessPool() as pool:
+        return pool.schedule(simulated_agent, args=[work_ms], timeout=timeout).result()
+
+
+def drive(call, requests, clients):
+    start = time.perf_counter()
+    with ThreadPoolExecutor(max_workers=clients) as executor:
+        results = list(executor.map(lambda _: call(), range(requests)))
+    elapsed = time.perf_counter() - start
+    return requests / elapsed, results
+
+
+def http_call(url, command):
+    body = json.dumps(command).encode("utf-8")
+    request = urllib.request.Request(
+        f"{url.rstrip('/')}/orchestrate",
+        data=body,
+        headers={"Content-Type": "application/json"},
+    )
+    try:
+        with urllib.request.urlopen(request, timeout=60) as response:
+            return response.status
+    except urllib.error.HTTPError as e:
+        return e.code
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--requests", type=int, default=200)
+    parser.add_argument("--clients", type=int, default=8)
+    parser.add_argument("--workers", type=int, default=os.cpu_count())
+    parser.add_argument("--work-ms", type=float, default=10.0)
+    parser.add_argument("--url", help="Load-test a running orchestrator instead")
+    parser.add_argument("--action", default="get_health_summary")
+    args = parser.parse_args()
+
+    if args.url:
+        command = {"action": args.action, "params": {}}
+        rps, statuses = drive(lambda: http_call(args.url, command), args.requests, args.clients)
+        counts = {s: statuses.count(s) for s in sorted(set(statuses))}
+        print(f"{args.url}: {rps:8.1f} req/s over {args.requests} requests, statuses {counts}")
+        with urllib.request.urlopen(f"{args.url.rstrip('/')}/health", timeout=10) as r:
+            print(json.dumps(json.load(r).get("worker_pool"), indent=2))
+        return
+
+    print(f"{args.requests} requests, {args.clients} clients, {args.work_ms:.0f} ms simulated agent")
+    before, _ = drive(lambda: per_call_pool(args.work_ms, 30), args.requests, args.clients)
+    print(f"before: ProcessPool per call  {before:8.1f} req/s")
+
+    pool = AgentWorkerPool(size=args.workers, max_queue=args.requests).start()
+    after, results = drive(
+        lambda: pool.run(simulated_agent, args=[args.work_ms], timeout=30),
+        args.requests,
+        args.clients,
+    )
+    metrics = pool.metrics()
+    pool.shutdown()
+    print(f"after: warm AgentWorkerPool   {after:8.1f} req/s")
+    print(f"speedup: {after / before:.1f}x, distinct workers used: {len({r['pid'] for r in results})}")
+    print(f"latency buckets (ms, cumulative): {metrics['task_latency_ms']['buckets']}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,94 @@
+"""
+Benchmark: PatternAnalyzer sequence mining at 1k, 10k and 100k events.
+
+Events are drawn from 8 operation types with a few planted recurring
+workflows, like a busy agent's operation log.
+- before: the original detector (every window re-joined and str.count-ed over
+  the whole log); only run up to --legacy-max events, it is roughly cubic
+- after: mine_sequences (batch, one pass per n-gram length over the n-grams
+  that still repeat) and StreamingSequenceMiner (per-event push/evict over a
+  sliding window)
+
+Run with: python tests/benchmark_pattern_sequences.py [--sizes 1000 10000 100000]
+"""
+
+import argparse
+import random
+import time
+
+from guardian.plugins.pattern_analyzer.sequences import (
+    StreamingSequenceMiner,
+    mine_sequences,
+)
+
+OPS = [f"op{i}" for i in range(8)]
+WORKFLOWS = [
+    ["op0", "op3", "op1", "op7"],
+    ["op2", "op2", "op5", "op6", "op1"],
+    ["op4", "op0", "op3"],
+]
+
+
+def make_events(n, seed=5):
+    rng = random.Random(seed)
+    events = []
+    while len(events) < n:
+        if rng.random() < 0.3:
+            events.extend(rng.choice(WORKFLOWS))
+        else:
+            events.append(rng.choice(OPS))
+    return events[:n]
+
+
+def legacy_windows(events):
+    """The original _find_sequences, on event types instead of memories."""
+    windows = []
+    for i in range(len(events) - 3 + 1):
+        for j in range(i + 3, len(events) + 1):
+            if ",".join(events).count(",".join(events[i:j])) > 1:
+                windows.append((i, j))
+    return windows
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--sizes", type=int, nargs="+", default=[1000, 10000, 100000])
+    parser.add_argument("--legacy-max", type=int, default=1000)
+    parser.add_argument("--max-length", type=int, default=None)
+    parser.add_argument("--window", type=int, default=5000)
+    args = parser.parse_args()
+
+    print(
+        f"{'events':>8} {'before s':>10} {'batch s':>10} {'sequences':>10} "
+        f"{'stream us/event':>16}"
+    )
+    for n in args.sizes:
+        events = make_events(n)
+
+        before = "-"
+        if n <= args.legacy_max:
+            start = time.perf_counter()
+            expected = legacy_windows(events)
+            before = f"{time.perf_counter() - start:10.2f}"
+
+        start = time.perf_counter()
+        found = mine_sequences(events, max_length=args.max_length)
+        batch = time.perf_counter() - start
+        if n <= args.legacy_max:
+            windows = sorted((s, s + seq.length) for seq in found for s in seq.starts)
+            assert windows == expected
+
+        miner = StreamingSequenceMiner(max_length=args.max_length or 10)
+        start = time.perf_counter()
+        for event in events:
+            miner.push(event)
+            if len(miner) > args.window:
+                miner.evict()
+        miner.frequent()
+        stream = (time.perf_counter() - start) / n * 1e6
+
+        print(f"{n:>8} {before:>10} {batch:10.2f} {len(found):>10} {stream:16.1f}")
+
+
+if __name__ == "__main__":
+    main()
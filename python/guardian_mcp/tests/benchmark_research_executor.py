@@ -0,0 +1,132 @@
+"""
+Benchmark: wall-clock time for SearchAgent.run on a 10-subtask plan (five
+url_search steps, each followed by its page_content step).
+
+- before: SearchAgent.run as it was, time.sleep(3) after planning, then every
+  search and its summary one after another
+- after: the plan runs as a DAG on
+  guardian.core.research.Modules.agent.executor.ResearchExecutor, searches
+  and summaries concurrently up to --fan-out, waiting on the "models" rate
+  limit only when it is spent
+
+Search and LLM backends are fakes with fixed latencies (--search, --summary
+seconds per call), so the numbers only reflect scheduling. Also reports when
+the first partial result reached the caller.
+
+Run with: python tests/benchmark_research_executor.py [--fan-out 4] [--rate 0]
+"""
+
+import argparse
+import asyncio
+import json
+import time
+from unittest.mock import patch
+
+from guardian.core.research.Modules.agent.search import SearchAgent
+from guardian.utils.limiter_core import RateLimiter
+
+SEARCH_LATENCY = 0.5
+SUMMARY_LATENCY = 1.5
+
+
+def ten_step_plan():
+    steps = []
+    for i in range(5):
+        steps.append(
+            {"tool": "url_search", "keyword": f"topic {i}", "search_engine": "google"}
+        )
+        steps.append({"tool": "page_content", "keyword": "Previous URLs"})
+    return steps
+
+
+class FakeModel:
+    def completion(self, prompt):
+        return f"```json\n{json.dumps(ten_step_plan())}\n```"
+
+
+class FakeCrawl:
+    async def get_url_llm(self, url, query):
+        await asyncio.sleep(SEARCH_LATENCY)
+        return [{"url": f"https://example.com/{query}/{i}"} for i in range(3)]
+
+    async def get_summary(self, urls, query=None):
+        await asyncio.sleep(SUMMARY_LATENCY)
+        return [{"url": u, "title": u} for u in urls]
+
+
+class LegacySearchAgent:
+    def __init__(self, model, crawl):
+        self.model = model
+        self.crawl = crawl
+
+    def _plan(self, task):
+        response = self.model.completion(task)
+        time.sleep(3)  ## foo foo solution
+        return json.loads(response.split("```json\n")[1].split("\n```")[0])
+
+    async def run(self, task, data):
+        steps = self._plan(task)
+        summary_list = []
+        for next_task in steps:
+            if next_task.get("tool", "") == "url_search":
+                urls = await self.crawl.get_url_llm(
+                    "https://google.com/search?q=" + next_task["keyword"],
+                    next_task["keyword"],
+                )
+                summaries = await self.crawl.get_summary(urls)
+                summary_list.extend(summaries)
+        return {"agent": "planner", "data": summary_list, "task": task}
+
+
+async def timed_stream(agent):
+    start = time.perf_counter()
+    first = None
+    async for message in agent.stream("task", []):
+        if first is None and message.get("partial"):
+            first = time.perf_counter() - start
+        result = message
+    return time.perf_counter() - start, first, len(result["data"])
+
+
+def main():
+    global SEARCH_LATENCY, SUMMARY_LATENCY
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--fan-out", type=int, default=4)
+    parser.add_argument("--search", type=float, default=0.5)
+    parser.add_argument("--summary", type=float, default=1.5)
+    parser.add_argument(
+        "--rate", type=float, default=0, help="model calls/sec (0: no limit)"
+    )
+    args = parser.parse_args()
+    SEARCH_LATENCY, SUMMARY_LATENCY = args.search, args.summary
+
+    print(
+        f"10-subtask plan, {args.search:g} s per search, "
+        f"{args.summary:g} s per summary:"
+    )
+    legacy = LegacySearchAgent(FakeModel(), FakeCrawl())
+    start = time.perf_counter()
+    result = asyncio.run(legacy.run("task", []))
+    elapsed = time.perf_counter() - start
+    print(
+        f"  {'before: serial + sleep(3)':<28} {elapsed:6.2f} s, "
+        f"first result {elapsed:6.2f} s, {len(result['data'])} summaries"
+    )
+
+    for fan_out in sorted({1, args.fan_out}):
+        limiter = RateLimiter()
+        if args.rate:
+            limiter.set_limit("models", rate=args.rate)
+        with patch("guardian.core.research.Modules.agent.search.Crawl") as crawl:
+            crawl.return_value = FakeCrawl()
+            agent = SearchAgent(FakeModel(), fan_out=fan_out, limiter=limiter)
+        elapsed, first, count = asyncio.run(timed_stream(agent))
+        label = f"after: DAG, fan-out {fan_out}"
+        print(
+            f"  {label:<28} {elapsed:6.2f} s, "
+            f"first result {first:6.2f} s, {count} summaries"
+        )
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,105 @@
+"""
+Benchmark: add_memory latency on a thread while its rolling summary is kept
+up to date by a slow LLM.
+
+- before: add_memory called update_rolling_summary inline after every
+  message, one LLM call over the thread's last 40 messages per add
+- after: add_memory calls RollingSummaryScheduler.note_message; a background
+  worker folds the new messages into the previous summary every 10 messages
+  (or after the thread goes idle)
+
+Only the thread part of add_memory is timed (TokenLedger.append plus the
+rolling-summary step); the short-/mid-term work is the same on both sides.
+The LLM is a fake that sleeps --llm-latency seconds per call. After the run
+the after side flushes, so both end with a summary covering every message.
+
+Run with: python tests/benchmark_rolling_summary.py [--adds 300] [--llm-latency 0.2]
+"""
+
+import argparse
+import os
+import statistics
+import tempfile
+import time
+
+from memoryos.summary_scheduler import RollingSummaryScheduler
+from memoryos.token_ledger import TokenLedger
+
+
+class SlowSummaryClient:
+    def __init__(self, latency):
+        self.latency = latency
+        self.calls = 0
+
+    def chat_completion(self, model, messages, temperature=0.7, max_tokens=2000):
+        self.calls += 1
+        time.sleep(self.latency)
+        return f"summary {self.calls}"
+
+
+def legacy_update(ledger, client, thread_id):
+    """update_rolling_summary before the scheduler: last 40 messages, inline."""
+    recent = ledger.messages_since(thread_id, 0, 40)
+    convo_text = "\n".join(
+        f"User: {m['user_input']}\nAssistant: {m['agent_response']}" for m in recent
+    )
+    summary = client.chat_completion(
+        model="fake",
+        messages=[
+            {"role": "system", "content": "You are a rolling summarizer."},
+            {"role": "user", "content": convo_text},
+        ],
+    )
+    ledger.set_rolling_summary(thread_id, summary.strip(), recent[-1]["message_id"])
+
+
+def run(legacy, adds, latency, gap, path):
+    ledger = TokenLedger(path)
+    client = SlowSummaryClient(latency)
+    scheduler = RollingSummaryScheduler(ledger, client, model="fake")
+    latencies = []
+    for i in range(adds):
+        start = time.perf_counter()
+        ledger.append("thread", f"question {i}", f"answer {i} " * 20)
+        if legacy:
+            legacy_update(ledger, client, "thread")
+        else:
+            scheduler.note_message("thread")
+        latencies.append(time.perf_counter() - start)
+        if gap:
+            time.sleep(gap)
+    start = time.perf_counter()
+    scheduler.close(flush=True)
+    flush_s = time.perf_counter() - start
+    ledger.close()
+    return latencies, client.calls, flush_s
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--adds", type=int, default=300)
+    parser.add_argument("--llm-latency", type=float, default=0.2)
+    parser.add_argument("--gap", type=float, default=0.01, help="seconds between adds")
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as data_dir:
+        for legacy in (True, False):
+            latencies, calls, flush_s = run(
+                legacy,
+                args.adds,
+                args.llm_latency,
+                args.gap,
+                os.path.join(data_dir, f"conversations_{legacy}.sqlite"),
+            )
+            ms = sorted(latency * 1000 for latency in latencies)
+            p99 = ms[min(len(ms) - 1, int(len(ms) * 0.99))]
+            label = "before: inline summary" if legacy else "after: scheduler"
+            print(
+                f"adds={args.adds} {label:<23} p50 {statistics.median(ms):8.2f} ms  "
+                f"p99 {p99:8.2f} ms  max {ms[-1]:8.2f} ms  "
+                f"{calls} LLM calls  final flush {flush_s * 1000:.0f} ms"
+            )
+
+
+if __name__ == "__main__":
+    main()
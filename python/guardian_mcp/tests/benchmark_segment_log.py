@@ -0,0 +1,178 @@
+"""
+Benchmark: memory event log append throughput and time-range query latency
+(p50/p99) over 10M events.
+
+- before: JSONLMemoryLogger as it was, the log file opened once per event
+  and every line of every file parsed on each query
+- after: guardian.memory.segment_log.SegmentLog (one buffered writer,
+  64 MiB segments with a sparse block index; queries seek to the blocks in
+  range)
+
+Events are MemoryEvent-shaped dicts with ISO timestamps, 1000 per simulated
+second, and one of eight event types. The legacy logger is measured on a
+prefix of the events, since a query over 10M lines takes about a minute.
+Queries are repeated after compaction with gzip.
+
+Run with: python tests/benchmark_segment_log.py [--events 10000000] [--queries 200]
+"""
+
+import argparse
+import json
+import os
+import random
+import shutil
+import tempfile
+import time
+from datetime import datetime, timedelta
+
+from guardian.memory.segment_log import SegmentLog
+
+START = datetime(2024, 1, 1)
+TYPES = [f"type{i}" for i in range(8)]
+
+
+class LegacyJSONLLogger:
+    def __init__(self, path):
+        self.path = path
+
+    def log_event(self, event):
+        with open(self.path, "a") as f:
+            json.dump(event, f)
+            f.write("\n")
+
+    def query_events(self, event_type=None, start_time=None, end_time=None, limit=100):
+        results = []
+        with open(self.path, "r") as f:
+            for line in f:
+                if len(results) >= limit:
+                    break
+                event = json.loads(line)
+                if event_type and event["event_type"] != event_type:
+                    continue
+                event_time = datetime.fromisoformat(event["timestamp"])
+                if start_time and event_time < start_time:
+                    continue
+                if end_time and event_time > end_time:
+                    continue
+                results.append(event)
+        return results
+
+
+def make_event(i, rng):
+    return {
+        "source": f"agent{i % 16}",
+        "event_type": rng.choice(TYPES),
+        "payload": {"seq": i, "note": "memory event"},
+        "tags": ["bench"],
+        "timestamp": (START + timedelta(milliseconds=i)).isoformat(),
+    }
+
+
+def percentile(samples, pct):
+    ordered = sorted(samples)
+    return ordered[min(len(ordered) - 1, int(len(ordered) * pct / 100))]
+
+
+def latency(query, windows):
+    samples = []
+    for start, end, event_type in windows:
+        t = time.perf_counter()
+        query(start, end, event_type)
+        samples.append((time.perf_counter() - t) * 1000)
+    return percentile(samples, 50), percentile(samples, 99)
+
+
+def make_windows(rng, events, span, count):
+    windows = []
+    for _ in range(count):
+        first = rng.randrange(events)
+        start = START + timedelta(milliseconds=first)
+        event_type = rng.choice([None, rng.choice(TYPES)])
+        windows.append((start, start + span, event_type))
+    return windows
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--events", type=int, default=10_000_000)
+    parser.add_argument("--legacy-events", type=int, default=200_000)
+    parser.add_argument("--queries", type=int, default=200)
+    parser.add_argument("--legacy-queries", type=int, default=10)
+    args = parser.parse_args()
+
+    rng = random.Random(0)
+    tmp = tempfile.mkdtemp()
+    try:
+        legacy = LegacyJSONLLogger(os.path.join(tmp, "memory_202401.jsonl"))
+        t = time.perf_counter()
+        for i in range(args.legacy_events):
+            legacy.log_event(make_event(i, rng))
+        legacy_rate = args.legacy_events / (time.perf_counter() - t)
+
+        log = SegmentLog(os.path.join(tmp, "segments"))
+        t = time.perf_counter()
+        for i in range(args.events):
+            log.append(make_event(i, rng))
+        log.flush()
+        rate = args.events / (time.perf_counter() - t)
+        print("append throughput:")
+        print(f"  {'before: open per event':<28} {legacy_rate:12,.0f} events/s")
+        print(f"  {'after: buffered segments':<28} {rate:12,.0f} events/s")
+        stats = log.stats()
+        print(
+            f"  {stats['events']:,} events in {stats['segments']} segments, "
+            f"{stats['bytes'] / 2**20:,.0f} MiB"
+        )
+
+        spans = {"1 s": timedelta(seconds=1), "1 min": timedelta(minutes=1)}
+        windows = {
+            label: make_windows(rng, args.events, span, args.queries)
+            for label, span in spans.items()
+        }
+
+        def query(start, end, event_type):
+            return log.query(
+                start, end, [event_type] if event_type else None, limit=100
+            )
+
+        for label, span in spans.items():
+            print(f"query latency, {label} window, limit 100:")
+            legacy_windows = make_windows(
+                rng, args.legacy_events, span, args.legacy_queries
+            )
+            p50, p99 = latency(
+                lambda s, e, k: legacy.query_events(k, s, e), legacy_windows
+            )
+            print(
+                f"  {'before: ' + format(args.legacy_events, ',') + ' events':<28}"
+                f" p50 {p50:9.2f} ms   p99 {p99:9.2f} ms"
+            )
+            p50, p99 = latency(query, windows[label])
+            print(
+                f"  {'after: ' + format(args.events, ',') + ' events':<28}"
+                f" p50 {p50:9.2f} ms   p99 {p99:9.2f} ms"
+            )
+
+        log.seal()
+        log.compression = "gzip"
+        t = time.perf_counter()
+        log.compact()
+        elapsed = time.perf_counter() - t
+        stats = log.stats()
+        print(
+            f"compacted with gzip in {elapsed:.0f} s, "
+            f"{stats['bytes'] / 2**20:,.0f} MiB; query latency, limit 100:"
+        )
+        for label in spans:
+            p50, p99 = latency(query, windows[label])
+            print(
+                f"  {'after: ' + label + ' window':<28}"
+                f" p50 {p50:9.2f} ms   p99 {p99:9.2f} ms"
+            )
+        log.close()
+    finally:
+        shutil.rmtree(tmp)
+
+
+if __name__ == "__main__":
+    main()
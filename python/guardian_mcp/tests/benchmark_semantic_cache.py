@@ -0,0 +1,155 @@
+"""
+Benchmark: semantic cache lookup latency at 50k entries, and hit rate on a
+replayed prompt log.
+
+- before: the global list semantic_cache used to scan, bag-of-words cosine
+  against every stored entry per lookup, never evicted
+- after: guardian.semantic_cache.SemanticCache (hashed term vectors in an
+  inverted index, LRU capacity and TTL bounds)
+
+The prompt log is synthetic: intents of four to eight content words drawn
+from a Zipf-like vocabulary, each replayed as paraphrases (filler words
+reshuffled, a content word sometimes dropped). A hit is "correct" when it
+returns the answer stored for the same intent.
+
+Run with: python tests/benchmark_semantic_cache.py [--entries 50000] [--log 20000]
+"""
+
+import argparse
+import math
+import random
+import time
+
+from guardian.semantic_cache import SemanticCache
+
+FILLERS = "how do i can you please the a my to for with what is".split()
+VOCAB = [
+    f"{a}{b}"
+    for a in "bcdfghjklmnpqrstvwz"
+    for b in ("ash", "elt", "ir", "ov", "unk", "ax", "ome", "ide")
+]
+VOCAB = [
+    f"{w}{s}"
+    for w in VOCAB
+    for s in ("", "er", "ing", "ly", "ment", "ness", "ist", "ful")
+]
+
+
+class LegacySemanticCache:
+    def __init__(self):
+        self.store_list = []
+
+    @staticmethod
+    def embed(text):
+        words = [w.lower() for w in text.split() if w.isalpha()]
+        counts = {}
+        for w in words:
+            counts[w] = counts.get(w, 0) + 1
+        norm = math.sqrt(sum(v * v for v in counts.values())) or 1.0
+        return {w: c / norm for w, c in counts.items()}
+
+    def lookup(self, query, threshold=0.8):
+        q_vec = self.embed(query)
+        best_score, best_result = 0.0, None
+        for vec, result in self.store_list:
+            score = sum(q_vec.get(k, 0.0) * v for k, v in vec.items())
+            if score > best_score:
+                best_score, best_result = score, result
+        return best_result if best_score >= threshold else None
+
+    def store(self, query, result):
+        self.store_list.append((self.embed(query), result))
+
+
+# Zipf-like word frequencies: a few common words, a long tail of rare ones
+WORD_WEIGHTS = [1 / (rank + 10) for rank in range(len(VOCAB))]
+
+
+def make_intent(rng):
+    return rng.choices(VOCAB, WORD_WEIGHTS, k=rng.randint(4, 8))
+
+
+def paraphrase(rng, intent):
+    words = list(intent)
+    if len(words) > 3 and rng.random() < 0.3:
+        words.pop(rng.randrange(len(words)))
+    words += rng.sample(FILLERS, rng.randint(1, 3))
+    rng.shuffle(words)
+    return " ".join(words)
+
+
+def percentile(samples, pct):
+    ordered = sorted(samples)
+    return ordered[min(len(ordered) - 1, int(len(ordered) * pct / 100))]
+
+
+def latency(cache, queries):
+    samples = []
+    for query in queries:
+        start = time.perf_counter()
+        cache.lookup(query)
+        samples.append((time.perf_counter() - start) * 1000)
+    return percentile(samples, 50), percentile(samples, 99)
+
+
+def replay(cache, log):
+    hits = correct = 0
+    for intent_id, prompt in log:
+        result = cache.lookup(prompt)
+        if result is None:
+            cache.store(prompt, intent_id)
+        else:
+            hits += 1
+            correct += result == intent_id
+    return hits / len(log), correct / max(hits, 1)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--entries", type=int, default=50_000)
+    parser.add_argument("--lookups", type=int, default=500)
+    parser.add_argument("--legacy-lookups", type=int, default=30)
+    parser.add_argument("--log", type=int, default=20_000)
+    parser.add_argument("--intents", type=int, default=4000)
+    args = parser.parse_args()
+
+    rng = random.Random(0)
+    filled = [paraphrase(rng, make_intent(rng)) for _ in range(args.entries)]
+    queries = [paraphrase(rng, make_intent(rng)) for _ in range(args.lookups)]
+
+    legacy = LegacySemanticCache()
+    cache = SemanticCache(max_entries=args.entries)
+    for i, prompt in enumerate(filled):
+        legacy.store(prompt, i)
+        cache.store(prompt, i)
+    print(f"lookup latency at {args.entries} entries:")
+    for label, c, qs in (
+        ("before: linear scan", legacy, queries[: args.legacy_lookups]),
+        ("after: indexed", cache, queries),
+    ):
+        p50, p99 = latency(c, qs)
+        print(f"  {label:<20} p50 {p50:9.3f} ms   p99 {p99:9.3f} ms")
+
+    intents = [make_intent(rng) for _ in range(args.intents)]
+    popularity = [1 / (rank + 1) for rank in range(args.intents)]
+    log = [
+        (intent_id, paraphrase(rng, intents[intent_id]))
+        for intent_id in rng.choices(range(args.intents), popularity, k=args.log)
+    ]
+    print(f"replayed log of {args.log} prompts over {args.intents} intents:")
+    for label, c in (
+        ("before: unbounded", LegacySemanticCache()),
+        ("after: max 10k", SemanticCache(max_entries=10_000)),
+        ("after: max 2k", SemanticCache(max_entries=2_000)),
+    ):
+        start = time.perf_counter()
+        hit_rate, precision = replay(c, log)
+        elapsed = time.perf_counter() - start
+        print(
+            f"  {label:<20} hit rate {hit_rate:6.1%}   correct hits {precision:6.1%}"
+            f"   {elapsed:6.1f} s"
+        )
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,100 @@
+"""
+Benchmark: appending 20k messages to a single thread and checking the
+auto-branch threshold after each one.
+
+- before: add_memory re-tokenized every message of every conversation in the
+  thread on each add, so the check after message n tokenizes 2n texts
+- after: TokenLedger.append counts the new message once (content-hash cached)
+  and returns the conversation's running total from SQLite
+
+Both sides use the same TokenCounter tokenizer (tiktoken when installed), with
+the legacy side calling it uncached the way client.tokenize was called. The
+branch threshold is set out of reach so the thread stays one conversation.
+The legacy side runs --legacy-messages appends and the rest of the curve is
+extrapolated, since the per-add cost grows linearly with thread size.
+
+Run with: python tests/benchmark_token_ledger.py [--messages 20000]
+"""
+
+import argparse
+import os
+import random
+import tempfile
+import time
+
+from memoryos.token_ledger import TokenCounter, TokenLedger, approximate_token_count
+
+WORDS = (
+    "memory thread token branch summary python index vector cache session "
+    "latency question answer context window budget"
+).split()
+
+
+def make_messages(count, rng):
+    return [
+        (
+            " ".join(rng.choices(WORDS, k=rng.randint(8, 40))),
+            " ".join(rng.choices(WORDS, k=rng.randint(40, 200))),
+        )
+        for _ in range(count)
+    ]
+
+
+def run_legacy(messages, counter):
+    """The old per-add loop over the whole thread, uncached."""
+    if counter.exact:
+        tokenize = lambda text: len(counter._encode(text, disallowed_special=()))
+    else:
+        tokenize = approximate_token_count
+    thread = []
+    start = time.perf_counter()
+    for user_input, agent_response in messages:
+        thread.append({"user_input": user_input, "agent_response": agent_response})
+        token_count = 0
+        for msg in thread:
+            token_count += tokenize(msg["user_input"])
+            token_count += tokenize(msg["agent_response"])
+        assert token_count < 10**12
+    return time.perf_counter() - start
+
+
+def run_ledger(messages, path):
+    ledger = TokenLedger(path)
+    start = time.perf_counter()
+    for user_input, agent_response in messages:
+        _, total = ledger.append("thread", user_input, agent_response)
+        assert total < 10**12
+    elapsed = time.perf_counter() - start
+    ledger.close()
+    return elapsed
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--messages", type=int, default=20_000)
+    parser.add_argument("--legacy-messages", type=int, default=1_000)
+    args = parser.parse_args()
+
+    messages = make_messages(args.messages, random.Random(0))
+    counter = TokenCounter()
+    tokenizer = "tiktoken" if counter.exact else "approximate"
+
+    legacy_n = min(args.legacy_messages, args.messages)
+    legacy_s = run_legacy(messages[:legacy_n], counter)
+    # Cost is quadratic in thread length: scale by (N / n)^2
+    legacy_total = legacy_s * (args.messages / legacy_n) ** 2
+    with tempfile.TemporaryDirectory() as data_dir:
+        ledger_s = run_ledger(messages, os.path.join(data_dir, "conversations.sqlite"))
+
+    print(
+        f"messages={args.messages} tokenizer={tokenizer}\n"
+        f"before: recount thread per add  {legacy_total:10.2f} s total "
+        f"(measured {legacy_n} adds: {legacy_s:.2f} s), "
+        f"last add ~{legacy_total * 2 / args.messages * 1000:.2f} ms\n"
+        f"after:  TokenLedger.append      {ledger_s:10.2f} s total, "
+        f"{ledger_s / args.messages * 1e6:.1f} us/add"
+    )
+
+
+if __name__ == "__main__":
+    main()
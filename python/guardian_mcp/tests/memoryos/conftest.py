@@ -0,0 +1,36 @@
+import numpy as np
+import pytest
+
+from memoryos.mid_term import MidTermMemory
+
+DIM = 16
+
+
+def _vector_for(text: str) -> np.ndarray:
+    """Deterministic pseudo-random unit vector per text."""
+    rng = np.random.default_rng(abs(hash(text)) % (2**32))
+    vec = rng.standard_normal(DIM).astype(np.float32)
+    return vec / np.linalg.norm(vec)
+
+
+@pytest.fixture
+def vector_for():
+    """The stand-in for get_embedding that mtm_factory installs."""
+    return _vector_for
+
+
+@pytest.fixture
+def mtm_factory(tmp_path, monkeypatch):
+    """Builds MidTermMemory instances on one file path with embeddings/LLM mocked out."""
+    monkeypatch.setattr("memoryos.mid_term.get_embedding", _vector_for)
+    # Inserts extract keywords locally without a client; search_sessions
+    # still asks the LLM for the query's keywords
+    monkeypatch.setattr(
+        "memoryos.mid_term.llm_extract_keywords", lambda text, client=None: []
+    )
+    db_path = str(tmp_path / "mid_term.json")
+
+    def make(client=None, **kwargs):
+        return MidTermMemory(file_path=db_path, client=client, **kwargs)
+
+    return make
@@ -0,0 +1,113 @@
+"""
+Local OpenAI-compatible HTTP stub for exercising LLM clients without network.
+
+    with FakeOpenAIServer(latency=0.05) as server:
+        client = AsyncLLMClient(api_key="test", base_url=server.base_url)
+"""
+
+import json
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+
+def default_responder(payload):
+    """Echoes a short, deterministic answer derived from the last message."""
+    last = payload["messages"][-1]["content"]
+    return f"echo: {last[:40]}"
+
+
+class FakeOpenAIServer:
+    def __init__(self, responder=default_responder, latency=0.0, fail_first=0):
+        self.responder = responder
+        self.latency = latency  # Seconds slept per request
+        self.fail_first = fail_first  # Leading requests answered with HTTP 500
+        self.requests = []
+        self.in_flight = 0
+        self.max_in_flight = 0
+        self._lock = threading.Lock()
+        self._server = None
+        self._thread = None
+
+    @property
+    def base_url(self):
+        host, port = self._server.server_address[:2]
+        return f"http://{host}:{port}/v1"
+
+    def _handler(self):
+        stub = self
+
+        class Handler(BaseHTTPRequestHandler):
+            def log_message(self, *args):
+                pass
+
+            def do_POST(self):
+                length = int(self.headers.get("Content-Length", 0))
+                payload = json.loads(self.rfile.read(length) or b"{}")
+                with stub._lock:
+                    stub.requests.append(payload)
+                    stub.in_flight += 1
+                    stub.max_in_flight = max(stub.max_in_flight, stub.in_flight)
+                    fail = stub.fail_first > 0
+                    if fail:
+                        stub.fail_first -= 1
+                try:
+                    time.sleep(stub.latency)
+                    if fail:
+                        body = {"error": {"message": "stub failure", "type": "server_error"}}
+                        self._send(500, body)
+                        return
+                    content = stub.responder(payload)
+                    self._send(
+                        200,
+                        {
+                            "id": f"chatcmpl-{len(stub.requests)}",
+                            "object": "chat.completion",
+                            "created": int(time.time()),
+                            "model": payload.get("model", "fake"),
+                            "choices": [
+                                {
+                                    "index": 0,
+                                    "message": {"role": "assistant", "content": content},
+                                    "finish_reason": "stop",
+                                }
+                            ],
+                            "usage": {
+                                "prompt_tokens": 0,
+                                "completion_tokens": 0,
+                                "total_tokens": 0,
+                            },
+                        },
+                    )
+                finally:
+                    with stub._lock:
+                        stub.in_flight -= 1
+
+            def _send(self, status, body):
+                data = json.dumps(body).encode("utf-8")
+                self.send_response(status)
+                self.send_header("Content-Type", "application/json")
+                self.send_header("Content-Length", str(len(data)))
+                self.end_headers()
+                self.wfile.write(data)
+
+        return Handler
+
+    def start(self):
+        self._server = ThreadingHTTPServer(("127.0.0.1", 0), self._handler())
+        self._server.daemon_threads = True
+        self._thread = threading.Thread(target=self._server.serve_forever, daemon=True)
+        self._thread.start()
+        return self
+
+    def stop(self):
+        if self._server is not None:
+            self._server.shutdown()
+            self._server.server_close()
+            self._server = None
+
+    def __enter__(self):
+        return self.start()
+
+    def __exit__(self, *exc):
+        self.stop()
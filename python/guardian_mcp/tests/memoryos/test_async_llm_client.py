@@ -0,0 +1,144 @@
+import asyncio
+import time
+
+import pytest
+
+from fake_openai_server import FakeOpenAIServer
+from memoryos.llm_client import LLM_ERROR_RESPONSE, AsyncLLMClient
+
+MESSAGES = [{"role": "user", "content": "hello"}]
+
+
+@pytest.fixture
+def server():
+    with FakeOpenAIServer() as stub:
+        yield stub
+
+
+def make_client(server, **kwargs):
+    kwargs.setdefault("backoff_base", 0.01)
+    return AsyncLLMClient(api_key="test", base_url=server.base_url, **kwargs)
+
+
+def test_gather_preserves_order_and_bounds_concurrency(server):
+    server.latency = 0.05
+    client = make_client(server, max_concurrency=4)
+    requests = [
+        {"model": "m", "messages": [{"role": "user", "content": f"q{i}"}]}
+        for i in range(12)
+    ]
+
+    start = time.perf_counter()
+    results = client.gather_sync(requests)
+    elapsed = time.perf_counter() - start
+    client.close()
+
+    assert results == [f"echo: q{i}" for i in range(12)]
+    assert server.max_in_flight <= 4
+    assert elapsed < 12 * 0.05  # Faster than running them one by one
+
+
+def test_retries_transient_failures(server):
+    server.fail_first = 2
+    client = make_client(server, max_retries=3)
+
+    result = client.run(client.chat_completion("m", MESSAGES))
+    client.close()
+
+    assert result == "echo: hello"
+    assert client.stats["retries"] == 2
+
+
+def test_deadline_returns_error_response(server):
+    server.latency = 0.5
+    client = make_client(server, max_retries=5)
+
+    start = time.perf_counter()
+    result = client.run(client.chat_completion("m", MESSAGES, timeout=0.1))
+    client.close()
+
+    assert result == LLM_ERROR_RESPONSE
+    assert time.perf_counter() - start < 0.45
+
+
+def test_temperature_zero_responses_are_cached(server, tmp_path):
+    cache_path = str(tmp_path / "llm_cache.sqlite")
+    client = make_client(server, cache_path=cache_path)
+    first = client.run(client.chat_completion("m", MESSAGES, temperature=0.0))
+    client.close()
+
+    # A fresh client on the same cache never reaches the server
+    again = make_client(server, cache_path=cache_path)
+    second = again.run(again.chat_completion("m", MESSAGES, temperature=0.0))
+    again.run(again.chat_completion("m", MESSAGES, temperature=0.7))
+    again.close()
+
+    assert first == second
+    assert again.stats["cache_hits"] == 1
+    assert len(server.requests) == 2  # One cold temp-0 call, one uncached temp-0.7 call
+
+
+def test_awaitable_from_another_event_loop(server):
+    client = make_client(server)
+
+    async def caller():
+        return await client.gather(
+            [{"model": "m", "messages": MESSAGES}, {"model": "m", "messages": MESSAGES}]
+        )
+
+    assert asyncio.run(caller()) == ["echo: hello", "echo: hello"]
+    client.close()
+
+
+def _updater_responder(payload):
+    system = payload["messages"][0]["content"].lower()
+    if payload.get("max_tokens") == 10:  # Continuity check
+        # Odd pages continue the previous topic, even pages start a new chain
+        current = payload["messages"][-1]["content"].split("Current Page:")[1]
+        return "true" if "odd" in current else "false"
+    if "meta-summary" in system:
+        return "meta"
+    return "[]"
+
+
+def test_updater_issues_page_calls_concurrently(tmp_path, monkeypatch):
+    from memoryos.mid_term import MidTermMemory
+    from memoryos.short_term import ShortTermMemory
+    from memoryos.updater import Updater
+    from memoryos.utils import OpenAIClient
+
+    monkeypatch.setattr(
+        "memoryos.mid_term.get_embedding", lambda text: [1.0, 0.0, 0.0]
+    )
+    monkeypatch.setattr(
+        "memoryos.mid_term.llm_extract_keywords", lambda text, client=None: []
+    )
+    monkeypatch.setattr(
+        "memoryos.updater.llm_extract_keywords", lambda text, client, model=None: []
+    )
+
+    with FakeOpenAIServer(responder=_updater_responder, latency=0.02) as stub:
+        stm = ShortTermMemory(str(tmp_path / "short.json"), max_capacity=10)
+        for i in range(10):
+            label = "even" if i % 2 == 0 else "odd"
+            stm.add_qa_pair({"user_input": f"{label} {i}", "agent_response": "ok"})
+        stm.max_capacity = 1  # Evict the whole batch in one pass
+        client = OpenAIClient(api_key="test", base_url=stub.base_url)
+        updater = Updater(
+            short_term_memory=stm,
+            mid_term_memory=MidTermMemory(str(tmp_path / "mid.json"), client=client),
+            long_term_memory=None,
+            client=client,
+            async_client=make_client(stub),
+        )
+        updater.process_short_term_to_mid_term()
+        updater.async_client.close()
+
+        assert stub.max_in_flight > 1
+        pages = [
+            p
+            for session in updater.mid_term_memory.sessions.values()
+            for p in session["details"]
+        ]
+        assert len(pages) == 10
+        assert all(p["meta_info"] == "meta" for p in pages)
@@ -0,0 +1,145 @@
+import json
+import random
+
+import numpy as np
+import pytest
+
+from memoryos.keywords import rake_keywords
+from memoryos.session_matcher import SessionMatcher
+from memoryos.utils import llm_extract_keywords_batch, parse_keyword_batch
+
+TOPICS = ["python", "cooking", "travel", "music", "garden", "chess"]
+
+
+class FakeKeywordClient:
+    """Answers batch keyword prompts with the first two words of every text."""
+
+    def __init__(self, reply=None):
+        self.calls = []
+        self.reply = reply
+
+    def chat_completion(self, model, messages, temperature=0.7, max_tokens=2000):
+        self.calls.append(messages)
+        if self.reply is not None:
+            return self.reply
+        lines = messages[1]["content"].split("\n")
+        texts = [line.split("] ", 1)[1] for line in lines if line.startswith("[")]
+        return json.dumps({"keywords": [text.split()[:2] for text in texts]})
+
+
+def _legacy_best(mtm, summary_vec, keywords, alpha=1.0):
+    """The per-session loop insert_pages_into_session used to run."""
+    best_sid, best_score = None, -1
+    for sid, session in mtm.sessions.items():
+        semantic = float(
+            np.dot(np.array(session["summary_embedding"], dtype=np.float32), summary_vec)
+        )
+        existing, new = set(session.get("summary_keywords", [])), set(keywords)
+        jaccard = len(existing & new) / len(existing | new) if existing and new else 0
+        if semantic + alpha * jaccard > best_score:
+            best_sid, best_score = sid, semantic + alpha * jaccard
+    return best_sid, best_score
+
+
+def test_rake_keywords_skips_stopwords_and_speaker_labels():
+    text = (
+        "User: How do I tune the garbage collector in Python? Assistant: The garbage "
+        "collector in Python can be tuned with gc thresholds."
+    )
+    keywords = rake_keywords(text)
+    assert "garbage collector" in keywords
+    assert len(keywords) <= 5
+    words = {word for keyword in keywords for word in keyword.split()}
+    assert not {"user", "assistant", "the", "in"} & words
+    assert rake_keywords("") == []
+
+
+def test_batch_extraction_uses_one_call_per_chunk_and_falls_back_locally():
+    texts = [f"topic{i} words about chess openings" for i in range(120)]
+    client = FakeKeywordClient()
+    keywords = llm_extract_keywords_batch(texts, client)
+    assert len(client.calls) == 3  # 50 + 50 + 20
+    assert keywords[7] == ["topic7", "words"]
+
+    broken = FakeKeywordClient(reply="Error: Could not get response from LLM.")
+    assert llm_extract_keywords_batch(texts[:2], broken) == [
+        rake_keywords(t) for t in texts[:2]
+    ]
+    assert llm_extract_keywords_batch(texts[:2], None) == [
+        rake_keywords(t) for t in texts[:2]
+    ]
+    partial = '```json\n{"keywords": [["a", "b"]]}\n```'
+    assert parse_keyword_batch(partial, 2) == [["a", "b"], None]
+
+
+def test_matcher_scores_match_the_per_session_formula(vector_for):
+    rng = random.Random(5)
+    matcher, sessions = SessionMatcher(), {}
+    for i in range(700):
+        sid = f"s{i}"
+        sessions[sid] = {
+            "summary_embedding": vector_for(sid).tolist(),
+            "summary_keywords": rng.sample(TOPICS, rng.randint(0, 3)),
+        }
+        matcher.upsert(
+            sid, sessions[sid]["summary_embedding"], sessions[sid]["summary_keywords"]
+        )
+        if rng.random() < 0.45:  # Enough removals to compact at least once
+            gone = rng.choice(list(sessions))
+            del sessions[gone]
+            matcher.remove(gone)
+
+    queries = [vector_for(f"q{i}") for i in range(4)]
+    query_keywords = [rng.sample(TOPICS, 2) for _ in queries]
+    sids, scores = matcher.scores(np.stack(queries), query_keywords, 0.5)
+    live = [sid for sid in sids if sid is not None]
+    assert live == list(sessions)
+    for q, (vec, keywords) in enumerate(zip(queries, query_keywords)):
+        for col, sid in enumerate(sids):
+            if sid is None:
+                assert scores[q, col] == -np.inf
+                continue
+            session = sessions[sid]
+            existing = set(session["summary_keywords"])
+            jaccard = (
+                len(existing & set(keywords)) / len(existing | set(keywords))
+                if existing
+                else 0
+            )
+            expected = np.dot(session["summary_embedding"], vec) + 0.5 * jaccard
+            assert scores[q, col] == pytest.approx(expected, abs=1e-5)
+
+
+def test_insert_picks_the_session_the_legacy_loop_picked(mtm_factory, vector_for):
+    rng = random.Random(11)
+    mtm = mtm_factory(max_capacity=40)
+    for i in range(120):
+        summary = f"summary {rng.randrange(60)}"
+        keywords = rng.sample(TOPICS, 2)
+        pages = [{"page_id": f"p{i}", "user_input": f"q{i}", "agent_response": "a"}]
+        expected_sid, expected_score = _legacy_best(mtm, vector_for(summary), keywords)
+        sid = mtm.insert_pages_into_session(summary, keywords, pages, 0.3)
+        if expected_sid is not None and expected_score >= 0.3:
+            assert sid == expected_sid
+        else:
+            assert sid not in (None, expected_sid)
+
+
+def test_batches_share_one_keyword_call_and_see_earlier_new_sessions(mtm_factory):
+    client = FakeKeywordClient()
+    mtm = mtm_factory(client=client)
+    pages = [
+        {"page_id": f"p{i}", "user_input": f"question {i}", "agent_response": "answer"}
+        for i in range(5)
+    ]
+    session_ids = mtm.insert_page_batches(
+        [("travel plans", ["travel"], pages), ("travel plans", ["travel"], pages)],
+        similarity_threshold=0.9,
+    )
+    assert len(client.calls) == 1
+    # The second theme merges into the session the first one created
+    assert session_ids[0] == session_ids[1]
+    session = mtm.sessions[session_ids[0]]
+    assert [p["page_id"] for p in session["details"]] == [f"p{i}" for i in range(5)] * 2
+    assert session["details"][0]["page_keywords"] == ["User:", "question"]
+    assert session["summary_keywords"] == ["travel", "plans"]
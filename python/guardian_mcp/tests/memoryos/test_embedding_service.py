@@ -0,0 +1,105 @@
+import pytest
+import numpy as np
+
+from memoryos.embedders.embedding_service import EmbeddingService
+
+
+class FakeModel:
+    """Stands in for SentenceTransformer and records every encode call."""
+
+    def __init__(self, dim=8):
+        self.dim = dim
+        self.calls = []
+
+    def encode(self, texts, batch_size=32, convert_to_numpy=True):
+        self.calls.append(list(texts))
+        return np.array(
+            [np.full(self.dim, float(len(t)), dtype=np.float32) for t in texts]
+        )
+
+
+class FakeEmbedder:
+    model_name = "fake-model"
+
+    def __init__(self):
+        self.model = FakeModel()
+
+
+@pytest.fixture
+def embedder():
+    return FakeEmbedder()
+
+
+def test_batch_deduplicates_within_call(embedder):
+    service = EmbeddingService(embedder=embedder)
+    vecs = service.embed_batch(["a", "bb", "a", "bb", "ccc"])
+
+    assert embedder.model.calls == [["a", "bb", "ccc"]]
+    assert [v[0] for v in vecs] == [1.0, 2.0, 1.0, 2.0, 3.0]
+
+
+def test_repeat_calls_hit_memo(embedder):
+    service = EmbeddingService(embedder=embedder)
+    service.embed_batch(["hello", "world"])
+    service.embed_batch(["hello", "new"])
+
+    assert embedder.model.calls == [["hello", "world"], ["new"]]
+    assert service.stats["encoded"] == 3
+
+
+def test_disk_cache_survives_restart(embedder, tmp_path):
+    cache_path = str(tmp_path / "embeddings.sqlite")
+    EmbeddingService(embedder=embedder, cache_path=cache_path).embed_batch(["persist"])
+
+    fresh = FakeEmbedder()
+    service = EmbeddingService(embedder=fresh, cache_path=cache_path)
+    vec = service.embed("persist")
+
+    assert fresh.model.calls == []
+    assert service.stats["disk_hits"] == 1
+    assert np.allclose(vec, np.full(8, 7.0))
+
+
+def test_cache_is_keyed_by_model(embedder, tmp_path):
+    cache_path = str(tmp_path / "embeddings.sqlite")
+    EmbeddingService(embedder=embedder, cache_path=cache_path).embed("text")
+
+    other = FakeEmbedder()
+    EmbeddingService(
+        embedder=other, model_name="other-model", cache_path=cache_path
+    ).embed("text")
+    assert other.model.calls == [["text"]]
+
+
+def test_memory_tiers_use_injected_service(embedder, tmp_path, monkeypatch):
+    from memoryos.long_term import LongTermMemory
+    from memoryos.mid_term import MidTermMemory
+
+    def fail(text):
+        raise AssertionError("get_embedding should not be called")
+
+    monkeypatch.setattr("memoryos.mid_term.get_embedding", fail)
+    monkeypatch.setattr("memoryos.long_term.get_embedding", fail)
+    monkeypatch.setattr(
+        "memoryos.mid_term.llm_extract_keywords", lambda text, client=None: []
+    )
+    service = EmbeddingService(embedder=embedder)
+
+    mtm = MidTermMemory(
+        file_path=str(tmp_path / "mid.json"), client=None, embedding_service=service
+    )
+    pages = [{"user_input": f"q{i}", "agent_response": "a"} for i in range(5)]
+    mtm.add_session("summary", pages)
+    # Summary and all five pages go to the encoder in a single call
+    assert len(embedder.model.calls) == 1
+    assert len(embedder.model.calls[0]) == 6
+
+    ltm = LongTermMemory(
+        file_path=str(tmp_path / "ltm.json"), embedding_service=service
+    )
+    ltm.add_user_knowledge_batch(["fact one", "none", "fact two"])
+    assert [k["knowledge"] for k in ltm.get_user_knowledge()] == [
+        "fact one",
+        "fact two",
+    ]
+    assert ltm.search_user_knowledge("fact one", top_k=1)
@@ -0,0 +1,117 @@
+import math
+import random
+import time
+
+import pytest
+
+from memoryos.heat_queue import IndexedHeap, SessionHeatQueue
+
+HOUR = 3600.0
+
+
+def _timestamp(epoch):
+    return time.strftime("%Y-%m-%d %H:%M:%S", time.localtime(epoch))
+
+
+def _live_heat(session, now, tau_hours=24):
+    recency = math.exp(-(now - session["epoch"]) / (tau_hours * HOUR))
+    return session["N_visit"] + session["L_interaction"] + recency
+
+
+@pytest.mark.parametrize("seed", range(5))
+def test_indexed_heap_matches_sorted_order(seed):
+    rng = random.Random(seed)
+    heap, keys = IndexedHeap(), {}
+    for _ in range(2000):
+        op = rng.random()
+        item = rng.randrange(200)
+        if op < 0.6:
+            keys[item] = rng.randrange(50)
+            heap.set(item, keys[item])
+        elif op < 0.8 and keys:
+            assert heap.remove(item) == (keys.pop(item, None) is not None)
+        elif keys:
+            expected = min((k, i) for i, k in keys.items())
+            assert heap.pop() == expected
+            del keys[expected[1]]
+        assert len(heap) == len(keys)
+    assert [heap.pop() for _ in range(len(keys))] == sorted(
+        (k, i) for i, k in keys.items()
+    )
+
+
+@pytest.mark.parametrize("seed", range(5))
+def test_lfu_eviction_order_matches_min_over_access_frequency(seed):
+    rng = random.Random(seed)
+    queue, access_frequency, next_id = SessionHeatQueue(), {}, 0
+    for _ in range(3000):
+        op = rng.random()
+        if op < 0.3:
+            sid = f"session_{next_id}"
+            next_id += 1
+            access_frequency[sid] = 0
+            queue.update_frequency(sid, 0)
+        elif op < 0.8 and access_frequency:
+            sid = rng.choice(list(access_frequency))
+            access_frequency[sid] += 1
+            queue.update_frequency(sid, access_frequency[sid])
+        elif access_frequency:
+            expected = min(access_frequency, key=access_frequency.get)
+            assert queue.pop_lfu() == expected
+            del access_frequency[expected]
+
+    rebuilt = SessionHeatQueue()
+    rebuilt.rebuild({}, access_frequency)
+    while access_frequency:
+        expected = min(access_frequency, key=access_frequency.get)
+        assert queue.pop_lfu() == expected
+        assert rebuilt.pop_lfu() == expected
+        del access_frequency[expected]
+
+
+@pytest.mark.parametrize("seed", range(5))
+def test_hottest_matches_a_full_scan_of_decayed_heat(seed):
+    rng = random.Random(seed)
+    start = time.time()
+    now = start
+    queue, sessions = SessionHeatQueue(), {}
+    for step in range(1500):
+        now += rng.uniform(0, HOUR)
+        sid = f"session_{rng.randrange(60)}"
+        session = sessions.setdefault(sid, {"N_visit": 0, "L_interaction": 1})
+        session["N_visit"] += rng.randrange(0, 2)
+        session["epoch"] = float(int(now))  # get_timestamp() has 1 s resolution
+        session["last_visit_time"] = _timestamp(session["epoch"])
+        # H_segment as compute_segment_heat stores it at update time
+        session["H_segment"] = _live_heat(session, session["epoch"])
+        queue.update_heat(sid, session)
+
+        if step % 10 == 0:
+            sid, heat = queue.hottest(now)
+            best = max(_live_heat(s, now) for s in sessions.values())
+            assert heat == pytest.approx(best)
+            assert _live_heat(sessions[sid], now) == pytest.approx(best)
+
+
+def test_mid_term_evicts_like_min_over_access_frequency(mtm_factory):
+    rng = random.Random(3)
+    mtm = mtm_factory(max_capacity=15)
+    for i in range(60):
+        before = dict(mtm.access_frequency)
+        sid = mtm.add_session(
+            f"summary {i}", [{"user_input": f"q{i}", "agent_response": "a"}]
+        )
+        before[sid] = 0
+        if len(before) > mtm.max_capacity:
+            evicted = min(before, key=before.get)
+            del before[evicted]
+        assert dict(mtm.access_frequency) == before
+        assert set(mtm.sessions) == set(before)
+        if rng.random() < 0.5:
+            mtm.search_sessions(f"summary {rng.randrange(i + 1)}", -1.0, -1.0, 3)
+
+    reloaded = mtm_factory(max_capacity=15)
+    assert reloaded.heap == mtm.heap
+    lfu_sid = reloaded.heat_queue.peek_lfu()
+    assert reloaded.access_frequency[lfu_sid] == min(mtm.access_frequency.values())
+    assert reloaded.hottest_session()[0] == mtm.hottest_session()[0]
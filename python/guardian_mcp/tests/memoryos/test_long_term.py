@@ -84,4 +84,72 @@ def test_knowledge_capacity_is_respected(ltm_instance: LongTermMemory):
     knowledge_texts = [k["knowledge"] for k in ltm_instance.get_user_knowledge()]
     assert len(knowledge_texts) == 2
     assert "Fact 1" not in knowledge_texts
-    assert "Fact 3" in knowledge_texts
\ No newline at end of file
+    assert "Fact 3" in knowledge_texts
+
+
+def test_evicted_knowledge_is_not_returned(ltm_instance: LongTermMemory):
+    """Entries pushed out by maxlen are tombstoned in the long-lived index."""
+    ltm_instance.knowledge_capacity = 2
+    ltm_instance.knowledge_base = deque(maxlen=2)
+
+    ltm_instance.add_user_knowledge("I like apples.")
+    ltm_instance.add_user_knowledge("Bananas are fine.")
+    ltm_instance.add_user_knowledge("Another banana fact.")  # Evicts the apple entry
+
+    results = ltm_instance.search_user_knowledge("query about apple", top_k=2)
+    assert "I like apples." not in [r["knowledge"] for r in results]
+
+
+def test_knowledge_index_compacts_tombstones(ltm_instance: LongTermMemory):
+    """A long stream of evictions keeps the index bounded by compacting."""
+    ltm_instance.knowledge_base = deque(maxlen=5)
+    for i in range(50):
+        ltm_instance.add_user_knowledge(f"banana fact {i}")
+
+    state = ltm_instance._knowledge_index_for(ltm_instance.knowledge_base)
+    assert len(state.index) == 5
+    assert state.index.index.ntotal <= 5 + state.index.dead_rows
+    assert state.index.dead_rows <= 1
+    texts = [r["knowledge"] for r in ltm_instance.search_user_knowledge("banana", top_k=5)]
+    assert sorted(texts) == sorted(f"banana fact {i}" for i in range(45, 50))
+
+
+def test_full_deque_edit_outside_the_index_is_picked_up(ltm_instance: LongTermMemory):
+    """Evict-and-append at capacity keeps the length; the mutation count catches it."""
+    ltm_instance.knowledge_base = deque(maxlen=2)
+    ltm_instance.add_user_knowledge("Bananas are fine.")
+    ltm_instance.add_user_knowledge("Another banana fact.")
+    ltm_instance.search_user_knowledge("banana")  # Index built and in sync
+
+    ltm_instance.knowledge_base.append(
+        {
+            "knowledge": "I like apples.",
+            "knowledge_embedding": (
+                mock_get_embedding("apple") / np.linalg.norm(mock_get_embedding("apple"))
+            ).tolist(),
+        }
+    )
+    ltm_instance.mark_knowledge_changed(ltm_instance.knowledge_base)
+
+    results = ltm_instance.search_user_knowledge("query about apple", top_k=1)
+    assert [r["knowledge"] for r in results] == ["I like apples."]
+
+
+def test_query_embedded_once_per_scope(ltm_instance: LongTermMemory, monkeypatch):
+    """Within one query_embedding_scope the query is embedded only once."""
+    from memoryos.utils import query_embedding_scope
+
+    calls = []
+
+    def counting_embedding(text):
+        calls.append(text)
+        return mock_get_embedding(text)
+
+    ltm_instance.add_user_knowledge("An apple a day.")
+    ltm_instance.add_assistant_knowledge("Apples are red.")
+    monkeypatch.setattr("memoryos.long_term.get_embedding", counting_embedding)
+
+    with query_embedding_scope():
+        ltm_instance.search_user_knowledge("apple question")
+        ltm_instance.search_assistant_knowledge("apple question")
+    assert calls == ["apple question"]
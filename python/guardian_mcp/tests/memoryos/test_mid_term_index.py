@@ -0,0 +1,104 @@
+import pytest
+import numpy as np
+
+from memoryos.mid_term import MidTermMemory
+from memoryos.vector_store.ann_index import VectorIndex
+
+
+def _brute_force_top_k(mtm: MidTermMemory, query_vec, k):
+    """The pre-index behaviour: score every session summary on each query."""
+    sids = list(mtm.sessions)
+    matrix = np.array([mtm.sessions[s]["summary_embedding"] for s in sids])
+    scores = matrix @ query_vec
+    order = np.argsort(-scores)[:k]
+    return [sids[i] for i in order], scores[order]
+
+
+def _add_sessions(mtm, n):
+    for i in range(n):
+        mtm.add_session(f"summary {i}", [{"user_input": f"q{i}", "agent_response": "a"}])
+
+
+def test_index_matches_brute_force(mtm_factory, vector_for):
+    mtm = mtm_factory(max_capacity=500)
+    _add_sessions(mtm, 200)
+
+    for q in range(10):
+        query_vec = vector_for(f"query {q}")
+        expected_ids, expected_scores = _brute_force_top_k(mtm, query_vec, 5)
+        hits = mtm.session_index.search(query_vec, 5)
+        assert [sid for sid, _ in hits] == expected_ids
+        assert np.allclose([score for _, score in hits], expected_scores, atol=1e-5)
+
+
+def test_search_sessions_matches_brute_force(mtm_factory, vector_for):
+    mtm = mtm_factory(max_capacity=500)
+    _add_sessions(mtm, 50)
+
+    query_vec = vector_for("needle")
+    expected_ids, _ = _brute_force_top_k(mtm, query_vec, 5)
+    results = mtm.search_sessions(
+        "needle", segment_similarity_threshold=-10, page_similarity_threshold=-10
+    )
+    assert sorted(r["session_id"] for r in results) == sorted(expected_ids)
+
+
+def test_eviction_removes_from_index(mtm_factory):
+    mtm = mtm_factory(max_capacity=5)
+    _add_sessions(mtm, 8)
+
+    assert len(mtm.sessions) == 5
+    assert mtm.session_index.keys() == set(mtm.sessions)
+
+
+def test_index_persists_and_reloads(mtm_factory, vector_for):
+    mtm = mtm_factory()
+    _add_sessions(mtm, 20)
+    query_vec = vector_for("persist")
+    before = mtm.session_index.search(query_vec, 3)
+
+    reloaded = mtm_factory()
+    assert reloaded.session_index.keys() == set(mtm.sessions)
+    assert reloaded.session_index.search(query_vec, 3) == before
+
+
+def test_stale_index_is_rebuilt(mtm_factory, tmp_path):
+    mtm = mtm_factory()
+    _add_sessions(mtm, 3)
+    # Simulate a crash between the JSON write and the index write
+    (tmp_path / "mid_term.faiss").unlink()
+
+    reloaded = mtm_factory()
+    assert reloaded.session_index.keys() == set(mtm.sessions)
+
+
+def test_reembedded_session_makes_index_stale(mtm_factory, vector_for):
+    mtm = mtm_factory()
+    _add_sessions(mtm, 3)
+    sid = next(iter(mtm.sessions))
+    # Same keys, new summary vector, and the index file is not rewritten
+    new_vec = vector_for("re-embedded summary")
+    mtm.sessions[sid]["summary_embedding"] = new_vec.tolist()
+    mtm.save()
+
+    reloaded = mtm_factory()
+    top_sid, score = reloaded.session_index.search(new_vec, 1)[0]
+    assert top_sid == sid
+    assert score == pytest.approx(1.0, abs=1e-5)
+
+
+@pytest.mark.parametrize("backend", ["flat", "ivf", "hnsw"])
+def test_backends_support_upsert_and_remove(backend, vector_for):
+    store = {f"k{i}": vector_for(f"k{i}") for i in range(300)}
+    index = VectorIndex(source=lambda: store.items(), backend=backend)
+    index.rebuild()
+
+    del store["k0"]
+    index.remove("k0")
+    store["k1"] = vector_for("replacement")
+    index.upsert("k1", store["k1"])
+
+    assert index.keys() == set(store)
+    hits = index.search(store["k1"], 1)
+    assert hits[0][0] == "k1"
+    assert "k0" not in [key for key, _ in index.search(vector_for("k0"), 10)]
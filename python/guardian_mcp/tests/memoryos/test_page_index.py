@@ -0,0 +1,117 @@
+import random
+
+from memoryos.updater import Updater
+
+
+def _scan_for_page(mtm, page_id):
+    """The pre-registry lookup: first match over every session's pages."""
+    for session in mtm.sessions.values():
+        for page in session.get("details", []):
+            if page.get("page_id") == page_id:
+                return page
+    return None
+
+
+def _scan_chain(mtm, start_page_id):
+    """The updater's old breadth-first walk, one page scan per hop."""
+    queue, visited, found = [start_page_id], {start_page_id}, []
+    head = 0
+    while head < len(queue):
+        page = _scan_for_page(mtm, queue[head])
+        head += 1
+        if page:
+            found.append(page["page_id"])
+            for neighbour in (page.get("pre_page"), page.get("next_page")):
+                if neighbour and neighbour not in visited:
+                    queue.append(neighbour)
+                    visited.add(neighbour)
+    return found
+
+
+def _insert_batch(mtm, rng, batch, prev_id):
+    """A short-term batch as the updater builds it, inserted once per theme."""
+    pages = []
+    for i in range(rng.randint(1, 4)):
+        page = {
+            "page_id": f"page-{batch}-{i}",
+            "user_input": f"q{batch}-{i}",
+            "agent_response": "a",
+            "pre_page": None,
+            "next_page": None,
+        }
+        if rng.random() < 0.7:
+            page["pre_page"] = pages[-1]["page_id"] if pages else prev_id
+        pages.append(page)
+    for _ in range(rng.randint(1, 2)):  # Same pages again under another theme
+        threshold = -10.0 if rng.random() < 0.5 else 10.0  # Merge, or new session
+        mtm.insert_pages_into_session(f"theme {batch}", [], pages, threshold)
+    for page in pages:
+        if page["pre_page"]:
+            mtm.update_page_connections(page["pre_page"], page["page_id"])
+    return pages
+
+
+def _assert_matches_scan(mtm, page_ids):
+    for page_id in page_ids:
+        assert mtm.get_page_by_id(page_id) is _scan_for_page(mtm, page_id)
+        assert [p["page_id"] for p in mtm.linked_pages(page_id)] == _scan_chain(
+            mtm, page_id
+        )
+
+
+def test_lookups_and_chains_match_a_full_scan(mtm_factory):
+    rng = random.Random(7)
+    mtm = mtm_factory(max_capacity=12)
+    page_ids, prev_id = ["page-missing"], None
+    for batch in range(40):
+        pages = _insert_batch(mtm, rng, batch, prev_id)
+        prev_id = pages[-1]["page_id"]
+        page_ids += [p["page_id"] for p in pages]
+        if batch % 5 == 4:  # Evictions have run by now
+            _assert_matches_scan(mtm, page_ids)
+
+    assert len(mtm.sessions) <= 12
+    mtm.save()
+    reloaded = mtm_factory(max_capacity=12)
+    _assert_matches_scan(reloaded, page_ids)
+    assert len(reloaded.page_registry) == len(mtm.page_registry)
+
+
+def test_meta_propagation_covers_the_chain_once(mtm_factory):
+    mtm = mtm_factory()
+    pages = [
+        {"page_id": f"p{i}", "user_input": f"q{i}", "agent_response": "a"}
+        for i in range(5)
+    ]
+    mtm.add_session("first", pages[:3])
+    mtm.add_session("second", pages[3:])
+    for prev, nxt in zip(pages, pages[1:]):
+        mtm.update_page_connections(prev["page_id"], nxt["page_id"])
+    assert mtm.chain_bounds("p2") == ("p0", "p4")
+
+    updater = Updater(None, mtm, None, client=None)
+    updater._update_linked_pages_meta_info("p2", "topic A")
+    assert [mtm.get_page_by_id(f"p{i}")["meta_info"] for i in range(5)] == [
+        "topic A"
+    ] * 5
+
+    # Unlinking drops the cached chain and bounds for the pages that reach it
+    mtm.update_page_connections("p2", None)
+    mtm.update_page_connections(None, "p3")
+    assert mtm.chain_bounds("p0") == ("p0", "p2")
+    assert mtm.chain_bounds("p4") == ("p3", "p4")
+    updater._update_linked_pages_meta_info("p4", "topic B")
+    assert [mtm.get_page_by_id(f"p{i}")["meta_info"] for i in range(5)] == [
+        "topic A"
+    ] * 3 + ["topic B"] * 2
+    assert mtm.linked_pages("p4")[0]["page_id"] == "p4"
+
+
+def test_registry_recovers_from_out_of_band_edits(mtm_factory):
+    mtm = mtm_factory()
+    sid = mtm.add_session(
+        "s", [{"page_id": "a", "user_input": "q", "agent_response": "r"}]
+    )
+    mtm.sessions[sid]["details"].insert(0, {"page_id": "b", "pre_page": "a"})
+    assert mtm.get_page_by_id("a") is mtm.sessions[sid]["details"][1]
+    assert mtm.get_page_by_id("b")["pre_page"] == "a"
@@ -0,0 +1,228 @@
+import json
+import os
+
+import numpy as np
+
+from memoryos.short_term import ShortTermMemory
+from memoryos.storage.backends import JsonFileBackend
+from memoryos.storage.oplog import OpLogStore
+
+
+def _records(n, vector_for):
+    records = {f"rec:{i}": {"text": f"entry {i}", "n": i} for i in range(n)}
+    vectors = {key: vector_for(key).tolist() for key in records}
+    return records, vectors
+
+
+def _assert_store_holds(store, records, vectors):
+    assert store.load() == records
+    for key, vec in vectors.items():
+        assert np.allclose(store.get_vector(key), vec)
+
+
+def test_oplog_roundtrip_and_unchanged_sync_is_free(tmp_path, vector_for):
+    base = str(tmp_path / "store")
+    records, vectors = _records(20, vector_for)
+    store = OpLogStore(base)
+    store.load()
+    assert store.sync(records, vectors) == 40
+
+    assert store.sync(records, vectors) == 0  # Nothing changed
+    records["rec:3"]["text"] = "edited"
+    del records["rec:5"], vectors["rec:5"]
+    assert store.sync(records, vectors) == 2  # One upsert, one delete
+    store.close()
+
+    _assert_store_holds(OpLogStore(base), records, vectors)
+
+
+def test_vector_edits_are_synced_in_place_or_replaced(tmp_path, vector_for):
+    base = str(tmp_path / "store")
+    records, vectors = _records(3, vector_for)
+    store = OpLogStore(base)
+    store.load()
+    store.sync(records, vectors)
+
+    vectors["rec:0"][0] += 1.0  # Same list object, new contents
+    assert store.sync(records, vectors) == 1
+    vectors["rec:1"] = list(vectors["rec:1"])  # New object, same contents
+    assert store.sync(records, vectors) == 0
+    vectors["rec:2"] = vector_for("replacement").tolist()
+    assert store.sync(records, vectors) == 1
+    store.close()
+
+    _assert_store_holds(OpLogStore(base), records, vectors)
+
+
+def test_torn_or_corrupt_tail_is_truncated(tmp_path, vector_for):
+    base = str(tmp_path / "store")
+    records, vectors = _records(5, vector_for)
+    store = OpLogStore(base)
+    store.load()
+    store.sync(records, vectors)
+    store.sync({**records, "rec:extra": {"text": "late"}}, vectors)
+    store.close()
+    good_size = os.path.getsize(f"{base}.log")
+
+    # A crash mid-append leaves half a frame behind
+    with open(f"{base}.log", "ab") as f:
+        f.write(b"\x40\x00\x00\x00\x12\x34")
+    recovered = OpLogStore(base)
+    assert "rec:extra" in recovered.load()
+    assert os.path.getsize(f"{base}.log") == good_size
+
+    # A flipped byte in the last frame fails its checksum; earlier ops survive
+    with open(f"{base}.log", "r+b") as f:
+        f.seek(good_size - 2)
+        f.write(b"#")
+    _assert_store_holds(OpLogStore(base), records, vectors)
+
+
+def test_snapshot_compacts_log_and_survives_crash_before_truncate(tmp_path, vector_for):
+    base = str(tmp_path / "store")
+    records, vectors = _records(10, vector_for)
+    store = OpLogStore(base)
+    store.load()
+    store.sync(records, vectors)
+    with open(f"{base}.log", "rb") as f:
+        covered_log = f.read()
+
+    store.sync(records, vectors, snapshot=True)
+    assert store.stats["snapshots"] == 1
+    assert os.path.getsize(f"{base}.log") < len(covered_log)
+    records["rec:0"]["text"] = "after snapshot"
+    store.sync(records, vectors)
+    store.close()
+    _assert_store_holds(OpLogStore(base), records, vectors)
+
+    # A crash between renaming the snapshot and truncating the log leaves ops
+    # the snapshot already covers; replay must skip them
+    with open(f"{base}.log", "wb") as f:
+        f.write(covered_log)
+    records["rec:0"]["text"] = "entry 0"
+    _assert_store_holds(OpLogStore(base), records, vectors)
+
+
+def test_log_compacts_automatically_once_it_outgrows_the_snapshot(tmp_path, vector_for):
+    base = str(tmp_path / "store")
+    records, vectors = _records(10, vector_for)
+    store = OpLogStore(base, snapshot_min_bytes=0, snapshot_ratio=1.0)
+    store.load()
+    for i in range(50):
+        records["rec:1"]["n"] = i
+        store.sync(records, vectors)
+
+    assert store.stats["snapshots"] > 1
+    assert os.path.getsize(f"{base}.log") <= os.path.getsize(f"{base}.snapshot")
+    _assert_store_holds(OpLogStore(base), records, vectors)
+
+
+def test_vector_slots_are_reused_after_delete(tmp_path, vector_for):
+    store = OpLogStore(str(tmp_path / "store"))
+    store.load()
+    records, vectors = _records(4, vector_for)
+    store.sync(records, vectors)
+    capacity = store.vectors.capacity
+
+    for round_ in range(50):
+        del records[f"rec:{round_}"], vectors[f"rec:{round_}"]
+        key = f"rec:{round_ + 4}"
+        records[key] = {"text": key}
+        vectors[key] = vector_for(key).tolist()
+        store.sync(records, vectors)
+
+    assert store.vectors.capacity == capacity
+    assert len({store._slots[k] for k in vectors}) == 4
+
+
+def _add_sessions(mtm, n, pages=3):
+    for i in range(n):
+        mtm.add_session(
+            f"summary {i}",
+            [
+                {"user_input": f"q{i}.{j}", "agent_response": f"a{i}.{j}"}
+                for j in range(pages)
+            ],
+        )
+
+
+def _comparable(sessions):
+    """Sessions with embeddings rounded to the float32 the side file stores."""
+
+    def strip(d, key):
+        return {k: v for k, v in d.items() if k != key}
+
+    return {
+        sid: {
+            **strip(strip(s, "details"), "summary_embedding"),
+            "summary_embedding": np.float32(s["summary_embedding"]).tolist(),
+            "details": [
+                {
+                    **strip(p, "page_embedding"),
+                    "page_embedding": np.float32(p["page_embedding"]).tolist(),
+                }
+                for p in s["details"]
+            ],
+        }
+        for sid, s in sessions.items()
+    }
+
+
+def test_mid_term_reloads_from_oplog(mtm_factory):
+    mtm = mtm_factory()
+    _add_sessions(mtm, 20)
+    mtm.search_sessions("summary 3")
+    mtm.storage.close()
+
+    reloaded = mtm_factory()
+    assert _comparable(reloaded.sessions) == _comparable(mtm.sessions)
+    assert dict(reloaded.access_frequency) == dict(mtm.access_frequency)
+    assert reloaded.heap == mtm.heap
+
+
+def test_mid_term_heat_update_appends_only_heat_records(mtm_factory):
+    mtm = mtm_factory()
+    _add_sessions(mtm, 50)
+    before = mtm.storage.bytes_written
+
+    sid = next(iter(mtm.sessions))
+    mtm.sessions[sid]["N_visit"] += 1
+    mtm.save()
+
+    assert mtm.storage.store.stats["ops"] == 50 * 9 + 1
+    assert mtm.storage.bytes_written - before < 512
+
+
+def test_mid_term_imports_legacy_json_and_exports_it(mtm_factory, tmp_path):
+    legacy = mtm_factory(storage="json")
+    _add_sessions(legacy, 5)
+    assert not os.path.exists(tmp_path / "mid_term.log")
+
+    migrated = mtm_factory()  # No op log yet: mid_term.json is imported
+    assert os.path.exists(tmp_path / "mid_term.log")
+    assert _comparable(migrated.sessions) == _comparable(legacy.sessions)
+
+    export_path = migrated.export_json(str(tmp_path / "export.json"))
+    with open(export_path, encoding="utf-8") as f:
+        exported = json.load(f)
+    assert set(exported["sessions"]) == set(legacy.sessions)
+
+
+def test_short_term_order_survives_eviction_and_reload(tmp_path):
+    path = str(tmp_path / "short.json")
+    stm = ShortTermMemory(path, max_capacity=3)
+    for i in range(7):
+        stm.add_qa_pair({"user_input": f"q{i}", "agent_response": "a"})
+    stm.pop_oldest()
+
+    reloaded = ShortTermMemory(path, max_capacity=3)
+    assert [qa["user_input"] for qa in reloaded.get_all()] == ["q5", "q6"]
+
+
+def test_json_backend_rewrites_whole_file(tmp_path):
+    path = str(tmp_path / "short.json")
+    stm = ShortTermMemory(path, max_capacity=10, storage=JsonFileBackend(path))
+    stm.add_qa_pair({"user_input": "q", "agent_response": "a", "timestamp": "t"})
+
+    with open(path, encoding="utf-8") as f:
+        assert json.load(f) == stm.get_all()
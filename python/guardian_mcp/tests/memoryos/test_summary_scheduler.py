@@ -0,0 +1,119 @@
+import threading
+import time
+
+import pytest
+
+from memoryos.summary_scheduler import RollingSummaryScheduler
+from memoryos.token_ledger import TokenLedger
+
+
+class FakeSummaryClient:
+    """Numbers its summaries; can hold the first call until released."""
+
+    def __init__(self, replies=None, hold=False):
+        self.calls = []
+        self.replies = list(replies or [])
+        self.started = threading.Event()
+        self.release = threading.Event()
+        if not hold:
+            self.release.set()
+
+    def chat_completion(self, model, messages, temperature=0.7, max_tokens=2000):
+        self.calls.append(messages[1]["content"])
+        self.started.set()
+        self.release.wait(5)
+        if self.replies:
+            return self.replies.pop(0)
+        return f"summary {len(self.calls)}"
+
+
+@pytest.fixture
+def ledger(tmp_path):
+    ledger = TokenLedger(str(tmp_path / "conversations.sqlite"))
+    yield ledger
+    ledger.close()
+
+
+def _add(ledger, scheduler, count, start=0, thread_id="t1"):
+    for i in range(start, start + count):
+        ledger.append(thread_id, f"question {i}", f"answer {i}")
+        scheduler.note_message(thread_id)
+
+
+def test_updates_fold_only_new_messages_into_the_previous_summary(ledger):
+    client = FakeSummaryClient()
+    scheduler = RollingSummaryScheduler(
+        ledger, client, every_n_messages=100, idle_seconds=60
+    )
+    _add(ledger, scheduler, 3)
+    assert scheduler.flush(timeout=5)
+    _add(ledger, scheduler, 2, start=3)
+    assert scheduler.flush(timeout=5)
+    scheduler.close()
+
+    first, second = client.calls
+    assert "Previous Summary:\nNone" in first
+    assert all(f"question {i}" in first for i in range(3))
+    assert "Previous Summary:\nsummary 1" in second
+    assert "question 2" not in second
+    assert "question 3" in second and "question 4" in second
+    assert scheduler.get_summary("t1") == "summary 2"
+
+
+def test_a_burst_coalesces_into_few_updates_off_the_caller_thread(ledger):
+    client = FakeSummaryClient(hold=True)
+    scheduler = RollingSummaryScheduler(
+        ledger, client, every_n_messages=4, idle_seconds=60
+    )
+    start = time.perf_counter()
+    _add(ledger, scheduler, 4)
+    assert client.started.wait(5)  # First update is running, and stuck
+    _add(ledger, scheduler, 6, start=4)
+    assert time.perf_counter() - start < 2  # note_message never waited on it
+    assert scheduler.get_summary("t1") is None
+
+    client.release.set()
+    assert scheduler.flush(timeout=5)
+    scheduler.close()
+    assert len(client.calls) == 2
+    assert "question 9" in client.calls[1]
+    _, through = ledger.rolling_summary_state("t1")
+    assert through == ledger.messages_since("t1", 0)[-1]["message_id"]
+
+
+def test_an_idle_thread_is_summarized_without_a_flush(ledger):
+    client = FakeSummaryClient()
+    scheduler = RollingSummaryScheduler(
+        ledger, client, every_n_messages=100, idle_seconds=0.05
+    )
+    _add(ledger, scheduler, 2)
+    deadline = time.monotonic() + 5
+    while scheduler.get_summary("t1") is None and time.monotonic() < deadline:
+        time.sleep(0.01)
+    scheduler.close()
+    assert scheduler.get_summary("t1") == "summary 1"
+
+
+def test_a_failed_update_keeps_the_summary_and_retries_the_messages(ledger):
+    client = FakeSummaryClient(
+        replies=["summary A", "Error: Could not get response from LLM."]
+    )
+    scheduler = RollingSummaryScheduler(
+        ledger, client, every_n_messages=100, idle_seconds=60
+    )
+    _add(ledger, scheduler, 1)
+    scheduler.flush(timeout=5)
+    _add(ledger, scheduler, 1, start=1)
+    scheduler.flush(timeout=5)
+    assert scheduler.get_summary("t1") == "summary A"
+
+    scheduler.flush(timeout=5)  # Pending again after the failure
+    scheduler.close()
+    assert scheduler.get_summary("t1") == "summary 3"
+    assert "question 1" in client.calls[2] and "question 0" not in client.calls[2]
+
+
+def test_an_older_summary_never_replaces_a_newer_one(ledger):
+    assert ledger.set_rolling_summary("t1", "through 10", through_message_id=10)
+    assert not ledger.set_rolling_summary("t1", "through 5", through_message_id=5)
+    assert ledger.rolling_summary_state("t1") == ("through 10", 10)
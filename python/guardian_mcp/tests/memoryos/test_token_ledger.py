@@ -0,0 +1,91 @@
+import sqlite3
+
+from memoryos.token_ledger import TokenCounter, TokenLedger, approximate_token_count
+
+
+class CountingCounter(TokenCounter):
+    """Approximate counts, with every real tokenization recorded."""
+
+    def __init__(self, **kwargs):
+        super().__init__(**kwargs)
+        self._encode = self._record
+        self.tokenized = []
+
+    def _record(self, text, disallowed_special=()):
+        self.tokenized.append(text)
+        return [0] * approximate_token_count(text)
+
+
+def test_counter_caches_by_content_and_stays_bounded():
+    counter = CountingCounter(cache_size=2)
+    assert counter.count("hello there, world") == counter.count("hello there, world")
+    assert counter.tokenized == ["hello there, world"]
+    assert counter.count("") == 0
+    counter.count("b")
+    counter.count("c")  # Evicts "hello there, world"
+    counter.count("hello there, world")
+    assert counter.tokenized.count("hello there, world") == 2
+    assert (counter.hits, counter.misses) == (1, 4)
+
+
+def test_running_totals_match_a_full_recount(tmp_path):
+    counter = CountingCounter()
+    ledger = TokenLedger(str(tmp_path / "conversations.sqlite"), counter=counter)
+    expected = 0
+    for i in range(50):
+        question, answer = f"question {i % 7}", "a fairly long answer " * (i % 5)
+        conversation_id, total = ledger.append("t1", question, answer, project_id="p")
+        expected += approximate_token_count(question) + approximate_token_count(answer)
+        assert total == expected
+    assert len(counter.tokenized) < 50 * 2  # Repeated texts hit the cache
+
+    conversation = ledger.get_conversation(conversation_id)
+    assert conversation["message_count"] == 50
+    assert sum(m["tokens"] for m in conversation["messages"]) == expected
+    assert ledger.thread_tokens("t1") == expected
+    assert ledger.thread_tokens("unknown") == 0
+    ledger.close()
+
+    reopened = TokenLedger(str(tmp_path / "conversations.sqlite"))
+    assert reopened.conversation_tokens(conversation_id) == expected
+    assert reopened.active_conversation("t1") == conversation_id
+
+
+def test_branch_routes_new_messages_to_the_child(tmp_path):
+    ledger = TokenLedger(str(tmp_path / "conversations.sqlite"))
+    parent_id, _ = ledger.append("t1", "first question", "first answer")
+    ledger.append("t1", "second question", "second answer")
+    parent_total = ledger.conversation_tokens(parent_id)
+
+    blob = ledger.branch(parent_id, "what happened so far")
+    child_id = blob["child_conversation_id"]
+    assert ledger.branch("missing", "nothing") is None
+    assert ledger.active_conversation("t1") == child_id
+
+    conversation_id, total = ledger.append("t1", "third question", "third answer")
+    assert conversation_id == child_id
+    assert total == ledger.message_tokens("third question", "third answer")
+    assert ledger.conversation_tokens(parent_id) == parent_total
+    assert ledger.thread_tokens("t1") == parent_total + total
+
+    parent, child = ledger.get_conversations_for_thread("t1")
+    assert parent["summary"]["summary_text"] == "what happened so far"
+    assert child["parent_id"] == parent_id and child["summary"] is None
+    assert [m["user_input"] for m in ledger.messages_since("t1", 0, 2)] == [
+        "second question",
+        "third question",
+    ]
+
+
+def test_rolling_summary_is_stored_per_thread(tmp_path):
+    ledger = TokenLedger(str(tmp_path / "conversations.sqlite"))
+    assert ledger.get_rolling_summary("t1") is None
+    ledger.set_rolling_summary("t1", "before any message", through_message_id=0)
+    ledger.append("t1", "q", "a")
+    (message,) = ledger.messages_since("t1", 0)
+    ledger.set_rolling_summary("t1", "after one message", message["message_id"])
+    assert ledger.get_rolling_summary("t1") == "after one message"
+    # The summary upsert keeps the thread's totals
+    assert ledger.thread_tokens("t1") == ledger.message_tokens("q", "a")
+    with sqlite3.connect(ledger.path) as conn:
+        assert conn.execute("SELECT COUNT(*) FROM threads").fetchone()[0] == 1
@@ -0,0 +1,179 @@
+import random
+import sys
+import time
+
+import pytest
+
+from guardian.cache import CacheConfig, lru_cache_safe
+from guardian.cache_core import (
+    MISSING,
+    LFUCache,
+    LRUCache,
+    estimate_size,
+    make_cache,
+    make_key,
+)
+
+
+class ReferenceLRU:
+    def __init__(self, maxsize):
+        self.maxsize, self.items, self.clock = maxsize, {}, 0
+
+    def get(self, key):
+        if key not in self.items:
+            return MISSING
+        self.clock += 1
+        self.items[key][1] = self.clock
+        return self.items[key][0]
+
+    def set(self, key, value):
+        self.items.pop(key, None)
+        if len(self.items) >= self.maxsize:
+            del self.items[min(self.items, key=lambda k: self.items[k][1])]
+        self.clock += 1
+        self.items[key] = [value, self.clock]
+
+
+class ReferenceLFU(ReferenceLRU):
+    def get(self, key):
+        if key not in self.items:
+            return MISSING
+        self.clock += 1
+        self.items[key][1] = self.clock
+        self.items[key][2] += 1
+        return self.items[key][0]
+
+    def set(self, key, value):
+        self.items.pop(key, None)
+        if len(self.items) >= self.maxsize:
+            victim = min(self.items, key=lambda k: (self.items[k][2], self.items[k][1]))
+            del self.items[victim]
+        self.clock += 1
+        self.items[key] = [value, self.clock, 1]
+
+
+@pytest.mark.parametrize(
+    "cache_cls, reference_cls", [(LRUCache, ReferenceLRU), (LFUCache, ReferenceLFU)]
+)
+@pytest.mark.parametrize("seed", range(10))
+def test_matches_reference_policy(cache_cls, reference_cls, seed):
+    rng = random.Random(seed)
+    maxsize = rng.randint(1, 12)
+    cache, reference = cache_cls(maxsize=maxsize), reference_cls(maxsize)
+    for step in range(500):
+        key = rng.randrange(20)
+        if rng.random() < 0.6:
+            assert cache.get(key, MISSING) == reference.get(key)
+        elif rng.random() < 0.95:
+            cache.set(key, step)
+            reference.set(key, step)
+        else:
+            cache.delete(key)
+            reference.items.pop(key, None)
+        assert sorted(cache._entries) == sorted(reference.items)
+
+
+def test_lfu_keeps_frequently_used_entries():
+    cache = LFUCache(maxsize=2)
+    cache.set("hot", 1)
+    for _ in range(5):
+        cache.get("hot")
+    cache.set("a", 2)
+    cache.set("b", 3)  # Evicts "a", not "hot"
+    assert "hot" in cache and "a" not in cache and "b" in cache
+    assert cache.stats()["evictions"] == 1
+
+
+def test_lfu_evicts_across_emptied_buckets():
+    cache = LFUCache(maxsize=None, max_bytes=3, sizeof=lambda value: value)
+    cache.set("once", 1)
+    cache.set("twice", 1)
+    cache.get("twice")
+    cache.set("thrice", 1)
+    cache.get("thrice")
+    cache.get("thrice")
+    cache.delete("once")  # Leaves the lowest bucket empty
+    cache.set("big", 3)  # Two evictions, from buckets 2 and then 3
+    assert sorted(cache._entries) == ["big"]
+    assert cache.stats()["evictions"] == 2
+
+
+def test_expired_entries_miss():
+    cache = LRUCache(maxsize=10)
+    cache.set("old", 1, expire=-1)
+    cache.set("new", 2, expire=60)
+    cache.set("forever", 3)
+    assert cache.get("old") is None
+    assert cache.get("new") == 2 and cache.get("forever") == 3
+    stats = cache.stats()
+    assert (stats["hits"], stats["misses"], stats["expired"]) == (2, 1, 1)
+    assert len(cache) == 2
+
+
+@pytest.mark.parametrize("policy", ["lru", "lfu"])
+def test_max_bytes(policy):
+    cache = make_cache(policy, maxsize=None, max_bytes=1000, sizeof=len)
+    for i in range(10):
+        cache.set(i, "x" * 300)
+    assert cache.bytes == 900 and len(cache) == 3
+    cache.set("big", "x" * 1001)  # Larger than the whole cache: not stored
+    assert "big" not in cache and len(cache) == 3
+    cache.clear()
+    assert cache.bytes == 0 and len(cache) == 0
+
+
+def test_estimate_size_counts_nested_containers():
+    value = [{"content": "x" * 1000, "tags": ["a", "b"]}]
+    assert estimate_size(value) > sys.getsizeof(value) + 1000
+    shared = "y" * 500
+    assert estimate_size([shared, shared]) < estimate_size([shared, "z" * 500])
+
+
+def test_make_key():
+    assert make_key((5,), {}) == 5
+    assert make_key((1, "a"), {"b": 2, "a": 1}) == make_key((1, "a"), {"a": 1, "b": 2})
+    assert make_key((1,), {}, typed=True) != make_key((1.0,), {}, typed=True)
+    # Unhashable arguments fall back to canonical JSON
+    assert make_key(([1, 2],), {"x": {"b": 1, "a": 2}}) == make_key(
+        ([1, 2],), {"x": {"a": 2, "b": 1}}
+    )
+    assert make_key(([1, 2],), {}) != make_key(([2, 1],), {})
+    with pytest.raises(TypeError):
+        make_key(([object()],), {})
+    with pytest.raises(ValueError):
+        make_cache("fifo")
+
+
+def test_lru_cache_safe_policy_and_stats(monkeypatch):
+    monkeypatch.setattr(CacheConfig, "CACHE_POLICY", "lfu")
+    calls = []
+
+    @lru_cache_safe(maxsize=2, expire=60)
+    def square(x, scale=1):
+        calls.append(x)
+        return x * x * scale
+
+    assert square.cache_info()["policy"] == "lfu"
+    square(2), square(2), square(2), square(3), square(4)
+    assert calls == [2, 3, 4]  # 2 was used most, so 3 made way for 4
+    assert square(2, scale=1) == 4 and calls == [2, 3, 4, 2]  # Other key
+    assert square(2) == 4 and calls == [2, 3, 4, 2]
+    info = square.cache_info()
+    assert (info["hits"], info["misses"], info["evictions"]) == (3, 4, 2)
+    square.cache_clear()
+    square(2)
+    assert calls == [2, 3, 4, 2, 2]
+
+
+def test_lru_cache_safe_unhashable_and_expiry():
+    calls = []
+
+    @lru_cache_safe(maxsize=10, expire=0.05)
+    def total(values):
+        calls.append(values)
+        return sum(values)
+
+    assert total([1, 2]) == 3 and total([1, 2]) == 3
+    assert len(calls) == 1
+    time.sleep(0.06)
+    assert total([1, 2]) == 3 and len(calls) == 2
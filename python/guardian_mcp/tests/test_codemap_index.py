@@ -0,0 +1,99 @@
+import os
+import time
+
+from guardian.codemap.index import CodemapIndex, tokenize
+from guardian.memory.codemap import query_codemap
+
+
+def write(path, text):
+    path.parent.mkdir(parents=True, exist_ok=True)
+    path.write_text(text)
+
+
+def make_tree(root):
+    write(
+        root / "pkg" / "embedding.py",
+        'class EmbeddingCache:\n    """SQLite cache of vectors."""\n\n\n'
+        "def embed_batch(texts):\n    return texts\n",
+    )
+    write(root / "pkg" / "limiter.py", "def acquire_token():\n    pass\n")
+    write(root / "pkg" / "broken.py", "def oops(:\n")
+
+
+def make_index(root):
+    return CodemapIndex(base_dir=str(root), cache_path=str(root / "cache.json"))
+
+
+def test_tokenize_splits_identifiers():
+    assert tokenize("get_codemap_index HTTPServer") == [
+        "get_codemap_index",
+        "get",
+        "codemap",
+        "index",
+        "httpserver",
+        "http",
+        "server",
+    ]
+
+
+def test_warm_start_reparses_only_changed_files(tmp_path):
+    make_tree(tmp_path)
+    cold = make_index(tmp_path)
+    cold.refresh()
+    assert cold.stats["parsed"] == 3
+    assert [e["path"] for e in cold.entries()] == [
+        os.path.join("pkg", "embedding.py"),
+        os.path.join("pkg", "limiter.py"),
+    ]
+
+    # Edit one file, touch another without changing it, delete the broken one
+    limiter = tmp_path / "pkg" / "limiter.py"
+    limiter.write_text(
+        "def acquire_token():\n    pass\n\n\ndef release_token():\n    pass\n"
+    )
+    later = time.time() + 5
+    os.utime(tmp_path / "pkg" / "embedding.py", (later, later))
+    (tmp_path / "pkg" / "broken.py").unlink()
+
+    warm = make_index(tmp_path)
+    assert warm.refresh() is True
+    assert warm.stats == {"reused": 0, "rehashed": 1, "parsed": 1, "removed": 1}
+    assert warm.query("release", top_k=1)[0]["name"] == "release_token"
+
+    again = make_index(tmp_path)
+    assert again.refresh() is False
+    assert again.stats["reused"] == 2
+
+
+def test_query_returns_top_k_ranked_symbols(tmp_path):
+    make_tree(tmp_path)
+    index = make_index(tmp_path).start()
+    assert index.wait(timeout=5)
+
+    results = index.query("embedding cache", top_k=2)
+    assert len(results) == 2
+    assert results[0]["name"] == "EmbeddingCache"
+    assert results[0]["kind"] == "class"
+    assert results[0]["line"] == 1
+    assert results[0]["score"] >= results[1]["score"]
+    assert index.query("acq")[0]["name"] == "acquire_token"  # Prefix match
+    assert index.query("nonexistent") == []
+
+
+def test_memory_codemap_query_is_ranked_and_bounded():
+    codemap = {
+        "query_codemap": {
+            "file": "a.py",
+            "line": 4,
+            "description": "Query the codemap",
+        },
+        "format_results": {
+            "file": "a.py",
+            "line": 9,
+            "description": "Format query output",
+        },
+        "load_codemap": {"file": "b.py", "line": 1, "description": "Load codemap.json"},
+    }
+    results = query_codemap("query", codemap, top_k=2)
+    assert [r["line"] for r in results] == [4, 9]
+    assert query_codemap("zzz", codemap)[0]["message"].startswith("No matches")
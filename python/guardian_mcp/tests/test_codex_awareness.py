@@ -0,0 +1,211 @@
+import json
+import random
+
+import pytest
+
+from guardian.codex_awareness import CodexAwareness, MemoryArtifact
+
+WORDS = ["alpha", "beta", "gamma", "delta", "Conversation", "decision", "résumé"]
+TAGS = ["test", "conversation", "decision", "pattern", "Insight"]
+
+
+def reference_query(
+    artifacts, query, source_filter=None, tags=None, min_confidence=0.0, limit=10
+):
+    """The pre-SQLite linear scan, kept as the behavioural reference."""
+    results = []
+    for artifact in artifacts:
+        if source_filter and artifact.source != source_filter:
+            continue
+        if tags and not all(tag in artifact.tags for tag in tags):
+            continue
+        if artifact.confidence < min_confidence:
+            continue
+        content_str = json.dumps(artifact.content).lower()
+        if query in content_str or any(
+            query.lower() in t.lower() for t in artifact.tags
+        ):
+            results.append(artifact)
+        if len(results) >= limit:
+            break
+    return results
+
+
+@pytest.fixture
+def codex(tmp_path):
+    codex = CodexAwareness(memory_path=tmp_path)
+    yield codex
+    codex.close()
+
+
+def _populate(codex, n=300, seed=7):
+    rng = random.Random(seed)
+    stored = []
+    for i in range(n):
+        content = {
+            "type": rng.choice(["conversation", "decision", "insight"]),
+            "text": " ".join(rng.choice(WORDS) for _ in range(4)) + f" item{i}",
+        }
+        artifact_id = codex.store_memory(
+            content=content,
+            source=rng.choice(["codexify", "memoryos", "vestige"]),
+            tags=rng.sample(TAGS, rng.randint(0, 3)),
+            confidence=round(rng.random(), 2),
+        )
+        stored.append(codex.artifacts[artifact_id])
+    return stored
+
+
+@pytest.mark.parametrize(
+    "kwargs",
+    [
+        {"query": "gamma"},
+        {"query": "item1", "limit": 50},
+        {"query": "conversation", "tags": ["test"]},
+        {"query": "Conversation"},  # Content is matched lowercased, tags are not
+        {"query": "decision", "source_filter": "memoryos", "min_confidence": 0.5},
+        {"query": "sigh", "limit": 20},  # Only in tags ("Insight")
+        {"query": "r\\u00e9"},  # Non-ASCII content is matched in its JSON escape
+        {"query": "ta"},  # Too short for the trigram index
+        {"query": "", "tags": ["pattern", "test"], "limit": 100},
+        {"query": "no such text"},
+    ],
+)
+def test_query_matches_linear_scan(codex, kwargs):
+    stored = _populate(codex)
+    expected = [a.id for a in reference_query(stored, **kwargs)]
+    assert [a.id for a in codex.query_memory(**kwargs)] == expected
+
+
+def test_related_memories_follow_relations_to_depth(codex):
+    leaf = codex.store_memory({"text": "leaf"}, "codexify", [])
+    middle = codex.store_memory(
+        {"text": "middle"}, "codexify", [], related_artifacts=[leaf, "missing"]
+    )
+    other = codex.store_memory({"text": "other"}, "codexify", [])
+    root = codex.store_memory(
+        {"text": "root"}, "codexify", [], related_artifacts=[middle, other]
+    )
+    # A cycle back to the root must not loop
+    codex.artifacts[leaf] = MemoryArtifact.from_dict(
+        {**codex.artifacts[leaf].to_dict(), "related_artifacts": [root]}
+    )
+
+    assert [a.id for a in codex.get_related_memories(root, max_depth=1)] == [
+        middle,
+        other,
+    ]
+    assert [a.id for a in codex.get_related_memories(root, max_depth=2)] == [
+        middle,
+        leaf,
+        other,
+    ]
+    assert [a.id for a in codex.get_related_memories(root, max_depth=3)] == [
+        middle,
+        leaf,
+        root,
+        other,
+    ]
+    assert codex.get_related_memories(other) == []
+    assert codex.get_related_memories("missing") == []
+
+
+def baseline_related(artifacts, artifact_id, max_depth):
+    """get_related_memories' walk from before the artifact store, minus logging."""
+    related = []
+    visited = set()
+
+    def traverse_related(current_id, depth):
+        if depth <= 0 or current_id in visited:
+            return
+        visited.add(current_id)
+        current_artifact = artifacts.get(current_id)
+        if not current_artifact:
+            return
+        for related_id in current_artifact.related_artifacts:
+            if related_id in artifacts:
+                related_artifact = artifacts[related_id]
+                if related_artifact not in related:
+                    related.append(related_artifact)
+                traverse_related(related_id, depth - 1)
+
+    traverse_related(artifact_id, max_depth)
+    return [a.id for a in related]
+
+
+def relate(codex, relations):
+    for artifact_id, related in relations.items():
+        codex.artifacts[artifact_id] = MemoryArtifact.from_dict(
+            {**codex.artifacts[artifact_id].to_dict(), "related_artifacts": related}
+        )
+
+
+def test_related_memories_keep_the_baseline_order_on_cycles(codex):
+    ids = [codex.store_memory({"text": f"a{i}"}, "codexify", []) for i in range(6)]
+    a0, a1, a2, a3, a4, a5 = ids
+    relate(codex, {a3: [a3, a5, a1], a5: [a0, a4, a1], a1: [a2]})
+
+    related = [a.id for a in codex.get_related_memories(a3, max_depth=2)]
+    assert related == [a3, a5, a0, a4, a1, a2]
+    assert related == baseline_related(codex.artifacts, a3, 2)
+
+
+@pytest.mark.parametrize("seed", range(10))
+def test_related_memories_on_a_dense_cyclic_graph_match_baseline_walk(codex, seed):
+    rng = random.Random(seed)
+    ids = [codex.store_memory({"text": f"node {i}"}, "codexify", []) for i in range(40)]
+    # Every node relates to 6 others, cycles and dangling ids included
+    relate(codex, {i: rng.sample(ids + ["missing"], 6) for i in ids})
+
+    for max_depth in (1, 2, 3, 5):
+        related = codex.get_related_memories(ids[0], max_depth=max_depth)
+        expected = baseline_related(codex.artifacts, ids[0], max_depth)
+        assert [a.id for a in related] == expected
+
+
+def test_artifacts_persist_and_mapping_view_works(codex, tmp_path):
+    first = codex.store_memory(
+        {"type": "decision", "text": "ship it"}, "axis", ["decision"], 0.8
+    )
+    codex.store_memory(
+        {"type": "insight", "text": "watch latency"}, "echoform", ["insight"]
+    )
+    codex.close()
+
+    reopened = CodexAwareness(memory_path=tmp_path)
+    assert len(reopened.artifacts) == 2
+    assert list(reopened.artifacts)[0] == first  # Insertion order is kept
+    assert reopened.artifacts.get(first).content == {
+        "type": "decision",
+        "text": "ship it",
+    }
+    assert reopened.query_memory("latency")[0].source == "echoform"
+    assert reopened.summarize_context([first])["confidence"] == 0.8
+
+    reopened.artifacts.clear()
+    assert len(reopened.artifacts) == 0
+    assert reopened.query_memory("ship") == []
+    reopened.close()
+
+
+def test_legacy_artifacts_json_is_imported_once(tmp_path):
+    legacy = MemoryArtifact.from_dict(
+        {
+            "id": "codexify_2024-01-01T00:00:00",
+            "content": {"type": "conversation", "text": "hello"},
+            "source": "codexify",
+            "timestamp": "2024-01-01T00:00:00",
+            "tags": ["test"],
+            "confidence": 0.9,
+            "related_artifacts": [],
+        }
+    )
+    with open(tmp_path / "artifacts.json", "w") as f:
+        json.dump([legacy.to_dict()], f)
+
+    codex = CodexAwareness(memory_path=tmp_path)
+    assert codex.artifacts[legacy.id] == legacy
+    codex.artifacts.clear()
+    codex.close()
+
+    assert len(CodexAwareness(memory_path=tmp_path).artifacts) == 0  # Not re-imported
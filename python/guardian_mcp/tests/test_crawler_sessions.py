@@ -0,0 +1,237 @@
+import asyncio
+import threading
+import time
+from collections import Counter
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+import pytest
+
+from guardian.core.research.Modules.browser.session import CrawlerSessions, PageCache
+
+
+class FixtureSite(BaseHTTPRequestHandler):
+    """/page/<n> (HTML with validators), /paper.pdf, /blob (no HEAD), /private."""
+
+    version = "v1"
+    max_age = 0
+    hits = Counter()
+    in_flight = 0
+    peak = 0
+    lock = threading.Lock()
+
+    def log_message(self, *args):
+        pass
+
+    def _serve(self, with_body):
+        cls = type(self)
+        with cls.lock:
+            cls.hits[(self.command, self.path)] += 1
+            cls.in_flight += 1
+            cls.peak = max(cls.peak, cls.in_flight)
+        try:
+            time.sleep(0.01)
+            self._respond(with_body)
+        finally:
+            with cls.lock:
+                cls.in_flight -= 1
+
+    def _respond(self, with_body):
+        etag = f'"{self.path}-{self.version}"'
+        if self.path.startswith("/page/"):
+            if self.headers.get("If-None-Match") == etag:
+                self.send_response(304)
+                self.send_header("ETag", etag)
+                self.end_headers()
+                return
+            body = f"<html><body>{self.path} {self.version}</body></html>".encode()
+            headers = {"Content-Type": "text/html", "ETag": etag}
+            headers["Cache-Control"] = f"max-age={self.max_age}"
+        elif self.path == "/paper.pdf":
+            body, headers = b"%PDF-1.4 fake", {"Content-Type": "application/pdf"}
+        elif self.path == "/blob":
+            if self.command == "HEAD":
+                self.send_response(405)
+                self.end_headers()
+                return
+            body = b"%PDF-1.7 served as a blob"
+            headers = {"Content-Type": "application/octet-stream"}
+        elif self.path == "/private":
+            body = b"<p>secret</p>"
+            headers = {"Content-Type": "text/html", "Cache-Control": "no-store"}
+        else:
+            self.send_error(404)
+            return
+        self.send_response(200)
+        for name, value in headers.items():
+            self.send_header(name, value)
+        self.send_header("Content-Length", str(len(body)))
+        self.end_headers()
+        if with_body:
+            self.wfile.write(body)
+
+    def do_GET(self):
+        self._serve(True)
+
+    def do_HEAD(self):
+        self._serve(False)
+
+
+@pytest.fixture
+def site():
+    FixtureSite.version, FixtureSite.max_age = "v1", 0
+    FixtureSite.hits.clear()
+    FixtureSite.peak = 0
+    server = ThreadingHTTPServer(("127.0.0.1", 0), FixtureSite)
+    thread = threading.Thread(target=server.serve_forever, daemon=True)
+    thread.start()
+    yield f"http://127.0.0.1:{server.server_address[1]}"
+    server.shutdown()
+    server.server_close()
+
+
+def sessions(tmp_path, **kwargs):
+    kwargs.setdefault("host_rate", 1000.0)
+    kwargs.setdefault("host_burst", 1000.0)
+    kwargs.setdefault("host_concurrency", 8)
+    return CrawlerSessions(cache_dir=str(tmp_path / "cache"), **kwargs)
+
+
+class FakeCrawler:
+    running = 0
+    peak = 0
+
+    def __init__(self):
+        self.started = False
+        self.inputs = []
+
+    async def start(self):
+        await asyncio.sleep(0.01)
+        self.started = True
+
+    async def close(self):
+        self.started = False
+
+    async def arun(self, url, config=None):
+        assert self.started
+        FakeCrawler.running += 1
+        FakeCrawler.peak = max(FakeCrawler.peak, FakeCrawler.running)
+        await asyncio.sleep(0.005)
+        FakeCrawler.running -= 1
+        self.inputs.append(url)
+        return url
+
+
+@pytest.mark.asyncio
+async def test_fetch_caches_and_revalidates(site, tmp_path):
+    async with sessions(tmp_path) as s:
+        first = await s.fetch(site + "/page/1")
+        assert not first.from_cache and b"v1" in first.body
+        # max-age=0: every fetch revalidates, and a 304 serves the stored body
+        again = await s.fetch(site + "/page/1")
+        assert again.from_cache and again.body == first.body
+        assert s.cache.revalidated == 1
+
+        FixtureSite.max_age = 3600
+        FixtureSite.version = "v2"  # New ETag, so no 304
+        changed = await s.fetch(site + "/page/1")
+        assert not changed.from_cache and b"v2" in changed.body
+        assert (await s.fetch(site + "/page/1")).from_cache
+        assert FixtureSite.hits[("GET", "/page/1")] == 3
+
+        await s.fetch(site + "/private")
+        await s.fetch(site + "/private")
+        assert FixtureSite.hits[("GET", "/private")] == 2  # no-store
+
+
+@pytest.mark.asyncio
+async def test_identical_bodies_are_stored_once(site, tmp_path):
+    FixtureSite.max_age = 3600
+    async with sessions(tmp_path) as s:
+        await s.fetch(site + "/page/1")
+        await s.fetch(site + "/paper.pdf")
+    cache = PageCache(str(tmp_path / "cache"))
+    record, body = cache.lookup(site + "/paper.pdf")
+    assert body.startswith(b"%PDF") and record["headers"]["content-type"]
+    assert len(list((tmp_path / "cache" / "objects").rglob("*"))) == 4  # 2 + dirs
+    cache.store(site + "/copy.pdf", 200, {}, body)
+    assert len(list((tmp_path / "cache" / "objects").rglob("*"))) == 4
+    assert cache.prune(older_than=-1) == 3 and cache.lookup(site + "/copy.pdf") is None
+    assert not [p for p in (tmp_path / "cache" / "objects").rglob("*") if p.is_file()]
+
+
+@pytest.mark.asyncio
+async def test_concurrent_fetches_share_a_request(site, tmp_path):
+    async with sessions(tmp_path) as s:
+        pages = await asyncio.gather(*[s.fetch(site + "/page/7") for _ in range(5)])
+    assert len({p.body for p in pages}) == 1
+    assert FixtureSite.hits[("GET", "/page/7")] == 1
+
+
+@pytest.mark.asyncio
+async def test_is_pdf_without_blocking(site, tmp_path):
+    async with sessions(tmp_path) as s:
+        results = await asyncio.gather(
+            s.is_pdf(site + "/paper.pdf"),
+            s.is_pdf(site + "/blob"),  # HEAD rejected: sniffs the first bytes
+            s.is_pdf(site + "/page/1"),
+            s.is_pdf(site + "/missing"),
+            s.is_pdf("http://127.0.0.1:9/closed"),
+        )
+    assert results == [True, True, False, False, False]
+    assert FixtureSite.hits[("GET", "/paper.pdf")] == 0
+    assert FixtureSite.hits[("GET", "/page/1")] == 0
+
+
+@pytest.mark.asyncio
+async def test_hosts_are_rate_and_concurrency_limited(site, tmp_path):
+    s = sessions(tmp_path, host_rate=20.0, host_burst=1.0, host_concurrency=1)
+    start = time.monotonic()
+    await asyncio.gather(*[s.fetch(f"{site}/page/{i}") for i in range(8)])
+    assert time.monotonic() - start >= 7 / 20
+    assert FixtureSite.peak == 1
+    await s.close()
+
+
+@pytest.mark.asyncio
+async def test_browsers_are_pooled(site, tmp_path):
+    FakeCrawler.peak = 0
+    created = []
+
+    def factory():
+        created.append(FakeCrawler())
+        return created[-1]
+
+    s = sessions(tmp_path, pool_size=3, crawler_factory=factory)
+    urls = [f"{site}/page/{i}" for i in range(20)]
+    results = await s.crawl_many(urls)
+    assert len(created) == 3 and FakeCrawler.peak == 3
+    assert all(r.startswith("raw:<html>") for r in results)  # Rendered from cache
+    # Search pages go to the browser directly, still on the same browsers
+    assert await s.crawl(site + "/search?q=x", cached=False) == site + "/search?q=x"
+    assert len(created) == 3 and s.stats()["browsers_started"] == 3
+    await s.close()
+    assert not any(c.started for c in created)
+
+
+@pytest.mark.asyncio
+async def test_closing_one_crawl_keeps_the_shared_pool(site, tmp_path, monkeypatch):
+    pytest.importorskip("crawl4ai")
+    from guardian.core.research.Modules.browser import crawl_ai
+
+    created = []
+
+    def factory():
+        created.append(FakeCrawler())
+        return created[-1]
+
+    shared = sessions(tmp_path, crawler_factory=factory)
+    monkeypatch.setattr(crawl_ai, "_sessions", shared)
+    first, second = crawl_ai.Crawl(model=None), crawl_ai.Crawl(model=None)
+    assert first.sessions is second.sessions
+    await first.start_crawler()
+    await first.close_crawler()
+    url = site + "/search?q=x"
+    assert await second.sessions.crawl(url, cached=False) == url
+    assert len(created) == 1 and created[0].started
+    await crawl_ai.close_shared_sessions()
+    assert not created[0].started
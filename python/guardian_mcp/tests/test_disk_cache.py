@@ -0,0 +1,173 @@
+import multiprocessing
+import sqlite3
+import time
+
+import pytest
+
+from guardian import cache as cache_module
+from guardian.cache import CacheConfig, disk_cache, memoize_to_disk
+from guardian.disk_cache import DiskCache
+from guardian.memory.query_memory import MemoryStore
+
+
+@pytest.fixture
+def store(tmp_path):
+    cache = DiskCache(str(tmp_path / "cache.db"), compact_interval=None)
+    yield cache
+    cache.close()
+
+
+@pytest.fixture
+def cache_dir(tmp_path, monkeypatch):
+    monkeypatch.setattr(CacheConfig, "CACHE_DIR", tmp_path / "cache")
+    monkeypatch.setattr(CacheConfig, "DISK_CACHE_COMPACT_INTERVAL", None)
+    monkeypatch.setattr(cache_module, "_disk_caches", {})
+    yield tmp_path / "cache"
+    for cache in cache_module._disk_caches.values():
+        cache.close()
+
+
+def test_get_set_and_counters(store):
+    assert store.get("ns", "a") is None
+    store.set("ns", "a", {"value": [1, 2]}, expire=60)
+    store.set("other", "a", None, expire=60)
+    assert store.get("ns", "a") == {"value": [1, 2]}
+    assert store.get("other", "a", default="missing") is None  # Cached None
+    assert store.get("other", "b", default="missing") == "missing"
+    stats = store.stats()
+    assert (stats["hits"], stats["misses"], stats["entries"]) == (2, 2, 2)
+
+
+def test_expired_entries_miss_and_are_compacted(store):
+    store.set("ns", "old", 1, expire=-1)
+    store.set("ns", "new", 2, expire=60)
+    assert store.get("ns", "old") is None
+    assert store.compact() == 1
+    assert len(store) == 1 and store.get("ns", "new") == 2
+    assert store.stats()["expired"] == 1
+    # Freed pages went back to the filesystem
+    assert store._connect().execute("PRAGMA freelist_count").fetchone()[0] == 0
+
+
+def test_overwrite_keeps_totals(store):
+    store.set("ns", "a", "x" * 10, expire=60)
+    store.set("ns", "a", "x" * 100, expire=60)
+    stats = store.stats()
+    assert stats["entries"] == 1 and stats["bytes"] == 102  # Quoted JSON string
+
+
+def test_max_entries_evicts_soonest_to_expire(tmp_path):
+    store = DiskCache(str(tmp_path / "c.db"), max_entries=10, compact_interval=None)
+    for i in range(10):
+        store.set("ns", str(i), i, expire=100 + i)
+    assert store.stats()["evictions"] == 0
+    store.set("ns", "late", -1, expire=1000)
+    # Down to 90% of the limit: the two entries closest to expiry go
+    assert len(store) == 9 and store.stats()["evictions"] == 2
+    assert store.get("ns", "0") is None and store.get("ns", "1") is None
+    assert store.get("ns", "2") == 2 and store.get("ns", "late") == -1
+    store.close()
+
+
+def test_max_bytes_evicts(tmp_path):
+    store = DiskCache(str(tmp_path / "c.db"), max_bytes=1000, compact_interval=None)
+    for i in range(20):
+        store.set("ns", str(i), "x" * 98, expire=100 + i)  # 100 bytes each
+    stats = store.stats()
+    assert stats["bytes"] <= 1000 and stats["entries"] == stats["bytes"] // 100
+    assert store.get("ns", "19") == "x" * 98
+    store.close()
+
+
+def test_background_compaction(tmp_path):
+    store = DiskCache(str(tmp_path / "c.db"), compact_interval=0.05)
+    store.set("ns", "gone", 1, expire=0.01)
+    deadline = time.time() + 5
+    while len(store) and time.time() < deadline:
+        time.sleep(0.02)
+    assert len(store) == 0
+    store.close()
+    assert not store._compactor.is_alive()
+
+
+def _write_entries(path, worker, count):
+    cache = DiskCache(path, max_entries=150, compact_interval=None)
+    for i in range(count):
+        cache.set("ns", f"{worker}-{i}", {"worker": worker, "i": i}, expire=60)
+    cache.close()
+
+
+def test_concurrent_processes_share_one_file(tmp_path):
+    path = str(tmp_path / "shared.db")
+    DiskCache(path, compact_interval=None).close()
+    ctx = multiprocessing.get_context("spawn")
+    workers = [
+        ctx.Process(target=_write_entries, args=(path, w, 100)) for w in range(4)
+    ]
+    for p in workers:
+        p.start()
+    for p in workers:
+        p.join(60)
+        assert p.exitcode == 0
+
+    store = DiskCache(path, compact_interval=None)
+    conn = sqlite3.connect(path)
+    count, size = conn.execute("SELECT COUNT(*), SUM(size) FROM entries").fetchone()
+    conn.close()
+    stats = store.stats()
+    # Eviction kept the shared limit, and the trigger-kept totals stayed exact
+    assert stats["entries"] == count <= 150 and stats["bytes"] == size
+    store.close()
+
+
+def test_memoize_to_disk_uses_disk_cache(cache_dir):
+    calls = []
+
+    @memoize_to_disk(expire=60)
+    def double(x):
+        calls.append(x)
+        return {"result": x * 2}
+
+    assert double(2) == {"result": 4}
+    assert double(2) == {"result": 4}
+    assert double(3) == {"result": 6}
+    assert calls == [2, 3]
+    assert (cache_dir / CacheConfig.DISK_CACHE_FILE).exists()
+    assert disk_cache().stats()["hits"] == 1
+
+
+def test_memoize_to_disk_skips_unserializable_values(cache_dir):
+    calls = []
+
+    @memoize_to_disk(expire=60)
+    def make(x):
+        calls.append(x)
+        return object()
+
+    make(object())  # Unhashable argument
+    make(1)  # Unstorable result
+    make(1)
+    assert len(calls) == 3
+
+
+def test_query_by_tags_is_cached_per_database(cache_dir, tmp_path):
+    def add(store, content):
+        with sqlite3.connect(store.db_path) as conn:
+            conn.execute(
+                "INSERT INTO memories (timestamp, content, tags) VALUES (?, ?, ?)",
+                ("2025-01-01T00:00:00", content, "test"),
+            )
+
+    first = MemoryStore(str(tmp_path / "a.db"))
+    second = MemoryStore(str(tmp_path / "b.db"))
+    add(first, "one")
+    add(second, "two")
+
+    assert [m["content"] for m in first.query_by_tags(["test"])] == ["one"]
+    assert [m["content"] for m in second.query_by_tags(["test"])] == ["two"]
+    add(first, "three")
+    # Still served from the cache until it expires
+    assert [m["content"] for m in first.query_by_tags(["test"])] == ["one"]
+    reopened = MemoryStore(str(tmp_path / "a.db"))
+    assert [m["content"] for m in reopened.query_by_tags(["test"])] == ["one"]
+    assert disk_cache().stats()["hits"] == 2
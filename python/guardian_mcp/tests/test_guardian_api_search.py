@@ -0,0 +1,72 @@
+import os
+import sys
+import tempfile
+
+import pytest
+from fastapi.testclient import TestClient
+
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), "..")))
+os.environ.setdefault(
+    "GUARDIAN_DB_PATH", os.path.join(tempfile.mkdtemp(), "guardian_api.db")
+)
+
+from guardian.core.db import GuardianDB
+
+# The API module pulls in the LLM router and route packages of a full deployment
+guardian_api = pytest.importorskip("guardian.guardian_api")
+
+HEADERS = {"X-API-Key": guardian_api.API_KEY}
+
+
+@pytest.fixture
+def chat_db(tmp_path, monkeypatch):
+    db = GuardianDB(db_path=str(tmp_path / "chat.db"))
+    monkeypatch.setattr(guardian_api, "chatlog_db", db)
+    return db
+
+
+@pytest.fixture
+def client():
+    return TestClient(guardian_api.app)
+
+
+def test_search_v2_ranks_and_pages_chat_log(chat_db, client):
+    for i in range(3):
+        chat_db.add_chat_log("s1", "u1", "user", f"deploy the rocket {i}")
+    chat_db.add_chat_log("s2", "u1", "user", "deploy elsewhere")
+    chat_db.add_chat_log("s1", "u1", "user", "unrelated chatter")
+
+    resp = client.get(
+        "/search/v2",
+        params={"query": "deploy", "session_id": "s1", "limit": 2},
+        headers=HEADERS,
+    )
+    assert resp.status_code == 200
+    first = resp.json()
+    assert len(first["results"]) == 2
+    assert all("<mark>" in r["snippet"] for r in first["results"])
+    assert first["next_cursor"]
+
+    resp = client.get(
+        "/search/v2",
+        params={"query": "deploy", "session_id": "s1", "cursor": first["next_cursor"]},
+        headers=HEADERS,
+    )
+    rest = resp.json()
+    assert [r["session_id"] for r in rest["results"]] == ["s1"]
+    assert rest["next_cursor"] is None
+    ids = {r["id"] for r in first["results"] + rest["results"]}
+    assert len(ids) == 3
+
+
+def test_search_v2_rejects_bad_requests(chat_db, client):
+    resp = client.get("/search/v2", params={"query": "deploy"})
+    assert resp.status_code == 401
+    resp = client.get(
+        "/search/v2", params={"query": "deploy", "scope": "files"}, headers=HEADERS
+    )
+    assert resp.status_code == 422
+    resp = client.get(
+        "/search/v2", params={"query": "deploy", "cursor": "garbage"}, headers=HEADERS
+    )
+    assert resp.status_code == 400
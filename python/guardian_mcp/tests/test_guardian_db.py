@@ -17,9 +17,11 @@ def db():
     db = GuardianDB(TEST_DB_PATH)
     db.init_db()
     yield db
-    # Teardown: remove the test db file
-    if os.path.exists(TEST_DB_PATH):
-        os.remove(TEST_DB_PATH)
+    # Teardown: close pooled connections, then remove the test db files
+    db.close()
+    for path in (TEST_DB_PATH, TEST_DB_PATH + "-wal", TEST_DB_PATH + "-shm"):
+        if os.path.exists(path):
+            os.remove(path)
 
 
 def test_insert_and_history(db):
@@ -33,3 +35,136 @@ def test_insert_and_history(db):
     history = db.get_history(limit=1, user_id="test")
     assert history, "No history found after insert"
     assert history[0][2] == "echo test"
+
+
+def test_bulk_inserts_match_single_inserts(db):
+    written = db.insert_chat_logs_bulk(
+        {"session_id": "s1", "user_id": "u1", "role": "user", "message": f"msg {i}"}
+        for i in range(50)
+    )
+    db.add_chat_log(session_id="s1", user_id="u1", role="user", message="single")
+    db.insert_logs_bulk([{"command": "bulk", "user_id": "test"}] * 3)
+
+    history = db.get_chat_history(session_id="s1", user_id="u1", limit=100)
+    assert written == 50
+    assert len(history) == 51
+    assert history[0]["message"] == "single"
+    assert history[-1]["message"] == "msg 0"
+    assert history[-1]["model"] == "test-model"
+    assert len(db.get_history(limit=10, user_id="test")) == 3
+
+
+def test_migrations_create_lookup_indexes(db):
+    with db._connect() as conn:
+        indexes = {
+            row[0]
+            for row in conn.execute("SELECT name FROM sqlite_master WHERE type='index'")
+        }
+        plan = conn.execute(
+            "EXPLAIN QUERY PLAN SELECT id FROM chat_log "
+            "WHERE session_id = ? AND user_id = ? ORDER BY id DESC",
+            ("s", "u"),
+        ).fetchall()
+    assert {
+        "idx_chat_log_session_user",
+        "idx_chat_log_user_id",
+        "idx_threads_parent_thread_id",
+        "idx_memory_timestamp",
+    } <= indexes
+    assert "idx_chat_log_session_user" in str(plan)
+    # Re-running is a no-op
+    assert db.apply_migrations() == db.apply_migrations()
+
+
+def test_connections_are_pooled_per_thread(db):
+    import threading
+
+    assert db._connect() is db._connect()
+    other = []
+    worker = threading.Thread(target=lambda: other.append(db._connect()))
+    worker.start()
+    worker.join()
+    assert other[0] is not db._connect()
+    assert db._connect().execute("PRAGMA journal_mode").fetchone()[0] == "wal"
+
+
+def _seed_chat(db, n=30):
+    db.insert_chat_logs_bulk(
+        {
+            "session_id": "s1",
+            "user_id": "u1",
+            "role": "user",
+            "message": f"deploy pipeline step {i}" if i % 3 == 0 else f"small talk {i}",
+            "response": "ok",
+        }
+        for i in range(n)
+    )
+
+
+def test_search_chat_log_ranks_and_highlights(db):
+    _seed_chat(db)
+    db.add_chat_log(session_id="s2", user_id="u1", role="user", message="deploy deploy deploy")
+
+    page = db.search_chat_log("deploy", limit=5)
+    assert len(page["results"]) == 5
+    assert page["results"][0]["session_id"] == "s2"  # Highest term frequency first
+    assert "<mark>deploy</mark>" in page["results"][0]["snippet"]
+    scores = [r["score"] for r in page["results"]]
+    assert scores == sorted(scores, reverse=True)
+    only_s1 = db.search_chat_log("deploy", session_id="s1", limit=50)["results"]
+    assert len(only_s1) == 10
+
+
+def test_search_cursor_pages_cover_all_matches_once(db):
+    _seed_chat(db)
+    seen, cursor = [], None
+    while True:
+        page = db.search_chat_log("deploy pipeline", limit=3, cursor=cursor)
+        seen += [r["id"] for r in page["results"]]
+        cursor = page["next_cursor"]
+        if cursor is None:
+            break
+    assert sorted(seen) == list(range(1, 31, 3))
+
+
+def test_history_page_keyset_and_keyword(db):
+    _seed_chat(db)
+    ids, cursor = [], None
+    while True:
+        page = db.get_chat_history_page("s1", "u1", limit=7, cursor=cursor)
+        ids += [row["id"] for row in page["history"]]
+        cursor = page["next_cursor"]
+        if cursor is None:
+            break
+    assert ids == list(range(30, 0, -1))
+    talk = db.get_chat_history_page("s1", "u1", limit=100, keyword="talk")
+    assert len(talk["history"]) == 20
+    with pytest.raises(ValueError):
+        db.get_chat_history_page("s1", "u1", cursor="not a cursor")
+
+
+def test_fts_triggers_and_chunked_backfill(db):
+    _seed_chat(db)
+    db.insert_log(command="deploy the thing", tag="ops", user_id="test")
+    # Simulate a database from before the FTS migration
+    with db._connect() as conn:
+        conn.execute("DROP TABLE chat_log_fts")
+        conn.execute("DROP TABLE memory_fts")
+        conn.execute("DROP TABLE fts_backfill")
+        conn.execute("PRAGMA user_version = 1")
+    db.close()
+
+    upgraded = GuardianDB(TEST_DB_PATH)
+    assert upgraded.fts_backfill_pending()
+    assert upgraded.search_chat_log("deploy")["results"] == []
+    with upgraded._connect() as conn:
+        # Writes during the backfill go through the triggers
+        conn.execute("UPDATE chat_log SET message = 'deploy hotfix' WHERE id = 2")
+        conn.execute("DELETE FROM chat_log WHERE id = 1")
+
+    assert upgraded.backfill_fts(chunk_size=4) == 29
+    assert not upgraded.fts_backfill_pending()
+    ids = {r["id"] for r in upgraded.search_chat_log("deploy", limit=50)["results"]}
+    assert ids == (set(range(4, 31, 3)) | {2})
+    assert upgraded.search_memory("deploy")["results"][0]["tag"] == "ops"
+    upgraded.close()
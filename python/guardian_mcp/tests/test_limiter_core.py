@@ -0,0 +1,200 @@
+import asyncio
+import multiprocessing
+import random
+import time
+
+import pytest
+
+from guardian.utils import limiter_core
+from guardian.utils.limiter_core import (
+    GCRA,
+    MemoryBackend,
+    RateLimiter,
+    SQLiteBackend,
+    TokenBucket,
+)
+from guardian.utils.performance import RateLimitedRunner
+
+
+class FakeClock:
+    def __init__(self):
+        self.now = 1000.0
+
+    def __call__(self):
+        return self.now
+
+
+@pytest.fixture
+def clock():
+    return FakeClock()
+
+
+@pytest.mark.parametrize("algorithm", ["gcra", "token_bucket"])
+def test_burst_then_rate(clock, algorithm):
+    limiter = RateLimiter(clock=clock)
+    limiter.set_limit("", rate=10, burst=3, algorithm=algorithm)
+    assert [limiter.try_acquire() for _ in range(4)] == [True, True, True, False]
+    clock.now += 0.1
+    assert limiter.try_acquire() and not limiter.try_acquire()
+    clock.now += 10  # Refilled, but never beyond the burst
+    assert sum(limiter.try_acquire() for _ in range(5)) == 3
+    assert limiter.stats()["granted"] == 7
+
+
+@pytest.mark.parametrize("seed", range(5))
+def test_gcra_and_token_bucket_agree(clock, seed):
+    rng = random.Random(seed)
+    rate, burst = rng.uniform(1, 20), rng.randint(1, 5)
+    gcra, bucket = RateLimiter(clock=clock), RateLimiter(clock=clock)
+    gcra.set_limit("", rate, burst, "gcra")
+    bucket.set_limit("", rate, burst, "token_bucket")
+    assert isinstance(bucket.get_limit(""), TokenBucket)
+    for _ in range(300):
+        clock.now += rng.expovariate(rate * 1.5)
+        cost = rng.choice([1, 1, 1, 2])
+        assert gcra.try_acquire(cost=cost) == bucket.try_acquire(cost=cost)
+
+
+def test_reservations_are_spaced_in_arrival_order(clock):
+    limiter = RateLimiter(clock=clock)
+    limiter.set_limit("", rate=4)
+    waits = [limiter.reserve() for _ in range(4)]
+    assert waits == pytest.approx([0.0, 0.25, 0.5, 0.75])
+    # Too far out: nothing is booked
+    assert limiter.reserve(max_wait=0.5) is None
+    assert limiter.reserve() == pytest.approx(1.0)
+
+
+def test_hierarchical_keys(clock):
+    limiter = RateLimiter(clock=clock)
+    limiter.set_limit("", rate=1, burst=5)  # Global
+    limiter.set_limit("plugins/*", rate=1, burst=2)  # Each plugin
+    limiter.set_limit("plugins/search/*", rate=1, burst=1)  # Each user of search
+    assert limiter.try_acquire("plugins/search/alice")
+    assert not limiter.try_acquire("plugins/search/alice")  # Her own budget
+    assert limiter.try_acquire("plugins/search/bob")
+    assert not limiter.try_acquire("plugins/search/carol")  # search's budget
+    assert limiter.try_acquire("plugins/weather")
+    assert limiter.try_acquire("plugins/weather")
+    assert limiter.try_acquire("plugins/notes")
+    assert not limiter.try_acquire("plugins/notes")  # Global budget
+    assert not limiter.try_acquire("other/key")  # Covers everything
+    # A denied request takes nothing from the levels that had room
+    clock.now += 1
+    assert limiter.try_acquire("plugins/notes")
+
+
+def test_would_allow_and_record(clock):
+    limiter = RateLimiter(clock=clock)
+    limiter.set_limit("models", rate=1, burst=2)
+    assert limiter.would_allow("models") and limiter.would_allow("models")
+    limiter.record("models", cost=3)  # Overdraws
+    assert not limiter.would_allow("models")
+    clock.now += 1.5
+    assert not limiter.try_acquire("models")
+    clock.now += 0.5
+    assert limiter.try_acquire("models")
+
+
+def test_unknown_algorithm():
+    with pytest.raises(ValueError):
+        RateLimiter().set_limit("", rate=1, algorithm="leaky")
+    with pytest.raises(ValueError):
+        GCRA(rate=0)
+
+
+def test_idle_keys_are_pruned(clock, monkeypatch):
+    monkeypatch.setattr(limiter_core, "PRUNE_EVERY", 10)
+    limiter = RateLimiter(backend=MemoryBackend(), clock=clock)
+    limiter.set_limit("users/*", rate=1)
+    for i in range(100):
+        limiter.try_acquire(f"users/{i}")
+        clock.now += 0.5
+    assert len(limiter.backend) < 20
+
+
+def test_acquire_blocks_for_the_rate():
+    limiter = RateLimiter()
+    limiter.set_limit("", rate=20)
+    start = time.monotonic()
+    for _ in range(5):
+        assert limiter.acquire()
+    assert 0.19 <= time.monotonic() - start < 0.5
+    assert not limiter.acquire(timeout=0.01)
+
+
+@pytest.mark.parametrize("spaced", [False, True])
+def test_acquire_async_spaces_concurrent_tasks(spaced):
+    limiter = RateLimiter()
+    limiter.set_limit("", rate=50)
+    starts = []
+
+    async def task():
+        await limiter.acquire_async(spaced=spaced)
+        starts.append(time.monotonic())
+
+    async def main():
+        await asyncio.gather(*[task() for _ in range(10)])
+
+    first = time.monotonic()
+    asyncio.run(main())
+    # Nobody starts before their booked slot...
+    assert all(t - first >= i * 0.02 for i, t in enumerate(starts))
+    assert starts[-1] - first < 0.4
+    if spaced:  # ...and spaced starts never bunch up after a late timer
+        assert min(b - a for a, b in zip(starts, starts[1:])) >= 0.02
+
+
+def test_slot_async_holds_the_slot_until_it_closes():
+    limiter = RateLimiter()
+    limiter.set_limit("", rate=50)
+    starts = []
+
+    async def call():
+        async with limiter.slot_async():
+            starts.append(time.monotonic())
+            return "done"
+
+    async def main():
+        first = time.monotonic()
+        results = await asyncio.gather(*[call() for _ in range(10)])
+        return first, results, time.monotonic()
+
+    first, results, end = asyncio.run(main())
+    assert results == ["done"] * 10
+    # Ten slots of 0.02s, each kept until it closed, though the calls are instant
+    assert end - first >= 0.2
+    assert all(t - first >= i * 0.02 for i, t in enumerate(starts))
+
+
+def _take_permits(path, attempts, queue):
+    limiter = RateLimiter(SQLiteBackend(path))
+    limiter.set_limit("shared", rate=0.001, burst=50)
+    queue.put(sum(limiter.try_acquire("shared") for _ in range(attempts)))
+    limiter.backend.close()
+
+
+def test_sqlite_backend_shares_one_budget_across_processes(tmp_path):
+    path = str(tmp_path / "limits.db")
+    SQLiteBackend(path).close()
+    ctx = multiprocessing.get_context("spawn")
+    queue = ctx.Queue()
+    workers = [
+        ctx.Process(target=_take_permits, args=(path, 40, queue)) for _ in range(4)
+    ]
+    for p in workers:
+        p.start()
+    granted = sum(queue.get(timeout=60) for _ in workers)
+    for p in workers:
+        p.join(60)
+        assert p.exitcode == 0
+    assert granted == 50
+
+
+def test_plugin_runners_share_a_budget(monkeypatch):
+    monkeypatch.setattr(limiter_core, "default_limiter", RateLimiter())
+    first = RateLimitedRunner("weather", rate_limit=0.5)
+    second = RateLimitedRunner("weather", rate_limit=0.5)
+    assert first.can_run() and first.try_run()
+    assert not second.can_run() and not second.try_run()
+    assert first.get_call_count() == 1
@@ -0,0 +1,181 @@
+import math
+import random
+from unittest.mock import MagicMock
+
+import pytest
+
+from guardian.agents.echoform import CycleHistory, EchoformAgent, MetricHistory
+from guardian.utils.online_stats import EWMA, PeakDetector, RunningStats, WindowedStats
+
+SEEDS = range(20)
+
+
+def batch_mean_var(values):
+    mean = sum(values) / len(values)
+    return mean, sum((x - mean) ** 2 for x in values) / len(values)
+
+
+def batch_peaks(data):
+    return [
+        i
+        for i in range(1, len(data) - 1)
+        if data[i] > data[i - 1] and data[i] > data[i + 1]
+    ]
+
+
+def random_series(rng, n):
+    kind = rng.choice(["gauss", "ints", "walk"])
+    if kind == "gauss":
+        return [
+            rng.gauss(rng.uniform(-1e3, 1e3), rng.uniform(0.01, 100)) for _ in range(n)
+        ]
+    if kind == "ints":  # Plenty of ties
+        return [float(rng.randint(0, 3)) for _ in range(n)]
+    values, x = [], 0.0
+    for _ in range(n):
+        x += rng.uniform(-1, 1)
+        values.append(x)
+    return values
+
+
+@pytest.mark.parametrize("seed", SEEDS)
+def test_running_stats_match_batch(seed):
+    rng = random.Random(seed)
+    values = random_series(rng, rng.randint(1, 300))
+    stats = RunningStats()
+    for i, value in enumerate(values, 1):
+        stats.push(value)
+        mean, var = batch_mean_var(values[:i])
+        assert stats.mean == pytest.approx(mean, rel=1e-9, abs=1e-9)
+        assert stats.variance == pytest.approx(var, rel=1e-7, abs=1e-9)
+
+
+@pytest.mark.parametrize("seed", SEEDS)
+def test_windowed_stats_match_batch(seed):
+    rng = random.Random(seed)
+    size = rng.randint(1, 25)
+    values = random_series(rng, rng.randint(1, 400))
+    window = WindowedStats(size)
+    for i, value in enumerate(values, 1):
+        window.push(value)
+        last = values[max(0, i - size) : i]
+        mean, var = batch_mean_var(last)
+        assert len(window) == len(last)
+        assert window.min == min(last) and window.max == max(last)
+        assert window.mean == pytest.approx(mean, rel=1e-9, abs=1e-6)
+        assert window.std == pytest.approx(math.sqrt(var), rel=1e-6, abs=1e-6)
+
+
+@pytest.mark.parametrize("seed", SEEDS)
+def test_ewma_matches_weighted_sum(seed):
+    rng = random.Random(seed)
+    alpha = rng.uniform(0.01, 1.0)
+    values = random_series(rng, rng.randint(1, 200))
+    ewma = EWMA(alpha)
+    for value in values:
+        ewma.push(value)
+    n = len(values)
+    expected = (1 - alpha) ** (n - 1) * values[0] + sum(
+        alpha * (1 - alpha) ** (n - 1 - i) * values[i] for i in range(1, n)
+    )
+    assert ewma.mean == pytest.approx(expected, rel=1e-9, abs=1e-6)
+    assert ewma.variance >= 0.0
+
+
+def test_ewma_variance_of_constant_stream_is_zero():
+    ewma = EWMA(0.3)
+    for _ in range(50):
+        ewma.push(4.2)
+    assert ewma.mean == pytest.approx(4.2) and ewma.std == pytest.approx(0.0)
+
+
+@pytest.mark.parametrize("seed", SEEDS)
+def test_peak_detector_matches_batch(seed):
+    rng = random.Random(seed)
+    data = random_series(rng, rng.randint(0, 200))
+    detector = PeakDetector()
+    peaks = detector.extend(data)
+    assert peaks == batch_peaks(data)
+    intervals = [b - a for a, b in zip(peaks, peaks[1:])]
+    expected = sum(intervals) / len(intervals) if intervals else None
+    assert detector.mean_interval == pytest.approx(expected)
+
+
+@pytest.mark.parametrize("seed", range(5))
+def test_echoform_anomalies_use_last_twenty_values(seed):
+    rng = random.Random(seed)
+    agent = EchoformAgent(MagicMock(), MagicMock())
+    seen = []
+    for _ in range(60):
+        value = rng.choice([rng.uniform(0.6, 0.7), rng.uniform(0.0, 1.0)])
+        if seen:
+            window = seen[-MetricHistory.ANOMALY_WINDOW :]
+            mean, var = batch_mean_var(window)
+            expected = abs(value - mean) > 2 * math.sqrt(var)
+            assert agent._is_anomalous("performance_score", value) == expected
+            trend = agent._analyze_trends({"performance_score": value})
+            recent = seen[-MetricHistory.TREND_WINDOW :]
+            assert trend["performance_score"]["magnitude"] == pytest.approx(
+                abs(value - sum(recent) / len(recent))
+            )
+        else:
+            assert not agent._is_anomalous("performance_score", value)
+        agent._update_metric_history({"performance_score": value})
+        seen.append(value)
+
+
+def test_echoform_cycle_frequency_from_peaks():
+    agent = EchoformAgent(MagicMock(), MagicMock())
+    history = [0, 1, 0, 0, 1, 0, 0, 1, 0]
+    assert agent._find_peaks(history) == [1, 4, 7]
+    assert agent._calculate_frequency({"history": history}) == pytest.approx(1 / 3)
+    assert agent._calculate_frequency({"history": [0, 1, 0]}) is None
+
+
+def legacy_cycles(history):
+    """_is_periodic and _calculate_frequency before CycleHistory."""
+    pattern_length = len(history) // 2
+    periodic = len(history) >= 3 and all(
+        abs(a - b) <= 0.1
+        for a, b in zip(history[:pattern_length], history[pattern_length:])
+    )
+    peaks = batch_peaks(history)
+    frequency = None
+    if len(peaks) >= 2:
+        frequency = 1.0 / ((peaks[-1] - peaks[0]) / (len(peaks) - 1))
+    return periodic, frequency
+
+
+@pytest.mark.parametrize("seed", SEEDS)
+def test_echoform_cycles_follow_a_growing_history(seed):
+    rng = random.Random(seed)
+    agent = EchoformAgent(MagicMock(), MagicMock())
+    history = []
+    cycle = CycleHistory()
+    for _ in range(60):
+        value = rng.choice([0.0, 0.05, 1.0])
+        history.append(value)
+        cycle.push(value)
+        state = {
+            "load": {"history": history},
+            "resources": {"cpu": {"history": cycle}},
+        }
+        cycles = agent._analyze_cycles(state)
+        periodic, frequency = legacy_cycles(history)
+        for result in (cycles["load"], cycles["resources"]["cpu"]):
+            assert result["periodic"] == periodic
+            assert result["frequency"] == pytest.approx(frequency)
+    assert cycle.peaks.index == len(history) - 1  # Pushed once
+
+
+def test_echoform_cycles_follow_a_shifted_window():
+    agent = EchoformAgent(MagicMock(), MagicMock())
+    window = [0, 1, 0, 1, 0]
+    assert agent._calculate_frequency({"history": window}) == pytest.approx(1 / 2)
+    assert agent._is_periodic({"history": window})
+    # Same length and last value, in place and as a new list
+    shifted = [0, 1, 0, 0, 0]
+    window[:] = shifted
+    for history in (window, shifted):
+        assert agent._calculate_frequency({"history": history}) is None
+        assert not agent._is_periodic({"history": history})
@@ -0,0 +1,196 @@
+import asyncio
+import json
+import time
+from unittest.mock import patch
+
+import pytest
+
+from guardian.core.research.Modules.agent.executor import (
+    ResearchExecutor,
+    build_plan,
+)
+from guardian.core.research.Modules.agent.search import SearchAgent
+from guardian.core.research.Modules.router import Router, Server
+from guardian.utils.limiter_core import RateLimiter
+
+LATENCY = 0.05
+
+
+def search_step(keyword, **extra):
+    return dict(tool="url_search", keyword=keyword, search_engine="google", **extra)
+
+
+def content_step(**extra):
+    return dict(tool="page_content", keyword="Previous URLs", **extra)
+
+
+def ten_step_plan():
+    steps = []
+    for i in range(5):
+        steps += [search_step(f"topic {i}"), content_step()]
+    return steps
+
+
+class FakeModel:
+    """Answers the search planner with a fixed plan."""
+
+    def __init__(self, steps):
+        self.steps = steps
+        self.calls = 0
+
+    def completion(self, prompt):
+        self.calls += 1
+        return f"```json\n{json.dumps(self.steps)}\n```"
+
+
+class FakeCrawl:
+    """Search and LLM summaries that each take LATENCY; records overlap."""
+
+    def __init__(self, fail=()):
+        self.fail = set(fail)
+        self.running = 0
+        self.peak = 0
+
+    async def _work(self):
+        self.running += 1
+        self.peak = max(self.peak, self.running)
+        await asyncio.sleep(LATENCY)
+        self.running -= 1
+
+    async def get_url_llm(self, url, query):
+        await self._work()
+        if query in self.fail:
+            raise RuntimeError(f"search failed: {query}")
+        slug = query.replace(" ", "-")
+        return [{"url": f"https://example.com/{slug}/{i}"} for i in range(2)]
+
+    async def get_summary(self, urls, query):
+        await self._work()
+        return [{"url": u, "title": u.rsplit("/", 2)[1]} for u in urls]
+
+
+def make_agent(steps, crawl, fan_out=4, limiter=None):
+    with patch("guardian.core.research.Modules.agent.search.Crawl") as MockCrawl:
+        MockCrawl.return_value = crawl
+        return SearchAgent(FakeModel(steps), fan_out=fan_out, limiter=limiter)
+
+
+def test_build_plan_links_summaries_to_their_searches():
+    steps = [search_step("a"), content_step(), search_step("b"), search_step("c")]
+    steps.append(content_step(depends_on=[0, 3]))
+    plan = build_plan(steps)
+    assert [(s.tool, s.deps) for s in plan] == [
+        ("url_search", []),
+        ("page_content", [0]),
+        ("url_search", []),
+        ("url_search", []),
+        ("page_content", [0, 3]),
+        ("page_content", [2]),  # Implicit: nobody summarized "b"
+    ]
+    with pytest.raises(ValueError):
+        build_plan([search_step("a", depends_on=[1]), content_step()])  # Cycle
+    with pytest.raises(ValueError):
+        build_plan([content_step(depends_on=[5])])
+
+
+@pytest.mark.asyncio
+async def test_executor_respects_dependencies_and_fan_out():
+    order, running, peak = [], 0, 0
+
+    async def work(subtask, inputs):
+        nonlocal running, peak
+        running += 1
+        peak = max(peak, running)
+        await asyncio.sleep(LATENCY)
+        running -= 1
+        order.append(subtask.index)
+        if subtask.keyword == "boom":
+            raise RuntimeError("boom")
+        return [subtask.index] + [x for found in inputs for x in found]
+
+    steps = ten_step_plan()
+    steps[2]["keyword"] = "boom"
+    steps.append({"tool": "unknown"})
+    executor = ResearchExecutor(
+        {"url_search": work, "page_content": work}, fan_out=3, rate_key=None
+    )
+    plan = build_plan(steps)
+    statuses = {}
+    async for subtask in executor.stream(plan):
+        statuses[subtask.index] = subtask.status
+    assert peak == 3
+    for subtask in plan:
+        for dep in subtask.deps:
+            if subtask.index in order:
+                assert order.index(dep) < order.index(subtask.index)
+    assert statuses[2] == "failed" and statuses[3] == "skipped"
+    assert statuses[10] == "skipped"  # No handler for the tool
+    assert plan[9].status == "done" and plan[9].result == [9, 8]
+
+
+@pytest.mark.asyncio
+async def test_subtasks_wait_for_the_rate_limit_not_a_fixed_sleep():
+    limiter = RateLimiter()
+    limiter.set_limit("models", rate=20)  # research calls count against it
+    crawl = FakeCrawl()
+    agent = make_agent(ten_step_plan(), crawl, fan_out=10, limiter=limiter)
+    start = time.monotonic()
+    await agent.run("task", [])
+    # 11 model calls (plan + 10 subtasks) at 20/s, however wide the fan-out
+    assert time.monotonic() - start >= 10 / 20
+    assert limiter.stats()["granted"] == 11
+
+
+@pytest.mark.asyncio
+async def test_ten_subtask_plan_runs_concurrently():
+    crawl = FakeCrawl(fail={"topic 3"})
+    agent = make_agent(ten_step_plan(), crawl, limiter=RateLimiter())
+    start = time.monotonic()
+    result = await agent.run("task", [])
+    elapsed = time.monotonic() - start
+    # Two waves (searches, then summaries) instead of ten calls in a row
+    assert elapsed < 4 * LATENCY and crawl.peak == 4
+    assert [s["title"] for s in result["data"]] == [
+        "topic-0",
+        "topic-0",
+        "topic-1",
+        "topic-1",
+        "topic-2",
+        "topic-2",
+        "topic-4",
+        "topic-4",
+    ]
+    assert len(agent.db) == 8
+
+
+@pytest.mark.asyncio
+async def test_partial_results_stream_through_the_server():
+    class OneShotPlanner:
+        name = "planner"
+
+        def __init__(self):
+            self.calls = 0
+
+        async def run(self, response, data=None):
+            self.calls += 1
+            if self.calls == 1:
+                return {"agent": "searcher", "task": response, "data": []}
+            return {"agent": "TERMINATE", "task": "TERMINATE", "data": data}
+
+    agent = make_agent(ten_step_plan(), FakeCrawl(), limiter=RateLimiter())
+    agent.set_name("searcher")
+    server = Server()
+    server.add_router("planner", Router(server, OneShotPlanner()))
+    server.add_router("searcher", Router(server, agent))
+    server.set_initial_router("planner", "task")
+    partials = []
+
+    async def on_partial(message):
+        partials.append((time.monotonic(), message))
+
+    report = await server.start("task", on_partial=on_partial)
+    done = time.monotonic()
+    assert report["agent"] == "TERMINATE" and len(report["data"]) == 10
+    assert len(partials) == 5
+    assert all(m["partial"] and m["agent"] == "searcher" for _, m in partials)
+    assert partials[0][0] < done - LATENCY / 2  # Well before the search step ended
@@ -0,0 +1,182 @@
+import json
+import random
+import time
+from datetime import datetime, timedelta
+
+import pytest
+
+from guardian.memory.segment_log import SegmentLog, candidate_blocks
+
+T0 = 1_700_000_000.0
+TYPES = ["recall", "store", "reflect"]
+
+
+def make_events(n, seed=0, shuffled=False):
+    rng = random.Random(seed)
+    times = [T0 + i for i in range(n)]
+    if shuffled:
+        rng.shuffle(times)
+    return [
+        {"i": i, "timestamp": t, "event_type": rng.choice(TYPES), "pad": "x" * 40}
+        for i, t in enumerate(times)
+    ]
+
+
+def brute_force(events, start, end, types=None, limit=None):
+    matches = [
+        e
+        for e in reversed(events)
+        if start <= e["timestamp"] <= end
+        and (types is None or e["event_type"] in types)
+    ]
+    return matches[:limit]
+
+
+@pytest.fixture
+def log(tmp_path):
+    log = SegmentLog(tmp_path / "log", segment_size=8 * 1024, block_size=512)
+    yield log
+    log.close()
+
+
+@pytest.mark.parametrize("shuffled", [False, True])
+def test_queries_match_a_full_scan(log, shuffled):
+    events = make_events(2000, shuffled=shuffled)
+    for event in events:
+        log.append(event)
+    assert log.stats()["segments"] > 10 and len(log) == 2000
+    rng = random.Random(1)
+    for _ in range(50):
+        start = T0 + rng.uniform(-10, 2000)
+        end = start + rng.choice([0, 5, 100, 5000])
+        types = rng.choice([None, ["recall"], ["store", "reflect"]])
+        limit = rng.choice([None, 7])
+        expected = brute_force(events, start, end, types, limit)
+        assert log.query(start, end, types, limit=limit) == expected
+
+
+def test_ordered_segments_seek_to_the_range(log):
+    for event in make_events(2000):
+        log.append(event)
+    segment = log._segments[3]
+    blocks = candidate_blocks(segment, segment.blocks, T0 + 1000, T0 + 1000)
+    assert len(segment.blocks) > 10 and len(blocks) <= 2
+    assert log.query(T0 + 1000, T0 + 1000)[0]["i"] == 1000
+    # Unknown event types never match, without reading anything
+    assert log.query(event_types=["unknown"]) == []
+
+
+def test_filters_accept_datetimes_and_predicates(log):
+    start = datetime(2024, 5, 1)
+    for minute in range(30):
+        stamp = start + timedelta(minutes=minute)
+        log.append({"timestamp": stamp.isoformat(), "source": f"s{minute % 2}"})
+    found = log.query(
+        start + timedelta(minutes=10),
+        start + timedelta(minutes=19),
+        predicate=lambda e: e["source"] == "s1",
+    )
+    assert [e["timestamp"][14:16] for e in found] == ["19", "17", "15", "13", "11"]
+
+
+def test_compaction_merges_compresses_and_expires(tmp_path):
+    log = SegmentLog(tmp_path / "log", segment_size=128 * 1024, block_size=512)
+    events = make_events(600)
+    for i, event in enumerate(events):
+        log.append(event)
+        if i % 100 == 99:
+            log.seal()  # Six small segments
+    assert log.stats()["segments"] == 6
+    log.compression = "gzip"
+    assert log.compact() == {"expired": 0, "merged": 6, "compressed": 0}
+    stats = log.stats()
+    assert stats["segments"] == 1 and stats["bytes"] < stats["raw_bytes"] / 3
+    assert log.query(T0 + 250, T0 + 260) == brute_force(events, T0 + 250, T0 + 260)
+    assert len(list((tmp_path / "log").glob("*.idx.json"))) == 1
+
+    for event in make_events(100, seed=1):
+        log.append(dict(event, timestamp=T0 * 2))  # Far in the future
+    log.seal()
+    log.retention = time.time() - T0 * 1.5  # Everything before T0 * 1.5
+    assert log.compact()["expired"] == 1
+    assert len(log) == 100 and not log.query(end=T0 * 1.5)
+    log.close()
+
+
+def test_reopening_recovers_the_active_segment(tmp_path):
+    directory = tmp_path / "log"
+    log = SegmentLog(directory, segment_size=8 * 1024, block_size=512)
+    events = make_events(300)
+    for event in events:
+        log.append(event)
+    log.close()
+    active = max(directory.glob("*-0.jsonl"))
+    with open(active, "ab") as f:
+        f.write(b'{"i": 300, "timest')  # Torn by a crash
+
+    log = SegmentLog(directory, segment_size=8 * 1024, block_size=512)
+    assert len(log) == 300 and log.query() == brute_force(events, 0, float("inf"))
+    log.append(events[0])
+    assert log.query(limit=1) == [events[0]]
+    log.close()
+
+
+def test_interrupted_compaction_is_cleaned_up(tmp_path):
+    directory = tmp_path / "log"
+    log = SegmentLog(directory, segment_size=64 * 1024, block_size=512)
+    events = make_events(300)
+    for i, event in enumerate(events):
+        log.append(event)
+        if i % 100 == 99:
+            log.seal()
+    log.compact()
+    log.close()
+    # As if the merge had committed but not yet removed the old segments
+    (directory / "00000001-0.jsonl").write_text(json.dumps(events[0]) + "\n")
+    (directory / "00000001.idx.json").write_text("{}")
+
+    log = SegmentLog(directory, segment_size=64 * 1024, block_size=512)
+    assert len(log) == 300 and log.query() == brute_force(events, 0, float("inf"))
+    assert sorted(p.name for p in directory.iterdir()) == [
+        "00000003-1.jsonl",
+        "00000003.idx.json",
+        "event_types.json",
+    ]
+    log.close()
+
+
+def test_unknown_compression():
+    with pytest.raises(ValueError):
+        SegmentLog("unused", compression="lz4")
+
+
+def test_jsonl_memory_logger(tmp_path):
+    from guardian.memory.logger import JSONLMemoryLogger, MemoryEvent
+
+    legacy = {
+        "source": "old",
+        "event_type": "note",
+        "payload": {},
+        "tags": ["a"],
+        "timestamp": "2024-01-01T00:00:00",
+    }
+    tmp_path.joinpath("memory_202401.jsonl").write_text(json.dumps(legacy) + "\n")
+    memory = JSONLMemoryLogger(tmp_path, compact_interval=None)
+    assert (tmp_path / "memory_202401.jsonl.imported").exists()
+    stamp = datetime(2024, 2, 1)
+    for i in range(20):
+        event = MemoryEvent(
+            source=f"agent{i % 2}",
+            event_type="note" if i % 3 else "alert",
+            payload={"i": i},
+            tags=["a", "b"] if i % 4 == 0 else ["a"],
+            timestamp=stamp + timedelta(hours=i),
+        )
+        assert memory.log_event(event)
+
+    found = memory.query_events(source="agent0", event_type="note", tags=["b"])
+    assert [e["payload"]["i"] for e in found] == [16, 8, 4]
+    found = memory.query_events(end_time=stamp - timedelta(seconds=1), limit=5)
+    assert found == [legacy]
+    assert len(memory.query_events(start_time=stamp + timedelta(hours=15))) == 5
+    memory.close()
@@ -1,8 +1,11 @@
+import random
+
 import pytest
 
 pytestmark = pytest.mark.asyncio
 
 from guardian.cache import semantic_cache, semantic_cache_store
+from guardian.semantic_cache import HashingEmbedder, SemanticCache, SparseIndex
 
 
 def test_semantic_cache_hit():
@@ -12,3 +15,78 @@ def test_semantic_cache_hit():
 
 def test_semantic_cache_miss():
     assert semantic_cache("completely different") is None
+
+
+WORDS = "reset password account login email billing invoice refund the a my how".split()
+
+
+def random_text(rng):
+    return " ".join(rng.choice(WORDS) for _ in range(rng.randint(1, 8)))
+
+
+@pytest.mark.parametrize("seed", range(10))
+def test_sparse_index_matches_brute_force(seed):
+    rng = random.Random(seed)
+    embed = HashingEmbedder()
+    index = SparseIndex()
+    vectors = {}
+    for key in range(200):
+        vectors[key] = embed(random_text(rng))
+        index.upsert(key, vectors[key])
+    for key in rng.sample(range(200), 50):
+        index.remove(key)
+        del vectors[key]
+    for _ in range(30):
+        query = embed(random_text(rng))
+        threshold = rng.choice([0.3, 0.6, 0.8, 0.95])
+        expected = {
+            key
+            for key, vec in vectors.items()
+            if sum(w * vec.get(t, 0.0) for t, w in query.items()) >= threshold
+        }
+        assert {key for key, _ in index.search(query, threshold)} == expected
+
+
+def test_capacity_eviction_removes_from_index():
+    cache = SemanticCache(max_entries=2)
+    cache.store("reset my password", 1)
+    cache.store("refund my invoice", 2)
+    assert cache.lookup("reset my password please") == 1  # Now most recent
+    cache.store("update billing email", 3)  # Evicts "refund my invoice"
+    assert cache.lookup("refund my invoice") is None
+    assert cache.lookup("reset my password") == 1
+    assert len(cache._index) == len(cache) == 2
+    assert cache.stats()["evictions"] == 1
+
+
+def test_ttl_and_threshold():
+    cache = SemanticCache(threshold=0.95, ttl=60)
+    cache.store("hello world", "fresh")
+    cache.store("stale entry", "old", ttl=-1)
+    assert cache.lookup("hello world again") is None  # 0.82 < 0.95
+    assert cache.lookup("hello world again", threshold=0.8) == "fresh"
+    assert cache.lookup("stale entry") is None
+    assert cache.stats()["expired"] == 1 and len(cache._index) == 1
+
+
+def test_persistence_round_trip(tmp_path):
+    path = str(tmp_path / "semantic.jsonl")
+    cache = SemanticCache(path=path, ttl=60)
+    cache.store("reset my password", {"answer": 1})
+    cache.store("gone soon", 2, ttl=-1)
+    cache.store("unserializable", object())
+    cache.save()
+
+    restored = SemanticCache(path=path)
+    assert len(restored) == 1
+    assert restored.lookup("how do I reset my password") is None  # Below 0.8
+    assert restored.lookup("reset my password now") == {"answer": 1}
+
+
+def test_dense_embeddings_use_vector_index():
+    pytest.importorskip("faiss")
+    axes = {"password": [1.0, 0.0, 0.0], "billing": [0.0, 1.0, 0.0]}
+    cache = SemanticCache(embed=lambda text: axes.get(text.split()[-1], [0, 0, 1]))
+    cache.store("reset password", "pw")
+    assert cache.lookup("forgot password") == "pw"
+    assert cache.lookup("monthly billing") is None